@@ -8,9 +8,9 @@ estadísticas de rendimiento y estado del sistema de integración RMS-Shopify.
 import logging
 import sys
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 
 from app.core.config import get_settings
@@ -156,14 +156,66 @@ async def get_bulk_operations_metrics() -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve bulk operations metrics: {str(e)}") from e
 
 
+@router.get("/locks", status_code=status.HTTP_200_OK)
+async def get_lock_metrics_endpoint() -> Dict[str, Any]:
+    """
+    Obtiene métricas de los locks distribuidos (tiempo de espera por tipo de lock).
+
+    Returns:
+        Dict: Adquisiciones, esperas y despertares por liberación de cada tipo de lock
+    """
+    from app.utils.distributed_lock import get_lock_metrics
+
+    return {"timestamp": datetime.now(timezone.utc).isoformat(), "locks": get_lock_metrics().get_summary()}
+
+
+def _get_shopify_graphql_metrics(sort_by: str, limit: Optional[int]) -> Dict[str, Any]:
+    """
+    Reúne la telemetría por operación GraphQL y el estado del presupuesto de costo.
+
+    Args:
+        sort_by: Criterio de orden de las operaciones
+        limit: Máximo de operaciones a incluir
+
+    Returns:
+        Dict: Telemetría de operaciones, throttle, concurrencia adaptativa, coalescing y pool HTTP
+    """
+    from app.db.shopify_clients.client_registry import get_client_registry
+    from app.db.shopify_clients.concurrency_controller import get_all_concurrency_status
+    from app.db.shopify_clients.cost_throttle import get_all_throttle_status
+    from app.db.shopify_clients.operation_telemetry import get_operation_telemetry
+    from app.db.shopify_clients.request_coalescer import get_request_coalescer
+
+    return {
+        "operations": get_operation_telemetry().get_summary(sort_by=sort_by, limit=limit),
+        "cost_throttle": get_all_throttle_status(),
+        "write_concurrency": get_all_concurrency_status(),
+        "read_coalescing": get_request_coalescer().get_status(),
+        "http_pool": get_client_registry().get_status(),
+    }
+
+
 @router.get("/performance", status_code=status.HTTP_200_OK)
-async def get_performance_metrics() -> Dict[str, Any]:
+async def get_performance_metrics(
+    sort_by: str = Query("actual_cost", description="actual_cost, requested_cost, latency, calls o throttle_wait"),
+    limit: Optional[int] = Query(None, ge=1, description="Máximo de operaciones GraphQL a devolver"),
+) -> Dict[str, Any]:
     """
     Obtiene métricas de rendimiento del sistema.
 
+    Incluye la telemetría por operación GraphQL de Shopify (latencia, costo
+    solicitado vs real, esperas de throttle, reintentos y bytes), ordenada de
+    la operación más costosa a la menos costosa.
+
+    Args:
+        sort_by: Criterio de orden de las operaciones GraphQL
+        limit: Máximo de operaciones GraphQL a devolver
+
     Returns:
         Dict: Métricas de rendimiento
     """
+    shopify_graphql = _get_shopify_graphql_metrics(sort_by, limit)
+
     try:
         import psutil
 
@@ -190,6 +242,7 @@ async def get_performance_metrics() -> Dict[str, Any]:
                 },
             },
             "python": {"version": sys.version, "executable": sys.executable, "platform": sys.platform},
+            "shopify_graphql": shopify_graphql,
         }
 
         return performance_metrics
@@ -200,6 +253,7 @@ async def get_performance_metrics() -> Dict[str, Any]:
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "error": "psutil not available for system metrics",
             "python": {"version": sys.version, "executable": sys.executable, "platform": sys.platform},
+            "shopify_graphql": shopify_graphql,
         }
     except Exception as e:
         logger.error(f"Error getting performance metrics: {e}")
@@ -313,13 +367,29 @@ async def reset_metrics() -> Dict[str, Any]:
         WEBHOOK_PROCESSOR.error_aggregator = type(WEBHOOK_PROCESSOR.error_aggregator)()
         WEBHOOK_PROCESSOR.processed_webhooks.clear()
 
+        # Reset Shopify GraphQL operation telemetry
+        from app.db.shopify_clients.operation_telemetry import get_operation_telemetry
+
+        get_operation_telemetry().reset()
+
+        # Reset lock wait metrics
+        from app.utils.distributed_lock import get_lock_metrics
+
+        get_lock_metrics().reset()
+
         logger.info("All metrics have been reset")
 
         return {
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "status": "success",
             "message": "All metrics have been reset",
-            "reset_components": ["retry_handlers", "webhook_processor", "error_aggregators"],
+            "reset_components": [
+                "retry_handlers",
+                "webhook_processor",
+                "error_aggregators",
+                "shopify_graphql",
+                "distributed_locks",
+            ],
         }
 
     except Exception as e:
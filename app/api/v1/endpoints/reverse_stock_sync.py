@@ -14,7 +14,10 @@ from pydantic import BaseModel, Field
 from app.core.config import get_settings
 from app.db.connection import ConnDB
 from app.db.rms.product_repository import ProductRepository
+from app.db.shopify_clients.client_registry import get_shopify_client as get_pooled_shopify_client
 from app.db.shopify_graphql_client import ShopifyGraphQLClient
+from app.services.catalog_mirror import get_catalog_mirror
+from app.services.product_fingerprint import FingerprintLedger
 from app.services.reverse_stock_sync import ReverseStockSynchronizer
 
 logger = logging.getLogger(__name__)
@@ -35,6 +38,14 @@ class ReverseStockSyncRequest(BaseModel):
     limit: Optional[int] = Field(default=None, ge=1, description="Límite total de productos a procesar (None = todos)")
 
 
+class InventoryReconciliationRequest(BaseModel):
+    """Request model for the whole-catalog inventory reconciliation."""
+
+    dry_run: bool = Field(default=True, description="Si True, solo genera el reporte de diferencias")
+    delete_zero_stock: bool = Field(default=True, description="Si True, elimina variantes con stock 0")
+    sample_size: int = Field(default=50, ge=0, le=1000, description="Variantes listadas por tipo de diferencia")
+
+
 class ReverseStockSyncResponse(BaseModel):
     """Response model for reverse stock sync."""
 
@@ -44,13 +55,13 @@ class ReverseStockSyncResponse(BaseModel):
     report: Optional[dict[str, Any]] = None
 
 
-async def get_shopify_client() -> ShopifyGraphQLClient:
-    """Dependency para obtener el cliente de Shopify."""
-    return ShopifyGraphQLClient(
-        shop_url=settings.SHOPIFY_SHOP_URL,
-        access_token=settings.SHOPIFY_ACCESS_TOKEN,
-        api_version=settings.SHOPIFY_API_VERSION,
-    )
+async def get_shopify_client() -> AsyncGenerator[ShopifyGraphQLClient, None]:
+    """Dependency para obtener un cliente de Shopify sobre el pool HTTP compartido."""
+    client = await get_pooled_shopify_client()
+    try:
+        yield client
+    finally:
+        await client.close()
 
 
 async def get_product_repository() -> AsyncGenerator[ProductRepository, None]:
@@ -64,9 +75,23 @@ async def get_product_repository() -> AsyncGenerator[ProductRepository, None]:
         await conn_db.close()
 
 
+async def get_fingerprint_ledger() -> AsyncGenerator[Optional[FingerprintLedger], None]:
+    """Dependency para obtener el ledger de sincronización (None si está deshabilitado)."""
+    if not settings.SYNC_FINGERPRINT_ENABLED:
+        yield None
+        return
+    ledger = FingerprintLedger()
+    await ledger.initialize()
+    try:
+        yield ledger
+    finally:
+        await ledger.close()
+
+
 async def get_reverse_stock_synchronizer(
     shopify_client: ShopifyGraphQLClient = Depends(get_shopify_client),
     product_repository: ProductRepository = Depends(get_product_repository),
+    fingerprint_ledger: Optional[FingerprintLedger] = Depends(get_fingerprint_ledger),
 ) -> ReverseStockSynchronizer:
     """Dependency para obtener el sincronizador de stock reverso."""
     primary_location_id = await shopify_client.get_primary_location_id()
@@ -81,6 +106,8 @@ async def get_reverse_stock_synchronizer(
         shopify_client=shopify_client,
         product_repository=product_repository,
         primary_location_id=primary_location_id,
+        catalog_mirror=await get_catalog_mirror(),
+        fingerprint_ledger=fingerprint_ledger,
     )
 
 
@@ -93,7 +120,7 @@ async def execute_reverse_stock_sync(
     Ejecuta la sincronización reversa de stock Shopify → RMS.
 
     Esta sincronización complementaria:
-    1. Encuentra productos en Shopify sin tag de sincronización de hoy
+    1. Encuentra productos activos en Shopify que el ledger no registra como verificados hoy
     2. Consulta el stock actual en RMS
     3. Actualiza el inventario en Shopify
     4. Elimina variantes con stock 0 (opcional)
@@ -145,6 +172,58 @@ async def execute_reverse_stock_sync(
         ) from e
 
 
+@router.post("/reconcile", response_model=ReverseStockSyncResponse)
+async def reconcile_inventory(
+    request: InventoryReconciliationRequest,
+    synchronizer: ReverseStockSynchronizer = Depends(get_reverse_stock_synchronizer),
+):
+    """
+    Compara el inventario de todo el catálogo con RMS y corrige solo las diferencias.
+
+    1. Exporta todas las variantes de Shopify con una operación bulk
+    2. Lee todas las cantidades de RMS con una sola consulta
+    3. Cruza ambas tablas por SKU en memoria
+    4. Escribe solo las cantidades distintas y elimina las variantes sin stock (opcional)
+
+    Args:
+        request: Parámetros de la reconciliación
+
+    Returns:
+        Reporte de diferencias y de los cambios aplicados
+    """
+    global _last_sync_result
+
+    try:
+        logger.info(
+            f"🔎 Iniciando reconciliación de inventario - "
+            f"Dry run: {request.dry_run}, Delete zero stock: {request.delete_zero_stock}"
+        )
+
+        report = await synchronizer.execute_reconciliation(
+            dry_run=request.dry_run,
+            delete_zero_stock=request.delete_zero_stock,
+            sample_size=request.sample_size,
+        )
+        _last_sync_result = report
+
+        counts = report["drift"]["counts"]
+        return ReverseStockSyncResponse(
+            success=True,
+            message=(
+                f"Reconciliación completada - {counts['update']} cantidades distintas, "
+                f"{counts['delete']} variantes sin stock, {counts['missing_in_rms']} SKUs no encontrados en RMS"
+            ),
+            sync_id=report["sync_id"],
+            report=report,
+        )
+
+    except Exception as e:
+        logger.error(f"❌ Error in inventory reconciliation: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Inventory reconciliation failed: {str(e)}"
+        ) from e
+
+
 @router.get("/status", response_model=dict[str, Any])
 async def get_reverse_sync_status():
     """
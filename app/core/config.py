@@ -61,6 +61,44 @@ class Settings(BaseSettings):
     SHOPIFY_WEBHOOK_SECRET: Optional[str] = Field(default=None, env="SHOPIFY_WEBHOOK_SECRET")
     SHOPIFY_RATE_LIMIT_PER_SECOND: int = Field(default=2, env="SHOPIFY_RATE_LIMIT_PER_SECOND")
     SHOPIFY_MAX_RETRIES: int = Field(default=3, env="SHOPIFY_MAX_RETRIES")
+    # Bucket de costo GraphQL (se ajusta automáticamente con extensions.cost.throttleStatus)
+    SHOPIFY_GRAPHQL_BUCKET_SIZE: float = Field(default=1000.0, env="SHOPIFY_GRAPHQL_BUCKET_SIZE")
+    SHOPIFY_GRAPHQL_RESTORE_RATE: float = Field(default=50.0, env="SHOPIFY_GRAPHQL_RESTORE_RATE")
+    SHOPIFY_SHARED_BUDGET_ENABLED: bool = Field(
+        default=True,
+        env="SHOPIFY_SHARED_BUDGET_ENABLED",
+        description="Comparte el bucket de costo de Shopify entre workers/réplicas vía Redis (requiere REDIS_URL)",
+    )
+    SHOPIFY_COALESCE_READS: bool = Field(
+        default=True,
+        env="SHOPIFY_COALESCE_READS",
+        description="Agrupa queries de lectura idénticas en vuelo en una sola llamada a Shopify",
+    )
+    SHOPIFY_MUTATION_BATCH_MAX_COST: float = Field(
+        default=500.0,
+        env="SHOPIFY_MUTATION_BATCH_MAX_COST",
+        description="Costo máximo estimado de un documento con mutaciones agrupadas por alias",
+    )
+    SHOPIFY_MUTATION_BATCH_MAX_SIZE: int = Field(
+        default=50,
+        env="SHOPIFY_MUTATION_BATCH_MAX_SIZE",
+        description="Máximo de mutaciones (aliases) por documento agrupado",
+    )
+    SHOPIFY_MUTATION_BATCH_WINDOW: float = Field(
+        default=0.05,
+        env="SHOPIFY_MUTATION_BATCH_WINDOW",
+        description="Segundos que se espera para acumular mutaciones antes de enviar un documento",
+    )
+    SHOPIFY_WRITE_CONCURRENCY_INITIAL: int = Field(
+        default=4,
+        env="SHOPIFY_WRITE_CONCURRENCY_INITIAL",
+        description="Ventana inicial de escrituras concurrentes (se ajusta con AIMD según el bucket de costo)",
+    )
+    SHOPIFY_WRITE_CONCURRENCY_MAX: int = Field(
+        default=32,
+        env="SHOPIFY_WRITE_CONCURRENCY_MAX",
+        description="Máximo de escrituras concurrentes que puede alcanzar la ventana adaptativa",
+    )
 
     # === CONFIGURACIÓN DE REDIS ===
     REDIS_URL: Optional[str] = Field(default=None, env="REDIS_URL")
@@ -77,6 +115,66 @@ class Settings(BaseSettings):
     SYNC_CHECKPOINT_INTERVAL: int = Field(default=100, env="SYNC_CHECKPOINT_INTERVAL")
     SYNC_PARALLEL_WORKERS: int = Field(default=3, env="SYNC_PARALLEL_WORKERS")
     SYNC_HANDLE_BATCH_SIZE: int = Field(default=25, env="SYNC_HANDLE_BATCH_SIZE")
+    SYNC_PIPELINE_PREFETCH_PAGES: int = Field(
+        default=2,
+        env="SYNC_PIPELINE_PREFETCH_PAGES",
+        description="Páginas de RMS extraídas por adelantado mientras se escribe la página actual en Shopify",
+    )
+    SYNC_FINGERPRINT_ENABLED: bool = Field(
+        default=True,
+        env="SYNC_FINGERPRINT_ENABLED",
+        description="Omite productos cuyo contenido mapeado no cambió desde la última escritura exitosa",
+    )
+    SYNC_FINGERPRINT_MAX_AGE_HOURS: int = Field(
+        default=168,
+        env="SYNC_FINGERPRINT_MAX_AGE_HOURS",
+        description="Horas tras las cuales un producto sin cambios se vuelve a escribir igualmente (0 = nunca)",
+    )
+    SYNC_UPDATE_PLANNER_ENABLED: bool = Field(
+        default=True,
+        env="SYNC_UPDATE_PLANNER_ENABLED",
+        description="Compara con el estado actual en Shopify y envía solo las mutaciones necesarias al actualizar",
+    )
+    SYNC_PRODUCT_SET_ENABLED: bool = Field(
+        default=True,
+        env="SYNC_PRODUCT_SET_ENABLED",
+        description="Crea productos con una sola mutación productSet; si Shopify la rechaza se usa el flujo por pasos",
+    )
+    CATALOG_MIRROR_ENABLED: bool = Field(
+        default=True,
+        env="CATALOG_MIRROR_ENABLED",
+        description="Mantiene un espejo local (SQLite) del catálogo de Shopify para evitar consultas repetidas",
+    )
+    CATALOG_MIRROR_PATH: str = Field(
+        default="checkpoints/catalog_mirror.sqlite3",
+        env="CATALOG_MIRROR_PATH",
+        description="Archivo SQLite del espejo del catálogo",
+    )
+    CATALOG_MIRROR_MAX_AGE_MINUTES: int = Field(
+        default=720,
+        env="CATALOG_MIRROR_MAX_AGE_MINUTES",
+        description="Antigüedad máxima de la última carga completa para leer del espejo (0 = sin límite)",
+    )
+    CATALOG_MIRROR_RECONCILE_INTERVAL_MINUTES: int = Field(
+        default=360,
+        env="CATALOG_MIRROR_RECONCILE_INTERVAL_MINUTES",
+        description="Intervalo en minutos entre recargas completas del espejo con la operación bulk",
+    )
+    SYNC_BULK_MUTATION_ENABLED: bool = Field(
+        default=True,
+        env="SYNC_BULK_MUTATION_ENABLED",
+        description="Escribe los productos con bulkOperationRunMutation (productSet) en sincronizaciones grandes",
+    )
+    SYNC_BULK_MUTATION_THRESHOLD: int = Field(
+        default=2000,
+        env="SYNC_BULK_MUTATION_THRESHOLD",
+        description="Productos (CCODs) a partir de los cuales la sincronización completa usa la mutación bulk",
+    )
+    SYNC_BULK_MUTATION_BATCH_SIZE: int = Field(
+        default=2000,
+        env="SYNC_BULK_MUTATION_BATCH_SIZE",
+        description="Productos a escribir por cada operación bulk de mutación",
+    )
 
     # === CONFIGURACIÓN DE UPDATE CHECKPOINT ===
     USE_UPDATE_CHECKPOINT: bool = Field(default=False, env="USE_UPDATE_CHECKPOINT")
@@ -165,6 +263,23 @@ class Settings(BaseSettings):
         default=10, env="ORDER_POLLING_MAX_PAGES", description="Máximo número de páginas a consultar en cada polling"
     )
 
+    # === CONFIGURACIÓN DE INVENTORY FAST LANE (SOLO CANTIDADES RMS → SHOPIFY) ===
+    ENABLE_INVENTORY_FAST_LANE: bool = Field(
+        default=True,
+        env="ENABLE_INVENTORY_FAST_LANE",
+        description="Propaga cambios de cantidad de RMS a Shopify sin pasar por el pipeline completo de productos",
+    )
+    INVENTORY_FAST_LANE_INTERVAL_SECONDS: int = Field(
+        default=60,
+        env="INVENTORY_FAST_LANE_INTERVAL_SECONDS",
+        description="Intervalo en segundos entre ciclos del fast lane (mínimo efectivo: 60, ciclo del scheduler)",
+    )
+    INVENTORY_FAST_LANE_INDEX_TTL_MINUTES: int = Field(
+        default=60,
+        env="INVENTORY_FAST_LANE_INDEX_TTL_MINUTES",
+        description="Vigencia en minutos del índice SKU → inventoryItemId de Shopify",
+    )
+
     # === CONFIGURACIÓN DE ORDERENTRY PARA ENVÍOS ===
     SHIPPING_ITEM_ID: int = Field(
         default=481461,
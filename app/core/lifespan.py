@@ -386,11 +386,13 @@ async def shutdown_close_connections():
         except Exception as e:
             logger.error(f"Error cerrando conexión RMS: {e}")
 
-        # Cerrar cliente Redis
+        # Cerrar cliente Redis (antes, la suscripción de liberación de locks)
         if settings.REDIS_URL:
             try:
                 from app.core import redis_client
+                from app.utils.distributed_lock import cleanup_locks
 
+                await cleanup_locks()
                 await redis_client.close_redis()
                 logger.info("✅ Cliente Redis cerrado")
             except Exception as e:
@@ -7,6 +7,7 @@ periódicas entre RMS y Shopify, incluyendo detección de cambios automática.
 
 import asyncio
 import logging
+import time
 from datetime import date, datetime, timedelta
 from typing import Any, Dict, Optional
 
@@ -29,6 +30,13 @@ _last_rms_sync_success: bool = False
 _polling_service = None
 _last_order_poll_time: Optional[datetime] = None
 
+# Inventory fast lane state
+_inventory_fast_lane = None
+_last_fast_lane_time: Optional[datetime] = None
+
+# Catalog mirror reconcile state
+_catalog_mirror_task: Optional[asyncio.Task] = None
+
 
 async def _save_scheduler_state():
     """
@@ -165,7 +173,7 @@ async def stop_scheduler():
     """
     Detiene el scheduler y la detección de cambios.
     """
-    global _scheduler_running, _scheduler_task, _change_detector, _polling_service
+    global _scheduler_running, _scheduler_task, _change_detector, _polling_service, _inventory_fast_lane
 
     try:
         if not _scheduler_running:
@@ -189,6 +197,27 @@ async def stop_scheduler():
             except Exception as e:
                 logger.error(f"Error deteniendo polling service: {e}")
 
+        # Detener inventory fast lane
+        if _inventory_fast_lane:
+            try:
+                from app.services.inventory_fast_lane import close_inventory_fast_lane
+
+                await close_inventory_fast_lane()
+                _inventory_fast_lane = None
+                logger.info("✅ Inventory fast lane detenido")
+            except Exception as e:
+                logger.error(f"Error deteniendo inventory fast lane: {e}")
+
+        # Detener recarga del espejo del catálogo
+        if _catalog_mirror_task and not _catalog_mirror_task.done():
+            _catalog_mirror_task.cancel()
+        try:
+            from app.services.catalog_mirror import close_catalog_mirror
+
+            await close_catalog_mirror()
+        except Exception as e:
+            logger.error(f"Error cerrando espejo del catálogo: {e}")
+
         # Cancelar tarea del scheduler
         if _scheduler_task and not _scheduler_task.done():
             _scheduler_task.cancel()
@@ -241,6 +270,12 @@ async def _scheduler_loop():
                 # Verificar si debe ejecutarse order polling
                 await _check_order_polling()
 
+                # Propagar cambios de cantidad RMS → Shopify (fast lane)
+                await _check_inventory_fast_lane()
+
+                # Recargar el espejo local del catálogo si está vencido
+                await _check_catalog_mirror_reconcile()
+
                 # Sleep por 1 minuto entre verificaciones
                 await asyncio.sleep(60)  # 1 minuto
 
@@ -311,6 +346,8 @@ async def _check_reverse_stock_sync():
         from app.db.connection import ConnDB
         from app.db.rms.product_repository import ProductRepository
         from app.db.shopify_graphql_client import ShopifyGraphQLClient
+        from app.services.catalog_mirror import get_catalog_mirror
+        from app.services.product_fingerprint import FingerprintLedger
         from app.services.reverse_stock_sync import ReverseStockSynchronizer
 
         # Initialize clients
@@ -323,12 +360,19 @@ async def _check_reverse_stock_sync():
         await conn_db.initialize()
         product_repository = ProductRepository(conn_db)
 
+        # Ledger shared with RMS→Shopify: skips products it already verified today
+        fingerprint_ledger = FingerprintLedger() if settings.SYNC_FINGERPRINT_ENABLED else None
+        if fingerprint_ledger:
+            await fingerprint_ledger.initialize()
+
         try:
             # Create synchronizer
             synchronizer = ReverseStockSynchronizer(
                 shopify_client=shopify_client,
                 product_repository=product_repository,
                 primary_location_id=primary_location_id,
+                catalog_mirror=await get_catalog_mirror(),
+                fingerprint_ledger=fingerprint_ledger,
             )
 
             # Execute reverse sync
@@ -359,6 +403,8 @@ async def _check_reverse_stock_sync():
             await _save_scheduler_state()
 
         finally:
+            if fingerprint_ledger:
+                await fingerprint_ledger.close()
             await conn_db.close()
             await shopify_client.close()
 
@@ -428,6 +474,100 @@ async def _check_order_polling():
         logger.error(f"Error en order polling: {e}", exc_info=True)
 
 
+async def _check_inventory_fast_lane():
+    """
+    Ejecuta un ciclo del inventory fast lane si corresponde.
+
+    Condiciones para ejecutar:
+    - ENABLE_INVENTORY_FAST_LANE=true
+    - Ha pasado INVENTORY_FAST_LANE_INTERVAL_SECONDS desde el último ciclo
+    """
+    global _inventory_fast_lane, _last_fast_lane_time
+
+    try:
+        if not settings.ENABLE_INVENTORY_FAST_LANE:
+            return
+
+        now = datetime.now(pytz.UTC)
+        if _last_fast_lane_time:
+            if now - _last_fast_lane_time < timedelta(seconds=settings.INVENTORY_FAST_LANE_INTERVAL_SECONDS):
+                return
+
+        if not _inventory_fast_lane:
+            from app.services.inventory_fast_lane import get_inventory_fast_lane
+
+            _inventory_fast_lane = await get_inventory_fast_lane()
+            logger.info("✅ Inventory fast lane initialized")
+
+        await _inventory_fast_lane.run_cycle()
+        _last_fast_lane_time = now
+
+    except Exception as e:
+        logger.error(f"Error en inventory fast lane: {e}", exc_info=True)
+
+
+async def _check_catalog_mirror_reconcile():
+    """
+    Recarga el espejo local del catálogo con una operación bulk si corresponde.
+
+    Condiciones para ejecutar:
+    - CATALOG_MIRROR_ENABLED=true
+    - La última carga completa tiene más de CATALOG_MIRROR_RECONCILE_INTERVAL_MINUTES (o nunca se cargó)
+    - No hay otra recarga en curso
+
+    La operación bulk puede tardar varios minutos, por eso corre en una tarea
+    aparte sin bloquear el loop del scheduler.
+    """
+    global _catalog_mirror_task
+
+    try:
+        if not settings.CATALOG_MIRROR_ENABLED:
+            return
+        if _catalog_mirror_task and not _catalog_mirror_task.done():
+            return
+
+        from app.services.catalog_mirror import get_catalog_mirror
+
+        mirror = await get_catalog_mirror()
+        if not mirror:
+            return
+
+        last_full_sync_at = await mirror.last_full_sync_at()
+        interval_seconds = settings.CATALOG_MIRROR_RECONCILE_INTERVAL_MINUTES * 60
+        if last_full_sync_at and time.time() - last_full_sync_at < interval_seconds:
+            return
+
+        _catalog_mirror_task = asyncio.create_task(_reconcile_catalog_mirror(mirror))
+
+    except Exception as e:
+        logger.error(f"Error verificando espejo del catálogo: {e}")
+
+
+async def _reconcile_catalog_mirror(mirror):
+    """
+    Ejecuta la recarga completa del espejo del catálogo.
+
+    Args:
+        mirror: Espejo inicializado
+    """
+    from app.db.shopify_graphql_client import ShopifyGraphQLClient
+    from app.services.catalog_mirror import reconcile_catalog_mirror
+
+    shopify_client = ShopifyGraphQLClient()
+    try:
+        await shopify_client.initialize()
+        logger.info("🪞 Recargando espejo del catálogo con operación bulk")
+        stats = await reconcile_catalog_mirror(mirror, shopify_client)
+        logger.info(
+            f"✅ Espejo del catálogo recargado - {stats['mirrored_products']} productos "
+            f"en {stats['duration_seconds']:.1f}s"
+        )
+    except Exception as e:
+        logger.error(f"Error recargando espejo del catálogo: {e}", exc_info=True)
+    finally:
+        await shopify_client.close()
+
+
 async def _check_scheduled_syncs():
     """
     Verifica y ejecuta sincronizaciones programadas adicionales.
@@ -483,7 +623,7 @@ def get_scheduler_status() -> Dict[str, Any]:
         Dict: Información del estado
     """
     global _change_detector, _last_full_sync_date, _last_rms_sync_time, _last_rms_sync_success
-    global _polling_service, _last_order_poll_time
+    global _polling_service, _last_order_poll_time, _inventory_fast_lane
 
     status = {
         "running": _scheduler_running,
@@ -577,6 +717,13 @@ def get_scheduler_status() -> Dict[str, Any]:
         except Exception as e:
             logger.error(f"Error getting polling statistics: {e}")
 
+    status["inventory_fast_lane"] = {
+        "enabled": settings.ENABLE_INVENTORY_FAST_LANE,
+        "interval_seconds": settings.INVENTORY_FAST_LANE_INTERVAL_SECONDS,
+        "last_cycle_time": _last_fast_lane_time.isoformat() if _last_fast_lane_time else None,
+        "statistics": _inventory_fast_lane.get_status() if _inventory_fast_lane else None,
+    }
+
     return status
 
 
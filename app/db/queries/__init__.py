@@ -41,11 +41,14 @@ __all__ = [
     "PRODUCTS_QUERY",  # noqa: F405
     "PRODUCT_BY_SKU_QUERY",  # noqa: F405
     "PRODUCT_BY_HANDLE_QUERY",  # noqa: F405
+    "PRODUCT_UPDATE_SNAPSHOT_QUERY",  # noqa: F405
+    "PRODUCT_SNAPSHOTS_BY_HANDLES_QUERY",  # noqa: F405
     # Product mutations
     "CREATE_PRODUCT_MUTATION",  # noqa: F405
     "UPDATE_PRODUCT_MUTATION",  # noqa: F405
     "CREATE_PRODUCT_WITH_CATEGORY_MUTATION",  # noqa: F405
     "UPDATE_PRODUCT_WITH_CATEGORY_MUTATION",  # noqa: F405
+    "PRODUCT_SET_MUTATION",  # noqa: F405
     # Variant operations
     "CREATE_VARIANT_MUTATION",  # noqa: F405
     "CREATE_VARIANTS_BULK_MUTATION",  # noqa: F405
@@ -76,6 +79,7 @@ __all__ = [
     "INVENTORY_LEVELS_SIMPLE_QUERY",  # noqa: F405
     "INVENTORY_LEVEL_BY_ITEM_QUERY",  # noqa: F405
     "INVENTORY_ITEMS_QUERY",  # noqa: F405
+    "INVENTORY_ITEM_SKU_INDEX_QUERY",  # noqa: F405
     "INVENTORY_ITEM_QUERY",  # noqa: F405
     "INVENTORY_SET_MUTATION",  # noqa: F405
     "INVENTORY_ADJUST_MUTATION",  # noqa: F405
@@ -135,4 +139,7 @@ __all__ = [
     "BULK_OPERATION_PRODUCTS_QUERY",  # noqa: F405
     "CREATE_BULK_OPERATION_MUTATION",  # noqa: F405
     "CANCEL_BULK_OPERATION_MUTATION",  # noqa: F405
+    "STAGED_UPLOADS_CREATE_MUTATION",  # noqa: F405
+    "BULK_OPERATION_RUN_MUTATION",  # noqa: F405
+    "PRODUCT_SET_BULK_MUTATION",  # noqa: F405
 ]
@@ -5,6 +5,7 @@ This module contains bulk operation management:
 - Bulk operation status and monitoring
 - Bulk data export operations
 - Bulk query execution
+- Bulk mutation execution from staged JSONL uploads
 """
 
 # Bulk operation status query
@@ -141,3 +142,67 @@ mutation CancelBulkOperation($id: ID!) {
   }
 }
 """
+
+# Staged upload target for the JSONL variables file of a bulk mutation
+STAGED_UPLOADS_CREATE_MUTATION = """
+mutation StagedUploadsCreate($input: [StagedUploadInput!]!) {
+  stagedUploadsCreate(input: $input) {
+    stagedTargets {
+      url
+      resourceUrl
+      parameters {
+        name
+        value
+      }
+    }
+    userErrors {
+      field
+      message
+    }
+  }
+}
+"""
+
+# Run a mutation once per line of a staged JSONL variables file
+BULK_OPERATION_RUN_MUTATION = """
+mutation BulkOperationRunMutation($mutation: String!, $stagedUploadPath: String!) {
+  bulkOperationRunMutation(mutation: $mutation, stagedUploadPath: $stagedUploadPath) {
+    bulkOperation {
+      id
+      status
+      type
+      createdAt
+    }
+    userErrors {
+      field
+      message
+    }
+  }
+}
+"""
+
+# Product upsert executed by bulkOperationRunMutation (one ProductSetInput per JSONL line)
+PRODUCT_SET_BULK_MUTATION = """
+mutation ProductSetBulk($input: ProductSetInput!) {
+  productSet(input: $input) {
+    product {
+      id
+      handle
+      variants(first: 250) {
+        nodes {
+          id
+          sku
+          inventoryItem {
+            id
+          }
+        }
+      }
+    }
+    userErrors {
+      field
+      message
+      code
+    }
+  }
+}
+"""
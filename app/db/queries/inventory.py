@@ -168,6 +168,24 @@ query GetInventoryItems($first: Int!, $after: String, $query: String) {
 }
 """
 
+# Lightweight SKU -> inventory item index (inventory fast lane)
+INVENTORY_ITEM_SKU_INDEX_QUERY = """
+query GetInventoryItemSkuIndex($first: Int!, $after: String) {
+  inventoryItems(first: $first, after: $after) {
+    edges {
+      node {
+        id
+        sku
+      }
+    }
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+  }
+}
+"""
+
 # Single inventory item query
 INVENTORY_ITEM_QUERY = """
 query GetInventoryItem($id: ID!) {
@@ -50,6 +50,58 @@ query GetProduct($id: ID!) {
 }
 """
 
+PRODUCT_UPDATE_SNAPSHOT_QUERY = """
+query GetProductUpdateSnapshot($id: ID!, $locationId: ID!) {
+  product(id: $id) {
+    id
+    title
+    status
+    vendor
+    tags
+    category {
+      id
+    }
+    metafields(first: 50) {
+      edges {
+        node {
+          namespace
+          key
+          type
+          value
+        }
+      }
+    }
+    variants(first: 250) {
+      edges {
+        node {
+          id
+          sku
+          price
+          compareAtPrice
+          selectedOptions {
+            name
+            value
+          }
+          inventoryItem {
+            id
+            tracked
+            inventoryLevel(locationId: $locationId) {
+              quantities(names: ["available"]) {
+                name
+                quantity
+              }
+            }
+          }
+        }
+      }
+      pageInfo {
+        hasNextPage
+      }
+    }
+  }
+}
+"""
+
 PRODUCTS_QUERY = """
 query GetProducts($first: Int!, $after: String) {
   products(first: $first, after: $after) {
@@ -203,6 +255,73 @@ query ProductsByHandlesBatch($handles: String!) {
 }
 """
 
+PRODUCT_SNAPSHOTS_BY_HANDLES_QUERY = """
+query ProductSnapshotsByHandles($handles: String!, $first: Int!, $locationId: ID!) {
+  products(first: $first, query: $handles) {
+    edges {
+      node {
+        id
+        title
+        handle
+        status
+        productType
+        vendor
+        tags
+        createdAt
+        updatedAt
+        category {
+          id
+        }
+        options {
+          id
+          name
+          values
+        }
+        metafields(first: 50) {
+          edges {
+            node {
+              namespace
+              key
+              type
+              value
+            }
+          }
+        }
+        variants(first: 100) {
+          edges {
+            node {
+              id
+              sku
+              title
+              price
+              compareAtPrice
+              inventoryQuantity
+              selectedOptions {
+                name
+                value
+              }
+              inventoryItem {
+                id
+                tracked
+                inventoryLevel(locationId: $locationId) {
+                  quantities(names: ["available"]) {
+                    name
+                    quantity
+                  }
+                }
+              }
+            }
+          }
+          pageInfo {
+            hasNextPage
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
 # Product Mutations
 CREATE_PRODUCT_MUTATION = """
 mutation CreateProduct($input: ProductInput!) {
@@ -459,6 +578,34 @@ mutation UpdateProductWithCategory($input: ProductInput!) {
 }
 """
 
+# Declarative upsert: product fields, options, variants (SKU, price, inventory) and metafields in one call
+PRODUCT_SET_MUTATION = """
+mutation ProductSet($input: ProductSetInput!, $synchronous: Boolean!) {
+  productSet(input: $input, synchronous: $synchronous) {
+    product {
+      id
+      title
+      handle
+      status
+      variants(first: 250) {
+        nodes {
+          id
+          sku
+          inventoryItem {
+            id
+          }
+        }
+      }
+    }
+    userErrors {
+      field
+      message
+      code
+    }
+  }
+}
+"""
+
 # Variant deletion mutation (using bulk delete)
 DELETE_VARIANTS_BULK_MUTATION = """
 mutation DeleteVariantsBulk($productId: ID!, $variantsIds: [ID!]!) {
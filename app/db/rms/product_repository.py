@@ -19,6 +19,9 @@ from app.utils.error_handler import RMSConnectionException
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# CCODs per stock query (SQL Server accepts at most 2100 parameters per statement)
+STOCK_QUERY_MAX_CCODS = 1000
+
 
 class ProductRepository(BaseRepository):
     """Repository for product and inventory operations in RMS."""
@@ -108,11 +111,16 @@ class ProductRepository(BaseRepository):
         family_filter: Optional[List[str]] = None,
         gender_filter: Optional[List[str]] = None,
         limit: Optional[int] = None,
-        offset: int = 0,
+        after_ccod: Optional[str] = None,
         include_zero_stock: bool = False,
     ) -> List[RMSViewItem]:
         """
         Get products modified since a specific timestamp using Item.LastUpdated.
+
+        When ``limit`` is given, results are paginated by keyset on CCOD: the page holds
+        all matching items of the next ``limit`` CCODs greater than ``after_ccod``, ordered
+        by CCOD, so a product is never split across pages and page cost does not grow with
+        depth. Pass the CCOD of the last returned item as ``after_ccod`` for the next page.
         """
         if not self.is_initialized():
             raise RMSConnectionException(
@@ -169,9 +177,23 @@ class ProductRepository(BaseRepository):
                 if not include_zero_stock:
                     query += " AND v.Quantity > 0"
 
-                query += " ORDER BY v.ItemID"
                 if limit:
-                    query += f" OFFSET {offset} ROWS FETCH NEXT {limit} ROWS ONLY"
+                    # Keyset (seek) pagination on CCOD over the filtered set
+                    query = f"""
+                    WITH Filtered AS ({query}),
+                    PageCCODs AS (
+                        SELECT DISTINCT TOP ({int(limit)}) ccod
+                        FROM Filtered
+                        WHERE ccod > :after_ccod
+                        ORDER BY ccod
+                    )
+                    SELECT f.* FROM Filtered f
+                    INNER JOIN PageCCODs p ON f.ccod = p.ccod
+                    ORDER BY f.ccod, f.item_id
+                    """
+                    params["after_ccod"] = after_ccod or ""
+                else:
+                    query += " ORDER BY v.ItemID"
 
                 if since_timestamp:
                     logger.info(f"Executing View_Items query for items modified since {since_timestamp}")
@@ -523,6 +545,63 @@ class ProductRepository(BaseRepository):
             logger.error(f"Error getting inventory summary: {e}")
             return {}
 
+    @with_retry(max_attempts=3, delay=1.0)
+    @log_operation()
+    async def get_item_quantities(self) -> List[Tuple[int, str, int]]:
+        """
+        Get the current quantity of every item in View_Items (inventory fast lane snapshot).
+
+        Only the three columns needed to compute stock deltas are read, so the
+        whole catalog can be scanned every minute.
+
+        Returns:
+            List[Tuple[int, str, int]]: (ItemID, C_ARTICULO, Quantity) per item
+        """
+        async with self.get_session() as session:
+            query = """
+            SELECT ItemID, C_ARTICULO, Quantity
+            FROM View_Items
+            WHERE C_ARTICULO IS NOT NULL
+            """
+            result = await session.execute(text(query))
+            return [(int(row[0]), str(row[1]).strip(), int(row[2] or 0)) for row in result.fetchall()]
+
+    @with_retry(max_attempts=3, delay=1.0)
+    @log_operation()
+    async def get_stock_by_ccods(self, ccods: List[str]) -> Dict[str, Dict[str, int]]:
+        """
+        Get the stock of every variant of many CCODs with one set-based query.
+
+        Used by the reverse stock sync to load a whole page of Shopify products at
+        once instead of querying each CCOD. CCODs are sent as parameters, in chunks
+        that stay below the SQL Server limit of 2100 parameters per statement.
+
+        Args:
+            ccods: CCODs to look up
+
+        Returns:
+            Dict[str, Dict[str, int]]: CCOD (lowercase) -> {C_ARTICULO (lowercase): quantity},
+                with negative quantities normalized to 0. CCODs without items are not included.
+        """
+        unique_ccods = list(dict.fromkeys(ccod for ccod in ccods if ccod))
+        stock: Dict[str, Dict[str, int]] = {}
+        async with self.get_session() as session:
+            for start in range(0, len(unique_ccods), STOCK_QUERY_MAX_CCODS):
+                chunk = unique_ccods[start : start + STOCK_QUERY_MAX_CCODS]
+                placeholders = ", ".join(f":ccod_{i}" for i in range(len(chunk)))
+                query = f"""
+                SELECT CCOD, C_ARTICULO, Quantity
+                FROM View_Items
+                WHERE CCOD IN ({placeholders})
+                AND C_ARTICULO IS NOT NULL
+                """
+                params = {f"ccod_{i}": ccod for i, ccod in enumerate(chunk)}
+                result = await session.execute(text(query), params)
+                for ccod, sku, quantity in result.fetchall():
+                    variants = stock.setdefault(str(ccod).strip().lower(), {})
+                    variants[str(sku).strip().lower()] = max(0, int(quantity or 0))
+        return stock
+
     # ------------------------- Stock operations -------------------------
     @with_retry(max_attempts=3, delay=1.0)
     @log_operation()
@@ -185,14 +185,14 @@ class RMSHandler:
         family_filter: Optional[List[str]] = None,
         gender_filter: Optional[List[str]] = None,
         limit: Optional[int] = None,
-        offset: int = 0,
+        after_ccod: Optional[str] = None,
         include_zero_stock: bool = False,
     ) -> List[RMSViewItem]:
         """Delegate to ProductRepository."""
         if not self._initialized:
             await self.initialize()
         return await self.product_repo.get_view_items_since(
-            since_timestamp, category_filter, family_filter, gender_filter, limit, offset, include_zero_stock
+            since_timestamp, category_filter, family_filter, gender_filter, limit, after_ccod, include_zero_stock
         )
 
     async def get_view_items(
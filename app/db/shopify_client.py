@@ -10,6 +10,7 @@ import logging
 from typing import Any, Dict, Optional
 
 from app.core.config import get_settings
+from app.db.shopify_clients.client_registry import close_client_registry, get_client_registry
 from app.db.shopify_graphql_client import ShopifyGraphQLClient
 
 settings = get_settings()
@@ -42,9 +43,10 @@ async def test_shopify_connection() -> bool:
     try:
         client = get_graphql_client()
 
-        # Inicializar el cliente si no está inicializado
+        # Inicializar el cliente si no está inicializado (verifica la conexión una vez por proceso)
         if not hasattr(client, "session") or client.session is None:
             await client.initialize()
+            return True
 
         return await client.test_connection()
     except Exception as e:
@@ -185,8 +187,9 @@ async def create_shopify_product(product_data: Dict[str, Any]) -> Dict[str, Any]
 
 async def initialize_http_client():
     """
-    Inicializa el cliente HTTP para Shopify.
+    Inicializa el pool HTTP compartido de Shopify y el cliente global.
     """
+    await get_client_registry().start()
     client = get_graphql_client()
     await client.initialize()
     logger.info("Shopify HTTP client initialized")
@@ -194,10 +197,11 @@ async def initialize_http_client():
 
 async def close_http_client():
     """
-    Cierra el cliente HTTP para Shopify.
+    Cierra el cliente global y el pool HTTP compartido de Shopify.
     """
     global _graphql_client
     if _graphql_client is not None:
         await _graphql_client.close()
         _graphql_client = None
-        logger.info("Shopify HTTP client closed")
+    await close_client_registry()
+    logger.info("Shopify HTTP client closed")
@@ -6,16 +6,22 @@ including connection management, rate limiting, and basic query execution.
 """
 
 import asyncio
+import json
 import logging
 import time
 from typing import Any, Dict, List, Optional
 
 import aiohttp
-from aiohttp import ClientTimeout
 
 from app.core.config import get_settings
 from app.utils.error_handler import ShopifyAPIException
 
+from .client_registry import get_client_registry
+from .cost_throttle import extract_operation_name, extract_operation_type, get_cost_throttle, is_throttled_error
+from .mutation_batcher import MutationBatcher
+from .operation_telemetry import get_operation_telemetry
+from .request_coalescer import get_request_coalescer, make_request_key
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,16 +46,21 @@ class BaseShopifyGraphQLClient:
 
         self.graphql_url = f"{self.shop_url}/admin/api/{self.api_version}/graphql.json"
 
-        # Session and rate limiting
+        # Session and rate limiting (cost bucket is shared by every client of the shop)
         self.session: Optional[aiohttp.ClientSession] = None
         self._last_request_time = 0
-        self._min_request_interval = 0.5  # 500ms between requests for rate limiting
+        self._throttle = get_cost_throttle(self.shop_url)
+        self._mutation_batcher: Optional[MutationBatcher] = None
 
         logger.info(f"Initialized Shopify GraphQL client for {self.shop_url}")
 
     async def initialize(self):
         """
-        Initialize the HTTP session and test the connection.
+        Attach the pooled HTTP session and verify the connection once per process.
+
+        The session is owned by the process-wide ``ShopifyClientRegistry``, so
+        initializing a client is cheap: no new TLS connection and no extra shop
+        query after the first client of the process.
 
         Raises:
             ShopifyAPIException: If initialization fails
@@ -60,48 +71,32 @@ class BaseShopifyGraphQLClient:
             return
 
         try:
-            # Close existing session if it exists but is in a bad state
-            if self.session is not None:
-                await self.session.close()
-                self.session = None
-
-            # Create HTTP session
-            timeout = ClientTimeout(total=30, connect=10)
-            connector = aiohttp.TCPConnector(limit=100, limit_per_host=30)
-
-            self.session = aiohttp.ClientSession(
-                timeout=timeout,
-                connector=connector,
-                headers={
-                    "Content-Type": "application/json",
-                    "X-Shopify-Access-Token": self.access_token,
-                    "User-Agent": f"RMS-Shopify-Integration/{self.api_version}",
-                },
-            )
+            registry = get_client_registry()
+            self.session = await registry.get_session()
 
-            # Test connection
-            await self.test_connection()
-            logger.info("✅ Shopify GraphQL client initialized successfully")
+            # Test connection (only the first client of the process pays for it)
+            await registry.ensure_connection_verified(self)
+            logger.debug("Shopify GraphQL client attached to pooled session")
 
         except Exception as e:
             logger.error(f"❌ Failed to initialize Shopify GraphQL client: {e}")
-            if self.session:
-                await self.session.close()
-                self.session = None
+            self.session = None
             raise ShopifyAPIException(f"Client initialization failed: {str(e)}") from e
 
     async def close(self):
-        """Close the HTTP session and clean up resources."""
+        """Release the pooled HTTP session (the registry keeps it open for other clients)."""
         if self.session:
-            await self.session.close()
             self.session = None
-            logger.info("Shopify GraphQL client closed")
+            logger.debug("Shopify GraphQL client released pooled session")
 
     async def _execute_query(
         self, query: str, variables: Optional[Dict[str, Any]] = None, max_retries: int = 3
     ) -> Dict[str, Any]:
         """
-        Execute a GraphQL query with rate limiting and error handling.
+        Execute a GraphQL query with cost-based rate limiting and error handling.
+
+        Identical read-only queries that are already in flight are coalesced into
+        a single HTTP round-trip (see ``request_coalescer``).
 
         Args:
             query: GraphQL query string
@@ -117,61 +112,178 @@ class BaseShopifyGraphQLClient:
         if not self.session:
             raise ShopifyAPIException("Client not initialized. Call initialize() first.")
 
-        # Apply rate limiting
-        await self._check_rate_limit()
+        operation_name = extract_operation_name(query)
+        operation_type = extract_operation_type(query)
+
+        if operation_type == "query" and self.settings.SHOPIFY_COALESCE_READS:
+            key = make_request_key(self.graphql_url, query, variables)
+            return await get_request_coalescer().run(
+                key,
+                operation_name,
+                lambda: self._send_query(query, variables, max_retries, operation_name, operation_type),
+            )
+
+        return await self._send_query(query, variables, max_retries, operation_name, operation_type)
+
+    async def _send_query(
+        self,
+        query: str,
+        variables: Optional[Dict[str, Any]],
+        max_retries: int,
+        operation_name: str,
+        operation_type: str,
+    ) -> Dict[str, Any]:
+        """
+        Send a GraphQL request to Shopify, retrying on throttling and transient errors.
+
+        Latency, cost, throttle waits, retries and payload sizes are recorded per
+        operation name in the process-wide ``OperationTelemetry``.
+
+        Args:
+            query: GraphQL query string
+            variables: Query variables
+            max_retries: Maximum number of retry attempts
+            operation_name: GraphQL operation name (cost prediction key)
+            operation_type: "query" or "mutation"
+
+        Returns:
+            Dict: Query response data
 
+        Raises:
+            ShopifyAPIException: If the query fails after retries
+        """
         payload = {"query": query}
         if variables:
             payload["variables"] = variables
+        body = json.dumps(payload)
+        request_bytes = len(body.encode("utf-8"))
 
+        telemetry = get_operation_telemetry()
+        throttle_wait = 0.0
+        attempts = 0
         last_exception = None
 
-        for attempt in range(max_retries):
-            try:
-                async with self.session.post(self.graphql_url, json=payload) as response:
-                    self._last_request_time = time.time()
+        try:
+            for attempt in range(max_retries):
+                attempts = attempt + 1
+                # Reserve the predicted cost of this operation in the shared bucket
+                wait_started = time.monotonic()
+                reserved_cost = await self._throttle.acquire(operation_name, operation_type)
+                throttle_wait += time.monotonic() - wait_started
+                cost_extension = None
+                settled = False
+
+                try:
+                    request_started = time.monotonic()
+                    async with self.session.post(self.graphql_url, data=body) as response:
+                        self._last_request_time = time.time()
+
+                        if response.status == 429:
+                            # Rate limit exceeded
+                            telemetry.observe_request(
+                                operation_name,
+                                operation_type,
+                                time.monotonic() - request_started,
+                                request_bytes,
+                                0,
+                                throttled=True,
+                            )
+                            retry_after = int(response.headers.get("Retry-After", 2))
+                            logger.warning(f"Rate limit exceeded, waiting {retry_after}s (attempt {attempt + 1})")
+                            last_exception = ShopifyAPIException(
+                                "HTTP 429: rate limit exceeded",
+                                api_response_code=429,
+                                rate_limited=True,
+                                retry_after=retry_after,
+                            )
+                            throttle_wait += retry_after
+                            await asyncio.sleep(retry_after)
+                            continue
+
+                        raw_body = await response.read()
+                        response_data = json.loads(raw_body) if raw_body else {}
+                        cost_extension = (response_data.get("extensions") or {}).get("cost")
+                        errors = response_data.get("errors") or []
+                        throttled = bool(errors) and is_throttled_error(errors)
+                        telemetry.observe_request(
+                            operation_name,
+                            operation_type,
+                            time.monotonic() - request_started,
+                            request_bytes,
+                            len(raw_body),
+                            cost_extension,
+                            throttled=throttled,
+                        )
 
-                    if response.status == 429:
-                        # Rate limit exceeded
-                        retry_after = int(response.headers.get("Retry-After", 2))
-                        logger.warning(f"Rate limit exceeded, waiting {retry_after}s (attempt {attempt + 1})")
-                        await asyncio.sleep(retry_after)
+                        if response.status != 200:
+                            raise ShopifyAPIException(
+                                f"HTTP {response.status}: {response_data.get('error', 'Unknown error')}",
+                                api_response_code=response.status,
+                            )
+
+                        # Check for GraphQL errors
+                        if errors:
+                            if throttled:
+                                # THROTTLED: wait exactly until the bucket restores the missing points
+                                wait_time = await self._throttle.settle_throttled(
+                                    operation_name, reserved_cost, cost_extension
+                                )
+                                settled = True
+                                last_exception = ShopifyAPIException(
+                                    f"GraphQL THROTTLED: {operation_name}",
+                                    rate_limited=True,
+                                    retry_after=max(1, int(wait_time + 0.999)),
+                                )
+                                if attempt < max_retries - 1:
+                                    throttle_wait += wait_time
+                                    await asyncio.sleep(wait_time)
+                                continue
+
+                            error_messages = [err.get("message", str(err)) for err in errors]
+                            raise ShopifyAPIException(
+                                f"GraphQL errors: {', '.join(error_messages)}", details={"graphql_errors": errors}
+                            )
+
+                        telemetry.observe_call(operation_name, operation_type, attempts, throttle_wait, True)
+                        return response_data.get("data", {})
+
+                except aiohttp.ClientError as e:
+                    last_exception = ShopifyAPIException(f"Network error: {str(e)}")
+                    if attempt < max_retries - 1:
+                        wait_time = min(2**attempt, 10)  # Exponential backoff, max 10s
+                        logger.warning(f"Network error, retrying in {wait_time}s (attempt {attempt + 1})")
+                        await asyncio.sleep(wait_time)
                         continue
 
-                    response_data = await response.json()
+                except Exception as e:
+                    last_exception = ShopifyAPIException(f"Unexpected error: {str(e)}")
+                    # Keep the original error so callers can tell rejected requests from transport failures
+                    last_exception.__cause__ = e
+                    if attempt < max_retries - 1:
+                        wait_time = min(2**attempt, 10)
+                        logger.warning(f"Error executing query, retrying in {wait_time}s (attempt {attempt + 1})")
+                        await asyncio.sleep(wait_time)
+                        continue
 
-                    if response.status != 200:
-                        raise ShopifyAPIException(
-                            f"HTTP {response.status}: {response_data.get('error', 'Unknown error')}"
-                        )
+                finally:
+                    if not settled:
+                        await self._throttle.settle(operation_name, reserved_cost, cost_extension)
 
-                    # Check for GraphQL errors
-                    if "errors" in response_data:
-                        errors = response_data["errors"]
-                        error_messages = [err.get("message", str(err)) for err in errors]
-                        raise ShopifyAPIException(f"GraphQL errors: {', '.join(error_messages)}")
-
-                    return response_data.get("data", {})
-
-            except aiohttp.ClientError as e:
-                last_exception = ShopifyAPIException(f"Network error: {str(e)}")
-                if attempt < max_retries - 1:
-                    wait_time = min(2**attempt, 10)  # Exponential backoff, max 10s
-                    logger.warning(f"Network error, retrying in {wait_time}s (attempt {attempt + 1})")
-                    await asyncio.sleep(wait_time)
-                    continue
-
-            except Exception as e:
-                last_exception = ShopifyAPIException(f"Unexpected error: {str(e)}")
-                if attempt < max_retries - 1:
-                    wait_time = min(2**attempt, 10)
-                    logger.warning(f"Error executing query, retrying in {wait_time}s (attempt {attempt + 1})")
-                    await asyncio.sleep(wait_time)
-                    continue
+        except asyncio.CancelledError:
+            telemetry.observe_call(operation_name, operation_type, attempts, throttle_wait, False)
+            raise
 
         # All retries failed
+        telemetry.observe_call(operation_name, operation_type, attempts, throttle_wait, False)
         raise last_exception or ShopifyAPIException("Query execution failed after retries")
 
+    @property
+    def mutation_batcher(self) -> MutationBatcher:
+        """Batcher that packs independent mutations of this client into aliased documents."""
+        if self._mutation_batcher is None:
+            self._mutation_batcher = MutationBatcher(self)
+        return self._mutation_batcher
+
     async def _execute_single_query(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Execute a single GraphQL query without retries (for simple operations).
@@ -185,16 +297,18 @@ class BaseShopifyGraphQLClient:
         """
         return await self._execute_query(query, variables, max_retries=1)
 
-    async def _check_rate_limit(self):
+    async def _check_rate_limit(self, operation_name: str = "anonymous_query"):
         """
-        Implement basic rate limiting to avoid overwhelming Shopify's API.
-        """
-        current_time = time.time()
-        time_since_last_request = current_time - self._last_request_time
+        Wait until the shared cost bucket can pay for an operation.
+
+        The reservation is settled immediately, so this only paces callers that
+        talk to Shopify outside of ``_execute_query``.
 
-        if time_since_last_request < self._min_request_interval:
-            sleep_time = self._min_request_interval - time_since_last_request
-            await asyncio.sleep(sleep_time)
+        Args:
+            operation_name: GraphQL operation name used to predict the cost
+        """
+        reserved_cost = await self._throttle.acquire(operation_name)
+        await self._throttle.settle(operation_name, reserved_cost)
 
     async def test_connection(self) -> bool:
         """
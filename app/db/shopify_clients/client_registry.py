@@ -0,0 +1,284 @@
+"""
+Process-wide registry of pooled Shopify HTTP resources.
+
+Every service used to build its own ``ShopifyGraphQLClient`` with a fresh
+``aiohttp.ClientSession``/``TCPConnector`` and run a ``shop`` test query on
+``initialize()``. The registry owns one keep-alive session (with DNS caching)
+for the whole process and verifies the Shopify connection only once, so
+client instances become cheap handles that borrow the pooled session.
+
+The registry is started and closed by the application lifespan; outside of the
+API (scripts, scheduler jobs) it starts lazily on first use.
+
+The few REST calls that remain go through ``rest_request``, which reuses the
+pooled session and paces requests with the ``X-Shopify-Shop-Api-Call-Limit``
+leaky bucket reported by Shopify.
+"""
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+import aiohttp
+from aiohttp import ClientTimeout
+
+from app.core.config import get_settings
+
+if TYPE_CHECKING:
+    from .base_client import BaseShopifyGraphQLClient
+    from .unified_client import ShopifyGraphQLClient
+
+logger = logging.getLogger(__name__)
+
+# Requests kept free in the REST bucket for other processes/apps of the shop
+REST_BUCKET_HEADROOM = 2
+
+
+class ShopifyClientRegistry:
+    """
+    Owner of the pooled Shopify session shared by all client handles.
+
+    The session is bound to the event loop that created it; if the registry is
+    used from a different loop (e.g. a script calling ``asyncio.run`` twice) the old
+    session is closed and a new one is created for that loop.
+    """
+
+    def __init__(self):
+        """Initialize the registry without opening any connection."""
+        self.settings = get_settings()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = asyncio.Lock()
+        self._connection_verified = False
+        # REST leaky bucket as last reported by X-Shopify-Shop-Api-Call-Limit ("used/limit")
+        self._rest_used = 0.0
+        self._rest_limit = 40.0
+        self._rest_updated_at = time.monotonic()
+        self.stats = {
+            "sessions_created": 0,
+            "handles_attached": 0,
+            "connection_checks": 0,
+            "rest_requests": 0,
+            "rest_waits": 0,
+        }
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create the pooled session with keep-alive and DNS caching."""
+        timeout = ClientTimeout(total=30, connect=10)
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=30,
+            keepalive_timeout=75,
+            ttl_dns_cache=300,
+            use_dns_cache=True,
+            enable_cleanup_closed=True,
+        )
+        self.stats["sessions_created"] += 1
+        return aiohttp.ClientSession(
+            timeout=timeout,
+            connector=connector,
+            headers={
+                "Content-Type": "application/json",
+                "X-Shopify-Access-Token": self.settings.SHOPIFY_ACCESS_TOKEN,
+                "User-Agent": f"RMS-Shopify-Integration/{self.settings.SHOPIFY_API_VERSION}",
+            },
+        )
+
+    async def start(self) -> aiohttp.ClientSession:
+        """
+        Open the pooled session if needed.
+
+        Returns:
+            aiohttp.ClientSession: Pooled session for the running loop
+        """
+        session = self._session
+        loop = asyncio.get_running_loop()
+        if session is not None and not session.closed:
+            if self._loop is loop:
+                return session
+            # The old pool belongs to another loop and cannot be reused from this one
+            logger.debug("Shopify session requested from a new event loop, creating a new pool")
+            await self._close_stale_session(session)
+
+        session = self._create_session()
+        self._session = session
+        self._loop = loop
+        self._lock = asyncio.Lock()
+        self._connection_verified = False
+        logger.info("✅ Pooled Shopify HTTP session created")
+        return session
+
+    @staticmethod
+    async def _close_stale_session(session: aiohttp.ClientSession) -> None:
+        """Close a session left by another event loop, which may already be closed."""
+        try:
+            await session.close()
+        except Exception as e:
+            logger.debug(f"Could not close the Shopify session of the previous event loop cleanly: {e}")
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the pooled session, starting the registry lazily.
+
+        Returns:
+            aiohttp.ClientSession: Pooled session
+        """
+        session = await self.start()
+        self.stats["handles_attached"] += 1
+        return session
+
+    async def ensure_connection_verified(self, client: "BaseShopifyGraphQLClient") -> None:
+        """
+        Run the Shopify connection test once per process (per event loop).
+
+        Args:
+            client: Client handle used to run the test query
+
+        Raises:
+            ShopifyAPIException: If the connection test fails
+        """
+        if self._connection_verified:
+            return
+
+        async with self._lock:
+            if self._connection_verified:
+                return
+            self.stats["connection_checks"] += 1
+            await client.test_connection()
+            self._connection_verified = True
+
+    def _rest_wait_time(self) -> float:
+        """Seconds until the REST bucket has room for one more request."""
+        # Shopify leaks the REST bucket at limit/20 requests per second (40 -> 2/s, 80 -> 4/s)
+        leak_rate = self._rest_limit / 20
+        elapsed = time.monotonic() - self._rest_updated_at
+        used = max(0.0, self._rest_used - elapsed * leak_rate)
+        excess = used + 1 - (self._rest_limit - REST_BUCKET_HEADROOM)
+        return excess / leak_rate if excess > 0 else 0.0
+
+    def _update_rest_bucket(self, header: Optional[str]) -> None:
+        """Record the bucket state from an ``X-Shopify-Shop-Api-Call-Limit`` header."""
+        if not header or "/" not in header:
+            return
+        try:
+            used, limit = header.split("/", 1)
+            self._rest_used = float(used)
+            self._rest_limit = float(limit)
+            self._rest_updated_at = time.monotonic()
+        except ValueError:
+            logger.debug(f"Unparseable X-Shopify-Shop-Api-Call-Limit header: {header}")
+
+    async def rest_request(
+        self, method: str, path: str, payload: Optional[Dict[str, Any]] = None, max_retries: int = 3
+    ) -> Tuple[int, Any]:
+        """
+        Send a Shopify Admin REST request through the pooled session.
+
+        Requests wait while the shop's REST bucket is (almost) full and HTTP 429
+        responses are retried after ``Retry-After``.
+
+        Args:
+            method: HTTP method (e.g. "PUT")
+            path: Path relative to ``/admin/api/{version}/`` (e.g. "variants/123.json")
+            payload: JSON body
+            max_retries: Maximum attempts on HTTP 429
+
+        Returns:
+            Tuple: (HTTP status, parsed JSON body or raw text)
+        """
+        session = await self.start()
+        url = f"{self.settings.shopify_api_base_url}/{path.lstrip('/')}"
+
+        for attempt in range(max_retries):
+            wait_time = self._rest_wait_time()
+            if wait_time > 0:
+                self.stats["rest_waits"] += 1
+                await asyncio.sleep(wait_time)
+
+            self.stats["rest_requests"] += 1
+            async with session.request(method, url, json=payload) as response:
+                self._update_rest_bucket(response.headers.get("X-Shopify-Shop-Api-Call-Limit"))
+
+                if response.status == 429 and attempt < max_retries - 1:
+                    retry_after = float(response.headers.get("Retry-After", 2))
+                    logger.warning(f"REST rate limit exceeded, waiting {retry_after}s (attempt {attempt + 1})")
+                    await asyncio.sleep(retry_after)
+                    continue
+
+                if response.content_type == "application/json":
+                    return response.status, await response.json()
+                return response.status, await response.text()
+
+        return 429, "REST rate limit exceeded"
+
+    async def close(self) -> None:
+        """Close the pooled session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Pooled Shopify HTTP session closed")
+        self._session = None
+        self._loop = None
+        self._lock = asyncio.Lock()
+        self._connection_verified = False
+
+    @property
+    def is_started(self) -> bool:
+        """Whether the pooled session is open."""
+        return self._session is not None and not self._session.closed
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get registry status for monitoring.
+
+        Returns:
+            Dict: Session state and counters
+        """
+        status: Dict[str, Any] = {
+            "started": self.is_started,
+            "connection_verified": self._connection_verified,
+            "stats": dict(self.stats),
+        }
+        status["rest_bucket"] = {"used": self._rest_used, "limit": self._rest_limit}
+        if self.is_started and self._session.connector is not None:
+            connector = self._session.connector
+            status["connector"] = {"limit": connector.limit, "limit_per_host": connector.limit_per_host}
+        return status
+
+
+_registry: Optional[ShopifyClientRegistry] = None
+
+
+def get_client_registry() -> ShopifyClientRegistry:
+    """
+    Get the process-wide Shopify client registry.
+
+    Returns:
+        ShopifyClientRegistry: Registry instance
+    """
+    global _registry
+    if _registry is None:
+        _registry = ShopifyClientRegistry()
+    return _registry
+
+
+async def get_shopify_client() -> "ShopifyGraphQLClient":
+    """
+    Get an initialized lightweight client handle backed by the pooled session.
+
+    Returns:
+        ShopifyGraphQLClient: Ready-to-use client handle
+    """
+    from .unified_client import ShopifyGraphQLClient
+
+    client = ShopifyGraphQLClient()
+    await client.initialize()
+    return client
+
+
+async def close_client_registry() -> None:
+    """Close the process-wide registry (application shutdown)."""
+    global _registry
+    if _registry is not None:
+        await _registry.close()
+        _registry = None
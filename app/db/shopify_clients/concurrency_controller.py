@@ -0,0 +1,260 @@
+"""
+AIMD (additive-increase / multiplicative-decrease) concurrency control for Shopify writes.
+
+Fixed fan-out (chunks of N followed by a sleep, or a hard-coded semaphore)
+leaves capacity unused while the cost bucket is full and overruns it when the
+bucket is low. The controller instead keeps a concurrency *window* that:
+
+- grows by one slot per window's worth of successful completions while the
+  shared cost throttle reports headroom above ``headroom_ratio``
+- is halved whenever Shopify pushes back (a new THROTTLED response recorded by
+  the throttle, or a task failing with a throttling / HTTP 429 error)
+
+Controllers are process-wide and keyed by name, so the learned window survives
+across calls and is visible in the performance metrics.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from app.utils.error_handler import ErrorCode, ShopifyAPIException
+
+from .cost_throttle import ShopifyCostThrottle
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_INITIAL_WINDOW = 4
+DEFAULT_MIN_WINDOW = 1
+DEFAULT_MAX_WINDOW = 32
+DEFAULT_HEADROOM_RATIO = 0.5
+
+
+def is_congestion_error(error: BaseException) -> bool:
+    """
+    Check whether an exception signals that Shopify is rate limiting the caller.
+
+    Only the structured fields that the base client sets on HTTP 429 and GraphQL
+    THROTTLED responses are used, never the message: GIDs, SKUs and quantities in a
+    message can contain "429". Wrapped exceptions are followed through ``__cause__``.
+
+    Args:
+        error: Exception raised by a task
+
+    Returns:
+        bool: True for THROTTLED / HTTP 429 failures
+    """
+    current: Optional[BaseException] = error
+    while current is not None:
+        if isinstance(current, ShopifyAPIException) and (
+            current.rate_limited
+            or current.api_response_code == 429
+            or current.error_code == ErrorCode.RATE_LIMIT_EXCEEDED
+        ):
+            return True
+        current = current.__cause__
+    return False
+
+
+class AIMDConcurrencyController:
+    """
+    Adaptive concurrency window driven by the Shopify cost bucket.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        throttle: Optional[ShopifyCostThrottle] = None,
+        initial_window: int = DEFAULT_INITIAL_WINDOW,
+        min_window: int = DEFAULT_MIN_WINDOW,
+        max_window: int = DEFAULT_MAX_WINDOW,
+        headroom_ratio: float = DEFAULT_HEADROOM_RATIO,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            name: Controller name (used in metrics)
+            throttle: Cost throttle whose bucket state and THROTTLED counter drive the window
+            initial_window: Starting concurrency
+            min_window: Lower bound of the window
+            max_window: Upper bound of the window
+            headroom_ratio: Minimum available/maximum bucket ratio required to grow the window
+        """
+        self.name = name
+        self.throttle = throttle
+        self.min_window = min_window
+        self.max_window = max_window
+        self.headroom_ratio = headroom_ratio
+        self.window = max(min_window, min(initial_window, max_window))
+
+        self._successes_in_window = 0
+        self._throttled_seen = self._throttled_responses()
+        self._busy_seconds = 0.0
+        self._busy_since: Optional[float] = None
+        self._in_flight = 0
+
+        self.stats: Dict[str, Any] = {
+            "completed": 0,
+            "failed": 0,
+            "increases": 0,
+            "decreases": 0,
+            "peak_window": self.window,
+        }
+
+    def _throttled_responses(self) -> float:
+        """Number of THROTTLED responses recorded so far by the throttle."""
+        return self.throttle.stats["throttled_responses"] if self.throttle else 0
+
+    def _has_headroom(self) -> bool:
+        """Whether the cost bucket has enough points to admit more concurrent work."""
+        if not self.throttle:
+            return True
+        return self.throttle.available >= self.throttle.maximum_available * self.headroom_ratio
+
+    def _decrease(self, reason: str) -> None:
+        """Multiplicative decrease of the window."""
+        previous = self.window
+        self.window = max(self.min_window, self.window // 2)
+        self._successes_in_window = 0
+        self.stats["decreases"] += 1
+        logger.info(f"🔻 {self.name} concurrency {previous} → {self.window} ({reason})")
+
+    def _increase(self) -> None:
+        """Additive increase after a full window of successful completions."""
+        self._successes_in_window += 1
+        if self._successes_in_window < self.window or self.window >= self.max_window:
+            return
+        if not self._has_headroom():
+            return
+        self._successes_in_window = 0
+        self.window += 1
+        self.stats["increases"] += 1
+        self.stats["peak_window"] = max(self.stats["peak_window"], self.window)
+
+    def record(self, error: Optional[BaseException] = None) -> None:
+        """
+        Feed the outcome of one completed task back into the window.
+
+        Args:
+            error: Exception raised by the task, or None on success
+        """
+        self.stats["completed" if error is None else "failed"] += 1
+
+        throttled = self._throttled_responses()
+        if throttled > self._throttled_seen:
+            self._throttled_seen = throttled
+            self._decrease("THROTTLED")
+        elif error is not None and is_congestion_error(error):
+            self._decrease("rate limited")
+        elif error is None:
+            self._increase()
+
+    def _enter(self) -> None:
+        if self._in_flight == 0:
+            self._busy_since = time.monotonic()
+        self._in_flight += 1
+
+    def _exit(self) -> None:
+        self._in_flight -= 1
+        if self._in_flight == 0 and self._busy_since is not None:
+            self._busy_seconds += time.monotonic() - self._busy_since
+            self._busy_since = None
+
+    async def map(self, items: Iterable[T], worker: Callable[[T], Awaitable[Any]]) -> List[Any]:
+        """
+        Run ``worker`` over all items keeping at most ``window`` calls in flight (across all callers).
+
+        Args:
+            items: Items to process
+            worker: Coroutine function called once per item
+
+        Returns:
+            List: One result per item, in input order; failed items hold their exception
+                (like ``asyncio.gather(..., return_exceptions=True)``)
+        """
+        pending = list(enumerate(items))
+        pending.reverse()
+        results: List[Any] = [None] * len(pending)
+        running: Dict[asyncio.Task, int] = {}
+
+        try:
+            while pending or running:
+                # The window is shared by concurrent callers; each keeps at least one task running
+                while pending and (not running or self._in_flight < self.window):
+                    index, item = pending.pop()
+                    self._enter()
+                    running[asyncio.ensure_future(worker(item))] = index
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = running.pop(task)
+                    self._exit()
+                    error = task.exception()
+                    results[index] = error if error is not None else task.result()
+                    self.record(error)
+        finally:
+            for task in running:
+                task.cancel()
+                self._exit()
+
+        return results
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the window and throughput metrics.
+
+        Returns:
+            Dict: Current window, bounds, in-flight tasks, throughput and counters
+        """
+        busy_seconds = self._busy_seconds
+        if self._busy_since is not None:
+            busy_seconds += time.monotonic() - self._busy_since
+        finished = self.stats["completed"] + self.stats["failed"]
+        return {
+            "window": self.window,
+            "min_window": self.min_window,
+            "max_window": self.max_window,
+            "in_flight": self._in_flight,
+            "busy_seconds": round(busy_seconds, 2),
+            "throughput_per_second": round(finished / busy_seconds, 2) if busy_seconds > 0 else 0.0,
+            **self.stats,
+        }
+
+
+# Process-wide controllers keyed by name
+_controllers: Dict[str, AIMDConcurrencyController] = {}
+
+
+def get_concurrency_controller(
+    name: str, throttle: Optional[ShopifyCostThrottle] = None, **kwargs
+) -> AIMDConcurrencyController:
+    """
+    Get (or create) the process-wide controller with the given name.
+
+    Args:
+        name: Controller name
+        throttle: Cost throttle used when the controller is created
+        **kwargs: Window bounds used when the controller is created
+
+    Returns:
+        AIMDConcurrencyController: Shared controller
+    """
+    controller = _controllers.get(name)
+    if controller is None:
+        controller = AIMDConcurrencyController(name, throttle=throttle, **kwargs)
+        _controllers[name] = controller
+    return controller
+
+
+def get_all_concurrency_status() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the status of every concurrency controller.
+
+    Returns:
+        Dict: Status keyed by controller name
+    """
+    return {name: controller.get_status() for name, controller in _controllers.items()}
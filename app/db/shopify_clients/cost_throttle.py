@@ -0,0 +1,485 @@
+"""
+Cost-aware leaky-bucket throttle for the Shopify GraphQL Admin API.
+
+Shopify rate limits GraphQL by calculated query cost instead of request count.
+Every response carries ``extensions.cost`` with the requested/actual cost and the
+``throttleStatus`` of the store bucket (maximumAvailable, currentlyAvailable,
+restoreRate). This module keeps a process-wide model of that bucket so all
+clients of the same shop share one budget (and, with Redis configured, every
+worker and replica too, see ``shared_budget``):
+
+- Requests reserve their predicted cost before being sent (prediction is learned
+  per GraphQL operation name from previous ``requestedQueryCost`` values).
+- Concurrent requests are admitted while the bucket can pay for them.
+- Every response re-syncs the local model with the server's throttleStatus and
+  refunds the difference between the reserved and the actual cost.
+- THROTTLED errors back off exactly the time needed to restore the missing points.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, Optional
+
+from .shared_budget import RedisCostBucket
+
+logger = logging.getLogger(__name__)
+
+# Matches "query GetProducts(" / "mutation CreateProduct {" at the start of a document
+_OPERATION_NAME_PATTERN = re.compile(r"^\s*(query|mutation)\s+([_A-Za-z][_0-9A-Za-z]*)")
+_OPERATION_TYPE_PATTERN = re.compile(r"^\s*(query|mutation|subscription)\b")
+
+# Shopify defaults for a standard plan store (learned from responses afterwards)
+DEFAULT_MAXIMUM_AVAILABLE = 1000.0
+DEFAULT_RESTORE_RATE = 50.0
+DEFAULT_QUERY_COST = 10.0
+DEFAULT_MUTATION_COST = 10.0
+
+
+def extract_operation_name(query: str) -> str:
+    """
+    Extract the operation name of a GraphQL document.
+
+    Args:
+        query: GraphQL document
+
+    Returns:
+        str: Operation name, or "anonymous_query"/"anonymous_mutation" when unnamed
+    """
+    match = _OPERATION_NAME_PATTERN.match(query)
+    if match:
+        return match.group(2)
+    return f"anonymous_{extract_operation_type(query)}"
+
+
+def extract_operation_type(query: str) -> str:
+    """
+    Extract the operation type ("query" or "mutation") of a GraphQL document.
+
+    Args:
+        query: GraphQL document
+
+    Returns:
+        str: Operation type; shorthand documents (``{ shop { id } }``) are queries
+    """
+    match = _OPERATION_TYPE_PATTERN.match(query)
+    return match.group(1) if match else "query"
+
+
+def is_throttled_error(errors: Any) -> bool:
+    """
+    Check whether a GraphQL ``errors`` list contains a THROTTLED error.
+
+    Args:
+        errors: Value of the ``errors`` key in a GraphQL response
+
+    Returns:
+        bool: True if Shopify rejected the request for lack of budget
+    """
+    if not isinstance(errors, list):
+        return False
+    for error in errors:
+        if not isinstance(error, dict):
+            continue
+        extensions = error.get("extensions") or {}
+        if extensions.get("code") == "THROTTLED" or error.get("message") == "Throttled":
+            return True
+    return False
+
+
+class ShopifyCostThrottle:
+    """
+    Local model of the Shopify GraphQL cost bucket.
+
+    The bucket refills continuously at ``restore_rate`` points per second up to
+    ``maximum_available``. All coroutines of the process share the same instance
+    (see ``get_cost_throttle``), so admission is coordinated across clients.
+    """
+
+    def __init__(
+        self,
+        maximum_available: float = DEFAULT_MAXIMUM_AVAILABLE,
+        restore_rate: float = DEFAULT_RESTORE_RATE,
+        smoothing: float = 0.3,
+        shared_bucket: Optional[RedisCostBucket] = None,
+    ):
+        """
+        Initialize the throttle.
+
+        Args:
+            maximum_available: Bucket size in cost points
+            restore_rate: Points restored per second
+            smoothing: EWMA factor used to learn per-operation costs (0-1]
+            shared_bucket: Redis bucket shared across processes (optional)
+        """
+        self.maximum_available = float(maximum_available)
+        self.restore_rate = float(restore_rate)
+        self.smoothing = smoothing
+        self.shared_bucket = shared_bucket
+
+        self._available = self.maximum_available
+        self._updated_at = time.monotonic()
+        self._throttled_until = 0.0
+        self._in_flight_cost = 0.0
+        self._in_flight_requests = 0
+        self._cost_estimates: Dict[str, float] = {}
+
+        self.stats: Dict[str, float] = {
+            "requests_admitted": 0,
+            "throttle_waits": 0,
+            "throttle_wait_seconds": 0.0,
+            "throttled_responses": 0,
+            "points_reserved": 0.0,
+            "points_refunded": 0.0,
+            "shared_admissions": 0,
+            "local_admissions": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Bucket state
+    # ------------------------------------------------------------------
+
+    def _refill(self) -> None:
+        """Apply the restore rate for the time elapsed since the last update."""
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._available = min(self.maximum_available, self._available + elapsed * self.restore_rate)
+            self._updated_at = now
+
+    @property
+    def available(self) -> float:
+        """Currently available points according to the local model."""
+        self._refill()
+        return self._available
+
+    def estimate_cost(self, operation_name: str, operation_type: str = "query") -> float:
+        """
+        Predict the cost Shopify will reserve for an operation.
+
+        Args:
+            operation_name: GraphQL operation name
+            operation_type: "query" or "mutation", used for unknown operations
+
+        Returns:
+            float: Predicted requested cost in points
+        """
+        if operation_name in self._cost_estimates:
+            return self._cost_estimates[operation_name]
+        return DEFAULT_MUTATION_COST if operation_type == "mutation" else DEFAULT_QUERY_COST
+
+    def hint_cost(self, operation_name: str, cost: float) -> None:
+        """
+        Seed the cost estimate of an operation that has not been observed yet.
+
+        Used by callers that know the cost of a document in advance (e.g. the
+        mutation batcher) so the first request does not under-reserve.
+
+        Args:
+            operation_name: GraphQL operation name
+            cost: Expected requested cost in points
+        """
+        if operation_name not in self._cost_estimates:
+            self._cost_estimates[operation_name] = float(cost)
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    def try_acquire(self, cost: float) -> float:
+        """
+        Reserve ``cost`` points if the bucket can pay for them right now.
+
+        Args:
+            cost: Points to reserve
+
+        Returns:
+            float: 0 if reserved, otherwise seconds to wait before retrying
+        """
+        self._refill()
+        now = time.monotonic()
+        if self._throttled_until > now:
+            return self._throttled_until - now
+
+        # Never ask for more than the bucket can ever hold
+        cost = min(cost, self.maximum_available)
+        if self._available >= cost:
+            self._reserve(cost)
+            return 0.0
+
+        return (cost - self._available) / self.restore_rate
+
+    def _reserve(self, cost: float) -> None:
+        """Book a reservation in the local model."""
+        self._available -= cost
+        self._in_flight_cost += cost
+        self._in_flight_requests += 1
+        self.stats["requests_admitted"] += 1
+        self.stats["points_reserved"] += cost
+
+    async def acquire(self, operation_name: str, operation_type: str = "query") -> float:
+        """
+        Wait until the bucket can pay for the operation and reserve its cost.
+
+        Uses the Redis-shared bucket when configured and reachable, otherwise
+        the local in-process model.
+
+        Args:
+            operation_name: GraphQL operation name
+            operation_type: "query" or "mutation"
+
+        Returns:
+            float: Reserved cost, to be passed back to ``settle``
+        """
+        cost = min(self.estimate_cost(operation_name, operation_type), self.maximum_available)
+        waited = 0.0
+
+        while True:
+            wait_time = None
+            if self.shared_bucket is not None:
+                wait_time = await self.shared_bucket.try_acquire(cost, self.maximum_available, self.restore_rate)
+                if wait_time is not None and wait_time <= 0:
+                    self._refill()
+                    self._reserve(cost)
+                    self.stats["shared_admissions"] += 1
+                    break
+
+            if wait_time is None:
+                wait_time = self.try_acquire(cost)
+                if wait_time <= 0:
+                    self.stats["local_admissions"] += 1
+                    break
+
+            self.stats["throttle_waits"] += 1
+            self.stats["throttle_wait_seconds"] += wait_time
+            waited += wait_time
+            await asyncio.sleep(wait_time)
+
+        if waited > 1.0:
+            logger.debug(f"Cost throttle: {operation_name} waited {waited:.2f}s for {cost:.0f} points")
+        return cost
+
+    def release(
+        self,
+        operation_name: str,
+        reserved_cost: float,
+        cost_extension: Optional[Dict[str, Any]] = None,
+    ) -> float:
+        """
+        Settle a reservation in the local model with the cost reported by Shopify.
+
+        Args:
+            operation_name: GraphQL operation name
+            reserved_cost: Cost reserved by ``acquire``
+            cost_extension: ``extensions.cost`` of the response (None on network errors)
+
+        Returns:
+            float: Points given back to the bucket (negative if the request cost more)
+        """
+        self._refill()
+        self._in_flight_cost = max(0.0, self._in_flight_cost - reserved_cost)
+        self._in_flight_requests = max(0, self._in_flight_requests - 1)
+
+        if not cost_extension:
+            # No information: the request most likely never reached Shopify
+            self._available = min(self.maximum_available, self._available + reserved_cost)
+            self.stats["points_refunded"] += reserved_cost
+            return reserved_cost
+
+        requested = cost_extension.get("requestedQueryCost")
+        actual = cost_extension.get("actualQueryCost")
+
+        if requested is not None:
+            self._learn_cost(operation_name, float(requested))
+
+        # Shopify refunds the difference between requested and actual cost
+        charged = float(actual if actual is not None else requested if requested is not None else reserved_cost)
+        refund = reserved_cost - charged
+        self._available = min(self.maximum_available, self._available + refund)
+        if refund > 0:
+            self.stats["points_refunded"] += refund
+
+        self._apply_throttle_status(cost_extension.get("throttleStatus"))
+        return refund
+
+    async def settle(
+        self,
+        operation_name: str,
+        reserved_cost: float,
+        cost_extension: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Settle a reservation locally and in the shared bucket.
+
+        Args:
+            operation_name: GraphQL operation name
+            reserved_cost: Cost reserved by ``acquire``
+            cost_extension: ``extensions.cost`` of the response (None on network errors)
+        """
+        refund = self.release(operation_name, reserved_cost, cost_extension)
+        if self.shared_bucket is not None:
+            throttle_status = (cost_extension or {}).get("throttleStatus") or {}
+            await self.shared_bucket.settle(
+                refund,
+                self.maximum_available,
+                self.restore_rate,
+                server_available=throttle_status.get("currentlyAvailable"),
+            )
+
+    async def settle_throttled(
+        self,
+        operation_name: str,
+        reserved_cost: float,
+        cost_extension: Optional[Dict[str, Any]] = None,
+    ) -> float:
+        """
+        Settle a THROTTLED reservation and propagate the back-off to every process.
+
+        Args:
+            operation_name: GraphQL operation name
+            reserved_cost: Cost reserved by ``acquire``
+            cost_extension: ``extensions.cost`` of the throttled response
+
+        Returns:
+            float: Seconds to wait before retrying
+        """
+        wait_time = self.register_throttled(operation_name, reserved_cost, cost_extension)
+        if self.shared_bucket is not None:
+            throttle_status = (cost_extension or {}).get("throttleStatus") or {}
+            await self.shared_bucket.settle(
+                reserved_cost,
+                self.maximum_available,
+                self.restore_rate,
+                server_available=throttle_status.get("currentlyAvailable"),
+                backoff_seconds=wait_time,
+            )
+        return wait_time
+
+    def register_throttled(
+        self,
+        operation_name: str,
+        reserved_cost: float,
+        cost_extension: Optional[Dict[str, Any]] = None,
+    ) -> float:
+        """
+        Settle a reservation rejected with THROTTLED and compute the exact back-off.
+
+        Args:
+            operation_name: GraphQL operation name
+            reserved_cost: Cost reserved by ``acquire`` (nothing is charged when throttled)
+            cost_extension: ``extensions.cost`` of the throttled response
+
+        Returns:
+            float: Seconds until the bucket holds enough points for the request
+        """
+        self.stats["throttled_responses"] += 1
+        self.release(operation_name, reserved_cost, None)
+        cost_extension = cost_extension or {}
+
+        requested = cost_extension.get("requestedQueryCost")
+        if requested is not None:
+            self._learn_cost(operation_name, float(requested))
+        else:
+            requested = self.estimate_cost(operation_name)
+
+        self._apply_throttle_status(cost_extension.get("throttleStatus"))
+        self._refill()
+
+        wait_time = max(0.0, (float(requested) - self._available) / self.restore_rate)
+        self._throttled_until = max(self._throttled_until, time.monotonic() + wait_time)
+        logger.warning(
+            f"Shopify THROTTLED {operation_name}: requested {float(requested):.0f} points, "
+            f"available {self._available:.0f}, backing off {wait_time:.2f}s"
+        )
+        return wait_time
+
+    def _apply_throttle_status(self, throttle_status: Optional[Dict[str, Any]]) -> None:
+        """Re-sync the local model with Shopify's authoritative bucket state."""
+        if not throttle_status:
+            return
+
+        maximum = throttle_status.get("maximumAvailable")
+        if maximum:
+            self.maximum_available = float(maximum)
+
+        restore_rate = throttle_status.get("restoreRate")
+        if restore_rate:
+            self.restore_rate = float(restore_rate)
+
+        currently_available = throttle_status.get("currentlyAvailable")
+        if currently_available is not None:
+            # Keep the more conservative value: in-flight reservations may not be
+            # reflected on the server yet, and other processes may be draining it
+            self._available = min(self._available, float(currently_available))
+            self._updated_at = time.monotonic()
+
+    def _learn_cost(self, operation_name: str, requested_cost: float) -> None:
+        """Update the EWMA cost estimate of an operation."""
+        previous = self._cost_estimates.get(operation_name)
+        if previous is None:
+            self._cost_estimates[operation_name] = requested_cost
+        else:
+            self._cost_estimates[operation_name] = previous + self.smoothing * (requested_cost - previous)
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get a snapshot of the throttle state for monitoring.
+
+        Returns:
+            Dict: Bucket state, in-flight reservations, learned costs and counters
+        """
+        return {
+            "maximum_available": self.maximum_available,
+            "currently_available": round(self.available, 2),
+            "restore_rate": self.restore_rate,
+            "in_flight_requests": self._in_flight_requests,
+            "in_flight_cost": round(self._in_flight_cost, 2),
+            "throttled_for_seconds": round(max(0.0, self._throttled_until - time.monotonic()), 2),
+            "shared_budget": self.shared_bucket is not None and self.shared_bucket.is_available,
+            "cost_estimates": {name: round(cost, 1) for name, cost in self._cost_estimates.items()},
+            "stats": dict(self.stats),
+        }
+
+
+# Process-wide throttles keyed by shop URL
+_throttles: Dict[str, ShopifyCostThrottle] = {}
+
+
+def get_cost_throttle(shop_url: str) -> ShopifyCostThrottle:
+    """
+    Get the process-wide cost throttle for a shop.
+
+    Args:
+        shop_url: Shop URL (used as bucket key; Shopify buckets are per store)
+
+    Returns:
+        ShopifyCostThrottle: Shared throttle instance
+    """
+    key = shop_url.replace("https://", "").replace("http://", "").rstrip("/")
+    throttle = _throttles.get(key)
+    if throttle is None:
+        from app.core.config import get_settings
+
+        settings = get_settings()
+        shared_bucket = None
+        if settings.SHOPIFY_SHARED_BUDGET_ENABLED and settings.REDIS_URL:
+            shared_bucket = RedisCostBucket(shop_key=key)
+
+        throttle = ShopifyCostThrottle(
+            maximum_available=settings.SHOPIFY_GRAPHQL_BUCKET_SIZE,
+            restore_rate=settings.SHOPIFY_GRAPHQL_RESTORE_RATE,
+            shared_bucket=shared_bucket,
+        )
+        _throttles[key] = throttle
+    return throttle
+
+
+def get_all_throttle_status() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the status of every throttle created in this process.
+
+    Returns:
+        Dict: Throttle status keyed by shop
+    """
+    return {shop: throttle.get_status() for shop, throttle in _throttles.items()}
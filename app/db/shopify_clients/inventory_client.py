@@ -9,20 +9,24 @@ import asyncio
 import logging
 from typing import Any, Dict, List, Optional, Tuple
 
-import aiohttp
-
 from app.db.queries import (
     INVENTORY_ACTIVATE_MUTATION,
     INVENTORY_ADJUST_QUANTITIES_MUTATION,
+    INVENTORY_ITEM_SKU_INDEX_QUERY,
     INVENTORY_ITEM_UPDATE_MUTATION,
     INVENTORY_SET_QUANTITIES_MUTATION,
 )
 from app.utils.error_handler import ShopifyAPIException
 
 from .base_client import BaseShopifyGraphQLClient
+from .client_registry import get_client_registry
+from .concurrency_controller import get_concurrency_controller
 
 logger = logging.getLogger(__name__)
 
+# Maximum quantities accepted by one inventorySetQuantities call
+INVENTORY_SET_QUANTITIES_MAX_ITEMS = 250
+
 
 class ShopifyInventoryClient(BaseShopifyGraphQLClient):
     """
@@ -242,11 +246,17 @@ class ShopifyInventoryClient(BaseShopifyGraphQLClient):
 
         except Exception as e:
             logger.error(f"Error updating inventory: {e}")
-            raise ShopifyAPIException(f"Failed to update inventory: {str(e)}") from e
+            # Keep the rate limit fields so callers can still tell throttling apart
+            raise ShopifyAPIException(
+                f"Failed to update inventory: {str(e)}",
+                api_response_code=getattr(e, "api_response_code", None),
+                rate_limited=getattr(e, "rate_limited", False),
+                retry_after=getattr(e, "retry_after", None),
+            ) from e
 
     async def batch_update_inventory(self, inventory_updates: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
         """
-        Update inventory in batch with error handling and rate limiting.
+        Update inventory in batch with adaptive (AIMD) concurrency.
 
         Args:
             inventory_updates: List of inventory updates with structure:
@@ -258,33 +268,201 @@ class ShopifyInventoryClient(BaseShopifyGraphQLClient):
         success_count = 0
         errors = []
 
-        # Process in chunks to avoid overwhelming the API
-        chunk_size = 10
-        for i in range(0, len(inventory_updates), chunk_size):
-            chunk = inventory_updates[i : i + chunk_size]
+        # The window widens while the cost bucket has headroom and halves on THROTTLED/429
+        controller = get_concurrency_controller(
+            "inventory_updates",
+            throttle=self._throttle,
+            initial_window=self.settings.SHOPIFY_WRITE_CONCURRENCY_INITIAL,
+            max_window=self.settings.SHOPIFY_WRITE_CONCURRENCY_MAX,
+        )
+        results = await controller.map(
+            inventory_updates,
+            lambda update: self.update_inventory(
+                update["inventory_item_id"], update["location_id"], update["available"]
+            ),
+        )
+
+        for update, result in zip(inventory_updates, results, strict=True):
+            if isinstance(result, Exception):
+                errors.append({"update": update, "error": str(result)})
+            elif result:
+                success_count += 1
+            else:
+                errors.append({"update": update, "error": "Update failed"})
 
-            # Process chunk concurrently
-            tasks = []
-            for update in chunk:
-                task = self.update_inventory(update["inventory_item_id"], update["location_id"], update["available"])
-                tasks.append(task)
+        logger.info(f"✅ Inventory batch update: {success_count} success, {len(errors)} errors")
+        return success_count, errors
 
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+    async def write_inventory_batch(
+        self,
+        items: List[Dict[str, Any]],
+        location_id: str,
+        activate: bool = True,
+        reference_document_uri: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Enable tracking, activate at a location and set available quantities for many items.
 
-            for j, result in enumerate(results):
-                if isinstance(result, Exception):
-                    errors.append({"update": chunk[j], "error": str(result)})
-                elif result:
-                    success_count += 1
-                else:
-                    errors.append({"update": chunk[j], "error": "Update failed"})
+        Tracking (``inventoryItemUpdate``) and activation (``inventoryActivate``)
+        are packed into aliased documents by the mutation batcher, and quantities
+        are written with ``inventorySetQuantities`` calls of up to 250 items, so a
+        whole product or page takes a few requests instead of three per variant.
+        Items that fail a step are not sent to the following steps.
 
-            # Rate limit pause between chunks
-            if i + chunk_size < len(inventory_updates):
-                await asyncio.sleep(1)
+        Args:
+            items: Items to write, with structure:
+                [{"inventory_item_id": "...", "quantity": 5, "sku": "...", "tracked": False}, ...]
+                ``sku`` is optional (for reporting), ``tracked=True`` skips the
+                tracking update and ``quantity=None`` only activates the item.
+            location_id: Location ID
+            activate: Whether to enable tracking and activate the items before setting quantities
+            reference_document_uri: Optional reference URI recorded in the adjustment group
 
-        logger.info(f"✅ Inventory batch update: {success_count} success, {len(errors)} errors")
-        return success_count, errors
+        Returns:
+            List[Dict]: One result per input item, in the same order:
+                {"inventory_item_id", "sku", "quantity", "success", "step", "errors"}
+                where ``step`` is the step that failed or "done"
+        """
+        results = [
+            {
+                "inventory_item_id": item.get("inventory_item_id"),
+                "sku": item.get("sku"),
+                "quantity": item.get("quantity"),
+                "success": False,
+                "step": None,
+                "errors": [],
+            }
+            for item in items
+        ]
+        pending = [index for index, result in enumerate(results) if result["inventory_item_id"]]
+        for index in set(range(len(results))) - set(pending):
+            results[index].update(step="input", errors=[{"message": "No inventory item ID"}])
+
+        if activate and pending:
+            pending = await self._enable_and_activate(items, results, pending, location_id)
+
+        to_set = [index for index in pending if results[index]["quantity"] is not None]
+        for start in range(0, len(to_set), INVENTORY_SET_QUANTITIES_MAX_ITEMS):
+            chunk = to_set[start : start + INVENTORY_SET_QUANTITIES_MAX_ITEMS]
+            await self._set_quantities_chunk(results, chunk, location_id, reference_document_uri)
+
+        for index in pending:
+            if results[index]["step"] is None:
+                results[index].update(success=True, step="done")
+
+        succeeded = sum(1 for result in results if result["success"])
+        logger.info(f"✅ Inventory batch write: {succeeded}/{len(results)} items at {location_id}")
+        return results
+
+    async def _enable_and_activate(
+        self, items: List[Dict[str, Any]], results: List[Dict[str, Any]], pending: List[int], location_id: str
+    ) -> List[int]:
+        """
+        Enable tracking and activate items at the location through the mutation batcher.
+
+        Returns:
+            List[int]: Indexes of the items that completed both steps
+        """
+        batcher = self.mutation_batcher
+        calls = []
+        for index in pending:
+            inventory_item_id = results[index]["inventory_item_id"]
+            if items[index].get("tracked") is not True:
+                calls.append(
+                    (
+                        index,
+                        "tracking",
+                        batcher.submit(
+                            "inventoryItemUpdate",
+                            {"id": ("ID!", inventory_item_id), "input": ("InventoryItemInput!", {"tracked": True})},
+                            "inventoryItem { id tracked } userErrors { field message }",
+                        ),
+                    )
+                )
+            calls.append(
+                (
+                    index,
+                    "activation",
+                    batcher.submit(
+                        "inventoryActivate",
+                        {"inventoryItemId": ("ID!", inventory_item_id), "locationId": ("ID!", location_id)},
+                        "inventoryLevel { id } userErrors { field message }",
+                    ),
+                )
+            )
+
+        responses = await asyncio.gather(*(call for _, _, call in calls), return_exceptions=True)
+
+        for (index, step, _), response in zip(calls, responses, strict=True):
+            if results[index]["step"] is not None:
+                continue  # Already failed the other step
+            if isinstance(response, BaseException):
+                results[index].update(step=step, errors=[{"message": str(response)}])
+            elif response.get("userErrors"):
+                results[index].update(step=step, errors=response["userErrors"])
+
+        return [index for index in pending if results[index]["step"] is None]
+
+    async def _set_quantities_chunk(
+        self,
+        results: List[Dict[str, Any]],
+        chunk: List[int],
+        location_id: str,
+        reference_document_uri: Optional[str],
+        retry: bool = True,
+    ) -> None:
+        """
+        Set the available quantity of up to 250 items with one ``inventorySetQuantities``.
+
+        The mutation is atomic: when some items are rejected, the remaining ones
+        are sent again once without them.
+        """
+        variables = {
+            "input": {
+                "name": "available",
+                "reason": "correction",
+                "ignoreCompareQuantity": True,
+                "quantities": [
+                    {
+                        "inventoryItemId": results[index]["inventory_item_id"],
+                        "locationId": location_id,
+                        "quantity": results[index]["quantity"],
+                    }
+                    for index in chunk
+                ],
+            }
+        }
+        if reference_document_uri:
+            variables["input"]["referenceDocumentUri"] = reference_document_uri
+
+        try:
+            result = await self._execute_query(INVENTORY_SET_QUANTITIES_MUTATION, variables)
+        except Exception as e:
+            for index in chunk:
+                results[index].update(step="quantities", errors=[{"message": str(e)}])
+            return
+
+        user_errors = (result.get("inventorySetQuantities") or {}).get("userErrors") or []
+        if not user_errors:
+            return
+
+        rejected = set()
+        for error in user_errors:
+            field = error.get("field") or []
+            # field looks like ["input", "quantities", "3", "locationId"]
+            if len(field) >= 3 and field[1] == "quantities" and str(field[2]).isdigit():
+                position = int(field[2])
+                if position < len(chunk):
+                    rejected.add(position)
+                    results[chunk[position]].update(step="quantities")
+                    results[chunk[position]]["errors"].append(error)
+
+        remaining = [index for position, index in enumerate(chunk) if position not in rejected]
+        if rejected and remaining and retry:
+            await self._set_quantities_chunk(results, remaining, location_id, reference_document_uri, retry=False)
+        else:
+            for index in remaining:
+                results[index].update(step="quantities", errors=list(user_errors))
 
     async def adjust_inventory_quantities(self, adjustments: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -402,38 +580,58 @@ class ShopifyInventoryClient(BaseShopifyGraphQLClient):
             else:
                 numeric_id = variant_id
 
-            # Build REST API URL
-            shop_name = self.shop_url.replace("https://", "").replace("http://", "")
-            if not shop_name.endswith(".myshopify.com"):
-                shop_name = f"{shop_name}.myshopify.com"
-
-            rest_url = f"https://{shop_name}/admin/api/{self.api_version}/variants/{numeric_id}.json"
-
-            # Prepare payload
-            payload = {"variant": variant_data}
-
-            # Make REST API call
-            headers = {
-                "Content-Type": "application/json",
-                "X-Shopify-Access-Token": self.access_token,
-            }
-
-            async with aiohttp.ClientSession() as session:
-                async with session.put(rest_url, json=payload, headers=headers) as response:
-                    response_data = await response.json()
+            # Pooled session + X-Shopify-Shop-Api-Call-Limit pacing
+            status, response_data = await get_client_registry().rest_request(
+                "PUT", f"variants/{numeric_id}.json", {"variant": variant_data}
+            )
 
-                    if response.status != 200:
-                        error_msg = response_data.get("error", response_data.get("errors", "Unknown error"))
-                        raise ShopifyAPIException(f"REST API error {response.status}: {error_msg}")
+            if status != 200:
+                error_msg = (
+                    response_data.get("error", response_data.get("errors", "Unknown error"))
+                    if isinstance(response_data, dict)
+                    else response_data
+                )
+                raise ShopifyAPIException(f"REST API error {status}: {error_msg}")
 
-                    variant = response_data.get("variant", {})
-                    logger.info(f"✅ Updated variant via REST API: {variant.get('sku', 'Unknown SKU')}")
-                    return variant
+            variant = response_data.get("variant", {})
+            logger.info(f"✅ Updated variant via REST API: {variant.get('sku', 'Unknown SKU')}")
+            return variant
 
         except Exception as e:
             logger.error(f"Error updating variant via REST API: {e}")
             raise ShopifyAPIException(f"Failed to update variant via REST API: {str(e)}") from e
 
+    async def get_inventory_item_sku_index(self, page_size: int = 250) -> Dict[str, str]:
+        """
+        Build a SKU -> inventory item ID index for every inventory item of the shop.
+
+        Args:
+            page_size: Items per page (max 250)
+
+        Returns:
+            Dict[str, str]: Lowercased SKU -> inventory item ID (items without SKU are skipped)
+        """
+        index: Dict[str, str] = {}
+        cursor = None
+
+        while True:
+            result = await self._execute_query(INVENTORY_ITEM_SKU_INDEX_QUERY, {"first": page_size, "after": cursor})
+            connection = result.get("inventoryItems") or {}
+
+            for edge in connection.get("edges", []):
+                node = edge.get("node") or {}
+                sku = (node.get("sku") or "").strip().lower()
+                if sku:
+                    index[sku] = node["id"]
+
+            page_info = connection.get("pageInfo") or {}
+            if not page_info.get("hasNextPage"):
+                break
+            cursor = page_info.get("endCursor")
+
+        logger.info(f"📇 Inventory item SKU index built: {len(index)} SKUs")
+        return index
+
     async def get_inventory_item(self, inventory_item_id: str) -> Optional[Dict[str, Any]]:
         """
         Get inventory item with inventory levels.
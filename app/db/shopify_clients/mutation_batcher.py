@@ -0,0 +1,276 @@
+"""
+Alias-multiplexed batching of independent Shopify GraphQL mutations.
+
+Most writes used to be sent one GraphQL document at a time (``tagsAdd`` per
+product, ``metafieldsSet`` per product, ``inventoryActivate`` per variant...).
+The batcher collects mutations submitted by concurrent tasks during a short
+window and packs them into a single document using field aliases::
+
+    mutation Batched_tagsAdd_2($m1_id: ID!, $m1_tags: [String!]!, $m2_id: ID!, $m2_tags: [String!]!) {
+      m1: tagsAdd(id: $m1_id, tags: $m1_tags) { userErrors { field message } }
+      m2: tagsAdd(id: $m2_id, tags: $m2_tags) { userErrors { field message } }
+    }
+
+Each document is filled up to the configured cost ceiling / alias count and the
+per-alias payload (including its ``userErrors``) is handed back to the caller
+that submitted it.
+
+Only independent, idempotent mutations must be submitted: if Shopify rejects a
+batched document with GraphQL errors, its mutations are retried one by one to
+isolate the invalid input. Rate limiting and transport failures fail every
+mutation of the document instead, since resending them individually would
+multiply the requests and the document may already have been applied.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+from app.core.config import get_settings
+from app.utils.error_handler import ShopifyAPIException
+
+from .concurrency_controller import is_congestion_error
+from .cost_throttle import DEFAULT_MUTATION_COST
+
+if TYPE_CHECKING:
+    from .base_client import BaseShopifyGraphQLClient
+
+logger = logging.getLogger(__name__)
+
+USER_ERRORS_SELECTION = "userErrors { field message }"
+
+
+@dataclass
+class BatchedMutation:
+    """A mutation waiting to be sent inside a batched document."""
+
+    field: str
+    arguments: Dict[str, Tuple[str, Any]]
+    selection: str
+    cost: float
+    future: asyncio.Future
+
+
+def _is_document_error(error: BaseException) -> bool:
+    """
+    Check whether Shopify rejected a batched document because of its content.
+
+    Only GraphQL errors that are not rate limiting count: one invalid input fails the
+    whole document, so its mutations can be isolated by sending them alone. Wrapped
+    exceptions are followed through ``__cause__``.
+
+    Args:
+        error: Exception raised while executing the document
+
+    Returns:
+        bool: True for document or validation errors
+    """
+    if is_congestion_error(error):
+        return False
+    current: Optional[BaseException] = error
+    while current is not None:
+        if isinstance(current, ShopifyAPIException) and current.details.get("graphql_errors"):
+            return True
+        current = current.__cause__
+    return False
+
+
+def build_batch_document(mutations: List[BatchedMutation]) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    Build one aliased GraphQL document for a list of mutations.
+
+    Args:
+        mutations: Mutations to pack; mutation ``i`` is exposed as alias ``m{i+1}``
+
+    Returns:
+        Tuple: (operation name, document, variables). The operation name encodes
+            the fields and the batch size so the cost throttle learns each shape
+    """
+    fields = sorted({mutation.field for mutation in mutations})
+    operation_name = f"Batched_{fields[0] if len(fields) == 1 else 'mixed'}_{len(mutations)}"
+
+    declarations: List[str] = []
+    selections: List[str] = []
+    variables: Dict[str, Any] = {}
+
+    for index, mutation in enumerate(mutations, start=1):
+        alias = f"m{index}"
+        call_arguments = []
+        for name, (graphql_type, value) in mutation.arguments.items():
+            variable = f"{alias}_{name}"
+            declarations.append(f"${variable}: {graphql_type}")
+            call_arguments.append(f"{name}: ${variable}")
+            variables[variable] = value
+        arguments_text = f"({', '.join(call_arguments)})" if call_arguments else ""
+        selections.append(f"  {alias}: {mutation.field}{arguments_text} {{ {mutation.selection} }}")
+
+    declarations_text = f"({', '.join(declarations)})" if declarations else ""
+    document = f"mutation {operation_name}{declarations_text} {{\n" + "\n".join(selections) + "\n}"
+    return operation_name, document, variables
+
+
+class MutationBatcher:
+    """
+    Packs concurrently submitted mutations into aliased GraphQL documents.
+
+    A document is sent when the next mutation would exceed the cost ceiling or
+    the alias limit, or when the batching window expires, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        client: "BaseShopifyGraphQLClient",
+        max_cost: Optional[float] = None,
+        max_size: Optional[int] = None,
+        window: Optional[float] = None,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            client: Client used to execute the batched documents
+            max_cost: Cost ceiling per document (default: SHOPIFY_MUTATION_BATCH_MAX_COST)
+            max_size: Maximum aliases per document (default: SHOPIFY_MUTATION_BATCH_MAX_SIZE)
+            window: Seconds to wait for more mutations (default: SHOPIFY_MUTATION_BATCH_WINDOW)
+        """
+        settings = get_settings()
+        self.client = client
+        self.max_cost = max_cost if max_cost is not None else settings.SHOPIFY_MUTATION_BATCH_MAX_COST
+        self.max_size = max(1, max_size if max_size is not None else settings.SHOPIFY_MUTATION_BATCH_MAX_SIZE)
+        self.window = window if window is not None else settings.SHOPIFY_MUTATION_BATCH_WINDOW
+
+        self._pending: List[BatchedMutation] = []
+        self._pending_cost = 0.0
+        self._timer: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self.stats: Dict[str, int] = {
+            "submitted": 0,
+            "documents_sent": 0,
+            "fallback_documents": 0,
+        }
+
+    async def submit(
+        self,
+        field: str,
+        arguments: Dict[str, Tuple[str, Any]],
+        selection: str = USER_ERRORS_SELECTION,
+        cost: float = DEFAULT_MUTATION_COST,
+    ) -> Dict[str, Any]:
+        """
+        Queue a mutation and wait for its result.
+
+        Args:
+            field: Mutation field (e.g. "tagsAdd")
+            arguments: Mapping of argument name to (GraphQL type, value),
+                e.g. ``{"id": ("ID!", product_id), "tags": ("[String!]!", ["x"])}``
+            selection: Selection set of the mutation payload (without braces)
+            cost: Estimated cost of this mutation in points
+
+        Returns:
+            Dict: Payload of this mutation (its selection, including userErrors)
+
+        Raises:
+            ShopifyAPIException: If the mutation could not be executed
+        """
+        mutation = BatchedMutation(
+            field=field,
+            arguments=arguments,
+            selection=selection,
+            cost=float(cost),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self.stats["submitted"] += 1
+
+        if self._pending and (
+            self._pending_cost + mutation.cost > self.max_cost or len(self._pending) >= self.max_size
+        ):
+            self._flush_pending()
+
+        self._pending.append(mutation)
+        self._pending_cost += mutation.cost
+
+        if len(self._pending) >= self.max_size or self._pending_cost >= self.max_cost:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = asyncio.ensure_future(self._flush_after_window())
+
+        return await mutation.future
+
+    async def flush(self) -> None:
+        """Send pending mutations immediately and wait for every document in flight."""
+        self._flush_pending()
+        if self._in_flight:
+            await asyncio.gather(*list(self._in_flight), return_exceptions=True)
+
+    async def _flush_after_window(self) -> None:
+        """Send the pending document once the batching window expires."""
+        await asyncio.sleep(self.window)
+        self._timer = None
+        self._flush_pending()
+
+    def _flush_pending(self) -> None:
+        """Detach the pending mutations and send them as one document."""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+
+        if not self._pending:
+            return
+
+        batch = self._pending
+        self._pending = []
+        self._pending_cost = 0.0
+
+        task = asyncio.ensure_future(self._execute(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _execute(self, batch: List[BatchedMutation]) -> None:
+        """Execute a batched document and hand each alias result to its caller."""
+        operation_name, document, variables = build_batch_document(batch)
+        self.client._throttle.hint_cost(operation_name, sum(mutation.cost for mutation in batch))
+        self.stats["documents_sent"] += 1
+
+        try:
+            data = await self.client._execute_query(document, variables)
+        except Exception as e:
+            if len(batch) > 1 and _is_document_error(e):
+                # One invalid input fails the whole document: isolate it by sending each mutation alone
+                logger.warning(f"Batched document {operation_name} failed ({e}), retrying mutations individually")
+                self.stats["fallback_documents"] += 1
+                await asyncio.gather(*[self._execute([mutation]) for mutation in batch])
+                return
+            # Throttling or transport failure: resending each mutation would multiply the load
+            error = e if isinstance(e, ShopifyAPIException) else ShopifyAPIException(str(e))
+            for mutation in batch:
+                if not mutation.future.done():
+                    mutation.future.set_exception(error)
+            return
+
+        for index, mutation in enumerate(batch, start=1):
+            if mutation.future.done():
+                continue  # Caller was cancelled
+            payload = (data or {}).get(f"m{index}")
+            if payload is None:
+                mutation.future.set_exception(
+                    ShopifyAPIException(f"No result returned for batched mutation {mutation.field}")
+                )
+            else:
+                mutation.future.set_result(payload)
+
+        logger.debug(f"Sent {len(batch)} mutations in one document ({operation_name})")
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get batching counters for monitoring.
+
+        Returns:
+            Dict: Submitted mutations vs documents sent
+        """
+        documents = self.stats["documents_sent"]
+        return {
+            **self.stats,
+            "mutations_per_document": round(self.stats["submitted"] / documents, 2) if documents else 0.0,
+            "pending": len(self._pending),
+        }
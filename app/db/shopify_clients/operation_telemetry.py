@@ -0,0 +1,218 @@
+"""
+Per-operation telemetry of Shopify GraphQL calls.
+
+Records, for every GraphQL operation name, the HTTP latency histogram, the
+requested vs actual query cost reported in ``extensions.cost``, time spent
+waiting for the cost bucket, retries and payload sizes. The summary is exposed
+through ``/api/v1/metrics/performance`` so the operations that consume most of
+the Shopify budget can be identified and trimmed.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+@dataclass
+class OperationStats:
+    """Accumulated telemetry of one GraphQL operation."""
+
+    operation_type: str = "query"
+    calls: int = 0
+    failures: int = 0
+    requests: int = 0
+    retries: int = 0
+    throttled_responses: int = 0
+    latency_total_ms: float = 0.0
+    latency_max_ms: float = 0.0
+    latency_histogram: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    requested_cost: float = 0.0
+    actual_cost: float = 0.0
+    cost_samples: int = 0
+    throttle_wait_seconds: float = 0.0
+    request_bytes: int = 0
+    response_bytes: int = 0
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """
+        Estimate a latency percentile from the histogram.
+
+        Args:
+            percentile: Percentile between 0 and 1
+
+        Returns:
+            Optional[float]: Upper bound (ms) of the bucket holding the percentile,
+                ``None`` for the open bucket or when there are no samples
+        """
+        if not self.requests:
+            return None
+        target = percentile * self.requests
+        seen = 0
+        for index, count in enumerate(self.latency_histogram):
+            seen += count
+            if seen >= target:
+                return float(LATENCY_BUCKETS_MS[index]) if index < len(LATENCY_BUCKETS_MS) else None
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the stats for the metrics endpoint."""
+        bucket_labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "operation_type": self.operation_type,
+            "calls": self.calls,
+            "failures": self.failures,
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled_responses": self.throttled_responses,
+            "latency_ms": {
+                "avg": round(self.latency_total_ms / self.requests, 2) if self.requests else 0.0,
+                "max": round(self.latency_max_ms, 2),
+                "p50": self.latency_percentile(0.5),
+                "p95": self.latency_percentile(0.95),
+                "histogram": dict(zip(bucket_labels, self.latency_histogram, strict=True)),
+            },
+            "cost": {
+                "requested_total": round(self.requested_cost, 2),
+                "actual_total": round(self.actual_cost, 2),
+                "requested_avg": round(self.requested_cost / self.cost_samples, 2) if self.cost_samples else 0.0,
+                "actual_avg": round(self.actual_cost / self.cost_samples, 2) if self.cost_samples else 0.0,
+                "over_requested": round(self.requested_cost - self.actual_cost, 2),
+            },
+            "throttle_wait_seconds": round(self.throttle_wait_seconds, 3),
+            "payload_bytes": {"request": self.request_bytes, "response": self.response_bytes},
+        }
+
+
+class OperationTelemetry:
+    """Process-wide registry of per-operation GraphQL statistics."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._operations: Dict[str, OperationStats] = {}
+
+    def _get(self, operation_name: str, operation_type: str) -> OperationStats:
+        stats = self._operations.get(operation_name)
+        if stats is None:
+            stats = self._operations[operation_name] = OperationStats(operation_type=operation_type)
+        return stats
+
+    def observe_request(
+        self,
+        operation_name: str,
+        operation_type: str,
+        latency_seconds: float,
+        request_bytes: int,
+        response_bytes: int,
+        cost_extension: Optional[Dict[str, Any]] = None,
+        throttled: bool = False,
+    ) -> None:
+        """
+        Record one HTTP round-trip of an operation.
+
+        Args:
+            operation_name: GraphQL operation name
+            operation_type: "query" or "mutation"
+            latency_seconds: Round-trip latency
+            request_bytes: Size of the request body
+            response_bytes: Size of the response body
+            cost_extension: ``extensions.cost`` of the response, if any
+            throttled: Whether Shopify answered THROTTLED / HTTP 429
+        """
+        stats = self._get(operation_name, operation_type)
+        latency_ms = latency_seconds * 1000
+        stats.requests += 1
+        stats.latency_total_ms += latency_ms
+        stats.latency_max_ms = max(stats.latency_max_ms, latency_ms)
+        bucket = next(
+            (index for index, bound in enumerate(LATENCY_BUCKETS_MS) if latency_ms <= bound), len(LATENCY_BUCKETS_MS)
+        )
+        stats.latency_histogram[bucket] += 1
+        stats.request_bytes += request_bytes
+        stats.response_bytes += response_bytes
+        if throttled:
+            stats.throttled_responses += 1
+
+        if cost_extension:
+            requested = cost_extension.get("requestedQueryCost")
+            actual = cost_extension.get("actualQueryCost")
+            if requested is not None:
+                stats.cost_samples += 1
+                stats.requested_cost += float(requested)
+                # THROTTLED responses report no actual cost: nothing was executed
+                stats.actual_cost += float(actual) if actual is not None else 0.0
+
+    def observe_call(
+        self, operation_name: str, operation_type: str, attempts: int, throttle_wait_seconds: float, succeeded: bool
+    ) -> None:
+        """
+        Record the outcome of one ``_execute_query`` call.
+
+        Args:
+            operation_name: GraphQL operation name
+            operation_type: "query" or "mutation"
+            attempts: Number of attempts made (retries = attempts - 1)
+            throttle_wait_seconds: Time spent waiting for the cost bucket or backoffs
+            succeeded: Whether the call returned data
+        """
+        stats = self._get(operation_name, operation_type)
+        stats.calls += 1
+        stats.retries += max(0, attempts - 1)
+        stats.throttle_wait_seconds += throttle_wait_seconds
+        if not succeeded:
+            stats.failures += 1
+
+    def get_summary(self, sort_by: str = "actual_cost", limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get the telemetry of every operation, most expensive first.
+
+        Args:
+            sort_by: "actual_cost", "requested_cost", "latency", "calls" or "throttle_wait"
+            limit: Maximum number of operations to return
+
+        Returns:
+            Dict: Totals and per-operation statistics
+        """
+        sort_keys = {
+            "actual_cost": lambda item: item[1].actual_cost,
+            "requested_cost": lambda item: item[1].requested_cost,
+            "latency": lambda item: item[1].latency_total_ms,
+            "calls": lambda item: item[1].calls,
+            "throttle_wait": lambda item: item[1].throttle_wait_seconds,
+        }
+        ranked = sorted(self._operations.items(), key=sort_keys.get(sort_by, sort_keys["actual_cost"]), reverse=True)
+        if limit is not None:
+            ranked = ranked[:limit]
+
+        all_stats = list(self._operations.values())
+        return {
+            "totals": {
+                "operations": len(all_stats),
+                "calls": sum(stats.calls for stats in all_stats),
+                "requests": sum(stats.requests for stats in all_stats),
+                "retries": sum(stats.retries for stats in all_stats),
+                "requested_cost": round(sum(stats.requested_cost for stats in all_stats), 2),
+                "actual_cost": round(sum(stats.actual_cost for stats in all_stats), 2),
+                "throttle_wait_seconds": round(sum(stats.throttle_wait_seconds for stats in all_stats), 3),
+            },
+            "sorted_by": sort_by if sort_by in sort_keys else "actual_cost",
+            "operations": {name: stats.to_dict() for name, stats in ranked},
+        }
+
+    def reset(self) -> None:
+        """Discard all recorded statistics."""
+        self._operations.clear()
+
+
+_telemetry = OperationTelemetry()
+
+
+def get_operation_telemetry() -> OperationTelemetry:
+    """
+    Get the process-wide GraphQL operation telemetry.
+
+    Returns:
+        OperationTelemetry: Shared telemetry instance
+    """
+    return _telemetry
@@ -14,6 +14,7 @@ from app.db.queries import (
     CREATE_VARIANTS_BULK_MUTATION,
     PRODUCT_BY_HANDLE_QUERY,
     PRODUCT_BY_SKU_QUERY,
+    PRODUCT_SNAPSHOTS_BY_HANDLES_QUERY,
     PRODUCTS_QUERY,
     TAXONOMY_CATEGORIES_QUERY,
     UPDATE_PRODUCT_MUTATION,
@@ -155,6 +156,47 @@ class ShopifyProductClient(BaseShopifyGraphQLClient):
             logger.error(f"Error in batch product search: {e}")
             raise ShopifyAPIException(f"Failed to search products in batch: {str(e)}") from e
 
+    async def get_product_snapshots_by_handles(
+        self, handles: List[str], location_id: str
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Find multiple products by handle with everything needed to plan their update.
+
+        Besides the fields of get_products_by_handles_batch, each product includes
+        its category, metafields and, per variant, inventory tracking and the
+        available quantity at the given location, so a single query serves the
+        existence check, status preservation and the update planner.
+
+        Args:
+            handles: List of product handles to search for
+            location_id: Location whose available quantities are returned
+
+        Returns:
+            Dict mapping handle to product snapshot (or None if not found)
+        """
+        if not handles:
+            return {}
+
+        try:
+            search_query = " OR ".join(f"handle:{handle}" for handle in handles)
+            variables = {"handles": search_query, "first": len(handles), "locationId": location_id}
+            result = await self._execute_query(PRODUCT_SNAPSHOTS_BY_HANDLES_QUERY, variables)
+
+            products_by_handle: Dict[str, Optional[Dict[str, Any]]] = {handle: None for handle in handles}
+            for edge in result.get("products", {}).get("edges", []):
+                product = edge["node"]
+                if product.get("handle") in products_by_handle:
+                    products_by_handle[product["handle"]] = product
+
+            found_count = sum(1 for p in products_by_handle.values() if p is not None)
+            logger.info(f"Batch snapshot search: Found {found_count}/{len(handles)} products by handle")
+
+            return products_by_handle
+
+        except Exception as e:
+            logger.error(f"Error in batch product snapshot search: {e}")
+            raise ShopifyAPIException(f"Failed to fetch product snapshots in batch: {str(e)}") from e
+
     async def create_product(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new product in Shopify.
@@ -687,13 +729,12 @@ class ShopifyProductClient(BaseShopifyGraphQLClient):
             Deletion result with product info after deletion
         """
         try:
-            from app.db.queries.reverse_sync import DELETE_VARIANTS_BULK_MUTATION
-
-            variables = {"productId": product_id, "variantsIds": [variant_id]}
-
-            result = await self._execute_query(DELETE_VARIANTS_BULK_MUTATION, variables)
-
-            delete_result = result.get("productVariantsBulkDelete", {})
+            # Deletions of products processed concurrently share one aliased document
+            delete_result = await self.mutation_batcher.submit(
+                "productVariantsBulkDelete",
+                {"productId": ("ID!", product_id), "variantsIds": ("[ID!]!", [variant_id])},
+                "product { id title } userErrors { field message }",
+            )
             self._handle_graphql_errors(delete_result, "Variant deletion")
 
             product = delete_result.get("product")
@@ -744,6 +785,37 @@ class ShopifyProductClient(BaseShopifyGraphQLClient):
             logger.error(f"Error fetching products without tag '{tag}': {e}")
             raise ShopifyAPIException(f"Failed to fetch products without tag: {str(e)}") from e
 
+    async def get_active_products_with_inventory(
+        self, limit: int = 250, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get a page of ACTIVE products with variant inventory and metafields (reverse stock sync shape).
+
+        Args:
+            limit: Number of products to fetch (max 250)
+            cursor: Pagination cursor
+
+        Returns:
+            Dict containing products and pagination info
+        """
+        try:
+            from app.db.queries.reverse_sync import PRODUCTS_WITHOUT_TAG_QUERY
+
+            variables = {"query": "status:ACTIVE", "first": min(limit, 250)}
+            if cursor:
+                variables["after"] = cursor
+
+            result = await self._execute_query(PRODUCTS_WITHOUT_TAG_QUERY, variables)
+            products_data = result.get("products", {})
+
+            logger.info(f"Fetched {len(products_data.get('edges', []))} active products")
+
+            return products_data
+
+        except Exception as e:
+            logger.error(f"Error fetching active products: {e}")
+            raise ShopifyAPIException(f"Failed to fetch active products: {str(e)}") from e
+
     async def get_product_with_inventory(self, product_id: str) -> Optional[Dict[str, Any]]:
         """
         Get product with full inventory information.
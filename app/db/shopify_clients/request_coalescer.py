@@ -0,0 +1,127 @@
+"""
+Single-flight coalescing of identical in-flight Shopify read queries.
+
+Concurrent tasks frequently ask Shopify for exactly the same thing at the same
+time (locations resolved by every reverse-sync worker, the same handle looked up
+during mapping and existence checks, repeated taxonomy searches). The coalescer
+lets the first caller (the leader) execute the request and every identical
+request that arrives while it is in flight awaits the same result, so they share
+one HTTP round-trip and one cost charge.
+
+Only read-only operations (GraphQL ``query`` documents) must be coalesced;
+mutations always execute individually.
+"""
+
+import asyncio
+import copy
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def make_request_key(endpoint: str, query: str, variables: Any) -> Tuple[str, str, str]:
+    """
+    Build the coalescing key of a GraphQL request.
+
+    Args:
+        endpoint: GraphQL endpoint URL (identifies the shop and API version)
+        query: GraphQL document
+        variables: Query variables
+
+    Returns:
+        Tuple: Hashable key; variables are serialized with sorted keys
+    """
+    serialized = json.dumps(variables or {}, sort_keys=True, default=str)
+    return endpoint, query, serialized
+
+
+class RequestCoalescer:
+    """
+    Shares the result of identical requests that are in flight at the same time.
+
+    The leader's work runs in its own task and callers await it through
+    ``asyncio.shield``, so cancelling one caller never cancels the request for
+    the others.
+    """
+
+    def __init__(self):
+        """Initialize the coalescer."""
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._followers: Dict[asyncio.Task, int] = {}
+        self.stats: Dict[str, int] = {"executed": 0, "coalesced": 0}
+        self._saved_by_operation: Dict[str, int] = {}
+
+    async def run(self, key: Hashable, operation_name: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Execute ``factory`` or join an identical request already in flight.
+
+        Args:
+            key: Coalescing key (see ``make_request_key``)
+            operation_name: GraphQL operation name, for the counters
+            factory: Coroutine factory that performs the request
+
+        Returns:
+            Any: Result of the request; when the result was shared every caller
+                receives its own deep copy so callers can mutate it safely
+        """
+        task = self._in_flight.get(key)
+        if task is not None and not task.done():
+            self.stats["coalesced"] += 1
+            self._followers[task] = self._followers.get(task, 0) + 1
+            self._saved_by_operation[operation_name] = self._saved_by_operation.get(operation_name, 0) + 1
+            logger.debug(f"Coalesced in-flight Shopify query {operation_name}")
+            return copy.deepcopy(await asyncio.shield(task))
+
+        self.stats["executed"] += 1
+        task = asyncio.ensure_future(factory())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda finished: self._forget(key, finished))
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            shared = self._followers.pop(task, 0)
+        return copy.deepcopy(result) if shared else result
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Remove a finished request and mark its exception as retrieved."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Avoid "exception was never retrieved" when every caller was cancelled
+            task.exception()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct requests currently in flight."""
+        return len(self._in_flight)
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get coalescing counters for monitoring.
+
+        Returns:
+            Dict: Executed vs coalesced calls and calls saved per operation
+        """
+        total = self.stats["executed"] + self.stats["coalesced"]
+        return {
+            "executed": self.stats["executed"],
+            "coalesced": self.stats["coalesced"],
+            "saved_ratio": round(self.stats["coalesced"] / total, 4) if total else 0.0,
+            "in_flight": self.in_flight,
+            "saved_by_operation": dict(sorted(self._saved_by_operation.items(), key=lambda item: -item[1])),
+        }
+
+
+_coalescer = RequestCoalescer()
+
+
+def get_request_coalescer() -> RequestCoalescer:
+    """
+    Get the process-wide request coalescer.
+
+    Returns:
+        RequestCoalescer: Shared coalescer instance
+    """
+    return _coalescer
@@ -0,0 +1,188 @@
+"""
+Redis-shared Shopify GraphQL cost budget.
+
+Shopify has a single cost bucket per store, but every uvicorn worker and every
+container runs its own ``ShopifyCostThrottle``. This module stores the bucket in
+Redis and admits requests with atomic Lua scripts, so all processes draw from
+one shared budget. When Redis is not reachable the throttle falls back to its
+in-process model until the cooldown expires.
+"""
+
+import logging
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Refill the bucket, then reserve ARGV[1] points or return the seconds to wait.
+# Returns a string because Lua numbers are truncated to integers in Redis replies.
+_ACQUIRE_SCRIPT = """
+local cost = tonumber(ARGV[1])
+local maximum = tonumber(ARGV[2])
+local rate = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'available', 'updated_at', 'throttled_until')
+local available = tonumber(state[1]) or maximum
+local updated_at = tonumber(state[2]) or now
+local throttled_until = tonumber(state[3]) or 0
+available = math.min(maximum, available + math.max(0, now - updated_at) * rate)
+local wait = 0
+if throttled_until > now then
+    wait = throttled_until - now
+elseif available >= cost then
+    available = available - cost
+else
+    wait = (cost - available) / rate
+end
+redis.call('HSET', KEYS[1], 'available', available, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], ttl)
+return tostring(wait)
+"""
+
+# Refill, refund ARGV[1] points, cap with Shopify's currentlyAvailable (ARGV[2], -1 if unknown)
+# and optionally block admissions for ARGV[5] seconds (THROTTLED back-off).
+_SETTLE_SCRIPT = """
+local refund = tonumber(ARGV[1])
+local server_available = tonumber(ARGV[2])
+local maximum = tonumber(ARGV[3])
+local rate = tonumber(ARGV[4])
+local backoff = tonumber(ARGV[5])
+local ttl = tonumber(ARGV[6])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'available', 'updated_at', 'throttled_until')
+local available = tonumber(state[1]) or maximum
+local updated_at = tonumber(state[2]) or now
+local throttled_until = tonumber(state[3]) or 0
+available = math.min(maximum, available + math.max(0, now - updated_at) * rate + refund)
+if server_available >= 0 then
+    available = math.min(available, server_available)
+end
+if backoff > 0 then
+    throttled_until = math.max(throttled_until, now + backoff)
+end
+redis.call('HSET', KEYS[1], 'available', available, 'updated_at', now, 'throttled_until', throttled_until)
+redis.call('EXPIRE', KEYS[1], ttl)
+return tostring(available)
+"""
+
+
+class RedisCostBucket:
+    """
+    Shopify cost bucket stored in Redis and shared by every process of a shop.
+
+    All operations are single Lua calls, so admission is atomic across workers
+    and replicas. Any Redis failure disables the shared bucket for
+    ``retry_cooldown`` seconds and callers fall back to their local model.
+    """
+
+    def __init__(
+        self,
+        shop_key: str,
+        redis_client: Any = None,
+        key_prefix: str = "shopify:cost_bucket",
+        key_ttl: int = 3600,
+        retry_cooldown: float = 30.0,
+    ):
+        """
+        Initialize the shared bucket.
+
+        Args:
+            shop_key: Shop identifier used in the Redis key
+            redis_client: Redis client (defaults to the application client)
+            key_prefix: Redis key prefix
+            key_ttl: Expiration of the bucket key in seconds
+            retry_cooldown: Seconds to stay on the local fallback after a Redis error
+        """
+        self.redis_key = f"{key_prefix}:{shop_key}"
+        self.key_ttl = key_ttl
+        self.retry_cooldown = retry_cooldown
+        self.redis_client: Any = redis_client
+        self._disabled_until = 0.0
+        self.errors = 0
+
+        if self.redis_client is None:
+            try:
+                from app.core.redis_client import get_redis_client
+
+                self.redis_client = get_redis_client()
+            except Exception as e:
+                logger.warning(f"Redis not available, Shopify cost budget will be per-process: {e}")
+
+    @property
+    def is_available(self) -> bool:
+        """Whether the shared bucket can be used right now."""
+        return self.redis_client is not None and time.monotonic() >= self._disabled_until
+
+    def _mark_unavailable(self, error: Exception) -> None:
+        """Switch to the local fallback for the cooldown period."""
+        self.errors += 1
+        self._disabled_until = time.monotonic() + self.retry_cooldown
+        logger.warning(
+            f"Shared Shopify cost budget unavailable, using local throttle for {self.retry_cooldown:.0f}s: {error}"
+        )
+
+    async def try_acquire(self, cost: float, maximum_available: float, restore_rate: float) -> Optional[float]:
+        """
+        Atomically reserve ``cost`` points in the shared bucket.
+
+        Args:
+            cost: Points to reserve
+            maximum_available: Bucket size
+            restore_rate: Points restored per second
+
+        Returns:
+            Optional[float]: 0 if reserved, seconds to wait otherwise, None if Redis is unavailable
+        """
+        if not self.is_available:
+            return None
+        try:
+            result = await self.redis_client.eval(
+                _ACQUIRE_SCRIPT, 1, self.redis_key, cost, maximum_available, restore_rate, self.key_ttl
+            )
+            return float(result)
+        except Exception as e:
+            self._mark_unavailable(e)
+            return None
+
+    async def settle(
+        self,
+        refund: float,
+        maximum_available: float,
+        restore_rate: float,
+        server_available: Optional[float] = None,
+        backoff_seconds: float = 0.0,
+    ) -> bool:
+        """
+        Settle a reservation in the shared bucket.
+
+        Args:
+            refund: Points to give back (reserved minus charged; may be negative)
+            maximum_available: Bucket size
+            restore_rate: Points restored per second
+            server_available: ``currentlyAvailable`` reported by Shopify, if known
+            backoff_seconds: Block every process for this long (THROTTLED back-off)
+
+        Returns:
+            bool: True if the shared bucket was updated
+        """
+        if not self.is_available:
+            return False
+        try:
+            await self.redis_client.eval(
+                _SETTLE_SCRIPT,
+                1,
+                self.redis_key,
+                refund,
+                server_available if server_available is not None else -1,
+                maximum_available,
+                restore_rate,
+                backoff_seconds,
+                self.key_ttl,
+            )
+            return True
+        except Exception as e:
+            self._mark_unavailable(e)
+            return False
@@ -5,7 +5,6 @@ This module provides a single interface that delegates to specialized clients
 while maintaining backward compatibility with the existing codebase.
 """
 
-import asyncio
 import logging
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -64,7 +63,7 @@ class ShopifyGraphQLClient(BaseShopifyGraphQLClient):
             # Share session and rate limiting
             client.session = self.session
             client._last_request_time = self._last_request_time
-            client._min_request_interval = self._min_request_interval
+            client._throttle = self._throttle
 
     async def close(self):
         """Close the unified client and all specialized clients."""
@@ -95,6 +94,12 @@ class ShopifyGraphQLClient(BaseShopifyGraphQLClient):
         """Delegate to product client."""
         return await self.products.get_products_by_handles_batch(handles)
 
+    async def get_product_snapshots_by_handles(
+        self, handles: List[str], location_id: str
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Delegate to product client."""
+        return await self.products.get_product_snapshots_by_handles(handles, location_id)
+
     async def create_product(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
         """Delegate to product client."""
         return await self.products.create_product(product_data)
@@ -113,23 +118,25 @@ class ShopifyGraphQLClient(BaseShopifyGraphQLClient):
         """Delegate to product client."""
         bulk_result = await self.products.create_variants_bulk(product_id, variants_data)
 
-        # Set inventory quantities if provided
+        # Set inventory quantities if provided (one inventorySetQuantities per 250 variants)
         if location_id and inventory_quantities:
-            inventory_tasks = []
-            variants = bulk_result.get("productVariants", [])
-
-            for variant in variants:
+            items = []
+            for variant in bulk_result.get("productVariants", []):
                 sku = variant.get("sku")
-                if sku and sku in inventory_quantities:
-                    quantity = inventory_quantities[sku]
-                    if quantity is not None and quantity > 0:
-                        task = self.set_variant_inventory_quantity(variant, location_id, quantity)
-                        inventory_tasks.append(task)
-
-            if inventory_tasks:
-                inventory_results = await asyncio.gather(*inventory_tasks, return_exceptions=True)
-                success_count = sum(1 for r in inventory_results if isinstance(r, dict) and r.get("success"))
-                logger.info(f"✅ Set inventory for {success_count}/{len(inventory_tasks)} variants")
+                quantity = inventory_quantities.get(sku) if sku else None
+                if quantity is not None and quantity > 0:
+                    items.append(
+                        {
+                            "inventory_item_id": (variant.get("inventoryItem") or {}).get("id"),
+                            "sku": sku,
+                            "quantity": quantity,
+                        }
+                    )
+
+            if items:
+                inventory_results = await self.write_inventory_batch(items, location_id, activate=False)
+                success_count = sum(1 for result in inventory_results if result["success"])
+                logger.info(f"✅ Set inventory for {success_count}/{len(items)} variants")
 
         return bulk_result
 
@@ -229,6 +236,20 @@ class ShopifyGraphQLClient(BaseShopifyGraphQLClient):
         """Delegate to inventory client."""
         return await self.inventory.batch_update_inventory(inventory_updates)
 
+    async def write_inventory_batch(
+        self,
+        items: List[Dict[str, Any]],
+        location_id: str,
+        activate: bool = True,
+        reference_document_uri: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Delegate to inventory client."""
+        return await self.inventory.write_inventory_batch(items, location_id, activate, reference_document_uri)
+
+    async def get_inventory_item_sku_index(self, page_size: int = 250) -> Dict[str, str]:
+        """Delegate to inventory client."""
+        return await self.inventory.get_inventory_item_sku_index(page_size)
+
     async def update_variant_rest(self, variant_id: str, variant_data: Dict[str, Any]) -> Dict[str, Any]:
         """Delegate to inventory client."""
         return await self.inventory.update_variant_rest(variant_id, variant_data)
@@ -606,6 +606,9 @@ mutation BulkProductsQuery {
             tags
             createdAt
             updatedAt
+            metafield(namespace: "rms", key: "ccod") {
+              value
+            }
             variants {
               edges {
                 node {
@@ -642,6 +645,52 @@ mutation BulkProductsQuery {
 }
 """
 
+# Flat variant export for the inventory reconciliation (no nested connections, so
+# every JSONL line is one variant). {location_id} is replaced before running it.
+BULK_OPERATION_VARIANT_INVENTORY_QUERY = """
+mutation BulkVariantInventoryQuery {
+  bulkOperationRunQuery(
+    query: \"\"\"
+    {
+      productVariants {
+        edges {
+          node {
+            id
+            sku
+            product {
+              id
+              status
+            }
+            inventoryItem {
+              id
+              inventoryLevel(locationId: "{location_id}") {
+                quantities(names: ["available"]) {
+                  quantity
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+    \"\"\"
+  ) {
+    bulkOperation {
+      id
+      status
+      errorCode
+      createdAt
+      objectCount
+      url
+    }
+    userErrors {
+      field
+      message
+    }
+  }
+}
+"""
+
 BULK_OPERATION_STATUS_QUERY = """
 query BulkOperationStatus($id: ID!) {
   node(id: $id) {
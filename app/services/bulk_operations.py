@@ -2,7 +2,9 @@
 Servicio de operaciones en lote para Shopify.
 
 Este módulo implementa operaciones bulk para manejar grandes volúmenes de datos
-usando la API de Bulk Operations de Shopify, que no tiene límites de rate.
+usando la API de Bulk Operations de Shopify, que no tiene límites de rate:
+consultas (bulkOperationRunQuery) y mutaciones desde un archivo JSONL subido con
+stagedUploadsCreate (bulkOperationRunMutation).
 """
 
 import asyncio
@@ -18,10 +20,18 @@ import aiofiles
 import aiohttp
 
 from app.core.config import get_settings
+from app.db.queries import (
+    BULK_OPERATION_RUN_MUTATION,
+    CANCEL_BULK_OPERATION_MUTATION,
+    PRODUCT_SET_BULK_MUTATION,
+    STAGED_UPLOADS_CREATE_MUTATION,
+)
+from app.db.shopify_clients.concurrency_controller import get_all_concurrency_status
 from app.db.shopify_graphql_client import ShopifyGraphQLClient
 from app.db.shopify_graphql_queries import (
     BULK_OPERATION_PRODUCTS_QUERY,
     BULK_OPERATION_STATUS_QUERY,
+    BULK_OPERATION_VARIANT_INVENTORY_QUERY,
 )
 from app.utils.error_handler import AppException, ErrorAggregator
 from app.utils.retry_handler import get_handler
@@ -29,6 +39,9 @@ from app.utils.retry_handler import get_handler
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Shopify acepta archivos de variables de hasta 100 MB; se usa un margen amplio
+BULK_MUTATION_MAX_FILE_BYTES = 20 * 1024 * 1024
+
 
 class BulkOperationStatus:
     """Estados de operaciones bulk."""
@@ -127,6 +140,40 @@ class ShopifyBulkOperations:
             logger.error(f"Bulk product extraction failed: {e}")
             raise
 
+    async def extract_variant_inventory_bulk(
+        self, location_id: str, timeout_minutes: int = 30
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Extrae SKU, inventory item y cantidad disponible de todas las variantes con una operación bulk.
+
+        Args:
+            location_id: Ubicación cuya cantidad "available" se exporta
+            timeout_minutes: Timeout para la operación
+
+        Returns:
+            Tuple: (variantes, estadísticas); cada variante es una línea plana del JSONL
+        """
+        logger.info("Starting bulk variant inventory extraction")
+        start_time = datetime.now(timezone.utc)
+
+        await self.initialize()
+        bulk_query = BULK_OPERATION_VARIANT_INVENTORY_QUERY.replace("{location_id}", location_id)
+        operation_id = await self._start_bulk_operation(bulk_query)
+        logger.info(f"Started bulk operation: {operation_id}")
+
+        operation_result = await self._wait_for_completion(operation_id, timeout_minutes * 60)
+        variants = await self._download_and_parse_results(operation_result.get("url"))
+
+        end_time = datetime.now(timezone.utc)
+        stats = {
+            "operation_id": operation_id,
+            "duration_seconds": (end_time - start_time).total_seconds(),
+            "total_variants": len(variants),
+            "file_size_bytes": operation_result.get("fileSize", 0),
+        }
+        logger.info(f"Bulk variant extraction completed: {len(variants)} variants in {stats['duration_seconds']:.2f}s")
+        return variants, stats
+
     async def _start_bulk_operation(self, query: str) -> str:
         """
         Inicia una operación bulk.
@@ -261,8 +308,10 @@ class ShopifyBulkOperations:
 
                     content = await response.text()
 
-            # Parsear JSONL (JSON Lines)
+            # Parsear JSONL (JSON Lines): cada nodo de una conexión anidada viene en su
+            # propia línea con __parentId, después de la línea de su producto
             products = []
+            products_by_id = {}
             lines = content.strip().split("\n")
 
             for line_num, line in enumerate(lines, 1):
@@ -272,9 +321,14 @@ class ShopifyBulkOperations:
                 try:
                     data = json.loads(line)
 
-                    # Filtrar solo productos (no variantes u otros objetos)
-                    if data.get("__typename") == "Product":
+                    parent_id = data.pop("__parentId", None)
+                    if parent_id is None:
                         products.append(data)
+                        products_by_id[data.get("id")] = data
+                    elif parent_id in products_by_id:
+                        # La query de productos solo anida variantes
+                        parent = products_by_id[parent_id]
+                        parent.setdefault("variants", {"edges": []})["edges"].append({"node": data})
 
                 except json.JSONDecodeError as e:
                     self.error_aggregator.add_error(
@@ -363,7 +417,7 @@ class ShopifyBulkOperations:
         self, inventory_updates: List[Dict[str, Any]], chunk_size: int = 100
     ) -> Dict[str, Any]:
         """
-        Actualiza inventario en lote usando múltiples operaciones paralelas.
+        Actualiza inventario en lote con concurrencia adaptativa (AIMD).
 
         Args:
             inventory_updates: Lista de actualizaciones de inventario
@@ -381,15 +435,15 @@ class ShopifyBulkOperations:
             # Dividir en chunks
             chunks = [inventory_updates[i : i + chunk_size] for i in range(0, len(inventory_updates), chunk_size)]
 
-            # Procesar chunks en paralelo (con límite de concurrencia)
-            semaphore = asyncio.Semaphore(5)  # Máximo 5 chunks paralelos
-
-            async def process_chunk(chunk):
-                async with semaphore:
-                    return await self.shopify_client.batch_update_inventory(chunk)
-
-            # Ejecutar todos los chunks
-            chunk_results = await asyncio.gather(*[process_chunk(chunk) for chunk in chunks], return_exceptions=True)
+            # Los chunks se procesan en orden: dentro de cada uno, la concurrencia la regula la
+            # ventana AIMD compartida de batch_update_inventory (crece con holgura en el bucket de
+            # costo y se reduce a la mitad ante THROTTLED/429), en lugar de un semáforo fijo
+            chunk_results = []
+            for chunk in chunks:
+                try:
+                    chunk_results.append(await self.shopify_client.batch_update_inventory(chunk))
+                except Exception as e:
+                    chunk_results.append(e)
 
             # Consolidar resultados
             total_success = 0
@@ -417,6 +471,7 @@ class ShopifyBulkOperations:
                 "success_rate": (total_success / len(inventory_updates) * 100) if inventory_updates else 0,
                 "errors": total_errors[:10],  # Primeros 10 errores para logging
                 "error_summary": self.error_aggregator.get_summary(),
+                "concurrency": get_all_concurrency_status().get("inventory_updates"),
             }
 
             logger.info(
@@ -431,6 +486,280 @@ class ShopifyBulkOperations:
             logger.error(f"Bulk inventory update failed: {e}")
             raise
 
+    async def bulk_upsert_products(
+        self, product_inputs: List[Dict[str, Any]], timeout_minutes: int = 60
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Crea o actualiza productos con productSet usando bulkOperationRunMutation.
+
+        Los ProductSetInput se escriben como JSONL, se suben con stagedUploadsCreate y
+        Shopify ejecuta productSet una vez por línea sin consumir el rate limit de la API.
+        Si el archivo supera BULK_MUTATION_MAX_FILE_BYTES se ejecutan varias operaciones
+        en secuencia (Shopify permite una sola operación bulk de mutación a la vez).
+
+        Si una operación falla, los resultados de las anteriores se conservan. La operación
+        fallida se cancela y se espera a que termine; sus productos y los de los archivos
+        siguientes se devuelven con "unconfirmed" porque Shopify pudo haber escrito parte de ellos.
+
+        Args:
+            product_inputs: ProductSetInput de cada producto
+            timeout_minutes: Timeout para cada operación
+
+        Returns:
+            Tuple: (resultados en el orden de product_inputs, estadísticas). Cada resultado
+                tiene "product" (id, handle, variantes con inventoryItem) o None, "user_errors"
+                y, si se desconoce lo que pasó con el producto, "unconfirmed"
+        """
+        logger.info(f"Starting bulk productSet mutation for {len(product_inputs)} products")
+        start_time = datetime.now(timezone.utc)
+        results: List[Dict[str, Any]] = []
+        operation_ids = []
+        error = None
+
+        try:
+            await self.initialize()
+
+            for chunk in self._render_jsonl_chunks(product_inputs, BULK_MUTATION_MAX_FILE_BYTES):
+                operation_id = None
+                try:
+                    staged_upload_path = await self._stage_upload(chunk, "bulk_product_set.jsonl")
+                    operation_id = await self._start_bulk_mutation(PRODUCT_SET_BULK_MUTATION, staged_upload_path)
+                    operation_ids.append(operation_id)
+                    logger.info(f"Started bulk mutation: {operation_id} ({chunk.count(chr(10))} products)")
+
+                    operation_result = await self._wait_for_completion(operation_id, timeout_minutes * 60)
+                    content = await self._download_content(operation_result.get("url"))
+                    results.extend(self._parse_mutation_results(content, chunk.count("\n"), "productSet"))
+                except Exception as e:
+                    self.error_aggregator.add_error(e, {"operation_id": operation_id})
+                    logger.error(f"Bulk productSet mutation {operation_id or ''} failed: {e}")
+                    if operation_id:
+                        await self._cancel_bulk_operation(operation_id)
+                    error = str(e)
+                    pending = len(product_inputs) - len(results)
+                    results.extend({"product": None, "user_errors": [], "unconfirmed": True} for _ in range(pending))
+                    break
+
+            end_time = datetime.now(timezone.utc)
+            unconfirmed = sum(1 for result in results if result.get("unconfirmed"))
+            failed = sum(1 for result in results if not result["product"]) - unconfirmed
+            stats = {
+                "operation_ids": operation_ids,
+                "start_time": start_time.isoformat(),
+                "end_time": end_time.isoformat(),
+                "duration_seconds": (end_time - start_time).total_seconds(),
+                "total_products": len(product_inputs),
+                "successful": len(results) - failed - unconfirmed,
+                "failed": failed,
+                "unconfirmed": unconfirmed,
+                "error": error,
+            }
+
+            logger.info(
+                f"Bulk productSet mutation completed: {stats['successful']}/{len(product_inputs)} successful "
+                f"in {stats['duration_seconds']:.2f}s"
+            )
+            return results, stats
+
+        except Exception as e:
+            self.error_aggregator.add_error(e)
+            logger.error(f"Bulk productSet mutation failed: {e}")
+            raise
+
+    async def _cancel_bulk_operation(self, operation_id: str, timeout_seconds: int = 120) -> Optional[str]:
+        """
+        Cancela una operación bulk y espera a que deje de ejecutarse.
+
+        Args:
+            operation_id: ID de la operación
+            timeout_seconds: Tiempo máximo de espera
+
+        Returns:
+            Optional[str]: Estado final de la operación, o None si no se pudo confirmar
+        """
+        try:
+            await self.shopify_client._execute_query(CANCEL_BULK_OPERATION_MUTATION, {"id": operation_id})
+        except Exception as e:
+            logger.warning(f"Could not cancel bulk operation {operation_id}: {e}")
+
+        start_time = datetime.now(timezone.utc)
+        while True:
+            try:
+                result = await self.shopify_client._execute_query(
+                    BULK_OPERATION_STATUS_QUERY, {"id": operation_id}, use_retry=False
+                )
+                status = (result.get("node") or {}).get("status")
+                if status not in (BulkOperationStatus.CREATED, BulkOperationStatus.RUNNING, "CANCELING"):
+                    logger.info(f"Bulk operation {operation_id} stopped with status: {status}")
+                    return status
+            except Exception as e:
+                logger.warning(f"Error checking bulk operation status: {e}")
+
+            if (datetime.now(timezone.utc) - start_time).total_seconds() > timeout_seconds:
+                logger.warning(f"Bulk operation {operation_id} still running after cancel request")
+                return None
+            await asyncio.sleep(2)
+
+    @staticmethod
+    def _render_jsonl_chunks(inputs: List[Dict[str, Any]], max_bytes: int) -> List[str]:
+        """
+        Escribe cada input como una línea {"input": ...} y agrupa las líneas en archivos
+        de como máximo max_bytes.
+
+        Args:
+            inputs: Variables $input de la mutación, una por línea
+            max_bytes: Tamaño máximo de cada archivo
+
+        Returns:
+            List[str]: Contenido JSONL de cada archivo, con las líneas en el orden de inputs
+        """
+        chunks = []
+        lines: List[str] = []
+        size = 0
+        for item in inputs:
+            line = json.dumps({"input": item}, ensure_ascii=False) + "\n"
+            line_size = len(line.encode("utf-8"))
+            if lines and size + line_size > max_bytes:
+                chunks.append("".join(lines))
+                lines, size = [], 0
+            lines.append(line)
+            size += line_size
+        if lines:
+            chunks.append("".join(lines))
+        return chunks
+
+    async def _stage_upload(self, content: str, filename: str) -> str:
+        """
+        Sube un archivo JSONL de variables para una mutación bulk.
+
+        Args:
+            content: Contenido JSONL
+            filename: Nombre del archivo
+
+        Returns:
+            str: stagedUploadPath para bulkOperationRunMutation
+        """
+        result = await self.shopify_client._execute_query(
+            STAGED_UPLOADS_CREATE_MUTATION,
+            {
+                "input": [
+                    {
+                        "resource": "BULK_MUTATION_VARIABLES",
+                        "filename": filename,
+                        "mimeType": "text/jsonl",
+                        "httpMethod": "POST",
+                    }
+                ]
+            },
+        )
+        staged = result.get("stagedUploadsCreate", {})
+        user_errors = staged.get("userErrors", [])
+        targets = staged.get("stagedTargets") or []
+        if user_errors or not targets:
+            raise AppException(
+                message=f"Failed to create staged upload: {', '.join(e['message'] for e in user_errors)}",
+                details={"user_errors": user_errors},
+            )
+
+        target = targets[0]
+        parameters = {parameter["name"]: parameter["value"] for parameter in target.get("parameters", [])}
+        form = aiohttp.FormData()
+        for name, value in parameters.items():
+            form.add_field(name, value)
+        form.add_field("file", content.encode("utf-8"), filename=filename, content_type="text/jsonl")
+
+        async with aiohttp.ClientSession() as session:
+            async with session.post(target["url"], data=form) as response:
+                if response.status not in (200, 201, 204):
+                    raise AppException(
+                        message=f"Failed to upload bulk mutation variables: HTTP {response.status}",
+                        details={"status": response.status, "body": (await response.text())[:500]},
+                    )
+
+        return parameters.get("key") or urlparse(target.get("resourceUrl") or "").path.lstrip("/")
+
+    async def _start_bulk_mutation(self, mutation: str, staged_upload_path: str) -> str:
+        """
+        Inicia una operación bulk de mutación.
+
+        Args:
+            mutation: Mutación GraphQL a ejecutar por cada línea del archivo
+            staged_upload_path: Ruta del archivo de variables subido
+
+        Returns:
+            str: ID de la operación
+        """
+        result = await self.shopify_client._execute_query(
+            BULK_OPERATION_RUN_MUTATION, {"mutation": mutation, "stagedUploadPath": staged_upload_path}
+        )
+        bulk_operation = result.get("bulkOperationRunMutation", {})
+        user_errors = bulk_operation.get("userErrors", [])
+        if user_errors:
+            raise AppException(
+                message=f"Failed to start bulk mutation: {', '.join(e['message'] for e in user_errors)}",
+                details={"user_errors": user_errors},
+            )
+
+        operation_id = (bulk_operation.get("bulkOperation") or {}).get("id")
+        if not operation_id:
+            raise AppException(
+                message="No operation ID returned from bulk mutation", details={"response": bulk_operation}
+            )
+        return operation_id
+
+    async def _download_content(self, download_url: Optional[str]) -> str:
+        """
+        Descarga el archivo de resultados de una operación bulk.
+
+        Args:
+            download_url: URL de resultados (None si la operación no produjo resultados)
+
+        Returns:
+            str: Contenido JSONL
+        """
+        if not download_url:
+            return ""
+        async with aiohttp.ClientSession() as session:
+            async with session.get(download_url) as response:
+                if response.status != 200:
+                    raise AppException(
+                        message=f"Failed to download bulk results: HTTP {response.status}",
+                        details={"download_url": download_url, "status": response.status},
+                    )
+                return await response.text()
+
+    @staticmethod
+    def _parse_mutation_results(content: str, line_count: int, mutation_field: str) -> List[Dict[str, Any]]:
+        """
+        Asocia cada línea del resultado de una mutación bulk con su línea de entrada.
+
+        Args:
+            content: JSONL de resultados (cada línea trae __lineNumber, base 0)
+            line_count: Cantidad de líneas del archivo de entrada
+            mutation_field: Campo raíz de la mutación (ej. "productSet")
+
+        Returns:
+            List[Dict]: Un resultado por línea de entrada con "product" y "user_errors"
+        """
+        results: List[Dict[str, Any]] = [
+            {"product": None, "user_errors": [{"message": "No result returned by bulk mutation"}]}
+            for _ in range(line_count)
+        ]
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            line_number = data.get("__lineNumber")
+            if not isinstance(line_number, int) or not 0 <= line_number < line_count:
+                continue
+
+            payload = (data.get("data") or {}).get(mutation_field) or {}
+            user_errors = list(payload.get("userErrors") or [])
+            user_errors.extend({"message": error.get("message", str(error))} for error in data.get("errors") or [])
+            product = payload.get("product")
+            results[line_number] = {"product": product if not user_errors else None, "user_errors": user_errors}
+        return results
+
     async def export_products_to_csv(
         self, file_path: str, fields: Optional[List[str]] = None, include_variants: bool = True
     ) -> Dict[str, Any]:
@@ -0,0 +1,724 @@
+"""
+Espejo local del catálogo de Shopify.
+
+Guarda en SQLite (archivo local, sin dependencias externas) lo que la
+sincronización necesita consultar una y otra vez sobre los productos de
+Shopify: handle, CCOD, tags, estado, variantes, SKUs, inventory items y
+cantidades. Así el chequeo de existencia, el reverse stock sync y el índice de
+SKUs del fast lane leen de disco en vez de paginar la API.
+
+El espejo se mantiene al día por tres vías:
+- Carga completa con la operación bulk de productos (seed y reconciliación periódica)
+- Escrituras propias: lo que la sincronización crea o actualiza se registra al terminar
+- Webhooks de productos e inventario (cambios hechos fuera de la sincronización)
+
+Los consumidores solo confían en el espejo si la última carga completa es más
+reciente que CATALOG_MIRROR_MAX_AGE_MINUTES; si no, consultan la API como antes.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.utils.id_utils import rest_to_graphql_id
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id TEXT PRIMARY KEY,
+    handle TEXT,
+    ccod TEXT,
+    title TEXT,
+    status TEXT,
+    vendor TEXT,
+    tags TEXT NOT NULL DEFAULT '[]',
+    updated_at TEXT,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS variants (
+    product_id TEXT NOT NULL,
+    sku_key TEXT NOT NULL,
+    sku TEXT,
+    variant_id TEXT,
+    inventory_item_id TEXT,
+    price TEXT,
+    compare_at_price TEXT,
+    available INTEGER,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (product_id, sku_key)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_products_handle ON products(handle);
+CREATE INDEX IF NOT EXISTS idx_products_ccod ON products(ccod);
+CREATE INDEX IF NOT EXISTS idx_variants_sku_key ON variants(sku_key);
+CREATE INDEX IF NOT EXISTS idx_variants_inventory_item ON variants(inventory_item_id);
+"""
+
+# Máximo de parámetros por consulta IN (...) (límite conservador de SQLite)
+MAX_SQL_PARAMS = 500
+
+
+def _edges(connection: Any) -> List[Dict[str, Any]]:
+    """Nodos de una conexión GraphQL ({"edges": [...]} o {"nodes": [...]}) o de una lista simple."""
+    if isinstance(connection, dict):
+        if "nodes" in connection:
+            return list(connection["nodes"] or [])
+        return [edge.get("node", edge) for edge in connection.get("edges", [])]
+    return list(connection or [])
+
+
+def _ccod_from_product(tags: Iterable[str], metafields: Iterable[Dict[str, Any]]) -> Optional[str]:
+    """CCOD desde el metafield rms/custom.ccod o, si no está, desde el tag ccod_*."""
+    for metafield in metafields:
+        if (
+            metafield.get("key") == "ccod"
+            and metafield.get("namespace") in ("rms", "custom")
+            and metafield.get("value")
+        ):
+            return str(metafield["value"])
+    for tag in tags:
+        if tag.lower().startswith("ccod_"):
+            return tag[5:].upper()
+    return None
+
+
+def _sku_key(sku: Optional[str], variant_id: Optional[str]) -> str:
+    """Clave de variante: SKU en minúsculas (como el resto de los cruces con RMS)."""
+    return sku.lower() if sku else f"#{variant_id}"
+
+
+def normalize_graphql_product(product: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convierte un producto de GraphQL (consulta normal o línea bulk ya ensamblada) al formato del espejo.
+
+    Args:
+        product: Producto con id, handle, tags, variants y opcionalmente metafield(s)
+
+    Returns:
+        Dict: Producto normalizado con lista "variants"
+    """
+    tags = product.get("tags") or []
+    metafields = _edges(product.get("metafields"))
+    if product.get("metafield"):
+        metafields.append({"namespace": "rms", "key": "ccod", **product["metafield"]})
+
+    variants = []
+    for variant in _edges(product.get("variants")):
+        variants.append(
+            {
+                "variant_id": variant.get("id"),
+                "sku": variant.get("sku"),
+                "inventory_item_id": (variant.get("inventoryItem") or {}).get("id"),
+                "price": variant.get("price"),
+                "compare_at_price": variant.get("compareAtPrice"),
+                "available": variant.get("inventoryQuantity"),
+            }
+        )
+
+    return {
+        "product_id": product["id"],
+        "handle": product.get("handle"),
+        "ccod": _ccod_from_product(tags, metafields),
+        "title": product.get("title"),
+        "status": product.get("status"),
+        "vendor": product.get("vendor"),
+        "tags": list(tags),
+        "updated_at": product.get("updatedAt"),
+        "variants": variants,
+    }
+
+
+def normalize_webhook_product(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convierte el payload REST de los webhooks products/create y products/update al formato del espejo.
+
+    Args:
+        payload: Payload del webhook
+
+    Returns:
+        Dict: Producto normalizado con lista "variants"
+    """
+    tags = payload.get("tags") or []
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+
+    variants = []
+    for variant in payload.get("variants") or []:
+        inventory_item_id = variant.get("inventory_item_id")
+        variants.append(
+            {
+                "variant_id": variant.get("admin_graphql_api_id")
+                or rest_to_graphql_id(str(variant.get("id") or ""), "ProductVariant")
+                or None,
+                "sku": variant.get("sku"),
+                "inventory_item_id": (
+                    rest_to_graphql_id(str(inventory_item_id), "InventoryItem") if inventory_item_id else None
+                ),
+                "price": variant.get("price"),
+                "compare_at_price": variant.get("compare_at_price"),
+                "available": variant.get("inventory_quantity"),
+            }
+        )
+
+    return {
+        "product_id": payload.get("admin_graphql_api_id") or rest_to_graphql_id(str(payload["id"]), "Product"),
+        "handle": payload.get("handle"),
+        "ccod": _ccod_from_product(tags, []),
+        "title": payload.get("title"),
+        "status": (payload.get("status") or "").upper() or None,
+        "vendor": payload.get("vendor"),
+        "tags": tags,
+        "updated_at": payload.get("updated_at"),
+        "variants": variants,
+    }
+
+
+def normalize_product_input(
+    product_id: str, shopify_input: Any, written_products: Iterable[Optional[Dict[str, Any]]] = ()
+) -> Dict[str, Any]:
+    """
+    Convierte un ShopifyProductInput escrito con éxito al formato del espejo.
+
+    El input no trae IDs de Shopify: se toman por SKU de los productos devueltos por
+    la escritura (o del snapshot previo) y, para los SKUs que no aparecen ahí, se
+    conservan los IDs que el espejo ya tenía.
+
+    Args:
+        product_id: ID del producto en Shopify
+        shopify_input: Producto escrito
+        written_products: Productos de Shopify con variantes (id, sku, inventoryItem),
+            ej. la respuesta de productSet y el snapshot usado para planificar
+
+    Returns:
+        Dict: Producto normalizado con lista "variants"
+    """
+    known_ids: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    for written in written_products:
+        for variant in _edges((written or {}).get("variants")):
+            if variant.get("sku") and variant.get("id"):
+                known_ids[variant["sku"].lower()] = (variant["id"], (variant.get("inventoryItem") or {}).get("id"))
+
+    tags = list(shopify_input.tags or [])
+    status = shopify_input.status
+    variants = []
+    for variant in shopify_input.variants or []:
+        quantities = variant.inventoryQuantities or []
+        variant_id, inventory_item_id = known_ids.get((variant.sku or "").lower(), (None, None))
+        variants.append(
+            {
+                "variant_id": variant_id,
+                "sku": variant.sku,
+                "inventory_item_id": inventory_item_id,
+                "price": variant.price,
+                "compare_at_price": variant.compareAtPrice,
+                "available": sum(int(quantity.get("availableQuantity", 0)) for quantity in quantities),
+            }
+        )
+
+    return {
+        "product_id": product_id,
+        "handle": shopify_input.handle,
+        "ccod": _ccod_from_product(tags, shopify_input.metafields or []),
+        "title": shopify_input.title,
+        "status": getattr(status, "value", status),
+        "vendor": shopify_input.vendor,
+        "tags": tags,
+        "updated_at": None,
+        "variants": variants,
+        # El input puede no incluir todas las variantes que existen en Shopify
+        "partial_variants": True,
+    }
+
+
+class CatalogMirror:
+    """
+    Espejo del catálogo de Shopify en SQLite.
+    """
+
+    def __init__(self, file_path: Optional[Path] = None, max_age_minutes: Optional[float] = None):
+        """
+        Inicializa el espejo.
+
+        Args:
+            file_path: Archivo SQLite (default: CATALOG_MIRROR_PATH)
+            max_age_minutes: Antigüedad máxima de la última carga completa para confiar
+                en el espejo (default: CATALOG_MIRROR_MAX_AGE_MINUTES)
+        """
+        self.file_path = Path(file_path or settings.CATALOG_MIRROR_PATH)
+        self.max_age_minutes = (
+            max_age_minutes if max_age_minutes is not None else settings.CATALOG_MIRROR_MAX_AGE_MINUTES
+        )
+        self._conn: Optional[sqlite3.Connection] = None
+        # Las operaciones corren en hilos (asyncio.to_thread) sobre una sola conexión
+        self._lock = threading.Lock()
+
+    async def initialize(self) -> None:
+        """Abre el archivo SQLite y crea las tablas e índices si no existen."""
+        if self._conn is not None:
+            return
+        await asyncio.to_thread(self._open)
+        status = await self.get_status()
+        logger.info(
+            f"🪞 Catalog mirror initialized ({status['products']} products, {status['variants']} variants, "
+            f"fresh: {status['fresh']})"
+        )
+
+    def _open(self) -> None:
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.file_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        self._conn = conn
+
+    async def close(self) -> None:
+        """Cierra la conexión con SQLite."""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await asyncio.to_thread(conn.close)
+
+    async def _run(self, func, *args):
+        """Ejecuta una operación sincrónica de SQLite en un hilo, serializada por el lock."""
+
+        def locked():
+            with self._lock:
+                return func(self._conn, *args)
+
+        return await asyncio.to_thread(locked)
+
+    # --- Escritura ---
+
+    async def replace_all(self, products: List[Dict[str, Any]], started_at: Optional[float] = None) -> int:
+        """
+        Reemplaza el espejo completo con el resultado de la operación bulk de productos.
+
+        La exportación refleja el catálogo del momento en que empezó: los productos y
+        cantidades que escrituras propias o webhooks registraron después se conservan
+        en lugar de pisarse con datos más viejos (o perderse si el producto es nuevo).
+
+        Args:
+            products: Productos de ShopifyBulkOperations.extract_all_products_bulk
+            started_at: Momento (epoch) en que empezó la exportación (None = reemplazar todo)
+
+        Returns:
+            int: Productos cargados desde la exportación
+        """
+        rows = [normalize_graphql_product(product) for product in products]
+        cutoff = started_at if started_at is not None else float("inf")
+
+        def replace(conn):
+            with conn:
+                newer = conn.execute(
+                    "SELECT product_id, handle FROM products WHERE synced_at > ?", (cutoff,)
+                ).fetchall()
+                newer_ids = {record["product_id"] for record in newer}
+                newer_handles = {record["handle"] for record in newer if record["handle"]}
+                newer_available = [
+                    (record["available"], record["inventory_item_id"])
+                    for record in conn.execute(
+                        "SELECT inventory_item_id, available FROM variants "
+                        "WHERE synced_at > ? AND inventory_item_id IS NOT NULL",
+                        (cutoff,),
+                    )
+                ]
+
+                conn.execute(
+                    "DELETE FROM variants WHERE product_id NOT IN "
+                    "(SELECT product_id FROM products WHERE synced_at > ?)",
+                    (cutoff,),
+                )
+                conn.execute("DELETE FROM products WHERE synced_at <= ?", (cutoff,))
+                now = time.time()
+                loaded = 0
+                for row in rows:
+                    if row["product_id"] in newer_ids or row.get("handle") in newer_handles:
+                        continue
+                    self._write_product(conn, row, now, keep_ids=False)
+                    loaded += 1
+                conn.executemany("UPDATE variants SET available = ? WHERE inventory_item_id = ?", newer_available)
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_full_sync_at', ?)", (str(now),))
+            return loaded, len(newer_ids)
+
+        count, kept = await self._run(replace)
+        logger.info(f"🪞 Catalog mirror reloaded with {count} products ({kept} newer local products kept)")
+        return count
+
+    async def upsert_products(self, products: List[Dict[str, Any]]) -> None:
+        """
+        Inserta o reemplaza productos ya normalizados (ver normalize_*).
+
+        Args:
+            products: Productos normalizados
+        """
+        if not products:
+            return
+
+        def upsert(conn):
+            with conn:
+                now = time.time()
+                for row in products:
+                    self._write_product(conn, row, now, keep_ids=True)
+
+        await self._run(upsert)
+
+    @staticmethod
+    def _write_product(conn: sqlite3.Connection, row: Dict[str, Any], now: float, keep_ids: bool) -> None:
+        """
+        Escribe un producto y reemplaza sus variantes.
+
+        Con keep_ids se conservan los IDs de variante e inventory item ya conocidos
+        para los SKUs que llegan sin ellos (escrituras propias), y el CCOD si el
+        origen no lo trae (webhooks sin metafields). Con "partial_variants" las
+        variantes que no vienen en el producto se mantienen.
+        """
+        product_id = row["product_id"]
+        known = {}
+        known_ccod = None
+        if keep_ids:
+            known = {
+                record["sku_key"]: (record["variant_id"], record["inventory_item_id"])
+                for record in conn.execute(
+                    "SELECT sku_key, variant_id, inventory_item_id FROM variants WHERE product_id = ?", (product_id,)
+                )
+            }
+            existing = conn.execute("SELECT ccod FROM products WHERE product_id = ?", (product_id,)).fetchone()
+            known_ccod = existing["ccod"] if existing else None
+
+        # Un handle pertenece a un solo producto (ej. producto eliminado y recreado)
+        if row.get("handle"):
+            stale = [
+                record["product_id"]
+                for record in conn.execute(
+                    "SELECT product_id FROM products WHERE handle = ? AND product_id != ?", (row["handle"], product_id)
+                )
+            ]
+            for stale_id in stale:
+                conn.execute("DELETE FROM variants WHERE product_id = ?", (stale_id,))
+                conn.execute("DELETE FROM products WHERE product_id = ?", (stale_id,))
+
+        conn.execute(
+            "INSERT OR REPLACE INTO products "
+            "(product_id, handle, ccod, title, status, vendor, tags, updated_at, synced_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                product_id,
+                row.get("handle"),
+                row.get("ccod") or known_ccod,
+                row.get("title"),
+                row.get("status"),
+                row.get("vendor"),
+                json.dumps(row.get("tags") or []),
+                row.get("updated_at"),
+                now,
+            ),
+        )
+        if not row.get("partial_variants"):
+            conn.execute("DELETE FROM variants WHERE product_id = ?", (product_id,))
+        for variant in row.get("variants") or []:
+            sku_key = _sku_key(variant.get("sku"), variant.get("variant_id"))
+            known_variant_id, known_item_id = known.get(sku_key, (None, None))
+            available = variant.get("available")
+            conn.execute(
+                "INSERT OR REPLACE INTO variants "
+                "(product_id, sku_key, sku, variant_id, inventory_item_id, price, compare_at_price, available, "
+                "synced_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    product_id,
+                    sku_key,
+                    variant.get("sku"),
+                    variant.get("variant_id") or known_variant_id,
+                    variant.get("inventory_item_id") or known_item_id,
+                    None if variant.get("price") is None else str(variant["price"]),
+                    None if variant.get("compare_at_price") is None else str(variant["compare_at_price"]),
+                    None if available is None else int(available),
+                    now,
+                ),
+            )
+
+    async def record_written_product(
+        self, product_id: str, shopify_input: Any, written_products: Iterable[Optional[Dict[str, Any]]] = ()
+    ) -> None:
+        """
+        Registra un producto que la sincronización acaba de crear o actualizar.
+
+        Args:
+            product_id: ID del producto en Shopify
+            shopify_input: ShopifyProductInput escrito
+            written_products: Productos de Shopify de los que tomar los IDs de variante
+                (respuesta de la escritura, snapshot previo)
+        """
+        await self.upsert_products([normalize_product_input(product_id, shopify_input, written_products)])
+
+    async def delete_product(self, product_id: str) -> None:
+        """
+        Elimina un producto y sus variantes.
+
+        Args:
+            product_id: ID GraphQL del producto
+        """
+
+        def delete(conn):
+            with conn:
+                conn.execute("DELETE FROM variants WHERE product_id = ?", (product_id,))
+                conn.execute("DELETE FROM products WHERE product_id = ?", (product_id,))
+
+        await self._run(delete)
+
+    async def delete_variants(self, product_id: str, skus: Iterable[str]) -> None:
+        """
+        Elimina variantes de un producto por SKU.
+
+        Args:
+            product_id: ID GraphQL del producto
+            skus: SKUs eliminados
+        """
+        keys = [sku.lower() for sku in skus if sku]
+        if not keys:
+            return
+
+        def delete(conn):
+            with conn:
+                conn.executemany(
+                    "DELETE FROM variants WHERE product_id = ? AND sku_key = ?", [(product_id, key) for key in keys]
+                )
+
+        await self._run(delete)
+
+    async def set_available(self, quantities: Dict[str, int]) -> None:
+        """
+        Actualiza cantidades disponibles por inventory item.
+
+        Args:
+            quantities: inventory_item_id (GraphQL) -> cantidad
+        """
+        if not quantities:
+            return
+
+        def update(conn):
+            now = time.time()
+            with conn:
+                conn.executemany(
+                    "UPDATE variants SET available = ?, synced_at = ? WHERE inventory_item_id = ?",
+                    [(int(quantity), now, item_id) for item_id, quantity in quantities.items()],
+                )
+
+        await self._run(update)
+
+    # --- Lectura ---
+
+    def is_fresh(self, last_full_sync_at: Optional[float]) -> bool:
+        """Si la última carga completa está dentro de max_age_minutes."""
+        if last_full_sync_at is None:
+            return False
+        if not self.max_age_minutes:
+            return True
+        return time.time() - last_full_sync_at <= self.max_age_minutes * 60
+
+    async def last_full_sync_at(self) -> Optional[float]:
+        """
+        Momento (epoch) de la última carga completa.
+
+        Returns:
+            Optional[float]: None si el espejo nunca se cargó
+        """
+
+        def read(conn):
+            row = conn.execute("SELECT value FROM meta WHERE key = 'last_full_sync_at'").fetchone()
+            return float(row["value"]) if row else None
+
+        return await self._run(read)
+
+    async def is_usable(self) -> bool:
+        """
+        Indica si los consumidores pueden leer del espejo en vez de la API.
+
+        Returns:
+            bool: True si está abierto y la última carga completa no está vencida
+        """
+        if self._conn is None:
+            return False
+        return self.is_fresh(await self.last_full_sync_at())
+
+    async def get_sku_index(self) -> Dict[str, str]:
+        """
+        Índice SKU (minúsculas) -> inventory item, como get_inventory_item_sku_index del cliente.
+
+        Returns:
+            Dict: sku_key -> inventory_item_id
+        """
+
+        def read(conn):
+            return {
+                record["sku_key"]: record["inventory_item_id"]
+                for record in conn.execute(
+                    "SELECT sku_key, inventory_item_id FROM variants "
+                    "WHERE sku IS NOT NULL AND inventory_item_id IS NOT NULL"
+                )
+            }
+
+        return await self._run(read)
+
+    async def get_products(
+        self,
+        limit: Optional[int] = None,
+        status: Optional[str] = None,
+        after_product_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Productos del espejo, con la misma forma que PRODUCTS_WITHOUT_TAG_QUERY
+        (metafield del CCOD y variantes con cantidad e inventory item), ordenados por ID.
+
+        Las variantes cuyo ID o inventory item aún no se conoce (escritas sin que la
+        respuesta los trajera y sin webhook posterior) se omiten: no se puede escribir
+        sobre ellas hasta que un webhook o la próxima carga completa los complete.
+
+        Args:
+            limit: Máximo de productos (None = todos)
+            status: Solo productos con este estado (ej. "ACTIVE"; None = todos)
+            after_product_id: Devolver solo productos con ID posterior (paginación por clave)
+
+        Returns:
+            List[Dict]: Productos en formato GraphQL
+        """
+
+        def read(conn):
+            products = []
+            for record in conn.execute(
+                "SELECT product_id, handle, title, ccod FROM products "
+                "WHERE (? IS NULL OR status = ?) AND (? IS NULL OR product_id > ?) "
+                "ORDER BY product_id LIMIT ?",
+                (status, status, after_product_id, after_product_id, limit or -1),
+            ):
+                products.append(
+                    {
+                        "id": record["product_id"],
+                        "handle": record["handle"],
+                        "title": record["title"],
+                        "metafields": {
+                            "edges": (
+                                [{"node": {"namespace": "rms", "key": "ccod", "value": record["ccod"]}}]
+                                if record["ccod"]
+                                else []
+                            )
+                        },
+                        "variants": {"edges": []},
+                    }
+                )
+
+            by_id = {product["id"]: product for product in products}
+            ids = list(by_id)
+            for i in range(0, len(ids), MAX_SQL_PARAMS):
+                chunk = ids[i : i + MAX_SQL_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                for record in conn.execute(
+                    "SELECT product_id, variant_id, sku, available, inventory_item_id FROM variants "
+                    f"WHERE product_id IN ({placeholders}) "
+                    "AND variant_id IS NOT NULL AND inventory_item_id IS NOT NULL "
+                    "ORDER BY product_id, sku_key",
+                    chunk,
+                ):
+                    by_id[record["product_id"]]["variants"]["edges"].append(
+                        {
+                            "node": {
+                                "id": record["variant_id"],
+                                "sku": record["sku"],
+                                "inventoryQuantity": record["available"] or 0,
+                                "inventoryItem": {"id": record["inventory_item_id"]},
+                            }
+                        }
+                    )
+            return products
+
+        return await self._run(read)
+
+    async def get_status(self) -> Dict[str, Any]:
+        """
+        Estado del espejo para monitoreo.
+
+        Returns:
+            Dict: Tamaño, antigüedad de la última carga completa y si está vigente
+        """
+
+        def read(conn):
+            products = conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+            variants = conn.execute("SELECT COUNT(*) FROM variants").fetchone()[0]
+            return products, variants
+
+        products, variants = await self._run(read)
+        last_full_sync_at = await self.last_full_sync_at()
+        return {
+            "path": str(self.file_path),
+            "products": products,
+            "variants": variants,
+            "last_full_sync_at": last_full_sync_at,
+            "age_minutes": round((time.time() - last_full_sync_at) / 60, 1) if last_full_sync_at else None,
+            "fresh": self.is_fresh(last_full_sync_at),
+        }
+
+
+async def reconcile_catalog_mirror(mirror: CatalogMirror, shopify_client=None) -> Dict[str, Any]:
+    """
+    Recarga el espejo completo con la operación bulk de productos.
+
+    Args:
+        mirror: Espejo inicializado
+        shopify_client: Cliente GraphQL de Shopify (opcional)
+
+    Returns:
+        Dict: Estadísticas de la operación bulk y productos cargados
+    """
+    from app.services.bulk_operations import ShopifyBulkOperations
+
+    bulk_operations = ShopifyBulkOperations(shopify_client)
+    started_at = time.time()
+    products, stats = await bulk_operations.extract_all_products_bulk()
+    stats["mirrored_products"] = await mirror.replace_all(products, started_at=started_at)
+    return stats
+
+
+_catalog_mirror: Optional[CatalogMirror] = None
+
+
+async def get_catalog_mirror() -> Optional[CatalogMirror]:
+    """
+    Obtiene la instancia singleton del espejo.
+
+    Returns:
+        Optional[CatalogMirror]: Espejo inicializado, o None si CATALOG_MIRROR_ENABLED=false
+            o no se pudo abrir el archivo
+    """
+    global _catalog_mirror
+
+    if not settings.CATALOG_MIRROR_ENABLED:
+        return None
+
+    if _catalog_mirror is None:
+        mirror = CatalogMirror()
+        try:
+            await mirror.initialize()
+        except Exception as e:
+            logger.warning(f"⚠️ Catalog mirror not available: {e}")
+            return None
+        _catalog_mirror = mirror
+
+    return _catalog_mirror
+
+
+async def close_catalog_mirror() -> None:
+    """Cierra la instancia singleton del espejo."""
+    global _catalog_mirror
+
+    if _catalog_mirror is not None:
+        await _catalog_mirror.close()
+        _catalog_mirror = None
@@ -8,7 +8,6 @@ los formatos de RMS y Shopify GraphQL API.
 import json
 import logging
 import re
-from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -392,7 +391,7 @@ class RMSToShopifyMapper:
     def _generate_tags(rms_item: RMSViewItem) -> List[str]:
         """
         Genera tags mínimos esenciales para el producto.
-        Solo: CCOD y fecha de sincronización.
+        Solo: CCOD (la última sincronización se registra en el ledger, no en tags).
 
         Args:
             rms_item: Item RMS
@@ -402,47 +401,38 @@ class RMSToShopifyMapper:
         """
         tags = []
 
-        # Tag 1: CCOD del producto
+        # CCOD del producto
         if rms_item.ccod:
             normalized_ccod = rms_item.ccod.strip().upper()
             tags.append(f"ccod_{normalized_ccod}")
 
-        # Tag 2: RMS-SYNC con fecha (formato YY-MM-DD)
-        sync_date = datetime.now(UTC).strftime("%y-%m-%d")
-        tags.append(f"RMS-SYNC-{sync_date}")
-
         return tags
 
     @staticmethod
-    def clean_rms_sync_tags(existing_tags: list[str], new_sync_tag: str) -> list[str]:
+    def clean_rms_sync_tags(existing_tags: list[str]) -> list[str]:
         """
-        Limpia tags RMS-Sync antiguos y mantiene solo el más reciente.
+        Elimina los tags RMS-Sync con fecha que dejaban versiones anteriores de la sincronización.
 
-        Elimina TODOS los tags que empiecen con "RMS-SYNC" (case-insensitive) y agrega el nuevo tag.
+        Elimina TODOS los tags que empiecen con "RMS-SYNC" (case-insensitive).
         Preserva todos los demás tags (ccod_, categoría, género, etc.).
 
         Elimina variantes como: RMS-SYNC-*, RMS-Sync, RMS-sync, rms-sync, etc.
 
         Args:
             existing_tags: Lista de tags actuales del producto en Shopify
-            new_sync_tag: Nuevo tag de sincronización a agregar (formato: RMS-SYNC-YY-MM-DD)
 
         Returns:
-            list[str]: Lista de tags limpia con solo el nuevo tag RMS-Sync
+            list[str]: Lista de tags sin tags RMS-Sync
 
         Example:
             >>> existing = ["ccod_24X104", "RMS-SYNC-25-01-20", "RMS-Sync", "Mujer"]
-            >>> new_tag = "RMS-SYNC-25-01-23"
-            >>> clean_rms_sync_tags(existing, new_tag)
-            ["ccod_24X104", "Mujer", "RMS-SYNC-25-01-23"]
+            >>> clean_rms_sync_tags(existing)
+            ["ccod_24X104", "Mujer"]
         """
         # Filtrar tags antiguos de RMS-Sync (case-insensitive para capturar todas las variantes)
         # Elimina: RMS-SYNC-*, RMS-Sync, RMS-sync, rms-sync, etc.
         cleaned_tags = [tag for tag in existing_tags if not tag.upper().startswith("RMS-SYNC")]
 
-        # Agregar el nuevo tag de sincronización
-        cleaned_tags.append(new_sync_tag)
-
         logger.debug(f"🏷️ Cleaned RMS-Sync tags: {len(existing_tags)} → {len(cleaned_tags)} tags")
         return cleaned_tags
 
@@ -0,0 +1,257 @@
+"""
+Inventory fast lane: high-frequency RMS → Shopify stock propagation.
+
+A stock change used to reach Shopify only through the full product pipeline
+(mapping, handle lookup, product update, variants, metafields, inventory),
+which runs every ``SYNC_INTERVAL_MINUTES``. The fast lane is a separate, much
+cheaper loop driven by the scheduler every minute:
+
+1. Read ``ItemID, C_ARTICULO, Quantity`` for the whole catalog from View_Items
+2. Compare with the previous snapshot and keep only the items whose quantity changed
+3. Resolve each SKU to its inventory item through a cached SKU → inventoryItemId index
+4. Push only those quantities with batched ``inventorySetQuantities`` calls
+
+The first cycle after a restart only seeds the snapshot; the full sync remains
+responsible for products, variants and the initial inventory.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Refresh the SKU index early when unknown SKUs appear, but not more often than this
+INDEX_MISS_REFRESH_SECONDS = 300
+
+
+def compute_quantity_deltas(
+    previous: Dict[int, Tuple[str, int]], current: Dict[int, Tuple[str, int]]
+) -> List[Dict[str, Any]]:
+    """
+    Compare two View_Items quantity snapshots.
+
+    Args:
+        previous: ItemID -> (SKU, quantity) from the last cycle
+        current: ItemID -> (SKU, quantity) read now
+
+    Returns:
+        List[Dict]: Changed items as {"item_id", "sku", "quantity", "delta"}; items that
+            are new in the snapshot or changed SKU are reported with their full quantity
+    """
+    changes = []
+    for item_id, (sku, quantity) in current.items():
+        old = previous.get(item_id)
+        if old is None or old[0] != sku:
+            changes.append({"item_id": item_id, "sku": sku, "quantity": quantity, "delta": quantity})
+        elif old[1] != quantity:
+            changes.append({"item_id": item_id, "sku": sku, "quantity": quantity, "delta": quantity - old[1]})
+    return changes
+
+
+class InventoryFastLane:
+    """
+    Pushes RMS quantity deltas to Shopify on a short cadence.
+    """
+
+    def __init__(
+        self,
+        shopify_client,
+        product_repository,
+        location_id: str,
+        index_ttl_seconds: Optional[float] = None,
+        catalog_mirror=None,
+    ):
+        """
+        Initialize the fast lane.
+
+        Args:
+            shopify_client: Shopify GraphQL client (must expose write_inventory_batch
+                and get_inventory_item_sku_index)
+            product_repository: RMS ProductRepository
+            location_id: Shopify location where quantities are set
+            index_ttl_seconds: Maximum age of the SKU index (default: INVENTORY_FAST_LANE_INDEX_TTL_MINUTES)
+            catalog_mirror: Local catalog mirror; when fresh, the SKU index is read from it
+                instead of paginating Shopify
+        """
+        self.shopify_client = shopify_client
+        self.product_repository = product_repository
+        self.location_id = location_id
+        self.catalog_mirror = catalog_mirror
+        self.index_ttl_seconds = (
+            index_ttl_seconds if index_ttl_seconds is not None else settings.INVENTORY_FAST_LANE_INDEX_TTL_MINUTES * 60
+        )
+
+        self._snapshot: Dict[int, Tuple[str, int]] = {}
+        self._sku_index: Dict[str, str] = {}
+        self._index_loaded_at: Optional[float] = None
+
+        self.stats: Dict[str, Any] = {
+            "cycles": 0,
+            "changes_detected": 0,
+            "items_pushed": 0,
+            "push_failures": 0,
+            "unknown_skus": 0,
+            "index_refreshes": 0,
+            "last_cycle_seconds": None,
+        }
+
+    async def _ensure_sku_index(self, has_misses: bool = False) -> None:
+        """Load or refresh the SKU → inventory item index when it is stale."""
+        if self._index_loaded_at is not None:
+            age = time.monotonic() - self._index_loaded_at
+            if age <= self.index_ttl_seconds and not (has_misses and age > INDEX_MISS_REFRESH_SECONDS):
+                return
+
+        if self.catalog_mirror and await self.catalog_mirror.is_usable():
+            self._sku_index = await self.catalog_mirror.get_sku_index()
+        else:
+            self._sku_index = await self.shopify_client.get_inventory_item_sku_index()
+        self._index_loaded_at = time.monotonic()
+        self.stats["index_refreshes"] += 1
+
+    async def run_cycle(self, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Run one fast-lane cycle.
+
+        Args:
+            dry_run: If True, compute the changes without writing to Shopify
+
+        Returns:
+            Dict: Cycle summary (changes, pushed, failed and unknown SKUs)
+        """
+        started = time.monotonic()
+        rows = await self.product_repository.get_item_quantities()
+        # Negative RMS stock is published as 0, like every other RMS → Shopify path
+        current = {item_id: (sku, max(0, quantity)) for item_id, sku, quantity in rows}
+
+        if not self._snapshot:
+            self._snapshot = current
+            logger.info(f"⚡ Inventory fast lane snapshot seeded with {len(current)} items")
+            return {"seeded": True, "items": len(current)}
+
+        changes = compute_quantity_deltas(self._snapshot, current)
+        summary: Dict[str, Any] = {"items": len(current), "changes": len(changes), "pushed": 0, "failed": []}
+
+        if changes:
+            await self._ensure_sku_index()
+            unknown = [change for change in changes if change["sku"].lower() not in self._sku_index]
+            if unknown:
+                # New products may have been created since the last index refresh
+                await self._ensure_sku_index(has_misses=True)
+                unknown = [change for change in changes if change["sku"].lower() not in self._sku_index]
+
+            items = [
+                {
+                    "inventory_item_id": self._sku_index[change["sku"].lower()],
+                    "sku": change["sku"],
+                    "quantity": change["quantity"],
+                    "item_id": change["item_id"],
+                }
+                for change in changes
+                if change["sku"].lower() in self._sku_index
+            ]
+            summary["unknown_skus"] = [change["sku"] for change in unknown]
+
+            failed_item_ids = set()
+            if items and not dry_run:
+                results = await self.shopify_client.write_inventory_batch(items, self.location_id, activate=False)
+                for item, result in zip(items, results, strict=True):
+                    if not result["success"]:
+                        failed_item_ids.add(item["item_id"])
+                        summary["failed"].append({"sku": item["sku"], "errors": result["errors"]})
+                summary["pushed"] = len(items) - len(failed_item_ids)
+                if self.catalog_mirror:
+                    pushed = {
+                        item["inventory_item_id"]: item["quantity"]
+                        for item in items
+                        if item["item_id"] not in failed_item_ids
+                    }
+                    try:
+                        await self.catalog_mirror.set_available(pushed)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Could not update catalog mirror quantities: {e}")
+
+            # Failed items and SKUs not in the index yet keep their previous snapshot value, so they
+            # are retried next cycle (and pushed once the index knows the SKU)
+            for item_id in failed_item_ids | {change["item_id"] for change in unknown}:
+                if item_id in self._snapshot:
+                    current[item_id] = self._snapshot[item_id]
+                else:
+                    current.pop(item_id, None)
+
+            self.stats["changes_detected"] += len(changes)
+            self.stats["items_pushed"] += summary["pushed"]
+            self.stats["push_failures"] += len(failed_item_ids)
+            self.stats["unknown_skus"] += len(unknown)
+
+        if not dry_run:
+            self._snapshot = current
+
+        elapsed = time.monotonic() - started
+        self.stats["cycles"] += 1
+        self.stats["last_cycle_seconds"] = round(elapsed, 3)
+        summary["duration_seconds"] = round(elapsed, 3)
+
+        if changes:
+            logger.info(
+                f"⚡ Inventory fast lane: {len(changes)} changes, {summary['pushed']} pushed, "
+                f"{len(summary['failed'])} failed, {len(summary.get('unknown_skus', []))} unknown SKUs "
+                f"({elapsed:.2f}s)"
+            )
+        return summary
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get fast-lane counters for monitoring.
+
+        Returns:
+            Dict: Snapshot/index sizes and cycle statistics
+        """
+        return {
+            "snapshot_items": len(self._snapshot),
+            "sku_index_size": len(self._sku_index),
+            "location_id": self.location_id,
+            **self.stats,
+        }
+
+
+_fast_lane: Optional[InventoryFastLane] = None
+
+
+async def get_inventory_fast_lane() -> InventoryFastLane:
+    """
+    Get or create the singleton inventory fast lane.
+
+    Returns:
+        InventoryFastLane: Initialized fast lane
+    """
+    global _fast_lane
+
+    if _fast_lane is None:
+        from app.db.rms.product_repository import ProductRepository
+        from app.db.shopify_clients.client_registry import get_shopify_client
+        from app.services.catalog_mirror import get_catalog_mirror
+
+        shopify_client = await get_shopify_client()
+        product_repository = ProductRepository()
+        await product_repository.initialize()
+        location_id = await shopify_client.get_primary_location_id()
+        _fast_lane = InventoryFastLane(
+            shopify_client, product_repository, location_id, catalog_mirror=await get_catalog_mirror()
+        )
+
+    return _fast_lane
+
+
+async def close_inventory_fast_lane() -> None:
+    """Close and clean up the singleton inventory fast lane."""
+    global _fast_lane
+
+    if _fast_lane is not None:
+        await _fast_lane.shopify_client.close()
+        await _fast_lane.product_repository.close()
+        _fast_lane = None
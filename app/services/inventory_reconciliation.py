@@ -0,0 +1,145 @@
+"""
+Whole-catalog inventory reconciliation: Shopify bulk export vs RMS quantities.
+
+The reverse stock sync walks Shopify page by page and checks each product
+against RMS. For a full drift check the reconciliation mode instead:
+
+1. Exports every variant (SKU, inventory item, available quantity) with one bulk operation
+2. Reads every RMS quantity with one set-based View_Items query
+3. Joins both tables in memory with pandas, keyed on the lower-cased SKU
+4. Writes only the mismatches and the zero-stock deletions, in batches
+
+This module holds the table building and the join; the writes are done by
+``ReverseStockSynchronizer.execute_reconciliation``.
+"""
+
+from typing import Any, Dict, List, Tuple, cast
+
+import numpy as np
+import pandas as pd
+
+VARIANT_COLUMNS = ["variant_id", "product_id", "product_status", "sku", "inventory_item_id", "shopify_qty"]
+DRIFT_ACTIONS = ("update", "delete", "preserve", "missing_in_rms")
+
+
+def variants_to_frame(variants: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Build the Shopify side of the join from the bulk variant export.
+
+    Args:
+        variants: JSONL lines of ``BULK_OPERATION_VARIANT_INVENTORY_QUERY``
+
+    Returns:
+        pd.DataFrame: One row per variant with ``VARIANT_COLUMNS``; ``shopify_qty`` is
+            NaN for variants whose item is not stocked at the location
+    """
+    rows = []
+    for variant in variants:
+        product = variant.get("product") or {}
+        inventory_item = variant.get("inventoryItem") or {}
+        level = inventory_item.get("inventoryLevel") or {}
+        quantities = level.get("quantities") or []
+        rows.append(
+            (
+                variant.get("id"),
+                product.get("id"),
+                product.get("status"),
+                (variant.get("sku") or "").strip(),
+                inventory_item.get("id"),
+                quantities[0].get("quantity") if quantities else None,
+            )
+        )
+    frame = pd.DataFrame.from_records(rows, columns=VARIANT_COLUMNS)
+    frame["shopify_qty"] = pd.to_numeric(frame["shopify_qty"], errors="coerce")
+    return frame
+
+
+def rms_quantities_to_frame(items: List[Tuple[int, str, int]]) -> pd.DataFrame:
+    """
+    Build the RMS side of the join from ``ProductRepository.get_item_quantities``.
+
+    Args:
+        items: (ItemID, C_ARTICULO, Quantity) per View_Items row
+
+    Returns:
+        pd.DataFrame: Columns ``sku_key`` (lower-cased, unique) and ``rms_qty`` (negatives as 0);
+            when a SKU appears more than once the last row wins
+    """
+    frame = pd.DataFrame.from_records(items, columns=["item_id", "sku", "rms_qty"])
+    frame["sku_key"] = frame["sku"].astype(str).str.strip().str.lower()
+    frame["rms_qty"] = frame["rms_qty"].clip(lower=0)
+    return cast(pd.DataFrame, frame.drop_duplicates("sku_key", keep="last")[["sku_key", "rms_qty"]])
+
+
+def compute_inventory_drift(
+    shopify: pd.DataFrame,
+    rms: pd.DataFrame,
+    delete_zero_stock: bool = True,
+    preserve_single_variant: bool = True,
+) -> pd.DataFrame:
+    """
+    Join the Shopify export with RMS and keep only the variants that need attention.
+
+    Only variants of active products are compared, with the same rules as the
+    reverse sync: RMS quantity 0 means delete (when enabled), a different quantity
+    means update, and a product never loses all of its variants when
+    ``preserve_single_variant`` is set.
+
+    Args:
+        shopify: Output of ``variants_to_frame``
+        rms: Output of ``rms_quantities_to_frame``
+        delete_zero_stock: Whether RMS quantity 0 deletes the variant instead of setting it to 0
+        preserve_single_variant: Keep zero-stock variants that are all that is left of their product
+
+    Returns:
+        pd.DataFrame: Drifted variants with ``rms_qty`` and ``action`` (one of ``DRIFT_ACTIONS``):
+            "update", "delete", "preserve" (zero stock kept to not empty the product) or
+            "missing_in_rms" (SKU unknown to RMS, reported only)
+    """
+    variants = cast(pd.DataFrame, shopify[shopify["product_status"] == "ACTIVE"]).copy()
+    variants["variant_count"] = variants.groupby("product_id")["variant_id"].transform("size")
+    variants = cast(pd.DataFrame, variants[variants["sku"] != ""])
+    variants["sku_key"] = pd.Series(variants["sku"]).str.lower()
+
+    merged = variants.merge(rms, on="sku_key", how="left", validate="many_to_one")
+    in_rms = merged["rms_qty"].notna()
+    zero_stock = in_rms & (merged["rms_qty"] == 0) & delete_zero_stock
+    # NaN (not stocked at the location) never equals the RMS quantity, so those items are set
+    mismatch = in_rms & ~zero_stock & (merged["shopify_qty"] != merged["rms_qty"])
+    if preserve_single_variant:
+        zero_per_product = zero_stock.groupby(merged["product_id"]).transform("sum")
+        preserved = zero_stock & (zero_per_product == merged["variant_count"])
+    else:
+        preserved = pd.Series(False, index=merged.index)
+
+    merged["action"] = np.select(
+        [~in_rms, preserved, zero_stock, mismatch], ["missing_in_rms", "preserve", "delete", "update"], default=""
+    )
+    drift = cast(pd.DataFrame, merged[merged["action"] != ""])
+    return drift.drop(columns=["sku_key", "variant_count"]).reset_index(drop=True)
+
+
+def summarize_drift(drift: pd.DataFrame, sample_size: int = 50) -> Dict[str, Any]:
+    """
+    Drift report section: count and first rows of every action.
+
+    Args:
+        drift: Output of ``compute_inventory_drift``
+        sample_size: Maximum rows listed per action
+
+    Returns:
+        Dict: {"counts": {action: n}, "samples": {action: [{"sku", "shopify_qty", "rms_qty"}, ...]}}
+    """
+    counts = drift["action"].value_counts()
+    samples = {}
+    for action in DRIFT_ACTIONS:
+        rows = drift.loc[drift["action"] == action, ["sku", "shopify_qty", "rms_qty"]].head(sample_size)
+        samples[action] = [
+            {
+                "sku": row["sku"],
+                "shopify_qty": None if pd.isna(row["shopify_qty"]) else int(row["shopify_qty"]),
+                "rms_qty": None if pd.isna(row["rms_qty"]) else int(row["rms_qty"]),
+            }
+            for row in rows.to_dict("records")
+        ]
+    return {"counts": {action: int(counts.get(action, 0)) for action in DRIFT_ACTIONS}, "samples": samples}
@@ -5,6 +5,7 @@ Preparación y formateo de datos para productos y variantes de Shopify.
 Este módulo se encarga específicamente de:
 - Preparar datos de productos base
 - Preparar datos de variantes para bulk operations
+- Preparar ProductSetInput para productSet (creación/actualización en una mutación)
 - Detectar tipos de opciones
 - Formatear datos según requerimientos de Shopify
 """
@@ -227,34 +228,18 @@ class DataPreparator:
             elif field == "category" and shopify_input.category:
                 update_data["category"] = shopify_input.category
 
-        # TAGS: Siempre actualizar con limpieza automática de RMS-Sync antiguos
+        # TAGS: Conservar los tags de Shopify (sin los RMS-Sync con fecha antiguos) y agregar los de RMS
         if shopify_input.tags and existing_tags is not None:
             from app.services.data_mapper import RMSToShopifyMapper
 
-            # Encontrar el nuevo tag RMS-Sync en los tags del shopify_input
-            new_sync_tag = None
+            logger.debug(f"🏷️ Tags BEFORE cleanup: {existing_tags}")
+            cleaned_tags = RMSToShopifyMapper.clean_rms_sync_tags(existing_tags)
             for tag in shopify_input.tags:
-                if tag.startswith("RMS-SYNC-"):
-                    new_sync_tag = tag
-                    break
+                if tag not in cleaned_tags:
+                    cleaned_tags.append(tag)
+            logger.debug(f"🏷️ Tags AFTER cleanup: {cleaned_tags}")
 
-            if new_sync_tag:
-                # Limpiar tags antiguos y mantener solo el nuevo
-                logger.debug(f"🏷️ Tags BEFORE cleanup: {existing_tags}")
-                cleaned_tags = RMSToShopifyMapper.clean_rms_sync_tags(existing_tags, new_sync_tag)
-                logger.debug(f"🏷️ Tags AFTER cleanup: {cleaned_tags}")
-
-                # Agregar tags no-RMS-Sync de shopify_input (como ccod_)
-                for tag in shopify_input.tags:
-                    if not tag.startswith("RMS-SYNC-") and tag not in cleaned_tags:
-                        cleaned_tags.append(tag)
-
-                update_data["tags"] = cleaned_tags
-                logger.info(f"🏷️ Tags actualizados: {len(existing_tags)} → {len(cleaned_tags)} (RMS-Sync limpio)")
-            else:
-                # Si no hay tag RMS-Sync, usar tags del shopify_input tal cual
-                update_data["tags"] = shopify_input.tags
-                logger.warning("⚠️ No se encontró tag RMS-SYNC en shopify_input, usando tags tal cual")
+            update_data["tags"] = cleaned_tags
 
         # Campos con lógica especial de preservación
         if "descriptionHtml" in fields_to_process:
@@ -289,6 +274,100 @@ class DataPreparator:
 
         return update_data
 
+    def prepare_product_set_input(
+        self,
+        shopify_input: ShopifyProductInput,
+        location_id: str,
+        existing_product: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Prepara el ProductSetInput para crear o actualizar el producto en una sola mutación productSet.
+
+        Para productos existentes se usan los mismos campos que en la actualización selectiva
+        (productType y descripción se preservan, tags con limpieza de RMS-Sync). productSet
+        reemplaza la lista de variantes, por lo que las variantes de Shopify que RMS no trae
+        se envían solo con su ID y opciones para conservarlas.
+
+        Args:
+            shopify_input: Input del producto
+            location_id: Ubicación para las cantidades de inventario de variantes nuevas
+            existing_product: Producto actual en Shopify con variantes (selectedOptions), o None
+
+        Returns:
+            Dict: ProductSetInput
+        """
+        if existing_product:
+            product_set = self.prepare_product_update_data(
+                shopify_input, existing_tags=existing_product.get("tags", [])
+            )
+            product_set["id"] = existing_product["id"]
+            product_set["handle"] = shopify_input.handle
+            existing_variants = [edge["node"] for edge in existing_product.get("variants", {}).get("edges", [])]
+        else:
+            product_set = self.prepare_base_product_data(shopify_input)
+            existing_variants = []
+
+        existing_by_options = {
+            self._option_values_key(
+                [{"optionName": opt["name"], "name": opt["value"]} for opt in variant.get("selectedOptions", [])]
+            ): variant
+            for variant in existing_variants
+        }
+
+        option_sets: Dict[str, List[str]] = {}
+        variants_input = []
+        for variant in shopify_input.variants or []:
+            variant_data = self.prepare_variant_data(variant)
+            variant_data.pop("inventoryQuantities", None)
+            variant_data["inventoryItem"] = {"sku": variant.sku, "tracked": True}
+            option_values = variant_data.get("optionValues") or [{"optionName": "Title", "name": "Default Title"}]
+            variant_data["optionValues"] = option_values
+
+            existing = existing_by_options.pop(self._option_values_key(option_values), None)
+            if existing:
+                variant_data["id"] = existing["id"]
+            else:
+                # productSet solo aplica inventoryQuantities a variantes nuevas
+                variant_data["inventoryQuantities"] = [
+                    {
+                        "locationId": quantity.get("locationId") or location_id,
+                        "name": "available",
+                        "quantity": int(quantity.get("availableQuantity", 0) or 0),
+                    }
+                    for quantity in variant.inventoryQuantities or []
+                ]
+            variants_input.append(variant_data)
+            for option in option_values:
+                option_sets.setdefault(option["optionName"], []).append(option["name"])
+
+        # Variantes de Shopify que RMS no trae: se conservan tal cual
+        for existing in existing_by_options.values():
+            option_values = [
+                {"optionName": opt["name"], "name": opt["value"]} for opt in existing.get("selectedOptions", [])
+            ]
+            variants_input.append({"id": existing["id"], "optionValues": option_values})
+            for option in option_values:
+                option_sets.setdefault(option["optionName"], []).append(option["name"])
+
+        product_set["productOptions"] = [
+            {"name": name, "values": [{"name": value} for value in sorted(set(values))]}
+            for name, values in option_sets.items()
+        ]
+        product_set["variants"] = variants_input
+
+        if shopify_input.metafields:
+            product_set["metafields"] = [
+                {key: metafield[key] for key in ("namespace", "key", "type", "value") if key in metafield}
+                for metafield in shopify_input.metafields
+            ]
+        return product_set
+
+    @staticmethod
+    def _option_values_key(option_values: List[Dict[str, Any]]) -> str:
+        """Combinación normalizada de optionValues, independiente del orden."""
+        pairs = sorted((str(option["optionName"]), str(option["name"])) for option in option_values)
+        return " / ".join(f"{name}:{value}" for name, value in pairs)
+
     def validate_product_data(self, shopify_input: ShopifyProductInput) -> Dict[str, Any]:
         """
         Valida los datos del producto antes de enviarlos a Shopify.
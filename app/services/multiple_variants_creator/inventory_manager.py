@@ -12,10 +12,8 @@ import logging
 from typing import Any, Dict, List
 
 from app.db.queries import (
-    INVENTORY_ACTIVATE_MUTATION,
     INVENTORY_BULK_ADJUST_MUTATION,
     INVENTORY_ITEM_UPDATE_MUTATION,
-    INVENTORY_SET_QUANTITIES_MUTATION,
 )
 from app.db.queries.products import PRODUCT_QUERY
 
@@ -38,18 +36,22 @@ class InventoryManager:
         self.shopify_client = shopify_client
         self.primary_location_id = primary_location_id
 
-    async def activate_inventory_for_all_variants(self, product_id: str, variants: List[Any]) -> None:
+    async def activate_inventory_for_all_variants(self, product_id: str, variants: List[Any]) -> List[Dict[str, Any]]:
         """
-        MÉTODO ACTUALIZADO: Ahora usa activate_inventory_tracking_well que está probado y funciona.
+        Activa tracking, activa en la ubicación y establece cantidades para todas las variantes
+        del producto en lote (write_inventory_batch), en pocas llamadas en lugar de tres por variante.
         Procesa todas las variantes que tengan datos de inventario sin importar el formato.
 
         Args:
             product_id: ID del producto
             variants: Lista de variantes con datos de inventario
+
+        Returns:
+            List[Dict]: Resultado por variante (sku, quantity, success, step, errors)
         """
         try:
-            # CAMBIO: Procesar todas las variantes que tengan cualquier tipo de datos de inventario
-            variants_with_inventory = []
+            # Procesar todas las variantes que tengan cualquier tipo de datos de inventario
+            variants_by_sku = {}
             for variant in variants:
                 has_inventory_data = False
 
@@ -61,84 +63,83 @@ class InventoryManager:
                 if hasattr(variant, "inventory_quantity") and variant.inventory_quantity is not None:
                     has_inventory_data = True
 
-                if has_inventory_data:
-                    variants_with_inventory.append(variant)
+                if has_inventory_data and getattr(variant, "sku", None):
+                    variants_by_sku[variant.sku] = variant
 
-            if not variants_with_inventory:
+            if not variants_by_sku:
                 logger.info("ℹ️ No inventory data found in any variants")
-                return
+                return []
 
-            logger.info(f"🔄 Processing inventory for {len(variants_with_inventory)} variants with inventory data")
+            logger.info(f"🔄 Processing inventory for {len(variants_by_sku)} variants with inventory data")
 
-            # Obtener todas las variantes del producto creado
+            # Obtener todas las variantes del producto (IDs de inventory items)
             result = await self.shopify_client._execute_query(PRODUCT_QUERY, {"id": product_id})
+            if not result or not result.get("product"):
+                logger.warning(f"⚠️ Product {product_id} not found while setting inventory")
+                return []
+
+            items = []
+            for variant_edge in result["product"].get("variants", {}).get("edges", []):
+                variant_node = variant_edge["node"]
+                sku = variant_node.get("sku")
+                inventory_item_id = variant_node.get("inventoryItem", {}).get("id")
+
+                target_variant = variants_by_sku.get(sku)
+                if not target_variant:
+                    logger.info(f"ℹ️ No inventory data found for variant {sku}")
+                    continue
+
+                if not inventory_item_id:
+                    logger.warning(f"⚠️ No inventory item found for variant {sku}")
+                    continue
+
+                desired_quantity = self._get_desired_quantity(target_variant)
+                if desired_quantity > 0:
+                    items.append({"inventory_item_id": inventory_item_id, "sku": sku, "quantity": desired_quantity})
+                else:
+                    logger.info(f"ℹ️ No quantity to set for variant {sku} (quantity: {desired_quantity})")
 
-            if result and result.get("product"):
-                shopify_variants = result["product"].get("variants", {}).get("edges", [])
-                logger.info(f"🔍 Processing inventory for {len(shopify_variants)} variants using proven working method")
-
-                # Procesar todas las variantes que tengan datos de inventario
-                for variant_edge in shopify_variants:
-                    variant_node = variant_edge["node"]
-                    sku = variant_node.get("sku")
-                    inventory_item_id = variant_node.get("inventoryItem", {}).get("id")
-
-                    if not inventory_item_id:
-                        logger.warning(f"⚠️ No inventory item found for variant {sku}")
-                        continue
-
-                    # Buscar datos de inventario para esta variante
-                    target_variant = None
-                    for input_variant in variants_with_inventory:
-                        if hasattr(input_variant, "sku") and input_variant.sku == sku:
-                            target_variant = input_variant
-                            break
-
-                    if not target_variant:
-                        logger.info(f"ℹ️ No inventory data found for variant {sku}")
-                        continue
-
-                    # Determinar cantidad deseada
-                    desired_quantity = 0
-                    location_id = self.primary_location_id
-
-                    # Formato inventoryQuantities (complejo)
-                    if hasattr(target_variant, "inventoryQuantities") and target_variant.inventoryQuantities:
-                        for inv_qty in target_variant.inventoryQuantities:
-                            loc_id = inv_qty.get("locationId", self.primary_location_id)
-                            if loc_id == self.primary_location_id:
-                                desired_quantity = inv_qty.get("availableQuantity", 0)
-                                location_id = loc_id
-                                break
-                    # Formato inventory_quantity (simple)
-                    elif (
-                        hasattr(target_variant, "inventory_quantity") and target_variant.inventory_quantity is not None
-                    ):
-                        desired_quantity = target_variant.inventory_quantity
-
-                    if desired_quantity > 0:
-                        try:
-                            logger.info(f"🔄 Using proven working method for variant {sku}: {desired_quantity} units")
-
-                            # CAMBIO CRÍTICO: Usar el método correcto con queries importadas
-                            tracking_result = await self._activate_inventory_tracking_well(
-                                inventory_item_id, location_id, desired_quantity
-                            )
+            if not items:
+                return []
 
-                            if tracking_result.get("success"):
-                                final_quantity = tracking_result.get("finalQuantity", desired_quantity)
-                                logger.info(f"✅ Successfully set inventory for variant {sku}: {final_quantity} units")
-                            else:
-                                error_msg = tracking_result.get("error", "Unknown error")
-                                logger.warning(f"❌ Failed to set inventory for variant {sku}: {error_msg}")
+            results = await self.shopify_client.write_inventory_batch(items, self.primary_location_id)
 
-                        except Exception as inv_error:
-                            logger.warning(f"❌ Error setting inventory for {sku}: {inv_error}")
-                    else:
-                        logger.info(f"ℹ️ No quantity to set for variant {sku} (quantity: {desired_quantity})")
+            for item_result in results:
+                if item_result["success"]:
+                    logger.info(f"✅ Inventory set for variant {item_result['sku']}: {item_result['quantity']} units")
+                else:
+                    logger.warning(
+                        f"❌ Failed to set inventory for variant {item_result['sku']} "
+                        f"(step: {item_result['step']}): {item_result['errors']}"
+                    )
+            return results
 
         except Exception as e:
             logger.warning(f"❌ Error verifying inventory for variants: {e}")
+            return []
+
+    def _get_desired_quantity(self, variant: Any) -> int:
+        """
+        Determina la cantidad deseada en la ubicación principal para una variante.
+
+        Args:
+            variant: Variante con inventoryQuantities o inventory_quantity
+
+        Returns:
+            int: Cantidad deseada (0 si no hay datos para la ubicación principal)
+        """
+        # Formato inventoryQuantities (complejo)
+        if hasattr(variant, "inventoryQuantities") and variant.inventoryQuantities:
+            for inv_qty in variant.inventoryQuantities:
+                if inv_qty.get("locationId", self.primary_location_id) == self.primary_location_id:
+                    return inv_qty.get("availableQuantity", 0)
+            return 0
+
+        # Formato inventory_quantity (simple)
+        if hasattr(variant, "inventory_quantity") and variant.inventory_quantity is not None:
+            return variant.inventory_quantity
+
+        return 0
 
     async def force_inventory_update_for_new_product(self, product_id: str, variants: List[Any]) -> None:
         """
@@ -309,23 +310,29 @@ class InventoryManager:
             successes = []
             failures = []
 
+            # Agrupar por ubicación: una escritura en lote (inventorySetQuantities de hasta 250) por ubicación
+            updates_by_location: Dict[str, List[Dict[str, Any]]] = {}
             for update in inventory_updates:
-                variant_node = update.get("variant_node")
                 location_id = update.get("location_id", self.primary_location_id)
-                quantity = update.get("quantity", 0)
-
-                try:
-                    result = await self.update_variant_inventory(variant_node, location_id, quantity)
+                updates_by_location.setdefault(location_id, []).append(update)
+
+            for location_id, updates in updates_by_location.items():
+                items = [
+                    {
+                        "inventory_item_id": (update.get("variant_node", {}).get("inventoryItem") or {}).get("id"),
+                        "sku": update.get("variant_node", {}).get("sku", "NO-SKU"),
+                        "quantity": update.get("quantity", 0),
+                    }
+                    for update in updates
+                ]
+                results = await self.shopify_client.write_inventory_batch(items, location_id, activate=False)
 
-                    if result.get("success"):
-                        successes.append({"sku": variant_node.get("sku", "NO-SKU"), "quantity": quantity})
+                for item_result in results:
+                    if item_result["success"]:
+                        successes.append({"sku": item_result["sku"], "quantity": item_result["quantity"]})
                     else:
-                        failures.append(
-                            {"sku": variant_node.get("sku", "NO-SKU"), "error": result.get("error", "Unknown error")}
-                        )
-
-                except Exception as e:
-                    failures.append({"sku": variant_node.get("sku", "NO-SKU"), "error": str(e)})
+                        error = item_result["errors"][0].get("message") if item_result["errors"] else "Unknown error"
+                        failures.append({"sku": item_result["sku"], "error": error})
 
             logger.info(f"✅ Bulk inventory update completed: {len(successes)} successes, {len(failures)} failures")
 
@@ -397,136 +404,3 @@ class InventoryManager:
         except Exception as e:
             logger.error(f"❌ Error validating inventory data: {e}")
             return {"is_valid": False, "error": str(e), "results": {"valid": [], "invalid": [], "warnings": []}}
-
-    async def _activate_inventory_tracking_well(
-        self, inventory_item_id: str, location_id: str, available_quantity: int = None
-    ) -> Dict[str, Any]:
-        """
-        Activa el tracking de inventario y establece la cantidad disponible inicial.
-
-        Flujo de 3 pasos:
-        1. Habilitar tracking en el inventory item
-        2. Activar inventory en la ubicación
-        3. Establecer cantidad disponible
-
-        Args:
-            inventory_item_id: ID del item de inventario
-            location_id: ID de la ubicación
-            available_quantity: Cantidad disponible inicial
-
-        Returns:
-            Resultado completo con el inventory level final
-        """
-        try:
-            # 📝 PASO 1: Habilitar tracking en el inventory item
-            logger.info(f"🔄 Step 1: Enabling tracking for item {inventory_item_id}")
-            update_variables = {"id": inventory_item_id, "input": {"tracked": True}}
-            update_result = await self.shopify_client._execute_query(INVENTORY_ITEM_UPDATE_MUTATION, update_variables)
-            update_data = update_result.get("inventoryItemUpdate", {})
-            if update_errors := update_data.get("userErrors", []):
-                logger.error(f"❌ Step 1 failed: {update_errors}")
-                return {"success": False, "step": 1, "errors": update_errors}
-
-            logger.info("✅ Step 1: Tracking enabled successfully")
-
-            # 📍 PASO 2: Activar inventory en la ubicación
-            activation_variables = {"inventoryItemId": inventory_item_id, "locationId": location_id}
-            activation_result = await self.shopify_client._execute_query(
-                INVENTORY_ACTIVATE_MUTATION, activation_variables
-            )
-            activation_data = activation_result.get("inventoryActivate", {})
-            if activation_errors := activation_data.get("userErrors", []):
-                logger.error(f"❌ Step 2 failed: {activation_errors}")
-                return {"success": False, "step": 2, "errors": activation_errors}
-
-            inventory_level = activation_data.get("inventoryLevel", {})
-            logger.info("✅ Step 2: Inventory activated at location")
-
-            # 📊 PASO 3: Establecer cantidad disponible (si se especifica)
-            if available_quantity is not None and available_quantity > 0:
-                logger.info(f"🔄 Step 3: Setting available quantity to {available_quantity}")
-                # Obtener la cantidad actual del inventory level
-                current_quantity = inventory_level.get("available", 0)
-                logger.info(f"   Current quantity: {current_quantity}")
-                # Para establecer la cantidad, usamos inventorySetQuantities
-                # Incluir ignoreCompareQuantity para forzar el establecimiento
-                set_quantity_variables = {
-                    "input": {
-                        "name": "available",
-                        "reason": "correction",
-                        "referenceDocumentUri": f"https://inventory-setup/item/{inventory_item_id.split('/')[-1]}",
-                        "ignoreCompareQuantity": True,
-                        "quantities": [
-                            {
-                                "inventoryItemId": inventory_item_id,
-                                "locationId": location_id,
-                                "quantity": available_quantity,
-                            }
-                        ],
-                    }
-                }
-
-                try:
-                    logger.debug(f"Sending inventorySetQuantities with variables: {set_quantity_variables}")
-                    set_result = await self.shopify_client._execute_query(
-                        INVENTORY_SET_QUANTITIES_MUTATION, set_quantity_variables
-                    )
-                    logger.debug(f"inventorySetQuantities response: {set_result}")
-                except Exception as query_error:
-                    logger.error(f"❌ Step 3 failed: GraphQL query error: {query_error}")
-                    return {
-                        "success": False,
-                        "step": 3,
-                        "errors": [{"message": f"GraphQL query failed: {str(query_error)}"}],
-                    }
-
-                # Verificar que set_result no sea None
-                if not set_result:
-                    logger.error("❌ Step 3 failed: No response from inventorySetQuantities")
-                    return {"success": False, "step": 3, "errors": [{"message": "No response from GraphQL"}]}
-
-                set_data = set_result.get("inventorySetQuantities", {})
-                if not set_data:
-                    logger.error("❌ Step 3 failed: No inventorySetQuantities in response")
-                    return {
-                        "success": False,
-                        "step": 3,
-                        "errors": [{"message": "No inventorySetQuantities field in response"}],
-                    }
-
-                if set_errors := set_data.get("userErrors", []):
-                    logger.error(f"❌ Step 3 failed: {set_errors}")
-                    return {"success": False, "step": 3, "errors": set_errors}
-
-                adjustment_group = set_data.get("inventoryAdjustmentGroup")
-                if adjustment_group is None:
-                    # Si no hay errores y adjustment_group es None, significa que no hubo cambios
-                    # Esto puede pasar cuando la cantidad ya es la deseada
-                    logger.info("✅ Step 3: Quantity already at desired value (no changes needed)")
-                    final_quantity = available_quantity
-                else:
-                    # Procesar cambios normalmente
-                    changes = adjustment_group.get("changes", [])
-
-                    if changes:
-                        available_change = next((c for c in changes if c.get("name") == "available"), changes[0])
-                        delta = available_change.get("delta", 0)
-                        final_quantity = available_change.get("quantityAfterChange", current_quantity + delta)
-                        logger.info(f"✅ Step 3: Quantity set (Δ{delta:+d}) → Final: {final_quantity}")
-                    else:
-                        final_quantity = available_quantity
-                        logger.info("✅ Step 3: Quantity operation completed")
-            else:
-                logger.info("ℹ️ Step 3: No quantity specified, skipping adjustment")
-                final_quantity = 0
-
-            return {
-                "success": True,
-                "inventoryLevel": inventory_level,
-                "tracked": True,
-                "finalQuantity": final_quantity,
-            }
-
-        except Exception as e:
-            logger.error(f"❌ Failed to activate inventory tracking: {e}")
-            return {"success": False, "error": str(e)}
@@ -10,16 +10,53 @@ import logging
 from typing import Any, Dict, List, Optional
 
 from app.api.v1.schemas.shopify_schemas import ShopifyProductInput
+from app.db.queries.products import PRODUCT_SET_MUTATION
 from app.db.rms.product_repository import ProductRepository
 from app.services.zero_stock_variant_cleanup import ZeroStockVariantCleanupService
+from app.utils.error_handler import ShopifyAPIException
 
 from .data_preparator import DataPreparator
 from .inventory_manager import InventoryManager
 from .metafields_manager import MetafieldsManager
+from .update_planner import ProductUpdatePlan, UpdatePlanner
 from .variant_manager import VariantManager
 
 logger = logging.getLogger(__name__)
 
+# Códigos HTTP 4xx que no indican que Shopify haya rechazado el input
+_RETRYABLE_CLIENT_STATUSES = (408, 429)
+
+
+def _is_rejected_request(error: BaseException) -> bool:
+    """
+    Indica si Shopify rechazó la petición sin escribir nada (input inválido).
+
+    Solo cuenta como rechazo un HTTP 4xx (salvo timeout y rate limit) o una respuesta con
+    errores GraphQL que no sean internos. Timeouts, errores de red y 5xx no son rechazos:
+    Shopify pudo haber escrito el producto. Se siguen las excepciones envueltas por ``__cause__``.
+
+    Args:
+        error: Excepción de la llamada a Shopify
+
+    Returns:
+        bool: True si la petición fue rechazada
+    """
+    current: Optional[BaseException] = error
+    while current is not None:
+        if isinstance(current, ShopifyAPIException) and not current.rate_limited:
+            status = current.api_response_code
+            if status and 400 <= status < 500 and status not in _RETRYABLE_CLIENT_STATUSES:
+                return True
+            graphql_errors = current.details.get("graphql_errors") or []
+            if graphql_errors and not any(
+                ((err.get("extensions") or {}).get("code") == "INTERNAL_SERVER_ERROR")
+                for err in graphql_errors
+                if isinstance(err, dict)
+            ):
+                return True
+        current = current.__cause__
+    return False
+
 
 class MultipleVariantsCreator:
     """
@@ -35,6 +72,8 @@ class MultipleVariantsCreator:
         primary_location_id: str,
         product_repository: Optional[ProductRepository] = None,
         enable_cleanup: bool = True,
+        enable_update_planner: bool = True,
+        enable_product_set: bool = True,
     ):
         """
         Inicializa el creador de variantes múltiples.
@@ -44,6 +83,8 @@ class MultipleVariantsCreator:
             primary_location_id: ID de la ubicación principal
             product_repository: Repositorio de productos RMS (requerido para limpieza)
             enable_cleanup: Habilitar limpieza de variantes con stock 0 (default: True)
+            enable_update_planner: Enviar solo las mutaciones necesarias al actualizar (default: True)
+            enable_product_set: Crear productos con una sola mutación productSet (default: True)
         """
         self.shopify_client = shopify_client
         self.primary_location_id = primary_location_id
@@ -54,6 +95,7 @@ class MultipleVariantsCreator:
         self.variant_manager = VariantManager(shopify_client, primary_location_id)
         self.inventory_manager = InventoryManager(shopify_client, primary_location_id)
         self.metafields_manager = MetafieldsManager(shopify_client)
+        self.enable_product_set = enable_product_set
 
         # Inicializar servicio de limpieza de variantes con stock 0
         # Solo si enable_cleanup Y product_repository están disponibles
@@ -65,9 +107,17 @@ class MultipleVariantsCreator:
         elif enable_cleanup and not product_repository:
             logger.warning("⚠️  Cleanup service disabled: product_repository not provided")
 
+        # El planificador solo propone limpieza si el servicio de limpieza puede ejecutarla
+        self.update_planner = (
+            UpdatePlanner(shopify_client, primary_location_id, plan_cleanup=self.cleanup_service is not None)
+            if enable_update_planner
+            else None
+        )
+
     async def create_product_with_variants(self, shopify_input: ShopifyProductInput) -> Dict[str, Any]:
         """
         FLUJO COMPLETO: Crea un producto en Shopify siguiendo el flujo especificado:
+        A. productSet (una sola llamada; si Shopify lo rechaza se sigue con los pasos B-J) →
         B. Crear Producto → C. Crear Variantes → D. Actualizar Inventario →
         E. Crear Metafields → F. Verificar Precio de Oferta → G. ¿Tiene Sale Price? →
         H. Crear Descuento Automático → J. Producto Completo
@@ -88,6 +138,16 @@ class MultipleVariantsCreator:
                 logger.error(f"❌ Product data validation failed: {validation_result['results']['invalid']}")
                 raise Exception(f"Invalid product data: {validation_result['results']['invalid']}")
 
+            # A. UPSERT DECLARATIVO: producto, opciones, variantes, inventario y metafields en una llamada
+            if self.enable_product_set:
+                created_product = await self.upsert_with_product_set(shopify_input)
+                if created_product:
+                    logger.info(
+                        f"🎉 STEP A: Created product {created_product['id']} with "
+                        f"{len(shopify_input.variants)} variants in one productSet call"
+                    )
+                    return created_product
+
             # B. CREAR PRODUCTO básico
             logger.info(f"🔄 STEP B: Creating base product - {shopify_input.title}")
             product_data = self.data_preparator.prepare_base_product_data(shopify_input)
@@ -131,13 +191,88 @@ class MultipleVariantsCreator:
             logger.error(f"❌ Error in product creation flow: {e}")
             raise
 
+    async def upsert_with_product_set(
+        self, shopify_input: ShopifyProductInput, existing_product: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Crea o actualiza el producto con una sola mutación productSet síncrona.
+
+        Envía campos, opciones, variantes con SKU y precio, inventario de variantes nuevas
+        (con tracking activado) y metafields de forma declarativa, en lugar de las llamadas
+        separadas del flujo por pasos.
+
+        Args:
+            shopify_input: Input del producto con todas las variantes
+            existing_product: Producto actual con variantes (selectedOptions) para conservar sus IDs, o None
+
+        Returns:
+            Optional[Dict]: Producto escrito (id, handle, variantes), o None si Shopify rechazó
+                el input y hay que usar el flujo por pasos
+
+        Raises:
+            ShopifyAPIException: Si la llamada falló sin rechazo (timeout, red, 5xx) y el producto
+                no aparece en Shopify: el resultado queda sin confirmar para el siguiente sync
+        """
+        product_set_input = self.data_preparator.prepare_product_set_input(
+            shopify_input, self.primary_location_id, existing_product
+        )
+        try:
+            result = await self.shopify_client._execute_query(
+                PRODUCT_SET_MUTATION, {"input": product_set_input, "synchronous": True}
+            )
+        except ShopifyAPIException as e:
+            if _is_rejected_request(e):
+                logger.warning(f"⚠️ productSet rejected {shopify_input.handle}, using step-by-step flow: {e}")
+                return None
+            return await self._confirm_product_set(shopify_input, e)
+
+        payload = (result or {}).get("productSet") or {}
+        user_errors = payload.get("userErrors") or []
+        if user_errors or not (payload.get("product") or {}).get("id"):
+            logger.warning(f"⚠️ productSet rejected {shopify_input.handle}, using step-by-step flow: {user_errors[:3]}")
+            return None
+        return payload["product"]
+
+    async def _confirm_product_set(self, shopify_input: ShopifyProductInput, error: Exception) -> Dict[str, Any]:
+        """
+        Busca el producto en Shopify tras un productSet con resultado desconocido.
+
+        Un timeout o un 5xx no garantiza que Shopify no haya escrito el producto; crearlo
+        otra vez con el flujo por pasos dejaría un duplicado con el handle con sufijo.
+
+        Args:
+            shopify_input: Input del producto enviado en productSet
+            error: Error de la llamada a productSet
+
+        Returns:
+            Dict: El producto si Shopify llegó a escribirlo
+
+        Raises:
+            ShopifyAPIException: Si el producto no aparece o no se puede consultar
+        """
+        try:
+            product = await self.shopify_client.get_product_by_handle(shopify_input.handle)
+        except Exception as lookup_error:
+            logger.warning(f"⚠️ Could not look up {shopify_input.handle} after productSet failed: {lookup_error}")
+            product = None
+
+        if product and product.get("id"):
+            logger.info(f"✅ productSet for {shopify_input.handle} was committed despite the error: {error}")
+            return product
+
+        raise ShopifyAPIException(
+            f"productSet outcome unconfirmed for {shopify_input.handle}, leaving it for the next sync: {error}"
+        ) from error
+
     async def update_product_with_variants(
         self, product_id: str, shopify_input: ShopifyProductInput, existing_product: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
         Actualiza un producto existente en Shopify con múltiples variantes.
 
-        Realiza las siguientes operaciones:
+        Con el planificador activo, compara el producto con su estado actual en Shopify
+        y ejecuta solo las operaciones necesarias (ver UpdatePlanner). Si no se puede
+        obtener el estado actual, realiza las siguientes operaciones:
         1. Actualizar información básica del producto
         2. Sincronizar variantes (crear nuevas, actualizar existentes)
         3. Actualizar inventario para todas las variantes
@@ -149,7 +284,7 @@ class MultipleVariantsCreator:
             existing_product: Producto existente obtenido de Shopify
 
         Returns:
-            Dict: Producto actualizado
+            Dict: Producto actualizado, con el resumen del plan ejecutado en "update_plan"
 
         Raises:
             Exception: Si falla la actualización del producto
@@ -157,7 +292,7 @@ class MultipleVariantsCreator:
         try:
             logger.info(
                 f"🔄⚠️ FLUJO COMPLETO: Starting update of product {product_id} "
-                f"with {len(shopify_input.variants)} variants and existing product data: {existing_product}"
+                f"with {len(shopify_input.variants)} variants (existing handle: {existing_product.get('handle')})"
             )
 
             # Validar datos antes de procesar
@@ -166,6 +301,23 @@ class MultipleVariantsCreator:
                 logger.error(f"❌ Product data validation failed: {validation_result['results']['invalid']}")
                 raise Exception(f"Invalid product data: {validation_result['results']['invalid']}")
 
+            # A. PLAN DE MUTACIONES MÍNIMAS (comparando con el estado actual en Shopify)
+            snapshot = None
+            if self.update_planner and UpdatePlanner.is_complete_snapshot(existing_product):
+                # El producto ya viene de la consulta en lote de la página
+                snapshot = existing_product
+            elif self.update_planner:
+                try:
+                    snapshot = await self.update_planner.fetch_snapshot(product_id)
+                except Exception as e:
+                    logger.warning(f"⚠️ STEP A: Could not fetch product snapshot, using full update: {e}")
+
+            if snapshot:
+                plan = self.update_planner.build_plan(product_id, shopify_input, snapshot)
+                updated_product = await self._execute_update_plan(plan, shopify_input, snapshot)
+                updated_product["update_plan"] = plan.to_report()
+                return updated_product
+
             # B. ACTUALIZAR PRODUCTO básico (solo campos seguros de RMS)
             logger.info(f"🔄 STEP B: Updating base product - {shopify_input.title}")
 
@@ -184,7 +336,12 @@ class MultipleVariantsCreator:
 
             # C. SINCRONIZAR VARIANTES (crear nuevas, actualizar existentes)
             logger.info(f"🔄 STEP C: Syncing {len(shopify_input.variants)} variants")
-            existing_variants = await self.variant_manager.get_existing_variants(product_id)
+            prefetched_variants = existing_product.get("variants") or {}
+            if prefetched_variants.get("pageInfo", {}).get("hasNextPage") is False:
+                # Las variantes ya vienen completas en la consulta en lote de la página
+                existing_variants = [edge["node"] for edge in prefetched_variants.get("edges", [])]
+            else:
+                existing_variants = await self.variant_manager.get_existing_variants(product_id)
             if shopify_input.variants:
                 await self.variant_manager.sync_product_variants(product_id, shopify_input.variants, existing_variants)
             logger.info("✅ STEP C: Variants synchronized successfully")
@@ -202,72 +359,144 @@ class MultipleVariantsCreator:
             logger.info("✅ STEP D: Inventory tracking updated")
 
             # D.1 LIMPIEZA DE VARIANTES CON STOCK 0 EN RMS
-            if self.cleanup_service and self.product_repository:
-                logger.info("🔄 STEP D.1: Cleaning up zero-stock variants from Shopify")
-
-                # Extraer CCOD para consulta SQL
-                ccod = "unknown"
-                if shopify_input.metafields:
-                    for metafield in shopify_input.metafields:
-                        if metafield.get("key") == "ccod" and metafield.get("namespace") == "rms":
-                            ccod = metafield.get("value", "unknown")
-                            break
-
-                # Validar CCOD extraído
-                if ccod == "unknown":
-                    available_keys = [m.get("key") for m in (shopify_input.metafields or [])]
-                    logger.warning(
-                        f"⚠️ STEP D.1: Cannot cleanup - CCOD metafield not found in product. "
-                        f"Available metafield keys: {available_keys}"
-                    )
-                    logger.info("⏭️  STEP D.1: Skipping zero-stock cleanup (no valid CCOD)")
-                else:
-                    logger.info(f"📋 STEP D.1: Extracted CCOD={ccod} from metafields")
-                    logger.info(f"🔍 STEP D.1: Querying RMS for zero-stock variants (CCOD={ccod})")
-
-                    # 1. Consultar RMS por variantes con stock 0
-                    zero_stock_variants = await self.product_repository.get_zero_stock_variants_by_ccod(ccod)
-                    zero_stock_skus = {v.c_articulo for v in zero_stock_variants if v.c_articulo}
-
-                    logger.info(
-                        f"📊 STEP D.1: RMS Query Results - "
-                        f"Found {len(zero_stock_variants)} variants with Quantity=0 for CCOD={ccod}"
-                    )
-
-                    # 2. Si hay variantes con stock 0, eliminarlas de Shopify
-                    if zero_stock_skus:
-                        logger.info(
-                            f"🗑️  STEP D.1: Will attempt to delete {len(zero_stock_skus)} zero-stock variants: "
-                            f"{list(zero_stock_skus)[:5]}{'...' if len(zero_stock_skus) > 5 else ''}"
-                        )
-
-                        cleanup_stats = await self.cleanup_service.cleanup_zero_stock_variants(
-                            shopify_product_id=product_id,
-                            zero_stock_skus=zero_stock_skus,
-                            ccod=ccod,
-                        )
-                        logger.info(
-                            f"✅ STEP D.1: Cleanup completed - "
-                            f"Checked: {cleanup_stats['variants_checked']}, "
-                            f"Deleted: {cleanup_stats['variants_deleted']}, "
-                            f"Errors: {cleanup_stats['errors']}"
-                        )
-                    else:
-                        logger.info(f"✅ STEP D.1: No zero-stock variants found in RMS for CCOD={ccod}")
-            else:
-                logger.debug("⏭️  STEP D.1: Zero-stock cleanup skipped (service/repository not available)")
+            await self._cleanup_zero_stock_variants(product_id, shopify_input)
 
             # F→G→H. PRECIO DE OFERTA SE APLICA POR CÓDIGO PYTHON (descuentos removidos)
             logger.info("✅ STEPS F-H: Sale prices applied directly in Python code")
 
             # J. PRODUCTO COMPLETO
             logger.info(f"🎉 STEP J: Product update complete with {len(shopify_input.variants)} variants")
+            updated_product["update_plan"] = {"operations": ["full_update"]}
             return updated_product
 
         except Exception as e:
             logger.error(f"❌ Error updating product {product_id} with multiple variants: {e}")
             raise
 
+    async def _execute_update_plan(
+        self, plan: ProductUpdatePlan, shopify_input: ShopifyProductInput, snapshot: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Ejecuta solo las operaciones del plan de actualización.
+
+        Args:
+            plan: Plan generado por UpdatePlanner
+            shopify_input: Nuevos datos del producto con variantes
+            snapshot: Estado del producto en Shopify usado para el plan
+
+        Returns:
+            Dict: Producto actualizado (o el snapshot si no cambió ningún campo base)
+
+        Raises:
+            ShopifyAPIException: Si alguna escritura planificada de variantes o inventario falló;
+                el producto no cuenta como actualizado y su fingerprint no se registra
+        """
+        product_id = plan.product_id
+        if plan.is_empty:
+            logger.info(f"✅ Product {product_id} already up to date in Shopify, no mutations needed")
+            return {"id": product_id, "title": snapshot.get("title")}
+
+        logger.info(f"🧭 Update plan for {product_id}: {plan.to_report()}")
+
+        updated_product = {"id": product_id, "title": snapshot.get("title")}
+        if plan.product_fields:
+            updated_product = await self.shopify_client.update_product(product_id, plan.product_fields)
+
+        existing_variants = [edge["node"] for edge in snapshot.get("variants", {}).get("edges", [])]
+        if plan.variants_create:
+            await self.variant_manager.create_multiple_variants(product_id, plan.variants_create, existing_variants)
+        failed_writes: List[str] = []
+        if plan.variants_update:
+            failed_variants = await self.variant_manager.update_existing_variants(product_id, plan.variants_update)
+            if failed_variants:
+                failed_writes.append(f"{failed_variants} variant updates")
+
+        if plan.metafields:
+            await self.metafields_manager.update_metafields(product_id, plan.metafields)
+
+        if plan.inventory_items:
+            results = await self.shopify_client.write_inventory_batch(
+                plan.inventory_items, self.primary_location_id, activate=plan.inventory_needs_activation
+            )
+            failed = [result["sku"] for result in results if not result["success"]]
+            if failed:
+                logger.warning(f"❌ Failed to set inventory for variants: {failed}")
+                failed_writes.append(f"inventory of {failed}")
+        if plan.variants_create:
+            # Las variantes nuevas no tienen inventory item conocido en el snapshot
+            await self.inventory_manager.activate_inventory_for_all_variants(product_id, plan.variants_create)
+
+        if plan.cleanup_candidates:
+            await self._cleanup_zero_stock_variants(product_id, shopify_input)
+
+        if failed_writes:
+            raise ShopifyAPIException(f"Update plan for {product_id} incomplete: {'; '.join(failed_writes)} failed")
+
+        return updated_product
+
+    async def _cleanup_zero_stock_variants(self, product_id: str, shopify_input: ShopifyProductInput) -> None:
+        """
+        Elimina de Shopify las variantes que tienen stock 0 en RMS (STEP D.1).
+
+        Args:
+            product_id: ID del producto
+            shopify_input: Datos del producto (el CCOD se toma de sus metafields)
+        """
+        if self.cleanup_service and self.product_repository:
+            logger.info("🔄 STEP D.1: Cleaning up zero-stock variants from Shopify")
+
+            # Extraer CCOD para consulta SQL
+            ccod = "unknown"
+            if shopify_input.metafields:
+                for metafield in shopify_input.metafields:
+                    if metafield.get("key") == "ccod" and metafield.get("namespace") == "rms":
+                        ccod = metafield.get("value", "unknown")
+                        break
+
+            # Validar CCOD extraído
+            if ccod == "unknown":
+                available_keys = [m.get("key") for m in (shopify_input.metafields or [])]
+                logger.warning(
+                    f"⚠️ STEP D.1: Cannot cleanup - CCOD metafield not found in product. "
+                    f"Available metafield keys: {available_keys}"
+                )
+                logger.info("⏭️  STEP D.1: Skipping zero-stock cleanup (no valid CCOD)")
+            else:
+                logger.info(f"📋 STEP D.1: Extracted CCOD={ccod} from metafields")
+                logger.info(f"🔍 STEP D.1: Querying RMS for zero-stock variants (CCOD={ccod})")
+
+                # 1. Consultar RMS por variantes con stock 0
+                zero_stock_variants = await self.product_repository.get_zero_stock_variants_by_ccod(ccod)
+                zero_stock_skus = {v.c_articulo for v in zero_stock_variants if v.c_articulo}
+
+                logger.info(
+                    f"📊 STEP D.1: RMS Query Results - "
+                    f"Found {len(zero_stock_variants)} variants with Quantity=0 for CCOD={ccod}"
+                )
+
+                # 2. Si hay variantes con stock 0, eliminarlas de Shopify
+                if zero_stock_skus:
+                    logger.info(
+                        f"🗑️  STEP D.1: Will attempt to delete {len(zero_stock_skus)} zero-stock variants: "
+                        f"{list(zero_stock_skus)[:5]}{'...' if len(zero_stock_skus) > 5 else ''}"
+                    )
+
+                    cleanup_stats = await self.cleanup_service.cleanup_zero_stock_variants(
+                        shopify_product_id=product_id,
+                        zero_stock_skus=zero_stock_skus,
+                        ccod=ccod,
+                    )
+                    logger.info(
+                        f"✅ STEP D.1: Cleanup completed - "
+                        f"Checked: {cleanup_stats['variants_checked']}, "
+                        f"Deleted: {cleanup_stats['variants_deleted']}, "
+                        f"Errors: {cleanup_stats['errors']}"
+                    )
+                else:
+                    logger.info(f"✅ STEP D.1: No zero-stock variants found in RMS for CCOD={ccod}")
+        else:
+            logger.debug("⏭️  STEP D.1: Zero-stock cleanup skipped (service/repository not available)")
+
     # Métodos de conveniencia para acceso directo a funcionalidades específicas
 
     def validate_product_data(self, shopify_input: ShopifyProductInput) -> Dict[str, Any]:
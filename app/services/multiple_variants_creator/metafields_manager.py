@@ -8,6 +8,7 @@ Este módulo se encarga específicamente de:
 - Validar estructura de metafields
 """
 
+import asyncio
 import logging
 from typing import Any, Dict, List
 
@@ -48,38 +49,18 @@ class MetafieldsManager:
                 }
                 metafields_set_input.append(metafield_input)
 
-            # Usar metafieldsSet mutation
-            metafields_mutation = """
-            mutation metafieldsSet($metafields: [MetafieldsSetInput!]!) {
-              metafieldsSet(metafields: $metafields) {
-                metafields {
-                  id
-                  key
-                  value
-                  definition {
-                    name
-                  }
-                }
-                userErrors {
-                  field
-                  message
-                }
-              }
-            }
-            """
-
-            metafields_result = await self.shopify_client._execute_query(
-                metafields_mutation, {"metafields": metafields_set_input}
+            # metafieldsSet por el batcher: los de productos procesados en paralelo van en un documento
+            set_result = await self.shopify_client.mutation_batcher.submit(
+                "metafieldsSet",
+                {"metafields": ("[MetafieldsSetInput!]!", metafields_set_input)},
+                "metafields { id key value } userErrors { field message }",
             )
 
-            if metafields_result and metafields_result.get("metafieldsSet"):
-                set_result = metafields_result["metafieldsSet"]
+            if set_result.get("userErrors"):
+                logger.warning(f"Metafields errors: {set_result['userErrors']}")
 
-                if set_result.get("userErrors"):
-                    logger.warning(f"Metafields errors: {set_result['userErrors']}")
-
-                created_metafields = set_result.get("metafields", [])
-                logger.info(f"✅ Created {len(created_metafields)} metafields")
+            created_metafields = set_result.get("metafields") or []
+            logger.info(f"✅ Created {len(created_metafields)} metafields")
 
         except Exception as e:
             logger.warning(f"❌ Failed to create metafields: {e}")
@@ -181,12 +162,19 @@ class MetafieldsManager:
             successes = []
             failures = []
 
-            for product_id, metafields in metafields_by_product.items():
-                try:
-                    await self.create_metafields(product_id, metafields)
+            # En paralelo para que el batcher agrupe los metafieldsSet de varios productos
+            items = list(metafields_by_product.items())
+            results = await asyncio.gather(
+                *(self.create_metafields(product_id, metafields) for product_id, metafields in items),
+                return_exceptions=True,
+            )
+            for (product_id, metafields), result in zip(items, results, strict=True):
+                if isinstance(result, Exception):
+                    failures.append(
+                        {"product_id": product_id, "error": str(result), "metafields_count": len(metafields)}
+                    )
+                else:
                     successes.append({"product_id": product_id, "metafields_count": len(metafields)})
-                except Exception as e:
-                    failures.append({"product_id": product_id, "error": str(e), "metafields_count": len(metafields)})
 
             logger.info(f"✅ Bulk metafields creation completed: {len(successes)} successes, {len(failures)} failures")
 
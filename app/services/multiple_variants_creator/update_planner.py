@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Planificador de mutaciones mínimas para actualizar productos en Shopify.
+
+Este módulo se encarga específicamente de:
+- Obtener en una sola consulta el estado actual del producto (campos base, tags,
+  metafields, variantes con precios e inventario en la ubicación principal)
+- Compararlo con el ShopifyProductInput deseado
+- Generar un plan con solo las operaciones necesarias (por ejemplo, solo un
+  productVariantsBulkUpdate de precios o solo dos cantidades de inventario)
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.api.v1.schemas.shopify_schemas import ShopifyProductInput
+from app.db.queries.products import PRODUCT_UPDATE_SNAPSHOT_QUERY
+from app.services.data_mapper import RMSToShopifyMapper
+
+from .data_preparator import DataPreparator
+from .inventory_manager import InventoryManager
+from .variant_manager import VariantManager
+
+logger = logging.getLogger(__name__)
+
+PLAN_OPERATIONS = (
+    "product_update",
+    "variants_create",
+    "variants_update",
+    "metafields_set",
+    "inventory_set",
+    "zero_stock_cleanup",
+)
+
+
+def _existing_combo(variant: Dict[str, Any]) -> str:
+    """Combinación normalizada de opciones de una variante de Shopify."""
+    sorted_options = sorted(variant.get("selectedOptions", []), key=lambda x: x.get("name", ""))
+    return " / ".join([f"{opt['name']}:{opt['value']}" for opt in sorted_options])
+
+
+def _available_quantity(variant: Dict[str, Any]) -> Optional[int]:
+    """Cantidad disponible de una variante de Shopify en la ubicación principal (None si no está activada)."""
+    level = (variant.get("inventoryItem") or {}).get("inventoryLevel") or {}
+    return next(
+        (quantity["quantity"] for quantity in level.get("quantities", []) if quantity.get("name") == "available"),
+        None,
+    )
+
+
+def _desired_combo(variant: Any) -> str:
+    """Combinación normalizada de opciones de una variante de RMS (Color, Size, ...)."""
+    option_pairs = []
+    for i, option_value in enumerate(getattr(variant, "options", None) or []):
+        option_name = "Color" if i == 0 else "Size" if i == 1 else f"Option{i+1}"
+        option_pairs.append((option_name, str(option_value)))
+    option_pairs.sort(key=lambda x: x[0])
+    return " / ".join([f"{name}:{value}" for name, value in option_pairs])
+
+
+@dataclass
+class ProductUpdatePlan:
+    """
+    Operaciones necesarias para llevar un producto de Shopify al estado deseado.
+    """
+
+    product_id: str
+    product_fields: Dict[str, Any] = field(default_factory=dict)
+    variants_create: List[Any] = field(default_factory=list)
+    variants_update: List[Tuple[Dict[str, Any], Any]] = field(default_factory=list)
+    metafields: List[Dict[str, Any]] = field(default_factory=list)
+    inventory_items: List[Dict[str, Any]] = field(default_factory=list)
+    inventory_needs_activation: bool = False
+    cleanup_candidates: List[str] = field(default_factory=list)
+
+    @property
+    def operations(self) -> List[str]:
+        """Operaciones del plan, en orden de ejecución."""
+        pending = {
+            "product_update": bool(self.product_fields),
+            "variants_create": bool(self.variants_create),
+            "variants_update": bool(self.variants_update),
+            "metafields_set": bool(self.metafields),
+            "inventory_set": bool(self.inventory_items or self.variants_create),
+            "zero_stock_cleanup": bool(self.cleanup_candidates),
+        }
+        return [operation for operation in PLAN_OPERATIONS if pending[operation]]
+
+    @property
+    def is_empty(self) -> bool:
+        """True si el producto ya está sincronizado."""
+        return not self.operations
+
+    def to_report(self) -> Dict[str, Any]:
+        """
+        Resumen del plan para reportes.
+
+        Returns:
+            Dict: Operaciones y cantidad de elementos por operación
+        """
+        return {
+            "operations": self.operations,
+            "product_fields": sorted(self.product_fields),
+            "variants_created": len(self.variants_create),
+            "variants_updated": len(self.variants_update),
+            "metafields_set": len(self.metafields),
+            "inventory_items": len(self.inventory_items),
+            "cleanup_candidates": len(self.cleanup_candidates),
+        }
+
+
+class UpdatePlanner:
+    """
+    Compara el producto deseado con el estado actual en Shopify y planifica las mutaciones.
+    """
+
+    def __init__(self, shopify_client, primary_location_id: str, plan_cleanup: bool = False):
+        """
+        Inicializa el planificador.
+
+        Args:
+            shopify_client: Cliente de Shopify GraphQL
+            primary_location_id: ID de la ubicación principal
+            plan_cleanup: Incluir candidatos a limpieza de variantes con stock 0 (solo si hay
+                servicio de limpieza configurado)
+        """
+        self.shopify_client = shopify_client
+        self.primary_location_id = primary_location_id
+        self.plan_cleanup = plan_cleanup
+        self.data_preparator = DataPreparator()
+        self.inventory_manager = InventoryManager(shopify_client, primary_location_id)
+
+    @staticmethod
+    def is_complete_snapshot(product: Optional[Dict[str, Any]]) -> bool:
+        """
+        Indica si un producto ya consultado (ej. en la consulta en lote por handle) trae
+        todo lo necesario para planificar, para no volver a consultarlo.
+
+        Args:
+            product: Producto obtenido de Shopify
+
+        Returns:
+            bool: True si incluye metafields e inventario de todas sus variantes
+        """
+        if not product or "metafields" not in product:
+            return False
+        variants = product.get("variants") or {}
+        if variants.get("pageInfo", {}).get("hasNextPage") is not False:
+            return False
+        return all("tracked" in (edge["node"].get("inventoryItem") or {}) for edge in variants.get("edges", []))
+
+    async def fetch_snapshot(self, product_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene el estado actual del producto en una sola consulta.
+
+        Args:
+            product_id: ID del producto
+
+        Returns:
+            Optional[Dict]: Producto con metafields y variantes, o None si no se puede
+                planificar (producto no encontrado o con más variantes de las que trae la consulta)
+        """
+        result = await self.shopify_client._execute_query(
+            PRODUCT_UPDATE_SNAPSHOT_QUERY, {"id": product_id, "locationId": self.primary_location_id}
+        )
+        product = (result or {}).get("product")
+        if not product:
+            return None
+
+        variants = product.get("variants", {})
+        if variants.get("pageInfo", {}).get("hasNextPage"):
+            logger.info(f"ℹ️ Product {product_id} has too many variants for a snapshot, using full update")
+            return None
+        return product
+
+    def build_plan(
+        self, product_id: str, shopify_input: ShopifyProductInput, snapshot: Dict[str, Any]
+    ) -> ProductUpdatePlan:
+        """
+        Genera el plan de actualización mínima.
+
+        Args:
+            product_id: ID del producto
+            shopify_input: Estado deseado (mapeado desde RMS)
+            snapshot: Estado actual obtenido con fetch_snapshot
+
+        Returns:
+            ProductUpdatePlan: Operaciones necesarias
+        """
+        plan = ProductUpdatePlan(product_id=product_id)
+        plan.product_fields = self._diff_product_fields(shopify_input, snapshot)
+        plan.metafields = self._diff_metafields(shopify_input.metafields or [], snapshot)
+
+        existing_variants = [edge["node"] for edge in snapshot.get("variants", {}).get("edges", [])]
+        existing_by_combo = {_existing_combo(variant): variant for variant in existing_variants}
+
+        kept_skus = set()
+        for variant in shopify_input.variants or []:
+            desired_quantity = self.inventory_manager._get_desired_quantity(variant)
+            if desired_quantity > 0:
+                kept_skus.add(variant.sku)
+
+            existing = existing_by_combo.get(_desired_combo(variant)) if variant.options else None
+            if existing is None:
+                plan.variants_create.append(variant)
+                continue
+
+            if self._variant_changed(existing, variant):
+                plan.variants_update.append((existing, variant))
+
+            inventory_item = self._diff_inventory(existing, variant, desired_quantity)
+            if inventory_item:
+                plan.inventory_items.append(inventory_item)
+                if not (existing.get("inventoryItem") or {}).get("inventoryLevel"):
+                    plan.inventory_needs_activation = True
+
+        # Solo las variantes de Shopify que RMS ya no tiene con stock pueden requerir limpieza;
+        # las que ya están en 0 en Shopify coinciden con RMS y no vuelven a consultar RMS
+        if self.plan_cleanup:
+            plan.cleanup_candidates = sorted(
+                variant["sku"]
+                for variant in existing_variants
+                if variant.get("sku") and variant["sku"] not in kept_skus and _available_quantity(variant) != 0
+            )
+        return plan
+
+    def plan_inventory_after_product_set(
+        self, shopify_input: ShopifyProductInput, snapshot: Dict[str, Any]
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Cantidades a escribir después de un productSet sobre un producto existente.
+
+        productSet solo aplica inventoryQuantities a variantes nuevas, así que las variantes
+        que ya existían se comparan con el snapshot. A diferencia de build_plan, las cantidades
+        en cero también se escriben porque en ese flujo no hay limpieza de variantes sin stock.
+
+        Args:
+            shopify_input: Estado deseado (mapeado desde RMS)
+            snapshot: Producto antes del productSet
+
+        Returns:
+            Tuple: (items para write_inventory_batch, si alguno requiere activación en la ubicación)
+        """
+        existing_by_combo = {
+            _existing_combo(edge["node"]): edge["node"] for edge in snapshot.get("variants", {}).get("edges", [])
+        }
+        items = []
+        needs_activation = False
+        for variant in shopify_input.variants or []:
+            existing = existing_by_combo.get(_desired_combo(variant)) if variant.options else None
+            inventory_item = (existing or {}).get("inventoryItem") or {}
+            if not inventory_item.get("id"):
+                continue
+
+            desired_quantity = self.inventory_manager._get_desired_quantity(variant)
+            level = inventory_item.get("inventoryLevel") or {}
+            available = next(
+                (
+                    quantity["quantity"]
+                    for quantity in level.get("quantities", [])
+                    if quantity.get("name") == "available"
+                ),
+                None,
+            )
+            if available == desired_quantity:
+                continue
+            items.append(
+                {
+                    "inventory_item_id": inventory_item["id"],
+                    "sku": variant.sku,
+                    "quantity": desired_quantity,
+                    "tracked": True,
+                }
+            )
+            needs_activation = needs_activation or not level
+        return items, needs_activation
+
+    def _diff_product_fields(self, shopify_input: ShopifyProductInput, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """Campos base (title, status, vendor, category, tags) que difieren del producto actual."""
+        existing_tags = snapshot.get("tags", [])
+        desired = self.data_preparator.prepare_product_update_data(shopify_input, existing_tags=existing_tags)
+
+        current = {
+            "title": snapshot.get("title"),
+            "status": snapshot.get("status"),
+            "vendor": snapshot.get("vendor"),
+            "category": (snapshot.get("category") or {}).get("id"),
+        }
+        changed = {}
+        for key, value in desired.items():
+            if key == "tags":
+                # Los tags RMS-SYNC con fecha antiguos no bastan para escribir; se quitan con el próximo cambio de tags
+                if set(value) != set(RMSToShopifyMapper.clean_rms_sync_tags(existing_tags)):
+                    changed[key] = value
+            elif value != current.get(key):
+                changed[key] = value
+        return changed
+
+    @staticmethod
+    def _diff_metafields(metafields: List[Dict[str, Any]], snapshot: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Metafields deseados que no existen o tienen otro valor o tipo."""
+        current = {
+            (node["namespace"], node["key"]): node
+            for node in (edge["node"] for edge in snapshot.get("metafields", {}).get("edges", []))
+        }
+        changed = []
+        for metafield in metafields:
+            existing = current.get((metafield.get("namespace"), metafield.get("key")))
+            if (
+                existing is None
+                or str(existing.get("value")) != str(metafield.get("value"))
+                or (metafield.get("type") and existing.get("type") != metafield["type"])
+            ):
+                changed.append(metafield)
+        return changed
+
+    @staticmethod
+    def _variant_changed(existing: Dict[str, Any], variant: Any) -> bool:
+        """Si cambió el precio, el precio de comparación o el SKU de una variante."""
+        if variant.sku and variant.sku != existing.get("sku"):
+            return True
+        desired_price = VariantManager._format_price(variant.price)
+        if desired_price is None or desired_price != VariantManager._format_price(existing.get("price")):
+            # Los precios inválidos pasan por las validaciones de update_existing_variants
+            return True
+        if variant.compareAtPrice:
+            desired_compare = VariantManager._format_price(variant.compareAtPrice)
+            if desired_compare != VariantManager._format_price(existing.get("compareAtPrice")):
+                return True
+        return False
+
+    @staticmethod
+    def _diff_inventory(existing: Dict[str, Any], variant: Any, desired_quantity: int) -> Optional[Dict[str, Any]]:
+        """Item para write_inventory_batch si la cantidad, el tracking o la activación difieren."""
+        inventory_item = existing.get("inventoryItem") or {}
+        if desired_quantity <= 0 or not inventory_item.get("id"):
+            return None
+
+        tracked = bool(inventory_item.get("tracked"))
+        if tracked and _available_quantity(existing) == desired_quantity:
+            return None
+        return {
+            "inventory_item_id": inventory_item["id"],
+            "sku": variant.sku,
+            "quantity": desired_quantity,
+            "tracked": tracked,
+        }
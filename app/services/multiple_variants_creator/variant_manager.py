@@ -7,18 +7,20 @@ Este módulo se encarga específicamente de:
 - Actualizar variantes existentes
 - Sincronizar variantes (crear nuevas, actualizar existentes)
 - Actualizar SKUs de variantes
-- Operaciones REST API para variantes
+- Operaciones REST API para variantes (respaldo, con la sesión HTTP compartida)
 """
 
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-import aiohttp
+from app.db.shopify_clients.client_registry import get_client_registry
 
 from .data_preparator import DataPreparator
 
 logger = logging.getLogger(__name__)
 
+MAX_REASONABLE_PRICE = 1000000.0  # 1 millón de colones
+
 
 class VariantManager:
     """
@@ -198,7 +200,7 @@ class VariantManager:
 
             # Actualizar variantes existentes si las hay
             if variants_to_update:
-                await self.update_existing_variants(variants_to_update)
+                await self.update_existing_variants(product_id, variants_to_update)
 
             logger.info(
                 f"✅ Variant sync completed: {len(variants_to_create)} created, {len(variants_to_update)} updated"
@@ -333,27 +335,32 @@ class VariantManager:
             # Actualizar variantes existentes si las hay
             if variants_to_update:
                 logger.info(f"🔄 Updating {len(variants_to_update)} existing variants...")
-                await self.update_existing_variants(variants_to_update)
+                await self.update_existing_variants(product_id, variants_to_update)
 
         except Exception as e:
             logger.error(f"❌ Error creating multiple variants: {e}")
             raise
 
-    async def update_existing_variants(self, variants_to_update: List[tuple]) -> None:
+    async def update_existing_variants(self, product_id: str, variants_to_update: List[tuple]) -> int:
         """
-        Actualiza variantes existentes.
+        Actualiza variantes existentes con un solo productVariantsBulkUpdate.
 
         Args:
+            product_id: ID del producto al que pertenecen las variantes
             variants_to_update: Lista de tuplas (existing_variant, new_variant_data)
+
+        Returns:
+            int: Número de variantes que debían escribirse y no se pudieron actualizar
+                (las que se saltan por validación de precio no cuentan)
         """
+        update_data = []
         try:
-            update_data = []
             for existing_variant, new_variant in variants_to_update:
                 # VALIDACIÓN CRÍTICA: Verificar si la variante existente ya tiene precio extremo
                 existing_price_str = existing_variant.get("price", "0")
                 try:
                     existing_price_float = float(existing_price_str)
-                    if existing_price_float > 1000000:
+                    if existing_price_float > MAX_REASONABLE_PRICE:
                         logger.error("🚨 VARIANTE YA CORRUPTA - NO ACTUALIZAR:")
                         logger.error(f"   SKU: {new_variant.sku}")
                         logger.error(f"   Precio actual en Shopify: ₡{existing_price_float:,.2f}")
@@ -366,7 +373,7 @@ class VariantManager:
 
                 # VALIDACIÓN DE PRECIO: Asegurar que el precio sea razonable
                 new_price_float = float(new_variant.price)
-                max_reasonable_price = 1000000.0  # 1 millón de colones
+                max_reasonable_price = MAX_REASONABLE_PRICE
 
                 if new_price_float > max_reasonable_price:
                     logger.error("🚨 PRECIO IRRACIONAL DETECTADO en actualización:")
@@ -446,25 +453,145 @@ class VariantManager:
 
             if update_data:
                 logger.info(f"🔄 Using bulk update for {len(update_data)} variants")
+                updated = await self.update_variants_bulk(product_id, update_data)
+                logger.info(f"✅ Updated {updated}/{len(update_data)} existing variants")
+                writable = sum(1 for variant_data in update_data if self._build_bulk_variant_input(variant_data))
+                return max(0, writable - updated)
+            return 0
+
+        except Exception as e:
+            logger.warning(f"❌ Error updating existing variants: {e}")
+            return len(update_data) or len(variants_to_update)
+
+    @staticmethod
+    def _format_price(value: Any) -> Optional[str]:
+        """
+        Formatea un precio para Shopify (CRC no usa decimales).
+
+        Args:
+            value: Precio a formatear
+
+        Returns:
+            Optional[str]: Precio entero como string, o None si es inválido o mayor
+                a 1 millón de colones (protección contra precios corruptos)
+        """
+        try:
+            price_float = float(value)
+        except (ValueError, TypeError):
+            return None
+        if price_float > MAX_REASONABLE_PRICE:
+            return None
+        return f"{price_float:.0f}"
+
+    def _build_bulk_variant_input(self, variant_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Convierte los datos de actualización de una variante a ProductVariantsBulkInput.
+
+        Args:
+            variant_data: Datos con id y opcionalmente price, compareAtPrice y sku
+
+        Returns:
+            Optional[Dict]: Input para productVariantsBulkUpdate, o None si no debe enviarse
+        """
+        bulk_input: Dict[str, Any] = {"id": variant_data["id"]}
+
+        if "price" in variant_data:
+            formatted_price = self._format_price(variant_data["price"])
+            if formatted_price is None:
+                logger.error("🚨 PRECIO EXTREMO O INVÁLIDO DETECTADO ANTES DE ENVIAR A SHOPIFY!")
+                logger.error(f"   Variant ID: {variant_data['id']} - Precio: {variant_data['price']}")
+                logger.error("   🛑 ABORTANDO actualización para prevenir corrupción")
+                return None
+            bulk_input["price"] = formatted_price
+
+        if variant_data.get("compareAtPrice") is not None:
+            formatted_compare_price = self._format_price(variant_data["compareAtPrice"])
+            if formatted_compare_price is not None:
+                bulk_input["compareAtPrice"] = formatted_compare_price
+            else:
+                logger.warning(f"⚠️ Removido compareAtPrice inválido: {variant_data['compareAtPrice']}")
+
+        if variant_data.get("sku"):
+            # El SKU vive en el inventory item desde la API 2024-04
+            bulk_input["inventoryItem"] = {"sku": variant_data["sku"]}
+
+        return bulk_input if len(bulk_input) > 1 else None
+
+    async def update_variants_bulk(self, product_id: str, variants_data: List[Dict[str, Any]]) -> int:
+        """
+        Actualiza precio, precio de comparación y SKU de varias variantes de un producto
+        con un solo productVariantsBulkUpdate.
 
-                # Como no tenemos product_id aquí, vamos a actualizar una por una usando la API correcta
-                for variant_update in update_data:
-                    await self.update_single_variant(variant_update)
+        Si la mutación falla, se actualiza variante por variante vía REST para aislar
+        la variante problemática.
 
-                logger.info(f"✅ Updated {len(update_data)} existing variants")
+        Args:
+            product_id: ID del producto
+            variants_data: Lista de dicts con id y opcionalmente price, compareAtPrice y sku
+
+        Returns:
+            int: Número de variantes actualizadas
+        """
+        bulk_inputs = [bulk_input for bulk_input in map(self._build_bulk_variant_input, variants_data) if bulk_input]
+        if not bulk_inputs:
+            logger.warning(f"   ⚠️ No valid variant updates for product {product_id}")
+            return 0
 
+        try:
+            result = await self.shopify_client.update_variants_bulk(product_id, bulk_inputs)
         except Exception as e:
-            logger.warning(f"❌ Error updating existing variants: {e}")
+            logger.warning(f"⚠️ Bulk variant update failed for {product_id}, falling back to REST per variant: {e}")
+            updated = 0
+            for variant_data in variants_data:
+                if await self.update_single_variant(variant_data):
+                    updated += 1
+            return updated
+
+        self._verify_returned_prices(bulk_inputs, result.get("productVariants") or [])
+        for bulk_input in bulk_inputs:
+            sku = bulk_input.get("inventoryItem", {}).get("sku", "")
+            logger.info(f"   ✅ Updated variant: {bulk_input['id']} {sku} - ₡{bulk_input.get('price', '-')}")
+        return len(bulk_inputs)
+
+    @staticmethod
+    def _verify_returned_prices(sent: List[Dict[str, Any]], returned: List[Dict[str, Any]]) -> None:
+        """
+        Verifica que Shopify haya guardado los precios enviados.
 
-    async def update_single_variant(self, variant_data: Dict[str, Any]) -> None:
+        Args:
+            sent: Inputs enviados a productVariantsBulkUpdate
+            returned: productVariants devueltos por la mutación
+        """
+        returned_by_id = {variant.get("id"): variant for variant in returned}
+        for bulk_input in sent:
+            if "price" not in bulk_input or bulk_input["id"] not in returned_by_id:
+                continue
+            try:
+                returned_price = float(returned_by_id[bulk_input["id"]].get("price"))
+            except (ValueError, TypeError):
+                continue
+            sent_price = float(bulk_input["price"])
+
+            if abs(returned_price - sent_price) > 1:  # Diferencia mayor a 1 colon
+                logger.error("🚨 DISCREPANCIA DE PRECIO DETECTADA!")
+                logger.error(f"   Variant ID: {bulk_input['id']}")
+                logger.error(f"   Enviado: ₡{sent_price:,.2f} - Recibido: ₡{returned_price:,.2f}")
+                if returned_price > MAX_REASONABLE_PRICE:
+                    logger.error("🚨 SHOPIFY DEVOLVIÓ PRECIO EXTREMO - PROBLEMA DE FORMATO!")
+
+    async def update_single_variant(self, variant_data: Dict[str, Any]) -> bool:
         """
-        Actualiza una sola variante usando REST API (más confiable para API 2025-04).
+        Actualiza una sola variante usando REST API.
+
+        Se usa como respaldo cuando productVariantsBulkUpdate falla para el producto.
 
         Args:
             variant_data: Datos de la variante a actualizar
+
+        Returns:
+            bool: True si la variante se actualizó
         """
         try:
-            # Usar REST API para actualizar la variante (más confiable)
             variant_id = variant_data["id"].split("/")[-1]  # Extract numeric ID
 
             update_payload = {}
@@ -475,167 +602,82 @@ class VariantManager:
             if "compareAtPrice" in variant_data:
                 update_payload["compare_at_price"] = variant_data["compareAtPrice"]
 
-            if update_payload:
-                await self.update_variant_via_rest(variant_id, update_payload)
-                logger.info(f"   ✅ Updated variant via REST: {variant_data.get('sku')} - ${variant_data.get('price')}")
-            else:
+            if not update_payload:
                 logger.warning(f"   ⚠️ No fields to update for variant {variant_data.get('id')}")
+                return False
+
+            result = await self.update_variant_via_rest(variant_id, update_payload)
+            if result is None:
+                return False
+            logger.info(f"   ✅ Updated variant via REST: {variant_data.get('sku')} - ₡{variant_data.get('price')}")
+            return True
 
         except Exception as e:
             logger.warning(f"❌ Error updating single variant: {e}")
+            return False
 
-    async def update_variant_via_rest(self, variant_id: str, update_data: Dict[str, Any]) -> None:
+    async def update_variant_via_rest(self, variant_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Actualiza una variante usando la REST API de Shopify.
 
+        Usa la sesión HTTP compartida y respeta X-Shopify-Shop-Api-Call-Limit.
+
         Args:
             variant_id: ID numérico de la variante
             update_data: Datos a actualizar
+
+        Returns:
+            Optional[Dict]: Variante actualizada, o None si el precio es inválido
         """
         try:
-            # DEBUGGING: Log detallado de lo que vamos a enviar
-            logger.info(f"🔍 DEBUG REST UPDATE - Variant ID: {variant_id}")
-            logger.info(f"🔍 DEBUG REST UPDATE - Input data: {update_data}")
-
             # VALIDACIÓN CRÍTICA: Verificar precio antes de enviar
             if "price" in update_data:
-                price_to_send = update_data["price"]
-
-                # DEBUGGING CRÍTICO: Log extra para variante problemática
-                if variant_id == "45313831174204":  # ID de la variante 24YM05051
-                    logger.error("🚨 REST UPDATE - VARIANTE PROBLEMÁTICA 24YM05051!")
-                    logger.error(f"   Variant ID: {variant_id}")
-                    logger.error(f"   Price input RAW: {repr(price_to_send)}")
-                    logger.error(f"   Price input type: {type(price_to_send)}")
-                    logger.error(f"   Full update_data: {update_data}")
-
-                try:
-                    price_float = float(price_to_send)
-                    if price_float > 1000000:  # 1 millón de colones
-                        logger.error("🚨 PRECIO EXTREMO DETECTADO ANTES DE ENVIAR A REST API!")
-                        logger.error(f"   Variant ID: {variant_id}")
-                        logger.error(f"   Precio a enviar: ₡{price_float:,.2f}")
-                        logger.error("   🛑 ABORTANDO actualización REST para prevenir corrupción")
-                        return None
-                    else:
-                        logger.info(f"✅ Precio válido a enviar: ₡{price_float:,.2f}")
-
-                        # SOLUCIÓN CRÍTICA: Formato específico para Shopify REST API
-                        # Shopify espera precios en formato string usando punto como separador
-                        # CRC no usa decimales - enviamos enteros
-                        formatted_price = f"{price_float:.0f}"
-                        logger.info(f"🔧 Precio formateado para Shopify: '{formatted_price}'")
-                        update_data["price"] = formatted_price
-
-                except ValueError:
-                    logger.error(f"🚨 Precio no es un número válido: {price_to_send}")
+                formatted_price = self._format_price(update_data["price"])
+                if formatted_price is None:
+                    logger.error("🚨 PRECIO EXTREMO O INVÁLIDO DETECTADO ANTES DE ENVIAR A REST API!")
+                    logger.error(f"   Variant ID: {variant_id} - Precio: {update_data['price']}")
+                    logger.error("   🛑 ABORTANDO actualización REST para prevenir corrupción")
                     return None
+                update_data["price"] = formatted_price
 
-            # SOLUCIÓN ADICIONAL: Formatear compare_at_price también
             if "compare_at_price" in update_data:
-                try:
-                    compare_price_float = float(update_data["compare_at_price"])
-                    if compare_price_float <= 1000000:  # Solo si es válido
-                        formatted_compare_price = f"{compare_price_float:.0f}"
-                        logger.info(f"🔧 Compare price formateado: '{formatted_compare_price}'")
-                        update_data["compare_at_price"] = formatted_compare_price
-                    else:
-                        # Remover precio de comparación inválido
-                        del update_data["compare_at_price"]
-                        logger.warning(f"⚠️ Removido compare_at_price inválido: {compare_price_float}")
-                except (ValueError, TypeError):
-                    # Remover precio de comparación malformado
+                formatted_compare_price = self._format_price(update_data["compare_at_price"])
+                if formatted_compare_price is not None:
+                    update_data["compare_at_price"] = formatted_compare_price
+                else:
                     del update_data["compare_at_price"]
-                    logger.warning("⚠️ Removido compare_at_price malformado")
-
-            # Usar el HTTP client del shopify_client para REST API
-            shop_domain = self.shopify_client.shop_url.replace("https://", "").replace(".myshopify.com", "")
-            rest_url = f"https://{shop_domain}.myshopify.com/admin/api/2025-04/variants/{variant_id}.json"
-
-            headers = {"X-Shopify-Access-Token": self.shopify_client.access_token, "Content-Type": "application/json"}
+                    logger.warning("⚠️ Removido compare_at_price inválido")
 
             data = {"variant": {"id": int(variant_id), **update_data}}
+            status, result = await get_client_registry().rest_request("PUT", f"variants/{variant_id}.json", data)
 
-            # DEBUGGING: Log del payload exacto con formato corregido
-            logger.info(f"🔍 DEBUG REST UPDATE - URL: {rest_url}")
-            logger.info(f"🔍 DEBUG REST UPDATE - Formatted payload: {data}")
-
-            async with aiohttp.ClientSession() as session:
-                async with session.put(rest_url, headers=headers, json=data) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        variant_result = result.get("variant")
-
-                        # VERIFICACIÓN POST-UPDATE: Confirmar que Shopify recibió el precio correcto
-                        if variant_result and "price" in variant_result:
-                            returned_price = float(variant_result["price"])
-                            sent_price = float(update_data.get("price", 0))
-
-                            logger.info(f"📤 Precio enviado: ₡{sent_price:,.2f}")
-                            logger.info(f"📥 Precio confirmado por Shopify: ₡{returned_price:,.2f}")
-
-                            if abs(returned_price - sent_price) > 1:  # Diferencia mayor a 1 colon
-                                logger.error("🚨 DISCREPANCIA DE PRECIO DETECTADA!")
-                                logger.error(f"   Enviado: ₡{sent_price:,.2f}")
-                                logger.error(f"   Recibido: ₡{returned_price:,.2f}")
-                                logger.error(f"   Diferencia: ₡{returned_price - sent_price:,.2f}")
-
-                                # Si el precio devuelto es extremo, loguearlo como error crítico
-                                if returned_price > 1000000:
-                                    logger.error("🚨 SHOPIFY DEVOLVIÓ PRECIO EXTREMO - PROBLEMA DE FORMATO!")
-                            else:
-                                logger.info("✅ Precio confirmado correctamente por Shopify")
-
-                        return variant_result
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"❌ REST API error {response.status}: {error_text}")
-                        raise Exception(f"REST API error {response.status}: {error_text}")
-
-        except Exception as e:
-            logger.error(f"❌ Error updating variant via REST: {e}")
-            raise
-
-    async def update_variant_sku_via_rest(self, variant_id: str, sku: str) -> None:
-        """
-        Actualiza el SKU de una variante usando la REST API de Shopify.
-
-        Args:
-            variant_id: ID numérico de la variante
-            sku: Nuevo SKU a asignar
-        """
-        try:
-            # Usar el HTTP client del shopify_client para REST API
-            shop_domain = self.shopify_client.shop_url.replace("https://", "").replace(".myshopify.com", "")
-            rest_url = f"https://{shop_domain}.myshopify.com/admin/api/2025-04/variants/{variant_id}.json"
-
-            headers = {"X-Shopify-Access-Token": self.shopify_client.access_token, "Content-Type": "application/json"}
-
-            data = {"variant": {"id": int(variant_id), "sku": sku}}
+            if status != 200:
+                logger.error(f"❌ REST API error {status}: {result}")
+                raise Exception(f"REST API error {status}: {result}")
 
-            async with aiohttp.ClientSession() as session:
-                async with session.put(rest_url, headers=headers, json=data) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result.get("variant")
-                    else:
-                        error_text = await response.text()
-                        raise Exception(f"REST API error {response.status}: {error_text}")
+            variant_result = result.get("variant")
+            if variant_result and "price" in update_data:
+                self._verify_returned_prices(
+                    [{"id": variant_result.get("id"), "price": update_data["price"]}], [variant_result]
+                )
+            return variant_result
 
         except Exception as e:
-            logger.warning(f"❌ Error updating variant SKU via REST: {e}")
+            logger.error(f"❌ Error updating variant via REST: {e}")
             raise
 
     async def update_variant_skus(
         self, created_variants: List[Dict[str, Any]], original_variants: List[Any], product_id: str
     ) -> None:
         """
-        Actualiza los SKUs de las variantes creadas ya que ProductVariantsBulkInput no acepta SKU.
+        Actualiza los SKUs de las variantes creadas ya que ProductVariantsBulkInput no acepta el campo sku.
+
+        Los SKUs se envían como inventoryItem.sku en un solo productVariantsBulkUpdate.
 
         Args:
             created_variants: Variantes creadas por Shopify
             original_variants: Variantes originales con SKUs
-            product_id: ID del producto (para compatibilidad)
+            product_id: ID del producto
         """
         try:
             logger.info("🔄 Updating SKUs for existing variants... Product ID: " + str(product_id))
@@ -658,31 +700,8 @@ class VariantManager:
 
             if variants_update_data:
                 logger.info(f"🔄 Updating SKUs for {len(variants_update_data)} variants...")
-
-                # Usar REST API para actualizar SKUs (más simple y confiable)
-                try:
-                    logger.info(f"🔄 Updating SKUs using REST API for {len(variants_update_data)} variants...")
-
-                    success_count = 0
-                    for variant_update in variants_update_data:
-                        try:
-                            # Usar REST API para actualizar SKU
-                            variant_id = variant_update["id"].split("/")[-1]  # Extract numeric ID
-                            await self.update_variant_sku_via_rest(variant_id, variant_update["sku"])
-                            success_count += 1
-                            logger.info(
-                                f"   ✅ SKU updated via REST: {variant_update['id']} -> {variant_update['sku']}"
-                            )
-                        except Exception as e:
-                            logger.warning(f"   ❌ Failed to update SKU for {variant_update['id']}: {e}")
-
-                    logger.info(
-                        f"✅ Successfully updated {success_count}/{len(variants_update_data)} variant SKUs via REST API"
-                    )
-
-                except Exception as e:
-                    logger.warning(f"❌ Error during SKU updates: {e}")
-                    logger.info("⏭️ Skipping SKU updates due to error")
+                success_count = await self.update_variants_bulk(product_id, variants_update_data)
+                logger.info(f"✅ Successfully updated {success_count}/{len(variants_update_data)} variant SKUs")
 
         except Exception as e:
             logger.warning(f"❌ Error updating variant SKUs: {e}")
@@ -0,0 +1,278 @@
+"""
+Ledger de fingerprints de contenido por CCOD.
+
+Cada producto mapeado (``ShopifyProductInput``) se resume en un hash estable
+más sub-hashes por sección (datos base, precios, inventario, metafields y
+opciones). Si el fingerprint de un CCOD coincide con el registrado en la última
+escritura exitosa, el producto no cambió en RMS y la sincronización puede
+omitirlo sin llamar a Shopify.
+
+Además guarda cuándo se verificó por última vez cada CCOD contra RMS (escrito o
+confirmado sin cambios). El reverse sync lo consulta para no revisar productos
+que la sincronización principal ya verificó ese día; reemplaza a los tags
+diarios RMS-SYNC-YY-MM-DD, que cambiaban los tags de todo el catálogo cada día.
+
+El ledger se guarda en un hash de Redis (compartido entre réplicas) y, si Redis
+no está disponible, en un archivo JSON local, igual que los checkpoints.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, cast
+
+import redis.asyncio as redis
+
+from app.api.v1.schemas.shopify_schemas import ShopifyProductInput
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_SECTIONS = ("core", "price", "inventory", "metafields", "options")
+
+# Tags de sincronización con fecha de versiones anteriores (aún presentes en productos existentes)
+VOLATILE_TAG_PREFIXES = ("RMS-SYNC-",)
+
+
+def _digest(value: Any) -> str:
+    """Hash estable de una estructura JSON-serializable."""
+    payload = json.dumps(value, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def compute_product_fingerprint(product: ShopifyProductInput) -> Dict[str, str]:
+    """
+    Calcula el fingerprint de un producto mapeado.
+
+    Args:
+        product: Producto mapeado desde RMS
+
+    Returns:
+        Dict: Sub-hash por sección de FINGERPRINT_SECTIONS más "product" (hash total)
+    """
+    variants = sorted(product.variants or [], key=lambda variant: variant.sku)
+    tags = sorted(tag for tag in product.tags or [] if not tag.startswith(VOLATILE_TAG_PREFIXES))
+
+    sections = {
+        "core": _digest(
+            {
+                "title": product.title,
+                "handle": product.handle,
+                "status": product.status,
+                "vendor": product.vendor,
+                "productType": product.productType,
+                "category": product.category,
+                "description": product.description,
+                "tags": tags,
+            }
+        ),
+        "price": _digest([(variant.sku, variant.price, variant.compareAtPrice) for variant in variants]),
+        "inventory": _digest(
+            [
+                (variant.sku, variant.inventoryQuantities, variant.inventoryManagement, variant.inventoryPolicy)
+                for variant in variants
+            ]
+        ),
+        "metafields": _digest(
+            sorted(product.metafields or [], key=lambda metafield: (metafield.get("namespace"), metafield.get("key")))
+        ),
+        "options": _digest({"options": product.options, "variants": [(v.sku, v.options) for v in variants]}),
+    }
+    sections["product"] = _digest([sections[name] for name in FINGERPRINT_SECTIONS])
+    return sections
+
+
+def changed_sections(previous: Optional[Dict[str, Any]], current: Dict[str, str]) -> List[str]:
+    """
+    Compara dos fingerprints.
+
+    Args:
+        previous: Fingerprint registrado (None si el CCOD no está en el ledger)
+        current: Fingerprint actual
+
+    Returns:
+        List[str]: Secciones que cambiaron (todas si no hay registro previo)
+    """
+    if not previous:
+        return list(FINGERPRINT_SECTIONS)
+    return [name for name in FINGERPRINT_SECTIONS if previous.get(name) != current.get(name)]
+
+
+class FingerprintLedger:
+    """
+    Almacén de fingerprints por CCOD (Redis con respaldo en archivo local).
+    """
+
+    def __init__(self, max_age_hours: Optional[float] = None, file_path: Optional[Path] = None):
+        """
+        Inicializa el ledger.
+
+        Args:
+            max_age_hours: Antigüedad máxima de un registro para confiar en él
+                (default: SYNC_FINGERPRINT_MAX_AGE_HOURS); los más viejos se re-sincronizan
+            file_path: Archivo JSON de respaldo sin Redis (las verificaciones van en
+                un archivo hermano con sufijo _verified)
+        """
+        self.max_age_hours = max_age_hours if max_age_hours is not None else settings.SYNC_FINGERPRINT_MAX_AGE_HOURS
+        self.file_path = file_path or Path("checkpoints") / "product_fingerprints.json"
+        self.verified_file_path = self.file_path.with_name(f"{self.file_path.stem}_verified.json")
+        self.redis_key = "sync:fingerprints"
+        self.verified_redis_key = "sync:verified"
+        self.redis_client: Optional[redis.Redis] = None
+        self._local: Dict[str, Dict[str, Any]] = {}
+        self._verified: Dict[str, float] = {}
+
+    async def initialize(self) -> None:
+        """Conecta con Redis si está disponible; si no, carga el archivo local."""
+        try:
+            if settings.REDIS_URL:
+                self.redis_client = await redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
+                await self.redis_client.ping()
+                logger.info("🧾 Fingerprint ledger initialized with Redis")
+                return
+        except Exception as e:
+            logger.debug(f"Redis not available for fingerprint ledger, using local file: {e}")
+            self.redis_client = None
+
+        if self.file_path.exists():
+            try:
+                self._local = json.loads(self.file_path.read_text())
+            except Exception as e:
+                logger.warning(f"⚠️ Could not load fingerprint ledger file, starting empty: {e}")
+                self._local = {}
+        if self.verified_file_path.exists():
+            try:
+                self._verified = json.loads(self.verified_file_path.read_text())
+            except Exception as e:
+                logger.warning(f"⚠️ Could not load verification ledger file, starting empty: {e}")
+                self._verified = {}
+        logger.info(f"🧾 Fingerprint ledger initialized with local file ({len(self._local)} CCODs)")
+
+    async def close(self) -> None:
+        """Cierra la conexión con Redis."""
+        if self.redis_client:
+            await self.redis_client.close()
+            self.redis_client = None
+
+    def _is_fresh(self, record: Dict[str, Any]) -> bool:
+        """Si el registro es suficientemente reciente para omitir el producto."""
+        if not self.max_age_hours:
+            return True
+        return time.time() - record.get("recorded_at", 0) <= self.max_age_hours * 3600
+
+    async def get_many(self, ccods: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Obtiene los fingerprints vigentes de varios CCODs en una sola llamada.
+
+        Args:
+            ccods: CCODs a consultar
+
+        Returns:
+            Dict: CCOD -> fingerprint (solo los registrados y no vencidos)
+        """
+        ccods = list(ccods)
+        if not ccods:
+            return {}
+
+        if self.redis_client:
+            try:
+                values = await cast(Awaitable[List[Optional[str]]], self.redis_client.hmget(self.redis_key, ccods))
+                records = {ccod: json.loads(value) for ccod, value in zip(ccods, values, strict=True) if value}
+            except Exception as e:
+                logger.warning(f"⚠️ Error reading fingerprint ledger from Redis: {e}")
+                return {}
+        else:
+            records = {ccod: self._local[ccod] for ccod in ccods if ccod in self._local}
+
+        return {ccod: record for ccod, record in records.items() if self._is_fresh(record)}
+
+    async def set_many(self, fingerprints: Dict[str, Dict[str, str]]) -> None:
+        """
+        Registra los fingerprints de productos escritos con éxito (y los marca como verificados).
+
+        Args:
+            fingerprints: CCOD -> fingerprint
+        """
+        if not fingerprints:
+            return
+        await self.mark_verified(fingerprints)
+
+        now = time.time()
+        records = {ccod: {**fingerprint, "recorded_at": now} for ccod, fingerprint in fingerprints.items()}
+
+        if self.redis_client:
+            try:
+                await cast(
+                    Awaitable[int],
+                    self.redis_client.hset(
+                        self.redis_key, mapping={ccod: json.dumps(record) for ccod, record in records.items()}
+                    ),
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Error writing fingerprint ledger to Redis: {e}")
+            return
+
+        self._local.update(records)
+        try:
+            self.file_path.parent.mkdir(exist_ok=True)
+            self.file_path.write_text(json.dumps(self._local))
+        except Exception as e:
+            logger.warning(f"⚠️ Error writing fingerprint ledger file: {e}")
+
+    async def get_verified_at(self, ccods: Iterable[str]) -> Dict[str, float]:
+        """
+        Obtiene cuándo se verificó por última vez cada CCOD, en una sola llamada.
+
+        Args:
+            ccods: CCODs a consultar
+
+        Returns:
+            Dict: CCOD -> timestamp de la última verificación (solo los registrados)
+        """
+        ccods = list(ccods)
+        if not ccods:
+            return {}
+
+        if self.redis_client:
+            try:
+                values = await cast(
+                    Awaitable[List[Optional[str]]], self.redis_client.hmget(self.verified_redis_key, ccods)
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Error reading verification ledger from Redis: {e}")
+                return {}
+            return {ccod: float(value) for ccod, value in zip(ccods, values, strict=True) if value}
+
+        return {ccod: self._verified[ccod] for ccod in ccods if ccod in self._verified}
+
+    async def mark_verified(self, ccods: Iterable[str]) -> None:
+        """
+        Registra que el stock y contenido de estos CCODs coinciden con RMS en este momento.
+
+        Args:
+            ccods: CCODs escritos o confirmados sin cambios
+        """
+        ccods = list(ccods)
+        if not ccods:
+            return
+
+        now = time.time()
+        if self.redis_client:
+            try:
+                await cast(
+                    Awaitable[int],
+                    self.redis_client.hset(self.verified_redis_key, mapping={ccod: now for ccod in ccods}),
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Error writing verification ledger to Redis: {e}")
+            return
+
+        self._verified.update(dict.fromkeys(ccods, now))
+        try:
+            self.verified_file_path.parent.mkdir(exist_ok=True)
+            self.verified_file_path.write_text(json.dumps(self._verified))
+        except Exception as e:
+            logger.warning(f"⚠️ Error writing verification ledger file: {e}")
@@ -2,8 +2,8 @@
 Reverse Stock Synchronization Service: Shopify → RMS.
 
 This service ensures complete inventory synchronization by:
-1. Finding products in Shopify without today's sync tag
-2. Querying current stock from RMS
+1. Finding active products in Shopify that the sync ledger has not verified today
+2. Querying current stock from RMS (one query per page of products)
 3. Updating inventory in Shopify
 4. Deleting variants with zero stock
 """
@@ -11,7 +11,9 @@ This service ensures complete inventory synchronization by:
 import asyncio
 import logging
 from datetime import UTC, datetime
-from typing import Any
+from typing import Any, cast
+
+import pandas as pd
 
 from app.core.config import get_settings
 
@@ -20,16 +22,29 @@ from app.core.config import get_settings
 #     BULK_UPDATE_INVENTORY_MUTATION,  # Used by inventory.set_variant_inventory_quantity()
 #     DELETE_VARIANT_MUTATION,  # Used by products.delete_variant()
 #     INVENTORY_ITEM_QUERY,  # Used by inventory.get_inventory_item()
-#     PRODUCTS_WITHOUT_TAG_QUERY,  # Used by products.get_products_without_tag()
+#     PRODUCTS_WITHOUT_TAG_QUERY,  # Used by products.get_active_products_with_inventory()
 #     VARIANT_RECENT_ORDERS_QUERY,  # Not currently used
 # )
 from app.db.rms.product_repository import ProductRepository
 from app.db.shopify_graphql_client import ShopifyGraphQLClient
+from app.services.bulk_operations import ShopifyBulkOperations
+from app.services.catalog_mirror import CatalogMirror
+from app.services.inventory_reconciliation import (
+    compute_inventory_drift,
+    rms_quantities_to_frame,
+    summarize_drift,
+    variants_to_frame,
+)
+from app.services.product_fingerprint import FingerprintLedger
+from app.utils.distributed_lock import LockAcquisitionError, ProductLock, acquire_many, release_many
 from app.utils.error_handler import SyncException
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Handles per live product lookup (same batch as the RMS → Shopify existence check)
+MAX_HANDLES_PER_QUERY = 50
+
 
 class ReverseStockSynchronizer:
     """
@@ -44,6 +59,8 @@ class ReverseStockSynchronizer:
         shopify_client: ShopifyGraphQLClient,
         product_repository: ProductRepository,
         primary_location_id: str,
+        catalog_mirror: CatalogMirror | None = None,
+        fingerprint_ledger: FingerprintLedger | None = None,
     ):
         """
         Initialize the reverse stock synchronizer.
@@ -52,10 +69,16 @@ class ReverseStockSynchronizer:
             shopify_client: Shopify GraphQL client for API operations
             product_repository: RMS repository for stock queries
             primary_location_id: Primary Shopify location ID
+            catalog_mirror: Local catalog mirror; when fresh, unsynced products are
+                selected from it instead of paginating Shopify and then re-read by handle
+            fingerprint_ledger: Sync ledger shared with the RMS → Shopify sync; products
+                verified today are skipped and reconciled ones are recorded in it
         """
         self.shopify_client = shopify_client
         self.product_repository = product_repository
         self.primary_location_id = primary_location_id
+        self.catalog_mirror = catalog_mirror
+        self.fingerprint_ledger = fingerprint_ledger
         self.sync_id = f"reverse_stock_{datetime.now(UTC).strftime('%Y%m%d_%H%M%S')}"
 
         # Statistics tracking
@@ -66,6 +89,7 @@ class ReverseStockSynchronizer:
             "total_variants_deleted": 0,
             "errors": 0,
             "skipped": 0,
+            "already_verified": 0,
             "products_without_ccod": 0,
             "products_with_ccod": 0,
             "details": {"updated": [], "deleted": [], "errors": []},
@@ -102,29 +126,73 @@ class ReverseStockSynchronizer:
 
             start_time = datetime.now(UTC)
 
-            # Get today's sync tag
-            today_tag = self._get_today_sync_tag()
-            logger.info(f"🏷️ Looking for products WITHOUT tag: {today_tag}")
-
-            # Query unsynced products from Shopify
-            unsynced_products = await self._get_unsynced_products(today_tag, batch_size, limit)
-
-            logger.info(f"📦 Found {len(unsynced_products)} products to process")
+            # Products verified since midnight (by either sync) are already up to date
+            verified_since = start_time.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+            logger.info(f"🧾 Looking for products not verified since {datetime.fromtimestamp(verified_since, UTC)}")
 
             # Process products in parallel with semaphore for concurrency control
             semaphore = asyncio.Semaphore(max_concurrent)
 
-            async def process_with_semaphore(product):
+            async def process_with_semaphore(product, page_stock, product_lock):
                 """Process product with semaphore-controlled concurrency."""
                 async with semaphore:
-                    await self._process_product(product, dry_run, delete_zero_stock)
+                    return await self._process_product(
+                        product, dry_run, delete_zero_stock, page_stock, product_lock=product_lock
+                    )
 
-            # Create tasks for parallel processing
-            tasks = [process_with_semaphore(product) for product in unsynced_products]
+            # The next page is fetched while the current one is processed. The one-slot queue
+            # provides backpressure, so at most two pages of products are held in memory.
+            page_queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+            async def produce_pages() -> None:
+                """Fetch unsynced pages and hand them to the processing stage."""
+                try:
+                    async for page in self._iter_unsynced_pages(verified_since, batch_size, limit):
+                        await page_queue.put(page)
+                except Exception as e:
+                    await page_queue.put(e)
+                    return
+                await page_queue.put(None)
+
+            logger.info(f"🚀 Processing unsynced products with max {max_concurrent} concurrent workers")
+            producer = asyncio.create_task(produce_pages())
+            try:
+                while (page := await page_queue.get()) is not None:
+                    if isinstance(page, Exception):
+                        raise page
+
+                    # One RMS query for the stock of the whole page, shared by its product tasks
+                    page_stock = await self._load_page_stock(page)
+
+                    # One Redis call locks every free product of the page; busy ones are waited on by their task
+                    page_locks = [ProductLock(product_id=product.get("id"), timeout_seconds=300) for product in page]
+                    await acquire_many(page_locks)
+
+                    # Execute the page's tasks concurrently (with semaphore limiting concurrency)
+                    try:
+                        results = await asyncio.gather(
+                            *(
+                                process_with_semaphore(product, page_stock, product_lock)
+                                for product, product_lock in zip(page, page_locks, strict=True)
+                            ),
+                            return_exceptions=True,
+                        )
+                    finally:
+                        await release_many(page_locks)
+
+                    # One ledger write for the page's reconciled products (replaces a tag mutation per product)
+                    if self.fingerprint_ledger:
+                        await self.fingerprint_ledger.mark_verified(
+                            self._extract_ccod_from_metafields(product).strip().upper()
+                            for product, result in zip(page, results, strict=True)
+                            if result is True
+                        )
+            finally:
+                if not producer.done():
+                    producer.cancel()
+                    await asyncio.gather(producer, return_exceptions=True)
 
-            # Execute all tasks concurrently (with semaphore limiting concurrency)
-            logger.info(f"🚀 Processing {len(tasks)} products with max {max_concurrent} concurrent workers")
-            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(f"📦 Processed {self.stats['total_products_checked']} unsynced products")
 
             # Calculate duration and performance metrics
             duration = (datetime.now(UTC) - start_time).total_seconds()
@@ -157,6 +225,7 @@ class ReverseStockSynchronizer:
                     "variants_deleted": self.stats["total_variants_deleted"],
                     "errors": self.stats["errors"],
                     "skipped": self.stats["skipped"],
+                    "already_verified": self.stats["already_verified"],
                     "products_without_ccod": self.stats["products_without_ccod"],
                     "products_with_ccod": self.stats["products_with_ccod"],
                 },
@@ -189,19 +258,243 @@ class ReverseStockSynchronizer:
                 message=f"Reverse stock sync failed: {e}", service="reverse_stock_sync", operation="execute"
             ) from e
 
-    async def _get_unsynced_products(self, exclude_tag: str, batch_size: int, limit: int | None) -> list[dict]:
+    async def execute_reconciliation(
+        self,
+        dry_run: bool = False,
+        delete_zero_stock: bool = True,
+        max_concurrent: int = 10,
+        sample_size: int = 50,
+    ) -> dict[str, Any]:
         """
-        Query products from Shopify that don't have the sync tag.
+        Reconcile the whole catalog with RMS from two full exports instead of product by product.
+
+        Shopify variants come from one bulk operation and RMS quantities from one
+        View_Items query; both are joined in memory on the lower-cased SKU, and only
+        the drifted variants are written (batched quantity sets and validated deletions).
+        The sync ledger is not consulted: every active variant is compared.
 
         Args:
-            exclude_tag: Tag to exclude (e.g., "RMS-SYNC-2025-01-11")
+            dry_run: If True, only report the drift without making changes
+            delete_zero_stock: If True, delete variants with zero stock in RMS
+            max_concurrent: Maximum number of products whose deletions run at the same time
+            sample_size: Maximum variants listed per action in the drift report
+
+        Returns:
+            Drift report with counts, samples and the write results
+        """
+        try:
+            logger.info(
+                f"🔎 Starting inventory reconciliation [sync_id: {self.sync_id}] - "
+                f"Dry run: {dry_run}, Delete zero stock: {delete_zero_stock}"
+            )
+            start_time = datetime.now(UTC)
+
+            bulk_operations = ShopifyBulkOperations(self.shopify_client)
+            variants, export_stats = await bulk_operations.extract_variant_inventory_bulk(self.primary_location_id)
+            rms_items = await self.product_repository.get_item_quantities()
+
+            shopify_frame = variants_to_frame(variants)
+            drift = compute_inventory_drift(
+                shopify_frame,
+                rms_quantities_to_frame(rms_items),
+                delete_zero_stock=delete_zero_stock,
+                preserve_single_variant=settings.REVERSE_SYNC_PRESERVE_SINGLE_VARIANT,
+            )
+            compared_seconds = (datetime.now(UTC) - start_time).total_seconds()
+            summary = summarize_drift(drift, sample_size)
+            logger.info(f"📊 Drift computed in {compared_seconds:.1f}s: {summary['counts']}")
+
+            self.stats["total_variants_checked"] = len(shopify_frame)
+            self.stats["skipped"] += summary["counts"]["preserve"]
+            await self._apply_quantity_drift(cast(pd.DataFrame, drift[drift["action"] == "update"]), dry_run)
+            await self._apply_zero_stock_drift(
+                shopify_frame, cast(pd.DataFrame, drift[drift["action"] == "delete"]), dry_run, max_concurrent
+            )
+
+            duration = (datetime.now(UTC) - start_time).total_seconds()
+            report = {
+                "sync_id": self.sync_id,
+                "mode": "reconciliation",
+                "timestamp": datetime.now(UTC).isoformat(),
+                "dry_run": dry_run,
+                "delete_zero_stock": delete_zero_stock,
+                "duration_seconds": round(duration, 2),
+                "statistics": {
+                    "variants_exported": len(shopify_frame),
+                    "rms_items": len(rms_items),
+                    "variants_checked": self.stats["total_variants_checked"],
+                    "variants_updated": self.stats["total_variants_updated"],
+                    "variants_deleted": self.stats["total_variants_deleted"],
+                    "errors": self.stats["errors"],
+                    "skipped": self.stats["skipped"],
+                },
+                "drift": summary,
+                "performance": {
+                    "bulk_export_seconds": round(export_stats["duration_seconds"], 2),
+                    "drift_computed_after_seconds": round(compared_seconds, 2),
+                },
+                "details": self.stats["details"],
+            }
+
+            logger.info(
+                f"🎉 Inventory reconciliation completed [sync_id: {self.sync_id}] - "
+                f"✅ {self.stats['total_variants_updated']} updated, "
+                f"🗑️ {self.stats['total_variants_deleted']} deleted, "
+                f"❌ {self.stats['errors']} errors in {duration:.1f}s"
+            )
+            return report
+
+        except Exception as e:
+            logger.error(f"❌ Error in inventory reconciliation: {e}", exc_info=True)
+            raise SyncException(
+                message=f"Inventory reconciliation failed: {e}", service="reverse_stock_sync", operation="reconcile"
+            ) from e
+
+    async def _apply_quantity_drift(self, updates: pd.DataFrame, dry_run: bool) -> None:
+        """
+        Set the RMS quantity of every mismatched variant with batched inventory writes.
+
+        Args:
+            updates: "update" rows of the drift frame
+            dry_run: If True, only record what would be written
+        """
+        items = [
+            {
+                "inventory_item_id": row["inventory_item_id"],
+                "sku": row["sku"],
+                "quantity": int(row["rms_qty"]),
+                "original_qty": None if pd.isna(row["shopify_qty"]) else int(row["shopify_qty"]),
+            }
+            for row in updates.to_dict("records")
+        ]
+        if not items:
+            return
+
+        written = []
+        if dry_run:
+            written = items
+        else:
+            # Items not stocked at the location (no quantity in the export) are activated first
+            for activate in (False, True):
+                batch = [item for item in items if (item["original_qty"] is None) == activate]
+                if not batch:
+                    continue
+                results = await self.shopify_client.write_inventory_batch(
+                    batch, self.primary_location_id, activate=activate
+                )
+                for item, result in zip(batch, results, strict=True):
+                    if result["success"]:
+                        written.append(item)
+                    else:
+                        self.stats["errors"] += 1
+                        self.stats["details"]["errors"].append({"sku": item["sku"], "error": result["errors"]})
+            await self._record_in_mirror(
+                "set_available", {item["inventory_item_id"]: item["quantity"] for item in written}
+            )
+
+        self.stats["total_variants_updated"] += len(written)
+        self.stats["details"]["updated"].extend(
+            {"sku": item["sku"], "old_qty": item["original_qty"], "new_qty": item["quantity"], "dry_run": dry_run}
+            for item in written
+        )
+
+    async def _apply_zero_stock_drift(
+        self, shopify_frame: pd.DataFrame, deletions: pd.DataFrame, dry_run: bool, max_concurrent: int
+    ) -> None:
+        """
+        Delete the zero-stock variants of the drift, product by product, with the usual validations.
+
+        Args:
+            shopify_frame: Whole variant export (to pass each product's full variant list)
+            deletions: "delete" rows of the drift frame
+            dry_run: If True, only simulate
+            max_concurrent: Maximum number of products processed at the same time
+        """
+        if deletions.empty:
+            return
+
+        product_variants = cast(pd.DataFrame, shopify_frame[shopify_frame["product_id"].isin(deletions["product_id"])])
+        all_variants = {
+            product_id: [
+                {"id": row["variant_id"], "sku": row["sku"], "inventoryItem": {"id": row["inventory_item_id"]}}
+                for row in group.to_dict("records")
+            ]
+            for product_id, group in product_variants.groupby("product_id")
+        }
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def delete_product_variants(product_id, group):
+            async with semaphore:
+                await self._delete_variants_safely(
+                    product_id,
+                    product_id,
+                    all_variants[product_id],
+                    [{"id": row["variant_id"], "sku": row["sku"]} for row in group.to_dict("records")],
+                    dry_run,
+                )
+
+        await asyncio.gather(
+            *(delete_product_variants(product_id, group) for product_id, group in deletions.groupby("product_id"))
+        )
+
+    async def _get_unsynced_products(self, verified_since: float, batch_size: int, limit: int | None) -> list[dict]:
+        """
+        Query active products from Shopify that the sync ledger has not verified.
+
+        Args:
+            verified_since: Timestamp; products verified at or after it are excluded
             batch_size: Products per page
             limit: Maximum products to fetch
 
         Returns:
             List of product dictionaries
         """
-        all_products = []
+        return [
+            product async for page in self._iter_unsynced_pages(verified_since, batch_size, limit) for product in page
+        ]
+
+    async def _iter_unsynced_pages(self, verified_since: float, batch_size: int, limit: int | None):
+        """
+        Yield pages of active products from Shopify that the sync ledger has not verified.
+
+        Each page is yielded as soon as it is fetched and filtered, so processing can start
+        before the whole catalog has been paginated. Pacing is left to the client's cost throttle.
+
+        Args:
+            verified_since: Timestamp; products verified at or after it are excluded
+            batch_size: Products per page
+            limit: Maximum products to fetch
+
+        Yields:
+            Lists of product dictionaries
+        """
+        if self.catalog_mirror and await self.catalog_mirror.is_usable():
+            # Same scope as the API path (status:ACTIVE): draft and archived products are left alone.
+            # Keyset pages by product ID, so only one page of the catalog is in memory at a time.
+            # The mirror only selects the products; their variants and quantities are read live,
+            # since this sync exists to catch the drift that webhooks and our own writes missed.
+            fetched = 0
+            after_product_id = None
+            while not limit or fetched < limit:
+                mirrored = await self.catalog_mirror.get_products(
+                    limit=batch_size, status="ACTIVE", after_product_id=after_product_id
+                )
+                if not mirrored:
+                    break
+                after_product_id = mirrored[-1]["id"]
+                products = await self._exclude_verified(mirrored, verified_since)
+                if limit:
+                    products = products[: limit - fetched]
+                products = await self._get_live_products(products)
+                fetched += len(products)
+                if products:
+                    yield products
+                if len(mirrored) < batch_size:
+                    break
+            logger.info(f"✅ Total unsynced products read from catalog mirror: {fetched}")
+            return
+
+        fetched = 0
         cursor = None
         page = 0
 
@@ -209,23 +502,28 @@ class ReverseStockSynchronizer:
             while True:
                 page += 1
 
-                # Use public method to get products without tag
-                products_data = await self.shopify_client.products.get_products_without_tag(
-                    tag=exclude_tag, limit=min(batch_size, 250), cursor=cursor
+                # Use public method to get active products
+                products_data = await self.shopify_client.products.get_active_products_with_inventory(
+                    limit=min(batch_size, 250), cursor=cursor
                 )
                 edges = products_data.get("edges", [])
-                products = [edge["node"] for edge in edges]
+                products = await self._exclude_verified([edge["node"] for edge in edges], verified_since)
 
-                logger.info(f"📄 Page {page}: Retrieved {len(products)} unsynced products")
-
-                all_products.extend(products)
+                logger.info(f"📄 Page {page}: {len(products)}/{len(edges)} products not verified today")
 
                 # Check limit
-                if limit and len(all_products) >= limit:
-                    all_products = all_products[:limit]
+                if limit and fetched + len(products) >= limit:
+                    products = products[: limit - fetched]
+                    fetched += len(products)
+                    if products:
+                        yield products
                     logger.info(f"🎯 Reached limit of {limit} products")
                     break
 
+                fetched += len(products)
+                if products:
+                    yield products
+
                 # Check pagination
                 page_info = products_data.get("pageInfo", {})
                 if not page_info.get("hasNextPage", False):
@@ -235,17 +533,71 @@ class ReverseStockSynchronizer:
                 if not cursor:
                     break
 
-                # Rate limiting
-                await asyncio.sleep(0.5)
-
-            logger.info(f"✅ Total unsynced products fetched: {len(all_products)}")
-            return all_products
+            logger.info(f"✅ Total unsynced products fetched: {fetched}")
 
         except Exception as e:
             logger.error(f"Error fetching unsynced products: {e}")
             raise
 
-    async def _process_product(self, product: dict, dry_run: bool, delete_zero_stock: bool):
+    async def _get_live_products(self, products: list[dict]) -> list[dict]:
+        """
+        Re-read products selected from the catalog mirror from Shopify, by handle.
+
+        Args:
+            products: Product dictionaries from the catalog mirror
+
+        Returns:
+            The same products as Shopify returns them now (variants, inventory item IDs and
+            quantities); products that were deleted or are no longer active are dropped
+        """
+        handles = [product["handle"] for product in products if product.get("handle")]
+        live: dict[str, dict | None] = {}
+        for i in range(0, len(handles), MAX_HANDLES_PER_QUERY):
+            live.update(
+                await self.shopify_client.get_product_snapshots_by_handles(
+                    handles[i : i + MAX_HANDLES_PER_QUERY], self.primary_location_id
+                )
+            )
+        return [
+            product
+            for product in (live.get(handle) for handle in handles)
+            if product and (product.get("status") or "ACTIVE").upper() == "ACTIVE"
+        ]
+
+    async def _exclude_verified(self, products: list[dict], verified_since: float) -> list[dict]:
+        """
+        Drop products whose CCOD the sync ledger verified at or after verified_since (one lookup).
+
+        Args:
+            products: Product dictionaries from Shopify or the catalog mirror
+            verified_since: Timestamp of the start of the verification window
+
+        Returns:
+            Products that still need to be reconciled (products without CCOD are kept)
+        """
+        if not self.fingerprint_ledger or not products:
+            return products
+
+        ccods = {id(product): self._extract_ccod_from_metafields(product) for product in products}
+        verified_at = await self.fingerprint_ledger.get_verified_at(
+            {ccod.strip().upper() for ccod in ccods.values() if ccod}
+        )
+        pending = [
+            product
+            for product in products
+            if not ccods[id(product)] or verified_at.get(ccods[id(product)].strip().upper(), 0) < verified_since
+        ]
+        self.stats["already_verified"] += len(products) - len(pending)
+        return pending
+
+    async def _process_product(
+        self,
+        product: dict,
+        dry_run: bool,
+        delete_zero_stock: bool,
+        page_stock: dict[str, dict[str, int]] | None = None,
+        product_lock: ProductLock | None = None,
+    ):
         """
         Process a single product: update inventory and delete zero-stock variants.
 
@@ -255,27 +607,38 @@ class ReverseStockSynchronizer:
             product: Product dictionary from Shopify
             dry_run: If True, only simulate
             delete_zero_stock: If True, delete variants with zero stock
+            page_stock: RMS stock of the product's page by CCOD (see _load_page_stock)
+            product_lock: Lock from the page-level batch acquisition; if it was not acquired
+                there (held by another sync) it is waited on here, and the caller releases it
+
+        Returns:
+            True if the product was reconciled with RMS and can be recorded as verified
         """
         product_id = product.get("id")
+        lock = product_lock or ProductLock(product_id=product_id, timeout_seconds=300)
 
-        # Import distributed lock
-        from app.utils.distributed_lock import ProductLock
-
-        # Use distributed lock to prevent concurrent processing
         # If lock cannot be acquired, it means another sync is processing this product
         try:
-            async with ProductLock(product_id=product_id, timeout_seconds=300):
-                await self._process_product_locked(product, dry_run, delete_zero_stock)
-        except Exception as e:
-            # Lock acquisition failed or processing error
-            if "Could not acquire lock" in str(e):
-                logger.info(f"⏳ Product {product_id} is being processed by another sync, skipping")
-                self.stats["skipped"] += 1
-            else:
-                # Re-raise other exceptions
-                raise
+            if not lock.acquired:
+                await lock.acquire()
+        except LockAcquisitionError:
+            logger.info(f"⏳ Product {product_id} is being processed by another sync, skipping")
+            self.stats["skipped"] += 1
+            return False
+
+        try:
+            return await self._process_product_locked(product, dry_run, delete_zero_stock, page_stock)
+        finally:
+            if product_lock is None:
+                await lock.release()
 
-    async def _process_product_locked(self, product: dict, dry_run: bool, delete_zero_stock: bool):
+    async def _process_product_locked(
+        self,
+        product: dict,
+        dry_run: bool,
+        delete_zero_stock: bool,
+        page_stock: dict[str, dict[str, int]] | None = None,
+    ):
         """
         Internal method that processes product after lock is acquired.
 
@@ -285,6 +648,11 @@ class ReverseStockSynchronizer:
             product: Product dictionary from Shopify
             dry_run: If True, only simulate
             delete_zero_stock: If True, delete variants with zero stock
+            page_stock: RMS stock of the product's page by CCOD; CCODs missing from it
+                are queried individually
+
+        Returns:
+            True if every write succeeded and the product now matches RMS (never in dry-run mode)
         """
         try:
             self.stats["total_products_checked"] += 1
@@ -302,7 +670,7 @@ class ReverseStockSynchronizer:
                 self.stats["products_without_ccod"] += 1
                 self.stats["skipped"] += 1
                 logger.debug(f"⏭️ Skipping product {product_title}: No CCOD found in metafields")
-                return
+                return False
 
             self.stats["products_with_ccod"] += 1
             logger.debug(f"✅ Found CCOD: {ccod} for product {product_title}")
@@ -312,17 +680,20 @@ class ReverseStockSynchronizer:
 
             if not variants:
                 logger.debug(f"⏭️ Skipping product {product_title}: No variants")
-                return
+                return False
 
             self.stats["total_variants_checked"] += len(variants)
 
-            # Query current stock from RMS for this CCOD
-            rms_stock = await self._get_rms_stock_by_ccod(ccod)
+            # Current stock from RMS for this CCOD (from the page-level load when available)
+            if page_stock is not None and ccod.lower() in page_stock:
+                rms_stock = page_stock[ccod.lower()]
+            else:
+                rms_stock = await self._get_rms_stock_by_ccod(ccod)
 
             if not rms_stock:
                 logger.warning(f"⚠️ No stock data found in RMS for CCOD: {ccod}")
                 self.stats["skipped"] += len(variants)
-                return
+                return False
 
             # Process each variant with rollback tracking
             variants_to_delete = []
@@ -367,13 +738,22 @@ class ReverseStockSynchronizer:
                         )
 
                 # Phase 2: Execute batch inventory updates
+                errors: list[dict] = []
                 if inventory_updates and not dry_run:
                     logger.info(f"📦 Batch updating {len(inventory_updates)} variants")
                     success_count, errors = await self.shopify_client.inventory.batch_update_inventory(
                         inventory_updates
                     )
 
+                    # Writes run concurrently, so failures can sit anywhere in the list
+                    failed_ids = {id(error["update"]) for error in errors}
+                    applied_updates = [upd for upd in inventory_updates if id(upd) not in failed_ids]
+
                     if success_count > 0:
+                        await self._record_in_mirror(
+                            "set_available",
+                            {upd["inventory_item_id"]: upd["available"] for upd in applied_updates},
+                        )
                         # Track successful updates for rollback
                         rollback_actions.extend(
                             [
@@ -383,7 +763,7 @@ class ReverseStockSynchronizer:
                                     "original_qty": upd["original_qty"],
                                     "sku": upd["sku"],
                                 }
-                                for upd in inventory_updates[:success_count]
+                                for upd in applied_updates
                             ]
                         )
 
@@ -392,14 +772,16 @@ class ReverseStockSynchronizer:
                         self.stats["errors"] += len(errors)
 
                 # Phase 3: Delete zero-stock variants (with validation)
+                deletions_ok = True
                 if variants_to_delete and delete_zero_stock:
-                    await self._delete_variants_safely(product_id, product_title, variants, variants_to_delete, dry_run)
+                    deletions_ok = await self._delete_variants_safely(
+                        product_id, product_title, variants, variants_to_delete, dry_run
+                    )
                     # Note: Deletions are NOT added to rollback_actions as they are non-reversible
 
-                # Phase 4: Mark product as synced with today's tag (to avoid reprocessing)
-                if not dry_run:
-                    today_tag = self._get_today_sync_tag()
-                    await self._mark_product_as_synced(product_id, product_title, today_tag)
+                # Phase 4: Recorded as verified in the sync ledger by the caller (to avoid reprocessing),
+                # only if every write succeeded: failed variants must be retried in the next run
+                return not dry_run and not errors and deletions_ok
 
             except Exception:
                 # Rollback: Revert inventory updates if any operation failed
@@ -412,6 +794,7 @@ class ReverseStockSynchronizer:
             self.stats["errors"] += 1
             self.stats["details"]["errors"].append({"product": product.get("title", "Unknown"), "error": str(e)})
             logger.error(f"❌ Error processing product {product.get('title', 'Unknown')}: {e}")
+            return False
 
     def _extract_ccod_from_metafields(self, product: dict) -> str | None:
         """
@@ -441,6 +824,30 @@ class ReverseStockSynchronizer:
 
         return None
 
+    async def _load_page_stock(self, products: list[dict]) -> dict[str, dict[str, int]]:
+        """
+        Query current stock from RMS for all CCODs of a page of products in one query.
+
+        Args:
+            products: Page of product dictionaries from Shopify
+
+        Returns:
+            Dictionary mapping CCOD (lowercase) to its SKU (lowercase) → quantity map.
+            CCODs without items in RMS map to an empty dict; if the query fails the
+            result is empty and each product falls back to _get_rms_stock_by_ccod.
+        """
+        ccods = {ccod.lower() for ccod in map(self._extract_ccod_from_metafields, products) if ccod}
+        if not ccods:
+            return {}
+        try:
+            stock = await self.product_repository.get_stock_by_ccods(sorted(ccods))
+        except Exception as e:
+            logger.warning(f"⚠️ Page stock query failed, querying {len(ccods)} CCODs one by one: {e}")
+            return {}
+
+        logger.debug(f"📊 RMS stock loaded for {len(stock)}/{len(ccods)} CCODs of the page")
+        return {ccod: stock.get(ccod, {}) for ccod in ccods}
+
     async def _get_rms_stock_by_ccod(self, ccod: str) -> dict[str, int]:
         """
         Query current stock from RMS for a specific CCOD.
@@ -619,7 +1026,7 @@ class ReverseStockSynchronizer:
         all_variants: list[dict],
         variants_to_delete: list[dict],
         dry_run: bool,
-    ):
+    ) -> bool:
         """
         Delete variants with comprehensive safety checks.
 
@@ -634,6 +1041,9 @@ class ReverseStockSynchronizer:
             all_variants: All product variants
             variants_to_delete: Variants to delete
             dry_run: If True, only simulate
+
+        Returns:
+            False if any deletion failed (variants skipped by the safety checks do not count)
         """
         # Safety check: Don't delete if it's the only variant
         if len(all_variants) == len(variants_to_delete):
@@ -643,10 +1053,10 @@ class ReverseStockSynchronizer:
                     f"Would delete all {len(variants_to_delete)} variants (only variants remaining)"
                 )
                 self.stats["skipped"] += len(variants_to_delete)
-                return
+                return True
 
-        # Delete each variant with validation
-        for variant_info in variants_to_delete:
+        # Validate and delete the variants concurrently so their deletions share batched documents
+        async def delete_variant(variant_info: dict) -> bool:
             variant_id = variant_info["id"]
             sku = variant_info["sku"]
 
@@ -671,7 +1081,7 @@ class ReverseStockSynchronizer:
                             "deletion_validation_failures", []
                         )
                         self.stats["details"]["deletion_validation_failures"].append({"sku": sku, "reason": reason})
-                        continue
+                        return True
 
                 # Proceed with deletion if validation passed
                 if not dry_run:
@@ -681,92 +1091,36 @@ class ReverseStockSynchronizer:
                     if not result.get("success", False):
                         logger.error(f"❌ Failed to delete variant {sku}")
                         self.stats["errors"] += 1
-                        continue
+                        return False
 
                     logger.info(f"🗑️ Deleted variant: {sku} (ID: {variant_id})")
+                    await self._record_in_mirror("delete_variants", product_id, [sku])
                 else:
                     logger.info(f"🗑️ [DRY-RUN] Would delete variant: {sku}")
 
                 self.stats["total_variants_deleted"] += 1
                 self.stats["details"]["deleted"].append({"sku": sku, "reason": "zero_stock", "dry_run": dry_run})
+                return True
 
             except Exception as e:
                 logger.error(f"Error deleting variant {sku}: {e}")
                 self.stats["errors"] += 1
+                return False
 
-    def _get_today_sync_tag(self) -> str:
-        """
-        Get today's sync tag in format RMS-SYNC-YY-MM-DD.
-        Must match the format used by main sync (variant_mapper.py).
-
-        Returns:
-            Sync tag string (e.g., "RMS-SYNC-25-01-23")
-        """
-        today = datetime.now(UTC).strftime("%y-%m-%d")
-        return f"RMS-SYNC-{today}"
+        results = await asyncio.gather(*(delete_variant(variant_info) for variant_info in variants_to_delete))
+        return all(results)
 
-    async def _mark_product_as_synced(self, product_id: str, product_title: str, sync_tag: str) -> bool:
+    async def _record_in_mirror(self, operation: str, *args) -> None:
         """
-        Mark product with today's sync tag to avoid reprocessing.
-
-        This is critical for preventing infinite reprocessing loops.
-        Products are only marked if they were successfully processed.
+        Apply one of our successful writes to the local catalog mirror.
 
         Args:
-            product_id: Shopify product ID (e.g., "gid://shopify/Product/123")
-            product_title: Product title for logging
-            sync_tag: Sync tag to add (e.g., "RMS-SYNC-25-01-23")
-
-        Returns:
-            True if tag was added, False if tag already existed or operation failed
+            operation: CatalogMirror method name (e.g., "set_available")
+            *args: Arguments for that method
         """
+        if not self.catalog_mirror:
+            return
         try:
-            # Build GraphQL mutation to add tag
-            mutation = """
-            mutation productUpdate($input: ProductInput!) {
-                productUpdate(input: $input) {
-                    product {
-                        id
-                        tags
-                    }
-                    userErrors {
-                        field
-                        message
-                    }
-                }
-            }
-            """
-
-            # Get current tags first
-            query = """
-            query getProduct($id: ID!) {
-                product(id: $id) {
-                    tags
-                }
-            }
-            """
-
-            result = await self.shopify_client._execute_query(query, {"id": product_id})
-            current_tags = result.get("product", {}).get("tags", [])
-
-            # Add sync tag if not present
-            if sync_tag in current_tags:
-                logger.debug(f"   ✓ Product {product_title} already has tag {sync_tag}")
-                return False
-
-            new_tags = current_tags + [sync_tag]
-            variables = {"input": {"id": product_id, "tags": new_tags}}
-
-            result = await self.shopify_client._execute_query(mutation, variables)
-            user_errors = result.get("productUpdate", {}).get("userErrors", [])
-
-            if user_errors:
-                logger.error(f"❌ Failed to mark product {product_title}: {user_errors}")
-                return False
-
-            logger.info(f"   🏷️  Marked product {product_title} with tag {sync_tag}")
-            return True
-
+            await getattr(self.catalog_mirror, operation)(*args)
         except Exception as e:
-            logger.error(f"❌ Error marking product {product_title} with tag {sync_tag}: {e}")
-            return False
+            logger.warning(f"⚠️ Could not update catalog mirror ({operation}): {e}")
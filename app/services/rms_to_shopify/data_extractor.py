@@ -1,7 +1,7 @@
 import logging
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from app.api.v1.schemas.rms_schemas import RMSViewItem
 from app.api.v1.schemas.shopify_schemas import ShopifyProductInput
@@ -26,6 +26,7 @@ class RMSExtractor:
         product_repository: ProductRepository,
         shopify_client: Any,
         primary_location_id: str,
+        product_lookup: Optional[Callable[[List[str]], Awaitable[Dict[str, Optional[Dict[str, Any]]]]]] = None,
     ):
         """
         Initialize RMS data extractor with SOLID repositories.
@@ -35,11 +36,14 @@ class RMSExtractor:
             product_repository: Repository for product operations
             shopify_client: Shopify GraphQL client
             primary_location_id: Primary Shopify location ID
+            product_lookup: Batched handle -> existing product lookup used to prefetch
+                each page's Shopify products once (e.g. ShopifyUpdater.check_products_exist_batch)
         """
         self.query_executor = query_executor
         self.product_repository = product_repository
         self.shopify_client = shopify_client
         self.primary_location_id = primary_location_id
+        self.product_lookup = product_lookup
         self.checkpoint_manager = UpdateCheckpointManager()
 
     async def count_rms_products(
@@ -91,70 +95,77 @@ class RMSExtractor:
 
     async def extract_rms_products_paginated(
         self,
-        offset: int,
         limit: int,
         filter_categories: Optional[List[str]] = None,
         ccod: Optional[str] = None,
         include_zero_stock: bool = False,
-    ) -> List[ShopifyProductInput]:
+        after_ccod: Optional[str] = None,
+    ) -> Tuple[List[ShopifyProductInput], Optional[str]]:
         """
-        Extracts a paginated list of products from RMS.
+        Extracts a page of products from RMS using keyset pagination on CCOD.
+
+        Each page seeks past ``after_ccod`` (``CCOD > :after_ccod``) instead of skipping
+        rows with OFFSET, so the cost of a page does not grow with the depth of the scan
+        and products added or removed mid-sync do not shift later pages.
 
         Args:
-            offset: The number of products (CCODs) to skip.
             limit: The number of products (CCODs) to extract.
             filter_categories: Categories to filter by.
             ccod: Specific CCOD to filter by.
             include_zero_stock: Whether to include products with zero stock.
+            after_ccod: Last CCOD of the previous page (None for the first page).
 
         Returns:
-            A list of Shopify products with multiple variants for this page.
+            A tuple of (Shopify products with multiple variants for this page, last CCOD
+            of the page to pass as ``after_ccod`` for the next one, or None when there are
+            no more CCODs).
         """
         try:
-            logger.info(f"📄 Extracting RMS products page - Offset: {offset}, Limit: {limit} (products/CCODs)")
-
-            # First, get the CCODs for this page using pagination at the CCOD level
-            ccod_query = """
-            WITH DistinctCCODs AS (
-                SELECT DISTINCT CCOD
-                FROM View_Items
-                WHERE CCOD IS NOT NULL
-                AND CCOD != ''
-                AND C_ARTICULO IS NOT NULL
-                AND Description IS NOT NULL
-                AND Price > 0
+            logger.info(f"📄 Extracting RMS products page - After CCOD: {after_ccod or '-'}, Limit: {limit} (CCODs)")
+
+            # First, get the CCODs for this page seeking past the previous page's last CCOD
+            ccod_query = f"""
+            SELECT DISTINCT TOP ({int(limit)}) CCOD
+            FROM View_Items
+            WHERE CCOD IS NOT NULL
+            AND CCOD != ''
+            AND CCOD > :after_ccod
+            AND C_ARTICULO IS NOT NULL
+            AND Description IS NOT NULL
+            AND Price > 0
             """
+            params = {"after_ccod": after_ccod or ""}
 
             # Add stock filter if not including zero stock products
             if not include_zero_stock:
                 ccod_query += " AND Quantity > 0"
 
             if ccod:
-                ccod_query += f" AND CCOD = '{ccod}'"
+                ccod_query += " AND CCOD = :ccod"
+                params["ccod"] = ccod
 
             if filter_categories:
-                categories_str = "', '".join(filter_categories)
-                ccod_query += f" AND Categoria IN ('{categories_str}')"
+                placeholders = ", ".join(f":cat_{i}" for i in range(len(filter_categories)))
+                ccod_query += f" AND Categoria IN ({placeholders})"
+                params.update({f"cat_{i}": category for i, category in enumerate(filter_categories)})
 
-            ccod_query += f"""
-            )
-            SELECT CCOD FROM DistinctCCODs
-            ORDER BY CCOD
-            OFFSET {offset} ROWS FETCH NEXT {limit} ROWS ONLY
-            """
+            ccod_query += " ORDER BY CCOD"
 
             # Get the CCODs for this page using the query executor
-            ccod_results = await self.query_executor.execute_custom_query(ccod_query)
+            ccod_results = await self.query_executor.execute_custom_query(ccod_query, params)
             page_ccods = [row.get("CCOD") for row in ccod_results]
 
             if not page_ccods:
-                logger.info(f"📊 No CCODs found for page (offset: {offset}, limit: {limit})")
-                return []
+                logger.info(f"📊 No more CCODs after {after_ccod or '-'}")
+                return [], None
 
-            logger.info(f"📊 Found {len(page_ccods)} CCODs for this page")
+            last_ccod = page_ccods[-1]
+            logger.info(f"📊 Found {len(page_ccods)} CCODs for this page (last: {last_ccod})")
 
-            # Now get all items for these CCODs
-            ccods_str = "', '".join(page_ccods)
+            # Now get all items for these CCODs, with the same row filters as the CCOD query except
+            # stock: every size of an in-stock CCOD is kept so sizes that dropped to 0 are written as 0
+            ccod_placeholders = ", ".join(f":page_ccod_{i}" for i in range(len(page_ccods)))
+            items_params = {f"page_ccod_{i}": page_ccod for i, page_ccod in enumerate(page_ccods)}
             items_query = f"""
             SELECT
                 Familia, Genero, Categoria, CCOD, C_ARTICULO,
@@ -168,15 +179,18 @@ class RMSExtractor:
                 ExtendedCategory, Tax,
                 SaleStartDate, SaleEndDate
             FROM View_Items
-            WHERE CCOD IN ('{ccods_str}')
+            WHERE CCOD IN ({ccod_placeholders})
+            AND C_ARTICULO IS NOT NULL
+            AND Description IS NOT NULL
+            AND Price > 0
             ORDER BY CCOD, talla
             """
 
-            items_data = await self.query_executor.execute_custom_query(items_query)
+            items_data = await self.query_executor.execute_custom_query(items_query, items_params)
             logger.info(f"📊 Extracted {len(items_data)} items for {len(page_ccods)} products (CCODs) from RMS")
 
             if not items_data:
-                return []
+                return [], last_ccod
 
             rms_items = []
             for item_data in items_data:
@@ -212,10 +226,11 @@ class RMSExtractor:
                 self.shopify_client,
                 self.primary_location_id,
                 include_category_tags=settings.SYNC_INCLUDE_CATEGORY_TAGS,
+                product_lookup=self.product_lookup,
             )
 
             logger.info(f"🎯 Generated {len(shopify_products)} products from {len(rms_items)} items (page)")
-            return shopify_products
+            return shopify_products, last_ccod
 
         except Exception as e:
             logger.error(f"Error extracting paginated RMS products: {e}")
@@ -225,6 +240,43 @@ class RMSExtractor:
                 operation="extract_paginated",
             ) from e
 
+    async def iter_rms_products_with_variants(
+        self,
+        filter_categories: Optional[List[str]] = None,
+        ccod: Optional[str] = None,
+        include_zero_stock: bool = False,
+        chunk_size: int = 200,
+        after_ccod: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[List[ShopifyProductInput], str]]:
+        """
+        Streams products from RMS in chunks of CCODs, in CCOD order.
+
+        Each chunk is extracted with keyset pagination and mapped before the next one is
+        read, so memory stays bounded by one chunk of View_Items rows, RMSViewItem models
+        and ShopifyProductInput objects regardless of the catalog size, and the caller
+        can start writing as soon as the first chunk is ready.
+
+        Args:
+            filter_categories: Categories to filter by.
+            ccod: Specific CCOD to sync.
+            include_zero_stock: Whether to include products with zero stock.
+            chunk_size: The number of products (CCODs) per chunk.
+            after_ccod: Resume after this CCOD (None to start from the beginning).
+
+        Yields:
+            A tuple per chunk of CCODs with the Shopify products with multiple variants and
+            the last CCOD of the chunk (to resume with ``after_ccod``).
+        """
+        cursor = after_ccod
+        while True:
+            products, cursor = await self.extract_rms_products_paginated(
+                chunk_size, filter_categories, ccod, include_zero_stock=include_zero_stock, after_ccod=cursor
+            )
+            if cursor is None:
+                return
+            if products:
+                yield products, cursor
+
     async def extract_rms_products_with_variants(
         self,
         filter_categories: Optional[List[str]] = None,
@@ -234,6 +286,9 @@ class RMSExtractor:
         """
         Extracts products from RMS using the new multi-variant system by CCOD.
 
+        Products are read in chunks of CCODs (see iter_rms_products_with_variants), so only
+        the resulting list is held in memory; large syncs should iterate the chunks instead.
+
         Args:
             filter_categories: Categories to filter by.
             ccod: Specific CCOD to sync.
@@ -244,100 +299,13 @@ class RMSExtractor:
         """
         try:
             logger.info("🔄 Extracting products with multi-variant system by CCOD")
-
-            query = """
-            SELECT 
-                Familia, Genero, Categoria, CCOD, C_ARTICULO,
-                ItemID, Description, color, talla, Quantity,
-                ROUND(Price * IIF(Tax > 0, 1 + (Tax / 100.0), 1), 2) AS Price,
-                CASE 
-                    WHEN SalePrice IS NOT NULL AND SalePrice > 0 
-                    THEN ROUND(SalePrice * IIF(Tax > 0, 1 + (Tax / 100.0), 1), 2)
-                    ELSE NULL
-                END AS SalePrice,
-                ExtendedCategory, Tax,
-                SaleStartDate, SaleEndDate
-            FROM View_Items
-            WHERE CCOD IS NOT NULL
-            AND CCOD != ''
-            AND C_ARTICULO IS NOT NULL
-            AND Description IS NOT NULL
-            AND Price > 0
-            """
-
-            # Add stock filter if not including zero stock products
-            if not include_zero_stock:
-                query += " AND Quantity > 0"
-
-            if ccod:
-                query += f" AND CCOD = '{ccod}'"
-
-            if filter_categories:
-                categories_str = "', '".join(filter_categories)
-                query += f" AND Categoria IN ('{categories_str}')"
-
-            query += " ORDER BY CCOD, talla"
-
-            logger.info("📋 Executing query to extract items from RMS...")
-            items_data = await self.query_executor.execute_custom_query(query)
-            logger.info(f"📊 Extracted {len(items_data)} items from RMS")
-
-            ccods_extracted = set(item.get("CCOD") for item in items_data if item.get("CCOD"))
-            logger.info(f"📋 Unique CCODs extracted: {len(ccods_extracted)}")
-
-            rms_items = []
-            negative_quantity_count = 0
-            for item_data in items_data:
-                try:
-                    raw_quantity = item_data.get("Quantity", 0)
-                    normalized_quantity = max(0, int(raw_quantity))
-
-                    if raw_quantity < 0:
-                        negative_quantity_count += 1
-                        c_articulo = item_data.get("C_ARTICULO", "unknown")
-                        logger.debug(
-                            f"📊 Negative quantity normalized: {raw_quantity} → {normalized_quantity}\
-                                para item {c_articulo}"
-                        )
-
-                    rms_item = RMSViewItem(
-                        familia=item_data.get("Familia", ""),
-                        genero=item_data.get("Genero", ""),
-                        categoria=item_data.get("Categoria", ""),
-                        ccod=item_data.get("CCOD", ""),
-                        c_articulo=item_data.get("C_ARTICULO", ""),
-                        item_id=item_data.get("ItemID", 0),
-                        description=item_data.get("Description", ""),
-                        color=item_data.get("color", ""),
-                        talla=item_data.get("talla", ""),
-                        quantity=normalized_quantity,
-                        price=Decimal(str(item_data.get("Price", 0))),
-                        sale_price=Decimal(str(item_data.get("SalePrice", 0))) if item_data.get("SalePrice") else None,
-                        extended_category=item_data.get("ExtendedCategory", ""),
-                        tax=int(item_data.get("Tax", 13)),
-                        sale_start_date=item_data.get("SaleStartDate"),
-                        sale_end_date=item_data.get("SaleEndDate"),
-                    )
-                    rms_items.append(rms_item)
-                except Exception as e:
-                    logger.warning(f"❌ --> (RMSViewItem) Error processing RMS item: {e}")
-                    continue
-
-            logger.info(f"✅ Processed {len(rms_items)} valid items from RMS")
-            if negative_quantity_count > 0:
-                logger.info(f"📊 Normalized {negative_quantity_count} negative quantities to 0")
-
-            logger.info("🔄 Grouping items by CCOD and creating products with variants...")
-            shopify_products = await create_products_with_variants(
-                rms_items,
-                self.shopify_client,
-                self.primary_location_id,
-                include_category_tags=settings.SYNC_INCLUDE_CATEGORY_TAGS,
-            )
+            shopify_products: List[ShopifyProductInput] = []
+            async for products, _ in self.iter_rms_products_with_variants(
+                filter_categories, ccod, include_zero_stock=include_zero_stock
+            ):
+                shopify_products.extend(products)
 
             logger.info(f"🎯 Generated {len(shopify_products)} products with multiple variants")
-            logger.info(f"📈 Reduction: {len(rms_items)} items → {len(shopify_products)} products")
-
             return shopify_products
 
         except Exception as e:
@@ -386,7 +354,7 @@ class RMSExtractor:
         filter_categories: Optional[List[str]] = None,
         include_zero_stock: bool = False,
         limit: Optional[int] = None,
-        offset: int = 0,
+        after_ccod: Optional[str] = None,
     ) -> tuple[List[ShopifyProductInput], Optional[datetime]]:
         """
         Extract products modified since checkpoint timestamp.
@@ -396,8 +364,8 @@ class RMSExtractor:
             default_days_back: Days to look back if no checkpoint exists
             filter_categories: Categories to filter by
             include_zero_stock: Whether to include zero stock products
-            limit: Limit for pagination
-            offset: Offset for pagination
+            limit: Number of products (CCODs) per page
+            after_ccod: Keyset cursor: only CCODs greater than this one
 
         Returns:
             Tuple of (products, timestamp_used)
@@ -421,7 +389,7 @@ class RMSExtractor:
             since_timestamp=since_timestamp,
             category_filter=filter_categories,
             limit=limit,
-            offset=offset,
+            after_ccod=after_ccod,
             include_zero_stock=include_zero_stock,
         )
 
@@ -437,6 +405,7 @@ class RMSExtractor:
             self.shopify_client,
             self.primary_location_id,
             include_category_tags=settings.SYNC_INCLUDE_CATEGORY_TAGS,
+            product_lookup=self.product_lookup,
         )
 
         logger.info(f"🎯 Generated {len(shopify_products)} products from {len(rms_items)} items")
@@ -444,8 +413,8 @@ class RMSExtractor:
 
     async def extract_rms_products_paginated_with_checkpoint(
         self,
-        offset: int,
         limit: int,
+        after_ccod: Optional[str] = None,
         use_checkpoint: bool = True,
         default_days_back: int = 30,
         filter_categories: Optional[List[str]] = None,
@@ -457,8 +426,8 @@ class RMSExtractor:
         This method combines pagination with checkpoint-based filtering.
 
         Args:
-            offset: Offset for pagination
-            limit: Limit for pagination
+            limit: Number of products (CCODs) per page
+            after_ccod: Keyset cursor: only CCODs greater than this one
             use_checkpoint: Whether to use checkpoint system
             default_days_back: Days to look back if no checkpoint exists
             filter_categories: Categories to filter by
@@ -473,5 +442,5 @@ class RMSExtractor:
             filter_categories=filter_categories,
             include_zero_stock=include_zero_stock,
             limit=limit,
-            offset=offset,
+            after_ccod=after_ccod,
         )
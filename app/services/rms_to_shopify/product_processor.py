@@ -1,11 +1,13 @@
 import asyncio
 import logging
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.api.v1.schemas.shopify_schemas import ShopifyProductInput
 from app.core.config import get_settings
 from app.core.logging_config import log_sync_operation
+from app.services.multiple_variants_creator.update_planner import UpdatePlanner
+from app.services.product_fingerprint import FingerprintLedger, changed_sections, compute_product_fingerprint
 from app.services.rms_to_shopify.progress_tracker import SyncProgressTracker
 from app.services.rms_to_shopify.shopify_updater import ShopifyUpdater
 from app.services.sync_checkpoint import SyncCheckpointManager
@@ -25,12 +27,43 @@ class ProductProcessor:
         checkpoint_manager: SyncCheckpointManager,
         error_aggregator: ErrorAggregator,
         checkpoint_frequency: int = 100,
+        fingerprint_ledger: Optional[FingerprintLedger] = None,
     ):
         self.sync_id = sync_id
         self.shopify_updater = shopify_updater
         self.checkpoint_manager = checkpoint_manager
         self.error_aggregator = error_aggregator
         self.checkpoint_frequency = checkpoint_frequency
+        self.fingerprint_ledger = fingerprint_ledger
+        # Why products were skipped and which fingerprint sections changed in the written ones
+        self.skip_reasons: Dict[str, int] = {}
+        self.changed_sections: Dict[str, int] = {}
+        # Operations executed by the update planner, counted per operation ("no_changes" for in-sync products)
+        self.update_operations: Dict[str, int] = {}
+        # Products written with the bulk productSet mutation and the ones that needed the per-product path
+        self.bulk_writes: Dict[str, int] = {"operations": 0, "products": 0, "per_product_fallbacks": 0}
+
+    def get_skip_report(self) -> Dict[str, Any]:
+        """
+        Returns the skip reasons, changed fingerprint sections and planned update operations for the sync report.
+
+        Returns:
+            A dictionary with "skip_reasons", "changed_sections" and "update_operations" counters,
+            plus "bulk_writes" when products were written with the bulk mutation.
+        """
+        report = {
+            "skip_reasons": dict(self.skip_reasons),
+            "changed_sections": dict(self.changed_sections),
+            "update_operations": dict(self.update_operations),
+        }
+        if self.bulk_writes["operations"]:
+            report["bulk_writes"] = dict(self.bulk_writes)
+        return report
+
+    def _record_skip(self, reason: str, stats: Dict[str, Any]) -> None:
+        """Counts a skipped product and its reason."""
+        stats["skipped"] += 1
+        self.skip_reasons[reason] = self.skip_reasons.get(reason, 0) + 1
 
     async def process_products_in_batches_optimized(
         self,
@@ -111,10 +144,12 @@ class ProductProcessor:
             batch_handles = [product.handle for product in batch if product.handle]
 
             existing_products = await self.shopify_updater.check_products_exist_batch(batch_handles)
+            writable = await self._resolve_unknown_products(batch, existing_products, stats)
 
             batch_stats = await self._process_product_batch_optimized(
-                batch, existing_products, force_update, progress_tracker
+                writable, existing_products, force_update, progress_tracker
             )
+            self.shopify_updater.evict_handles(batch_handles)
 
             for key in stats:
                 stats[key] += batch_stats.get(key, 0)
@@ -171,18 +206,9 @@ class ProductProcessor:
                     f"Progress: {processed_so_far}/{page_products} ({processed_so_far / page_products * 100:.1f}%)"
                 )
 
+            # No pause between batches: every Shopify call is admitted by the shared cost throttle
             progress_tracker.log_progress("Batch Progress - ")
 
-            if i + batch_size < len(products_to_process):
-                if batch_size > 2:
-                    sleep_time = 3
-                    logger.debug(f"🕐 Rate limiting: {sleep_time}s pause")
-                else:
-                    sleep_time = 1
-                    logger.debug(f"🕐 Minimal pause: {sleep_time}s")
-
-                await asyncio.sleep(sleep_time)
-
         # Only log final progress if there were products to process
         if products_to_process:
             progress_tracker.log_progress("Final Progress - ")
@@ -202,7 +228,7 @@ class ProductProcessor:
         progress_tracker: Optional[SyncProgressTracker] = None,
     ) -> Dict[str, Any]:
         """
-        Processes a batch of products with optimized search.
+        Processes a batch of products concurrently (bounded by SYNC_PARALLEL_WORKERS).
 
         Args:
             batch: The batch of products to process.
@@ -223,17 +249,302 @@ class ProductProcessor:
             "inventory_failed": 0,
         }
 
-        for shopify_input in batch:
-            await self._process_single_product(
-                shopify_input,
-                existing_products.get(shopify_input.handle),
-                force_update,
-                stats,
-                progress_tracker,
+        # Fingerprints of the batch and the ones recorded at the last successful write (one lookup)
+        fingerprints: Dict[int, Dict[str, str]] = {}
+        previous_fingerprints: Dict[str, Dict[str, Any]] = {}
+        written_fingerprints: Dict[str, Dict[str, str]] = {}
+        unchanged_ccods: List[str] = []
+        if self.fingerprint_ledger:
+            fingerprints = {id(shopify_input): compute_product_fingerprint(shopify_input) for shopify_input in batch}
+            previous_fingerprints = await self.fingerprint_ledger.get_many(
+                ccod for ccod in (self._get_ccod(shopify_input) for shopify_input in batch) if ccod
             )
 
+        # Up to SYNC_PARALLEL_WORKERS products in flight; each one isolates its own errors
+        semaphore = asyncio.Semaphore(max(1, settings.SYNC_PARALLEL_WORKERS))
+
+        async def process(shopify_input: ShopifyProductInput) -> None:
+            async with semaphore:
+                await self._process_single_product(
+                    shopify_input,
+                    existing_products.get(shopify_input.handle),
+                    force_update,
+                    stats,
+                    progress_tracker,
+                    fingerprint=fingerprints.get(id(shopify_input)),
+                    previous_fingerprints=previous_fingerprints,
+                    written_fingerprints=written_fingerprints,
+                    unchanged_ccods=unchanged_ccods,
+                )
+
+        await asyncio.gather(*(process(shopify_input) for shopify_input in batch))
+
+        if self.fingerprint_ledger:
+            await self.fingerprint_ledger.set_many(written_fingerprints)
+            await self.fingerprint_ledger.mark_verified(unchanged_ccods)
+
+        return stats
+
+    async def process_products_bulk(self, products: List[ShopifyProductInput], force_update: bool) -> Dict[str, Any]:
+        """
+        Writes a group of products with one bulk productSet mutation (bulkOperationRunMutation).
+
+        The skip rules are the same as in the per-product path. Existing products without a
+        complete snapshot (more variants than the batch lookup returns) and products rejected
+        by the bulk mutation are written through the per-product path. Products left unconfirmed
+        by an interrupted bulk mutation are looked up again first, so they are not created twice.
+
+        Args:
+            products: The products to sync, usually several extracted pages.
+            force_update: Whether to force update existing products.
+
+        Returns:
+            A dictionary with the statistics of the group.
+        """
+        stats = {
+            "total_processed": 0,
+            "created": 0,
+            "updated": 0,
+            "skipped": 0,
+            "errors": 0,
+            "inventory_updated": 0,
+            "inventory_failed": 0,
+        }
+        existing_products = await self.shopify_updater.check_products_exist_batch(
+            [shopify_input.handle for shopify_input in products]
+        )
+        products = await self._resolve_unknown_products(products, existing_products, stats)
+
+        fingerprints: Dict[int, Dict[str, str]] = {}
+        previous_fingerprints: Dict[str, Dict[str, Any]] = {}
+        written_fingerprints: Dict[str, Dict[str, str]] = {}
+        unchanged_ccods: List[str] = []
+        if self.fingerprint_ledger:
+            fingerprints = {id(shopify_input): compute_product_fingerprint(shopify_input) for shopify_input in products}
+            previous_fingerprints = await self.fingerprint_ledger.get_many(
+                ccod for ccod in (self._get_ccod(shopify_input) for shopify_input in products) if ccod
+            )
+
+        entries = []
+        per_product: List[ShopifyProductInput] = []
+        unconfirmed: List[ShopifyProductInput] = []
+        for shopify_input in products:
+            ccod = self._get_ccod(shopify_input)
+            if not ccod:
+                logger.warning(f"⚠️ No CCOD found in product tags: {shopify_input.title}")
+                stats["errors"] += 1
+                continue
+
+            existing_product = existing_products.get(shopify_input.handle)
+            fingerprint = fingerprints.get(id(shopify_input))
+            previous = previous_fingerprints.get(ccod)
+            skip_reason, verified = self._resolve_skip(
+                shopify_input, existing_product, force_update, fingerprint, previous
+            )
+            if skip_reason:
+                self._record_skip(skip_reason, stats)
+                if verified:
+                    unchanged_ccods.append(ccod)
+                stats["total_processed"] += 1
+            elif existing_product and not UpdatePlanner.is_complete_snapshot(existing_product):
+                per_product.append(shopify_input)
+            else:
+                entries.append((shopify_input, existing_product, ccod, fingerprint, previous))
+
+        if entries:
+            try:
+                results = await self.shopify_updater.upsert_products_bulk(
+                    [(shopify_input, existing_product) for shopify_input, existing_product, *_ in entries]
+                )
+            except Exception as e:
+                logger.error(f"❌ Bulk productSet mutation failed, writing {len(entries)} products one by one: {e}")
+                self.error_aggregator.add_error(e, {"operation": "bulk_product_set", "products": len(entries)})
+                results = [{"product": None, "user_errors": [], "unconfirmed": True} for _ in entries]
+
+            self.bulk_writes["operations"] += 1
+            for (shopify_input, existing_product, ccod, fingerprint, previous), result in zip(
+                entries, results, strict=True
+            ):
+                if not result["product"]:
+                    if result.get("unconfirmed"):
+                        unconfirmed.append(shopify_input)
+                        continue
+                    if result["user_errors"]:
+                        logger.warning(f"⚠️ Bulk productSet rejected {ccod}: {result['user_errors'][:3]}")
+                    per_product.append(shopify_input)
+                    continue
+
+                self.bulk_writes["products"] += 1
+                if result.get("inventory_failed"):
+                    # Some quantities were not written: no fingerprint, so the next sync writes it again
+                    logger.warning(f"⚠️ {ccod} written in bulk but {result['inventory_failed']} quantities failed")
+                    stats["errors"] += 1
+                    stats["total_processed"] += 1
+                    stats["inventory_failed"] += result["inventory_failed"]
+                    continue
+
+                action = "update" if existing_product else "create"
+                stats["updated" if existing_product else "created"] += 1
+                stats["total_processed"] += 1
+                stats["inventory_updated"] += 1
+                log_sync_operation(action, "shopify", ccod=ccod)
+                self._record_written(ccod, fingerprint, previous if existing_product else None, written_fingerprints)
+
+        if self.fingerprint_ledger:
+            await self.fingerprint_ledger.set_many(written_fingerprints)
+            await self.fingerprint_ledger.mark_verified(unchanged_ccods)
+
+        if unconfirmed:
+            per_product.extend(await self._refresh_existing_products(unconfirmed, existing_products, stats))
+
+        if per_product:
+            self.bulk_writes["per_product_fallbacks"] += len(per_product)
+            fallback_stats = await self._process_product_batch_optimized(per_product, existing_products, force_update)
+            for key in stats:
+                stats[key] += fallback_stats.get(key, 0)
+
+        self.shopify_updater.evict_handles(list(existing_products))
         return stats
 
+    async def _resolve_unknown_products(
+        self,
+        products: List[ShopifyProductInput],
+        existing_products: Dict[str, Optional[Dict[str, Any]]],
+        stats: Dict[str, Any],
+    ) -> List[ShopifyProductInput]:
+        """
+        Looks up again the products that the batch existence check could not answer.
+
+        A failed lookup leaves the handle out of existing_products; treating it as missing
+        would create a duplicate of a product that already exists.
+
+        Args:
+            products: The products about to be written.
+            existing_products: The existing products found by handle; completed in place.
+            stats: The statistics of the batch; products that cannot be looked up count as errors.
+
+        Returns:
+            The products whose existence is known.
+        """
+        unknown = [
+            shopify_input
+            for shopify_input in products
+            if shopify_input.handle and shopify_input.handle not in existing_products
+        ]
+        if unknown and not await self._refresh_existing_products(unknown, existing_products, stats):
+            return [
+                shopify_input
+                for shopify_input in products
+                if not shopify_input.handle or shopify_input.handle in existing_products
+            ]
+        return products
+
+    async def _refresh_existing_products(
+        self,
+        products: List[ShopifyProductInput],
+        existing_products: Dict[str, Optional[Dict[str, Any]]],
+        stats: Dict[str, Any],
+    ) -> List[ShopifyProductInput]:
+        """
+        Looks up products in Shopify again, bypassing the cached and mirrored answers.
+
+        Used for products left unconfirmed by an interrupted bulk operation (which may have
+        created or updated them) and for products the batch existence check could not answer.
+
+        Args:
+            products: The products to look up.
+            existing_products: The existing products found by handle; refreshed in place.
+            stats: The statistics of the group; products that cannot be looked up count as errors.
+
+        Returns:
+            The products that can be written (none if the lookup failed).
+        """
+        try:
+            existing_products.update(
+                await self.shopify_updater.refresh_products([shopify_input.handle for shopify_input in products])
+            )
+        except Exception as e:
+            logger.error(
+                f"❌ Could not look up {len(products)} products in Shopify, leaving them for the next sync: {e}"
+            )
+            self.error_aggregator.add_error(e, {"operation": "product_lookup", "products": len(products)})
+            stats["errors"] += len(products)
+            return []
+        return products
+
+    @staticmethod
+    def _get_ccod(shopify_input: ShopifyProductInput) -> Optional[str]:
+        """Returns the CCOD of a product from its ccod_ tag."""
+        ccod = None
+        for tag in shopify_input.tags or []:
+            if tag.startswith("ccod_"):
+                ccod = tag.replace("ccod_", "").upper()
+        return ccod
+
+    @staticmethod
+    def _get_skip_reason(
+        shopify_input: ShopifyProductInput,
+        existing_product: Optional[Dict[str, Any]],
+        force_update: bool,
+        fingerprint: Optional[Dict[str, str]],
+        previous: Optional[Dict[str, Any]],
+    ) -> Optional[str]:
+        """Returns why a product does not need to be written, or None if it must be created or updated."""
+        if existing_product:
+            if not force_update:
+                return "exists_without_force_update"
+            if fingerprint and previous and previous.get("product") == fingerprint["product"]:
+                return "unchanged_fingerprint"
+            return None
+
+        total_stock = 0
+        for variant in shopify_input.variants or []:
+            if hasattr(variant, "inventoryQuantities") and variant.inventoryQuantities:
+                for inv_qty in variant.inventoryQuantities:
+                    total_stock += inv_qty.get("availableQuantity", 0)
+        if total_stock > 0 or settings.SYNC_CREATE_ZERO_STOCK_PRODUCTS:
+            return None
+        return "zero_stock_not_created"
+
+    def _resolve_skip(
+        self,
+        shopify_input: ShopifyProductInput,
+        existing_product: Optional[Dict[str, Any]],
+        force_update: bool,
+        fingerprint: Optional[Dict[str, str]],
+        previous: Optional[Dict[str, Any]],
+    ) -> Tuple[Optional[str], bool]:
+        """
+        Returns the skip reason of a product and whether its Shopify snapshot was verified.
+
+        An unchanged fingerprint skips the product on its own only when there is no complete
+        snapshot to compare with. With a complete snapshot, a product that drifted in Shopify
+        is written again instead of waiting for its fingerprint to expire.
+        """
+        skip_reason = self._get_skip_reason(shopify_input, existing_product, force_update, fingerprint, previous)
+        if skip_reason != "unchanged_fingerprint" or not UpdatePlanner.is_complete_snapshot(existing_product):
+            return skip_reason, False
+        if self._snapshot_matches(shopify_input, existing_product):
+            return skip_reason, True
+        logger.info(f"🔁 {shopify_input.handle} unchanged in RMS but drifted in Shopify, updating it")
+        return None, False
+
+    def _snapshot_matches(self, shopify_input: ShopifyProductInput, existing_product: Optional[Dict[str, Any]]) -> bool:
+        """
+        Whether the current Shopify snapshot already matches the product (empty update plan).
+
+        An unchanged fingerprint only says that RMS did not change since the last write, which
+        may be days old; the product is recorded as verified only if Shopify matches it too.
+        """
+        if not existing_product or not UpdatePlanner.is_complete_snapshot(existing_product):
+            return False
+        planner = UpdatePlanner(
+            self.shopify_updater.shopify_client,
+            self.shopify_updater.primary_location_id,
+            plan_cleanup=settings.ENABLE_ZERO_STOCK_CLEANUP and self.shopify_updater.product_repository is not None,
+        )
+        return planner.build_plan(existing_product["id"], shopify_input, existing_product).is_empty
+
     async def _process_single_product(
         self,
         shopify_input: ShopifyProductInput,
@@ -241,6 +552,10 @@ class ProductProcessor:
         force_update: bool,
         stats: Dict[str, Any],
         progress_tracker: Optional[SyncProgressTracker] = None,
+        fingerprint: Optional[Dict[str, str]] = None,
+        previous_fingerprints: Optional[Dict[str, Dict[str, Any]]] = None,
+        written_fingerprints: Optional[Dict[str, Dict[str, str]]] = None,
+        unchanged_ccods: Optional[List[str]] = None,
     ):
         """
         Processes a single product.
@@ -251,44 +566,47 @@ class ProductProcessor:
             force_update: Whether to force update the existing product.
             stats: The statistics dictionary.
             progress_tracker: The optional progress tracker.
+            fingerprint: The product's content fingerprint, if the ledger is enabled.
+            previous_fingerprints: Fingerprints recorded at the last successful write, by CCOD.
+            written_fingerprints: Collects the fingerprints of products written successfully.
+            unchanged_ccods: Collects the CCODs skipped because their fingerprint did not change
+                and their Shopify snapshot needs no update.
         """
         ccod = None
         try:
-            for tag in shopify_input.tags or []:
-                if tag.startswith("ccod_"):
-                    ccod = tag.replace("ccod_", "").upper()
+            ccod = self._get_ccod(shopify_input)
             if not ccod:
                 logger.warning(f"⚠️ No CCOD found in product tags: {shopify_input.title}")
                 stats["errors"] += 1
                 return
 
-            if existing_product:
-                if force_update:
-                    updated_product = await self.shopify_updater.update_shopify_product(shopify_input, existing_product)
-                    if updated_product:
-                        stats["updated"] += 1
-                        stats["inventory_updated"] += 1
-                        log_sync_operation("update", "shopify", ccod=ccod)
-                    else:
-                        stats["errors"] += 1
+            previous = (previous_fingerprints or {}).get(ccod)
+            skip_reason, verified = self._resolve_skip(
+                shopify_input, existing_product, force_update, fingerprint, previous
+            )
+            if skip_reason:
+                self._record_skip(skip_reason, stats)
+                if verified and unchanged_ccods is not None:
+                    unchanged_ccods.append(ccod)
+            elif existing_product:
+                updated_product = await self.shopify_updater.update_shopify_product(shopify_input, existing_product)
+                if updated_product:
+                    stats["updated"] += 1
+                    stats["inventory_updated"] += 1
+                    log_sync_operation("update", "shopify", ccod=ccod)
+                    self._record_written(ccod, fingerprint, previous, written_fingerprints)
+                    self._record_update_plan(updated_product)
                 else:
-                    stats["skipped"] += 1
+                    stats["errors"] += 1
             else:
-                total_stock = 0
-                for variant in shopify_input.variants or []:
-                    if hasattr(variant, "inventoryQuantities") and variant.inventoryQuantities:
-                        for inv_qty in variant.inventoryQuantities:
-                            total_stock += inv_qty.get("availableQuantity", 0)
-                if total_stock > 0 or settings.SYNC_CREATE_ZERO_STOCK_PRODUCTS:
-                    created_product = await self.shopify_updater.create_shopify_product(shopify_input)
-                    if created_product:
-                        stats["created"] += 1
-                        stats["inventory_updated"] += 1
-                        log_sync_operation("create", "shopify", ccod=ccod)
-                    else:
-                        stats["errors"] += 1
+                created_product = await self.shopify_updater.create_shopify_product(shopify_input)
+                if created_product:
+                    stats["created"] += 1
+                    stats["inventory_updated"] += 1
+                    log_sync_operation("create", "shopify", ccod=ccod)
+                    self._record_written(ccod, fingerprint, None, written_fingerprints)
                 else:
-                    stats["skipped"] += 1
+                    stats["errors"] += 1
             stats["total_processed"] += 1
             if progress_tracker:
                 progress_tracker.update(
@@ -306,3 +624,25 @@ class ProductProcessor:
             if progress_tracker:
                 progress_tracker.update(errors=1)
             logger.error(f"❌ Error processing {ccod or 'unknown'}: {str(e)}")
+
+    def _record_update_plan(self, updated_product: Dict[str, Any]) -> None:
+        """Counts the operations of the update plan returned with an updated product."""
+        plan = updated_product.get("update_plan") if isinstance(updated_product, dict) else None
+        if not plan:
+            return
+        for operation in plan.get("operations") or ["no_changes"]:
+            self.update_operations[operation] = self.update_operations.get(operation, 0) + 1
+
+    def _record_written(
+        self,
+        ccod: str,
+        fingerprint: Optional[Dict[str, str]],
+        previous: Optional[Dict[str, Any]],
+        written_fingerprints: Optional[Dict[str, Dict[str, str]]],
+    ) -> None:
+        """Records the fingerprint of a product written successfully and which sections changed."""
+        if fingerprint is None or written_fingerprints is None:
+            return
+        written_fingerprints[ccod] = fingerprint
+        for section in changed_sections(previous, fingerprint):
+            self.changed_sections[section] = self.changed_sections.get(section, 0) + 1
@@ -1,16 +1,21 @@
-import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.api.v1.schemas.shopify_schemas import ShopifyProductInput
 from app.core.config import get_settings
 from app.db.rms.product_repository import ProductRepository
 from app.db.shopify_graphql_client import ShopifyGraphQLClient
+from app.services.bulk_operations import ShopifyBulkOperations
+from app.services.catalog_mirror import CatalogMirror
 from app.services.multiple_variants_creator import MultipleVariantsCreator
+from app.services.multiple_variants_creator.data_preparator import DataPreparator
+from app.services.multiple_variants_creator.update_planner import UpdatePlanner
 from app.utils.error_handler import SyncException
 
 logger = logging.getLogger(__name__)
 
+MAX_HANDLES_PER_QUERY = 50
+
 
 class ShopifyUpdater:
     """Updates data in Shopify."""
@@ -20,27 +25,36 @@ class ShopifyUpdater:
         shopify_client: ShopifyGraphQLClient,
         primary_location_id: str,
         product_repository: Optional[ProductRepository] = None,
+        catalog_mirror: Optional[CatalogMirror] = None,
     ):
         self.shopify_client = shopify_client
         self.primary_location_id = primary_location_id
         self.product_repository = product_repository
+        self.catalog_mirror = catalog_mirror
         self.batch_handle_cache: Dict[str, Optional[Dict[str, Any]]] = {}
 
     async def check_products_exist_batch(self, handles: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
         """
         Checks if products exist in Shopify by their handles using an optimized batch search.
 
+        Results are product snapshots (status, tags, metafields and variants with
+        inventory at the primary location) cached per handle, so the page prefetch
+        done during mapping serves the existence check and the update planner
+        without further lookups. The local catalog mirror is not consulted: the writes
+        need the live snapshot anyway, and a handle missing from the mirror (missed
+        webhook, another replica) must not be treated as a new product.
+
         Args:
             handles: A list of product handles to check.
 
         Returns:
             A dictionary mapping handles to existing products (or None if they don't exist).
+            Handles whose lookup failed are left out, so callers can tell them apart from
+            products that do not exist.
         """
         if not handles:
             return {}
 
-        MAX_HANDLES_PER_QUERY = 50
-
         cached_results = {}
         uncached_handles = []
 
@@ -62,15 +76,14 @@ class ShopifyUpdater:
                         f"(chunk {i//MAX_HANDLES_PER_QUERY + 1})"
                     )
 
-                    batch_results = await self.shopify_client.get_products_by_handles_batch(chunk_handles)
+                    batch_results = await self.shopify_client.get_product_snapshots_by_handles(
+                        chunk_handles, self.primary_location_id
+                    )
 
                     for handle, product in batch_results.items():
                         self.batch_handle_cache[handle] = product
                         results[handle] = product
 
-                    if i + MAX_HANDLES_PER_QUERY < len(uncached_handles):
-                        await asyncio.sleep(0.5)
-
                 found_count = sum(1 for p in results.values() if p is not None)
                 cache_hits = len(cached_results)
                 logger.debug(
@@ -79,12 +92,50 @@ class ShopifyUpdater:
                 )
 
             except Exception as e:
-                logger.error(f"Error in batch product check: {e}")
-                for handle in uncached_handles:
-                    results[handle] = None
+                # A failed lookup is not "not found": unanswered handles are left out of the result
+                unanswered = [handle for handle in uncached_handles if handle not in results]
+                logger.error(f"Error in batch product check, {len(unanswered)} handles left unresolved: {e}")
 
         return results
 
+    def evict_handles(self, handles: List[str]) -> None:
+        """
+        Drops cached snapshots once their products have been processed.
+
+        The cache only has to live from the page prefetch done during mapping until the
+        page is written; evicting it keeps memory bounded by the pages in flight instead
+        of growing with the catalog.
+
+        Args:
+            handles: The handles of the processed products.
+        """
+        for handle in handles:
+            self.batch_handle_cache.pop(handle, None)
+
+    async def refresh_products(self, handles: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Looks up products again in Shopify, bypassing the handle cache.
+
+        Used after a write with an unknown outcome, when the cached answers
+        may no longer be true. Lookup errors are raised, not reported as missing products.
+
+        Args:
+            handles: A list of product handles to check.
+
+        Returns:
+            A dictionary mapping handles to existing products (or None if they don't exist).
+        """
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        for handle in handles:
+            self.batch_handle_cache.pop(handle, None)
+        for i in range(0, len(handles), MAX_HANDLES_PER_QUERY):
+            batch_results = await self.shopify_client.get_product_snapshots_by_handles(
+                handles[i : i + MAX_HANDLES_PER_QUERY], self.primary_location_id
+            )
+            self.batch_handle_cache.update(batch_results)
+            results.update(batch_results)
+        return results
+
     async def create_shopify_product(self, shopify_input: ShopifyProductInput) -> Dict[str, Any]:
         """
         Creates a product in Shopify.
@@ -102,8 +153,10 @@ class ShopifyUpdater:
                 self.primary_location_id,
                 self.product_repository,
                 enable_cleanup=settings.ENABLE_ZERO_STOCK_CLEANUP,
+                enable_product_set=settings.SYNC_PRODUCT_SET_ENABLED,
             )
             created_product = await variants_creator.create_product_with_variants(shopify_input)
+            await self._record_in_mirror(created_product.get("id"), shopify_input, created_product)
 
             sku = shopify_input.variants[0].sku if shopify_input.variants else "unknown"
 
@@ -138,6 +191,7 @@ class ShopifyUpdater:
                 self.primary_location_id,
                 self.product_repository,
                 enable_cleanup=settings.ENABLE_ZERO_STOCK_CLEANUP,
+                enable_update_planner=settings.SYNC_UPDATE_PLANNER_ENABLED,
             )
 
             product_id = shopify_product.get("id")
@@ -147,6 +201,7 @@ class ShopifyUpdater:
             updated_product = await variants_creator.update_product_with_variants(
                 product_id, shopify_input, shopify_product
             )
+            await self._record_in_mirror(product_id, shopify_input, updated_product, shopify_product)
 
             sku = shopify_input.variants[0].sku if shopify_input.variants else "unknown"
             if logger.isEnabledFor(logging.DEBUG):
@@ -160,3 +215,74 @@ class ShopifyUpdater:
                 operation="update_product",
                 failed_records=[shopify_input.model_dump()],
             ) from e
+
+    async def upsert_products_bulk(
+        self, entries: List[Tuple[ShopifyProductInput, Optional[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Creates or updates many products with one bulk productSet mutation.
+
+        Existing products must come with a complete snapshot (see UpdatePlanner.is_complete_snapshot)
+        so their variants keep their IDs. New variants get their quantities in the productSet
+        input; productSet does not change quantities of existing variants, so those are
+        compared with the snapshot and written afterwards with write_inventory_batch.
+
+        Args:
+            entries: (product input, existing product snapshot or None) pairs.
+
+        Returns:
+            One result per entry, in order, with "product" (None if it was not written),
+            "user_errors", "inventory_failed" (quantities that could not be set) and, when the
+            bulk operation was interrupted, "unconfirmed" (the product may have been written).
+        """
+        data_preparator = DataPreparator()
+        product_inputs = [
+            data_preparator.prepare_product_set_input(shopify_input, self.primary_location_id, existing_product)
+            for shopify_input, existing_product in entries
+        ]
+        results, _ = await ShopifyBulkOperations(self.shopify_client).bulk_upsert_products(product_inputs)
+
+        planner = UpdatePlanner(self.shopify_client, self.primary_location_id)
+        inventory_items: List[Dict[str, Any]] = []
+        owners: List[int] = []
+        needs_activation = False
+        for index, ((shopify_input, existing_product), result) in enumerate(zip(entries, results, strict=True)):
+            result["inventory_failed"] = 0
+            if not result["product"]:
+                continue
+            await self._record_in_mirror(
+                result["product"].get("id"), shopify_input, result["product"], existing_product
+            )
+            if existing_product:
+                items, activate = planner.plan_inventory_after_product_set(shopify_input, existing_product)
+                inventory_items.extend(items)
+                owners.extend([index] * len(items))
+                needs_activation = needs_activation or activate
+
+        if inventory_items:
+            item_results = await self.shopify_client.write_inventory_batch(
+                inventory_items, self.primary_location_id, activate=needs_activation
+            )
+            for owner, item_result in zip(owners, item_results, strict=True):
+                if not item_result["success"]:
+                    results[owner]["inventory_failed"] += 1
+        return results
+
+    async def _record_in_mirror(
+        self, product_id: Optional[str], shopify_input: ShopifyProductInput, *written_products: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Records a successfully written product in the local catalog mirror.
+
+        Args:
+            product_id: The Shopify product ID.
+            shopify_input: The written product data.
+            *written_products: Shopify products carrying variant and inventory item IDs
+                (the write response and the snapshot it was planned from).
+        """
+        if not self.catalog_mirror or not product_id:
+            return
+        try:
+            await self.catalog_mirror.record_written_product(product_id, shopify_input, written_products)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not record product {product_id} in catalog mirror: {e}")
@@ -9,6 +9,8 @@ from app.core.logging_config import LogContext
 from app.db.rms.product_repository import ProductRepository
 from app.db.rms.query_executor import QueryExecutor
 from app.db.shopify_graphql_client import ShopifyGraphQLClient
+from app.services.catalog_mirror import get_catalog_mirror
+from app.services.product_fingerprint import FingerprintLedger
 from app.services.rms_to_shopify.data_extractor import RMSExtractor
 from app.services.rms_to_shopify.product_processor import ProductProcessor
 from app.services.rms_to_shopify.report_generator import ReportGenerator
@@ -51,6 +53,7 @@ class RMSToShopifySyncOrchestrator:
         self.query_executor = QueryExecutor()
         self.product_repository = ProductRepository()
         self.shopify_client = ShopifyGraphQLClient()
+        self.fingerprint_ledger = FingerprintLedger() if settings.SYNC_FINGERPRINT_ENABLED else None
         self.primary_location_id = None
         self.shopify_updater: Optional[ShopifyUpdater] = None
         self.rms_extractor: Optional[RMSExtractor] = None
@@ -75,10 +78,17 @@ class RMSToShopifySyncOrchestrator:
                 logger.warning("No primary location found - inventory updates may fail")
 
             self.shopify_updater = ShopifyUpdater(
-                self.shopify_client, self.primary_location_id, self.product_repository
+                self.shopify_client,
+                self.primary_location_id,
+                self.product_repository,
+                catalog_mirror=await get_catalog_mirror(),
             )
             self.rms_extractor = RMSExtractor(
-                self.query_executor, self.product_repository, self.shopify_client, self.primary_location_id
+                self.query_executor,
+                self.product_repository,
+                self.shopify_client,
+                self.primary_location_id,
+                product_lookup=self.shopify_updater.check_products_exist_batch,
             )
             self.product_processor = ProductProcessor(
                 self.sync_id,
@@ -86,10 +96,13 @@ class RMSToShopifySyncOrchestrator:
                 self.checkpoint_manager,
                 self.error_aggregator,
                 self.checkpoint_frequency,
+                fingerprint_ledger=self.fingerprint_ledger,
             )
             self.report_generator = ReportGenerator(self.sync_id, self.error_aggregator)
 
             await self.checkpoint_manager.initialize()
+            if self.fingerprint_ledger:
+                await self.fingerprint_ledger.initialize()
             logger.info(f"🚀 Sync orchestrator initialized [sync_id: {self.sync_id}]")
 
         except Exception as e:
@@ -111,6 +124,8 @@ class RMSToShopifySyncOrchestrator:
                 await self.shopify_client.close()
             if self.checkpoint_manager:
                 await self.checkpoint_manager.close()
+            if self.fingerprint_ledger:
+                await self.fingerprint_ledger.close()
             logger.info(f"Sync orchestrator closed successfully - ID: {self.sync_id}")
         except Exception as e:
             logger.error(f"Error closing sync orchestrator: {e}")
@@ -210,7 +225,8 @@ class RMSToShopifySyncOrchestrator:
             }
 
         checkpoint = await self.checkpoint_manager.load_checkpoint()
-        current_page = 1  # Changed from 0 to 1 for 1-based page indexing
+        current_page = 1  # 1-based page numbering (for logs and reports)
+        after_ccod: Optional[str] = None  # Keyset cursor: last CCOD fully processed
         stats = {
             "total_processed": 0,
             "created": 0,
@@ -222,10 +238,12 @@ class RMSToShopifySyncOrchestrator:
         }
 
         if self.resume_from_checkpoint and checkpoint and await self.checkpoint_manager.should_resume():
-            current_page = checkpoint.get("additional_data", {}).get("current_page", 1)  # Default to 1, not 0
+            last_ccod = checkpoint.get("last_processed_ccod")
+            after_ccod = last_ccod if last_ccod and last_ccod != "unknown" else None
+            current_page = checkpoint.get("additional_data", {}).get("current_page", 1)
             stats = checkpoint["stats"]
             logger.info(
-                f"📊 Resuming from checkpoint - Page: {current_page}, "
+                f"📊 Resuming from checkpoint - After CCOD: {after_ccod}, Page: {current_page}, "
                 f"Processed: {stats['total_processed']} [sync_id: {self.sync_id}]"
             )
         else:
@@ -242,7 +260,6 @@ class RMSToShopifySyncOrchestrator:
         - Total Products (from RMS count): {total_products}
         - Page Size (products per page): {page_size}
         - Calculated Total Pages: {total_pages}
-        - Initial Loop Condition: `while {current_page} <= {total_pages}`
         """
         )
 
@@ -252,114 +269,186 @@ class RMSToShopifySyncOrchestrator:
             }]"
         )
 
-        while current_page <= total_pages:  # Fixed condition: iterate through all pages
-            logger.info(f"--- LOOP START: current_page = {current_page} ---")
-            offset = (current_page - 1) * page_size  # Adjusted for 1-based indexing
-
+        # Large catalogs are written with bulk productSet mutations: pages are accumulated and
+        # flushed every SYNC_BULK_MUTATION_BATCH_SIZE products instead of written one by one
+        bulk_mode = settings.SYNC_BULK_MUTATION_ENABLED and total_products >= settings.SYNC_BULK_MUTATION_THRESHOLD
+        bulk_batch_size = max(1, settings.SYNC_BULK_MUTATION_BATCH_SIZE)
+        bulk_pending: List[Any] = []
+        if bulk_mode:
             logger.info(
-                f"📄 Processing page {current_page}/{total_pages} "
-                f"(offset: {offset}, limit: {page_size}) [sync_id: {self.sync_id}]"
-            )
-
-            # --- STEP 1: Data Extraction ---
-            logger.info(">>> STARTING STEP 1: Data Extraction...")
-            page_products = await self.rms_extractor.extract_rms_products_paginated(
-                offset, page_size, filter_categories, include_zero_stock=include_zero_stock
+                f"📦 Bulk mutation mode: {total_products} products >= {settings.SYNC_BULK_MUTATION_THRESHOLD}, "
+                f"{bulk_batch_size} products per bulk operation [sync_id: {self.sync_id}]"
             )
-            logger.info(f"<<< COMPLETED STEP 1: Data Extraction. Found {len(page_products)} products.")
-
-            if not page_products:
-                logger.warning(f"Empty page {current_page}, continuing...")
-                current_page += 1
-                continue
-
-            # --- STEP 2: Product Processing ---
-            logger.info(">>> STARTING STEP 2: Product Processing...")
-            try:
-                page_stats = await self.product_processor.process_products_in_batches_optimized(
-                    page_products,
-                    force_update,
-                    batch_size,
-                    start_index=0,
-                    initial_stats={},
-                    total_products_global=total_products,
-                    is_page_processing=True,
-                )
-                logger.info(
-                    f"<<< COMPLETED STEP 2: Product Processing. Page stats: Created={
-                        page_stats.get('created', 0)
-                    }, Updated={page_stats.get('updated', 0)}, Errors={page_stats.get('errors', 0)}"
-                )
-            except Exception as e:
-                logger.error(f"❌ Error in STEP 2 (Product Processing): {e}", exc_info=True)
-                # Continue with empty stats rather than failing completely
-                page_stats = {
-                    "total_processed": 0,
-                    "created": 0,
-                    "updated": 0,
-                    "errors": len(page_products),
-                    "skipped": 0,
-                }
-                logger.warning(f"⚠️ Continuing despite error, marked {len(page_products)} products as errors")
 
-            # Update cumulative stats
+        def record_progress(page_stats: Dict[str, Any], page: int) -> None:
             for key in stats:
                 stats[key] += page_stats.get(key, 0)
 
             progress_percentage = (stats["total_processed"] / total_products * 100) if total_products > 0 else 0
             logger.info(
-                f"📊 Page {current_page}/{total_pages} completed - "
+                f"📊 Page {page}/{total_pages} completed - "
                 f"Total progress: {stats['total_processed']}/{total_products} ({progress_percentage:.1f}%) "
                 f"[sync_id: {self.sync_id}]"
             )
 
-            # --- STEP 3: Checkpoint Saving ---
-            logger.info(">>> STARTING STEP 3: Checkpoint Saving...")
-            await self.checkpoint_manager.save_checkpoint(
-                last_processed_ccod=(
-                    page_products[-1].tags[0].replace("ccod_", "") if page_products[-1].tags else "unknown"
-                ),
-                processed_count=stats["total_processed"],
-                total_count=total_products,
-                stats=stats,
-                batch_number=current_page,
-                additional_data={"current_page": current_page + 1, "total_pages": total_pages},
-            )
-            logger.info("<<< COMPLETED STEP 3: Checkpoint Saving.")
+        # Extraction/mapping of the next pages overlaps with Shopify writes for the current one.
+        # The bounded queue provides backpressure: when Shopify (throttle) is the bottleneck the
+        # producer blocks on put() instead of sleeping between pages.
+        prefetch_pages = max(1, settings.SYNC_PIPELINE_PREFETCH_PAGES)
+        page_queue: asyncio.Queue = asyncio.Queue(maxsize=prefetch_pages)
+        stage_times = {
+            "extract": {"busy_seconds": 0.0, "idle_seconds": 0.0},
+            "process": {"busy_seconds": 0.0, "idle_seconds": 0.0},
+        }
 
-            current_page += 1
+        async def produce_pages(first_page: int, cursor: Optional[str]) -> None:
+            """Extract pages in CCOD order (keyset) and hand them to the processing stage."""
+            page = first_page
+            while True:
+                logger.info(
+                    f"📄 Extracting page {page}/{total_pages} "
+                    f"(after CCOD: {cursor or '-'}, limit: {page_size}) [sync_id: {self.sync_id}]"
+                )
+                stage_started = time.monotonic()
+                try:
+                    page_products, cursor = await self.rms_extractor.extract_rms_products_paginated(
+                        page_size, filter_categories, include_zero_stock=include_zero_stock, after_ccod=cursor
+                    )
+                except Exception as e:
+                    stage_times["extract"]["busy_seconds"] += time.monotonic() - stage_started
+                    await page_queue.put((page, e, None))
+                    return
+                stage_times["extract"]["busy_seconds"] += time.monotonic() - stage_started
 
-            # Add delay between pages only if there are more pages to process
-            if current_page <= total_pages:
-                await asyncio.sleep(2)
+                if cursor is None:
+                    break
 
-            logger.info(f"--- LOOP END: current_page is now {current_page} ---")
+                stage_started = time.monotonic()
+                await page_queue.put((page, page_products, cursor))
+                stage_times["extract"]["idle_seconds"] += time.monotonic() - stage_started
+                page += 1
 
-            # Log clear pagination progress
-            if current_page <= total_pages:
-                logger.info(
-                    f"\n{'=' * 60}\n"
-                    f"📊 PAGE {current_page - 1}/{total_pages} COMPLETED\n"
-                    f"✅ Products synced so far: {stats['total_processed']}/{total_products}\n"
-                    f"➡️  Continuing to page {current_page}...\n"
-                    f"{'=' * 60}\n"
-                )
-            else:
-                logger.info(
-                    f"\n{'=' * 60}\n"
-                    f"🎉 ALL PAGES PROCESSED!\n"
-                    f"✅ Total products synced: {stats['total_processed']}/{total_products}\n"
-                    f"📄 Pages processed: {current_page - 1}/{total_pages}\n"
-                    f"{'=' * 60}\n"
+            await page_queue.put(None)
+
+        producer = asyncio.create_task(produce_pages(current_page, after_ccod))
+        try:
+            while True:
+                stage_started = time.monotonic()
+                item = await page_queue.get()
+                stage_times["process"]["idle_seconds"] += time.monotonic() - stage_started
+                if item is None:
+                    if bulk_pending:
+                        # Last pages still waiting for their bulk write
+                        stage_started = time.monotonic()
+                        page_stats = await self._write_products_bulk(bulk_pending, force_update)
+                        stage_times["process"]["busy_seconds"] += time.monotonic() - stage_started
+                        record_progress(page_stats, current_page - 1)
+                    break
+
+                current_page, page_products, page_last_ccod = item
+                if isinstance(page_products, Exception):
+                    raise page_products
+                logger.info(f"<<< Page {current_page}/{total_pages} extracted. Found {len(page_products)} products.")
+
+                if not page_products:
+                    logger.warning(f"Empty page {current_page} (up to CCOD {page_last_ccod}), continuing...")
+                    current_page += 1
+                    continue
+
+                # --- Product Processing ---
+                stage_started = time.monotonic()
+                if bulk_mode:
+                    bulk_pending.extend(page_products)
+                    if len(bulk_pending) < bulk_batch_size:
+                        current_page += 1
+                        continue
+                    page_stats = await self._write_products_bulk(bulk_pending, force_update)
+                    bulk_pending = []
+                    stage_times["process"]["busy_seconds"] += time.monotonic() - stage_started
+                    record_progress(page_stats, current_page)
+                    await self.checkpoint_manager.save_checkpoint(
+                        last_processed_ccod=page_last_ccod,
+                        processed_count=stats["total_processed"],
+                        total_count=total_products,
+                        stats=stats,
+                        batch_number=current_page,
+                        additional_data={"current_page": current_page + 1, "total_pages": total_pages},
+                    )
+                    current_page += 1
+                    continue
+
+                try:
+                    page_stats = await self.product_processor.process_products_in_batches_optimized(
+                        page_products,
+                        force_update,
+                        batch_size,
+                        start_index=0,
+                        initial_stats={},
+                        total_products_global=total_products,
+                        is_page_processing=True,
+                    )
+                    logger.info(
+                        f"<<< Page {current_page} processed. Created={page_stats.get('created', 0)}, "
+                        f"Updated={page_stats.get('updated', 0)}, Errors={page_stats.get('errors', 0)}"
+                    )
+                except Exception as e:
+                    logger.error(f"❌ Error processing page {current_page}: {e}", exc_info=True)
+                    # Continue with empty stats rather than failing completely
+                    page_stats = {
+                        "total_processed": 0,
+                        "created": 0,
+                        "updated": 0,
+                        "errors": len(page_products),
+                        "skipped": 0,
+                    }
+                    logger.warning(f"⚠️ Continuing despite error, marked {len(page_products)} products as errors")
+                stage_times["process"]["busy_seconds"] += time.monotonic() - stage_started
+
+                # Update cumulative stats
+                record_progress(page_stats, current_page)
+
+                # --- Checkpoint Saving (pages arrive in CCOD order; resume seeks past the last CCOD) ---
+                await self.checkpoint_manager.save_checkpoint(
+                    last_processed_ccod=page_last_ccod,
+                    processed_count=stats["total_processed"],
+                    total_count=total_products,
+                    stats=stats,
+                    batch_number=current_page,
+                    additional_data={"current_page": current_page + 1, "total_pages": total_pages},
                 )
 
+                current_page += 1
+
+            logger.info(
+                f"\n{'=' * 60}\n"
+                f"🎉 ALL PAGES PROCESSED!\n"
+                f"✅ Total products synced: {stats['total_processed']}/{total_products}\n"
+                f"📄 Pages processed: {current_page - 1}/{total_pages}\n"
+                f"{'=' * 60}\n"
+            )
+        finally:
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
+
         final_report = self.report_generator.generate_sync_report(stats)
+        final_report.update(self.product_processor.get_skip_report())
         final_report["duration_seconds"] = time.time() - start_time
         final_report["pages_processed"] = current_page - 1  # Actual pages processed
         final_report["page_size"] = page_size
         final_report["total_pages"] = total_pages
         final_report["total_products_expected"] = total_products
         final_report["total_products_synced"] = stats["total_processed"]
+        final_report["write_mode"] = "bulk_mutation" if bulk_mode else "per_product"
+        final_report["pipeline"] = {
+            "prefetch_pages": prefetch_pages,
+            "stages": {
+                stage: {name: round(value, 2) for name, value in times.items()} for stage, times in stage_times.items()
+            },
+        }
 
         # Only delete checkpoint if we actually processed all products
         if stats["total_processed"] >= total_products:
@@ -381,6 +470,16 @@ class RMSToShopifySyncOrchestrator:
 
         return final_report
 
+    async def _write_products_bulk(self, products: List[Any], force_update: bool) -> Dict[str, Any]:
+        """Writes accumulated pages with one bulk productSet mutation, counting them as errors if it fails."""
+        logger.info(f"📦 Writing {len(products)} products with a bulk mutation [sync_id: {self.sync_id}]")
+        try:
+            return await self.product_processor.process_products_bulk(products, force_update)
+        except Exception as e:
+            logger.error(f"❌ Error writing {len(products)} products with a bulk mutation: {e}", exc_info=True)
+            self.error_aggregator.add_error(e, {"operation": "bulk_write", "products": len(products)})
+            return {"total_processed": 0, "created": 0, "updated": 0, "errors": len(products), "skipped": 0}
+
     async def _sync_products_traditional(
         self,
         force_update: bool,
@@ -388,16 +487,18 @@ class RMSToShopifySyncOrchestrator:
         filter_categories: Optional[List[str]],
         include_zero_stock: bool,
         cod_product: Optional[str],
+        chunk_size: int = 200,
     ) -> Dict[str, Any]:
-        """Traditional sync method for compatibility."""
-        rms_products = await self.rms_extractor.extract_rms_products_with_variants(
-            filter_categories, cod_product, include_zero_stock=include_zero_stock
-        )
-        logger.info(f"📦 Extracted {len(rms_products)} products from RMS [sync_id: {self.sync_id}]")
+        """
+        Traditional sync method for compatibility.
 
+        Products are streamed from RMS in chunks of CCODs and each chunk is written before
+        the next one is extracted, so memory does not grow with the catalog. A checkpoint
+        with the last CCOD is saved after every chunk and a resumed sync seeks past it.
+        """
         checkpoint = await self.checkpoint_manager.load_checkpoint()
-        start_index = 0
-        initial_stats = {
+        after_ccod: Optional[str] = None
+        stats = {
             "total_processed": 0,
             "created": 0,
             "updated": 0,
@@ -408,19 +509,14 @@ class RMSToShopifySyncOrchestrator:
         }
 
         if self.resume_from_checkpoint and checkpoint and await self.checkpoint_manager.should_resume():
-            progress_pct = (
-                (checkpoint["processed_count"] / checkpoint["total_count"] * 100)
-                if checkpoint["total_count"] > 0
-                else 0
-            )
+            last_ccod = checkpoint.get("last_processed_ccod")
+            after_ccod = last_ccod if last_ccod and last_ccod != "unknown" else None
+            stats.update(checkpoint["stats"])
+            stats["resumed_from_checkpoint"] = True
             logger.info(
-                f"📊 Resuming sync from checkpoint [sync_id: {self.sync_id}]: {checkpoint['processed_count']}/{
-                    checkpoint['total_count']
-                } products ({progress_pct:.1f}%)"
+                f"📊 Resuming sync from checkpoint [sync_id: {self.sync_id}]: after CCOD {after_ccod}, "
+                f"{checkpoint['processed_count']} products already processed"
             )
-            start_index = checkpoint["processed_count"]
-            initial_stats = checkpoint["stats"]
-            initial_stats["resumed_from_checkpoint"] = True
         else:
             if self.force_fresh_start:
                 logger.info(f"🚀 Starting fresh sync [sync_id: {self.sync_id}] - forced fresh start")
@@ -430,17 +526,43 @@ class RMSToShopifySyncOrchestrator:
             else:
                 logger.info(f"🚀 Starting fresh sync [sync_id: {self.sync_id}] - no valid checkpoint found")
 
-        sync_stats = await self.product_processor.process_products_in_batches_optimized(
-            rms_products,
-            force_update,
-            batch_size,
-            start_index,
-            initial_stats,
-            total_products_global=None,  # Not using pagination, so no global total
-            is_page_processing=False,  # Traditional processing, not page-based
+        # Real total so the checkpoint stays resumable (should_resume requires processed < total)
+        total_products = await self.rms_extractor.count_rms_products(
+            filter_categories, cod_product, include_zero_stock=include_zero_stock
         )
 
-        final_report = self.report_generator.generate_sync_report(sync_stats)
+        chunks = 0
+        async for rms_products, last_ccod in self.rms_extractor.iter_rms_products_with_variants(
+            filter_categories,
+            cod_product,
+            include_zero_stock=include_zero_stock,
+            chunk_size=chunk_size,
+            after_ccod=after_ccod,
+        ):
+            chunks += 1
+            logger.info(f"📦 Extracted chunk {chunks} with {len(rms_products)} products [sync_id: {self.sync_id}]")
+            chunk_stats = await self.product_processor.process_products_in_batches_optimized(
+                rms_products,
+                force_update,
+                batch_size,
+                initial_stats={},
+                is_page_processing=True,  # Checkpoints are saved per chunk below
+            )
+            for key, value in chunk_stats.items():
+                stats[key] = stats.get(key, 0) + value
+
+            await self.checkpoint_manager.save_checkpoint(
+                last_processed_ccod=last_ccod,
+                processed_count=stats["total_processed"],
+                total_count=max(total_products, stats["total_processed"]),
+                stats=stats,
+                batch_number=chunks,
+            )
+
+        logger.info(f"📦 Synced {stats['total_processed']} products in {chunks} chunks [sync_id: {self.sync_id}]")
+
+        final_report = self.report_generator.generate_sync_report(stats)
+        final_report.update(self.product_processor.get_skip_report())
 
         if final_report.get("success_rate", 0) > 0:
             logger.info(f"🎉 Sync completed successfully [sync_id: {self.sync_id}] - Cleaning up checkpoint")
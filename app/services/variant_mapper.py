@@ -5,9 +5,8 @@ Mapeador inteligente de variantes por color y talla.
 
 import logging
 from collections import defaultdict
-from datetime import UTC, datetime
 from decimal import Decimal
-from typing import Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from app.api.v1.schemas.rms_schemas import RMSViewItem
 from app.api.v1.schemas.shopify_schemas import (
@@ -95,6 +94,42 @@ class VariantMapper:
             logger.warning(f"Error al verificar producto existente '{handle}': {e}")
             return None
 
+    @staticmethod
+    def get_group_handle(items: List[RMSViewItem]) -> str:
+        """
+        Genera el handle del producto de un grupo de items (basado en el CCOD del primer item).
+
+        Args:
+            items: Lista de items RMS del mismo modelo
+
+        Returns:
+            str: Handle del producto en Shopify
+        """
+        from app.utils.shopify_utils import generate_shopify_handle
+
+        base_item = items[0]
+        return generate_shopify_handle(base_item.ccod, base_item.familia)
+
+    @staticmethod
+    def _status_from_existing_product(
+        handle: str, existing_product: Optional[Dict[str, Any]]
+    ) -> Optional[ProductStatus]:
+        """
+        Obtiene el status de un producto ya consultado en Shopify.
+
+        Args:
+            handle: Handle del producto
+            existing_product: Producto obtenido por la consulta en lote (None si no existe)
+
+        Returns:
+            ProductStatus del producto existente o None si no existe
+        """
+        if existing_product and existing_product.get("status"):
+            current_status = existing_product["status"]
+            logger.debug(f"Producto existente '{handle}' tiene status: {current_status}")
+            return ProductStatus(current_status)
+        return None
+
     @staticmethod
     async def map_product_group_with_variants(
         items: List[RMSViewItem],
@@ -102,6 +137,7 @@ class VariantMapper:
         location_id: Optional[str] = None,
         preserve_shopify_status: bool = True,
         include_category_tags: bool = False,
+        existing_products: Optional[Dict[str, Optional[Dict[str, Any]]]] = None,
     ) -> ShopifyProductInput:
         """
         Mapea un grupo de items RMS a un producto Shopify con múltiples variantes.
@@ -112,6 +148,8 @@ class VariantMapper:
             location_id: ID de ubicación para inventario
             preserve_shopify_status: Si True, preserva el status existente del producto en Shopify
             include_category_tags: Si True, incluye tags de categoría y género para collections
+            existing_products: Productos de Shopify ya consultados en lote por handle; si el
+                handle está presente no se consulta Shopify de nuevo
 
         Returns:
             ShopifyProductInput: Producto con variantes múltiples
@@ -126,14 +164,15 @@ class VariantMapper:
         base_title = VariantMapper._generate_base_title(items)
 
         # Generar handle único basado en CCOD
-        from app.utils.shopify_utils import generate_shopify_handle
-
-        handle = generate_shopify_handle(base_item.ccod, base_item.familia)
+        handle = VariantMapper.get_group_handle(items)
 
         # Determinar status del producto
         product_status = ProductStatus.DRAFT  # Default para productos nuevos
         if preserve_shopify_status:
-            existing_status = await VariantMapper._get_existing_product_status(handle, shopify_client)
+            if existing_products is not None and handle in existing_products:
+                existing_status = VariantMapper._status_from_existing_product(handle, existing_products[handle])
+            else:
+                existing_status = await VariantMapper._get_existing_product_status(handle, shopify_client)
             if existing_status:
                 product_status = existing_status
                 logger.info(f"🔄 Preservando status existente '{existing_status}' para producto '{handle}'")
@@ -166,7 +205,7 @@ class VariantMapper:
         # product_type siempre vacío (se configura manualmente en Shopify)
         product_type = RMSToShopifyMapper._get_product_type(base_item)
 
-        # Generar SOLO tags básicos: ccod_ y RMS-SYNC-YY-MM-DD
+        # Generar SOLO el tag básico ccod_
         # NO se agregan tags de categoría o género por defecto
         all_tags = VariantMapper._generate_tags(base_item)
 
@@ -420,19 +459,16 @@ class VariantMapper:
     def _generate_tags(item: RMSViewItem) -> List[str]:
         """
         Genera tags mínimos esenciales para el producto.
-        Solo: CCOD y fecha de sincronización.
+        Solo: CCOD. La fecha de la última sincronización se registra en el ledger
+        (FingerprintLedger), no en tags, para no modificar todo el catálogo cada día.
         """
         tags = []
 
-        # Tag 1: CCOD del producto
+        # CCOD del producto
         if item.ccod:
             normalized_ccod = item.ccod.strip().upper()
             tags.append(f"ccod_{normalized_ccod}")
 
-        # Tag 2: RMS-SYNC con fecha (formato YY-MM-DD)
-        sync_date = datetime.now(UTC).strftime("%y-%m-%d")
-        tags.append(f"RMS-SYNC-{sync_date}")
-
         return tags
 
     @staticmethod
@@ -450,6 +486,7 @@ async def create_products_with_variants(
     location_id: Optional[str] = None,
     preserve_shopify_status: bool = True,
     include_category_tags: bool = False,
+    product_lookup: Optional[Callable[[List[str]], Awaitable[Dict[str, Optional[Dict[str, Any]]]]]] = None,
 ) -> List[ShopifyProductInput]:
     """
     Genera productos con variantes inteligentes a partir de items RMS.
@@ -460,6 +497,9 @@ async def create_products_with_variants(
         location_id: ID de ubicación para inventario
         preserve_shopify_status: Si True, preserva el status existente del producto en Shopify
         include_category_tags: Si True, incluye tags de categoría y género para collections
+        product_lookup: Consulta en lote handle → producto existente (ej.
+            ShopifyUpdater.check_products_exist_batch); si se indica, los status se obtienen
+            con una sola consulta para todos los productos en lugar de una por handle
 
     Returns:
         List: Lista de productos Shopify con variantes
@@ -467,11 +507,21 @@ async def create_products_with_variants(
     # Agrupar items por modelo
     grouped_items = VariantMapper.group_items_by_model(rms_items)
 
+    existing_products = None
+    if preserve_shopify_status and product_lookup and grouped_items:
+        handles = list(dict.fromkeys(VariantMapper.get_group_handle(items) for items in grouped_items.values()))
+        existing_products = await product_lookup(handles)
+
     products = []
     for _, items in grouped_items.items():
         # Crear producto con variantes
         product = await VariantMapper.map_product_group_with_variants(
-            items, shopify_client, location_id, preserve_shopify_status, include_category_tags
+            items,
+            shopify_client,
+            location_id,
+            preserve_shopify_status,
+            include_category_tags,
+            existing_products=existing_products,
         )
         products.append(product)
 
@@ -25,6 +25,7 @@ from app.utils.error_handler import (
     ErrorAggregator,
     ValidationException,
 )
+from app.utils.id_utils import rest_to_graphql_id
 from app.utils.retry_handler import get_handler
 
 settings = get_settings()
@@ -190,6 +191,7 @@ class WebhookProcessor:
 
             # Podríamos actualizar estado en base de datos local si es necesario
             await self._update_local_product_sync_status(product.id, "created", {"created_at": product.createdAt})
+            await self._update_catalog_mirror("upsert", payload)
 
             return {
                 "action": "product_created",
@@ -217,6 +219,9 @@ class WebhookProcessor:
             # Validar payload
             product = self._validate_product_payload(payload)
 
+            # El espejo del catálogo se actualiza también con nuestras propias escrituras
+            await self._update_catalog_mirror("upsert", payload)
+
             # Verificar si la actualización viene de nuestra sincronización
             if await self._is_internal_update(product.id):
                 logger.info(f"Internal update detected for {product.id}, skipping sync back")
@@ -265,6 +270,7 @@ class WebhookProcessor:
             await self._update_local_product_sync_status(
                 product_id, "deleted", {"deleted_at": datetime.now(timezone.utc).isoformat()}
             )
+            await self._update_catalog_mirror("delete", payload)
 
             return {"action": "product_deleted", "product_id": product_id, "sync_needed": False}
 
@@ -397,6 +403,7 @@ class WebhookProcessor:
             available = payload.get("available")
 
             logger.info(f"Inventory updated in Shopify: Item {inventory_item_id} at {location_id} = {available}")
+            await self._update_catalog_mirror("inventory", payload)
 
             # Si la actualización no viene de nuestra sincronización,
             # podríamos necesitar sincronizar de vuelta a RMS
@@ -576,6 +583,36 @@ class WebhookProcessor:
         # Por ahora, solo logging
         logger.debug(f"Would update sync status: {product_id} -> {status} ({metadata})")
 
+    async def _update_catalog_mirror(self, action: str, payload: Dict[str, Any]):
+        """
+        Refleja en el espejo local del catálogo un cambio notificado por webhook.
+
+        Un error aquí no debe hacer fallar el webhook: la reconciliación periódica
+        del espejo corrige cualquier cambio perdido.
+
+        Args:
+            action: "upsert" (products/create y products/update), "delete" o "inventory"
+            payload: Payload REST del webhook
+        """
+        try:
+            from app.services.catalog_mirror import get_catalog_mirror, normalize_webhook_product
+
+            mirror = await get_catalog_mirror()
+            if not mirror:
+                return
+
+            if action == "upsert":
+                await mirror.upsert_products([normalize_webhook_product(payload)])
+            elif action == "delete":
+                await mirror.delete_product(rest_to_graphql_id(str(payload["id"]), "Product"))
+            elif action == "inventory" and payload.get("available") is not None:
+                # El espejo guarda una cantidad por variante (tienda con una ubicación principal)
+                inventory_item_id = rest_to_graphql_id(str(payload["inventory_item_id"]), "InventoryItem")
+                await mirror.set_available({inventory_item_id: payload["available"]})
+
+        except Exception as e:
+            logger.warning(f"⚠️ Could not update catalog mirror from webhook ({action}): {e}")
+
     async def _sync_order_to_rms(self, order: ShopifyOrder, raw_payload: Dict[str, Any]):
         """
         Sincroniza orden a RMS en background.
@@ -13,6 +13,7 @@ IMPORTANTE: Las variantes con stock 0 NO vienen en el sync normal porque el quer
 Por eso necesitamos una consulta SQL adicional específica para stock 0.
 """
 
+import asyncio
 import logging
 from typing import Any, Dict, List, Optional, Set
 
@@ -87,7 +88,8 @@ class ZeroStockVariantCleanupService:
 
             logger.debug(f"Encontradas {len(shopify_variants)} variantes en Shopify para {ccod}")
 
-            # 2. Eliminar variantes que tienen stock 0 en RMS
+            # 2. Eliminar variantes que tienen stock 0 en RMS (en paralelo: el batcher las agrupa)
+            deletions = []
             for variant in shopify_variants:
                 self.stats["variants_checked"] += 1
                 sku = variant.get("sku")
@@ -103,12 +105,14 @@ class ZeroStockVariantCleanupService:
                         f"🗑️  Variante con stock 0 detectada en Shopify: " f"SKU={sku}, ID={variant_id}, CCOD={ccod}"
                     )
 
-                    deleted = await self._delete_variant(variant_id, sku, ccod, shopify_product_id)
-                    if deleted:
-                        self.stats["variants_deleted"] += 1
+                    deletions.append(self._delete_variant(variant_id, sku, ccod, shopify_product_id))
                 else:
                     logger.debug(f"✅ Variante {sku} tiene stock > 0 en RMS, manteniendo")
 
+            for deleted in await asyncio.gather(*deletions):
+                if deleted:
+                    self.stats["variants_deleted"] += 1
+
             logger.info(
                 f"✅ Limpieza completada para {ccod}: "
                 f"{self.stats['variants_checked']} verificadas, "
@@ -190,39 +194,22 @@ class ZeroStockVariantCleanupService:
         Returns:
             True si se eliminó exitosamente, False en caso contrario
         """
-        delete_mutation = """
-        mutation bulkDeleteProductVariants($productId: ID!, $variantsIds: [ID!]!) {
-            productVariantsBulkDelete(productId: $productId, variantsIds: $variantsIds) {
-                product {
-                    id
-                    title
-                }
-                userErrors {
-                    field
-                    message
-                }
-            }
-        }
-        """
-
         try:
-            response = await self.shopify_client._execute_query(
-                delete_mutation, {"productId": product_id, "variantsIds": [variant_id]}
+            # productVariantsBulkDelete por el batcher: se agrupa con las de otras variantes y productos
+            response = await self.shopify_client.mutation_batcher.submit(
+                "productVariantsBulkDelete",
+                {"productId": ("ID!", product_id), "variantsIds": ("[ID!]!", [variant_id])},
+                "product { id title } userErrors { field message }",
             )
 
-            # Note: _execute_query already extracts "data" field
-            if not response or "productVariantsBulkDelete" not in response:
-                logger.error(f"Respuesta inválida al eliminar variante {sku}: {response}")
-                return False
-
-            user_errors = response.get("productVariantsBulkDelete", {}).get("userErrors", [])
+            user_errors = response.get("userErrors", [])
 
             if user_errors:
                 logger.error(f"Errores al eliminar variante {sku}: {user_errors}")
                 self.stats["errors"] += 1
                 return False
 
-            product = response.get("productVariantsBulkDelete", {}).get("product")
+            product = response.get("product")
 
             if product:
                 logger.info(f"🗑️  Variante ELIMINADA (stock 0 en RMS): SKU={sku}, ID={variant_id}, CCOD={ccod}")
@@ -7,10 +7,13 @@ to ensure atomic lock acquisition and automatic release on timeout.
 
 Key Features:
 - Atomic lock acquisition (SET NX)
+- Batch acquisition/release of many locks in one Redis call (acquire_many/release_many)
+- Waiters woken through Redis pub/sub on release instead of blind sleep-polling
 - Auto-expiration (prevents deadlocks)
 - Token-based release (prevents accidental unlocks)
 - Context manager support (async with)
 - File-based fallback when Redis unavailable
+- Lock wait metrics per lock type (get_lock_metrics)
 
 Usage:
     async with DistributedLock("product:123", timeout=300) as lock:
@@ -24,10 +27,52 @@ import os
 import time
 import uuid
 from contextlib import asynccontextmanager
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Pub/sub channel where every release publishes the released Redis key
+LOCK_RELEASED_CHANNEL = "lock:released"
+
+# Atomic release: delete only our own lock and announce it to waiters
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    redis.call("del", KEYS[1])
+    redis.call("publish", ARGV[2], KEYS[1])
+    return 1
+else
+    return 0
+end
+"""
+
+# SET NX EX for many keys in one round-trip; ARGV[1] is the TTL, ARGV[i + 1] the token of KEYS[i]
+ACQUIRE_MANY_SCRIPT = """
+local results = {}
+for i, key in ipairs(KEYS) do
+    if redis.call("set", key, ARGV[i + 1], "NX", "EX", ARGV[1]) then
+        results[i] = 1
+    else
+        results[i] = 0
+    end
+end
+return results
+"""
+
+# Token-checked release of many keys; ARGV[1] is the channel, ARGV[i + 1] the token of KEYS[i]
+RELEASE_MANY_SCRIPT = """
+local results = {}
+for i, key in ipairs(KEYS) do
+    if redis.call("get", key) == ARGV[i + 1] then
+        redis.call("del", key)
+        redis.call("publish", ARGV[1], key)
+        results[i] = 1
+    else
+        results[i] = 0
+    end
+end
+return results
+"""
+
 
 class LockAcquisitionError(Exception):
     """Raised when lock cannot be acquired within timeout."""
@@ -38,6 +83,164 @@ class LockAcquisitionError(Exception):
         super().__init__(f"Could not acquire lock '{key}' after {waited:.2f}s")
 
 
+class LockMetrics:
+    """
+    Process-wide lock acquisition statistics, grouped by lock type ("product", "order", ...).
+
+    Wait time is measured from the first acquisition attempt until the lock is
+    acquired or given up, so it includes both Redis round-trips and waiting for
+    other holders.
+    """
+
+    def __init__(self):
+        self._by_kind: Dict[str, Dict[str, Any]] = {}
+
+    def _kind_stats(self, kind: str) -> Dict[str, Any]:
+        return self._by_kind.setdefault(
+            kind,
+            {
+                "acquired": 0,
+                "failed": 0,
+                "contended": 0,
+                "release_wakeups": 0,
+                "batch_calls": 0,
+                "batch_acquired": 0,
+                "total_wait_seconds": 0.0,
+                "max_wait_seconds": 0.0,
+            },
+        )
+
+    def record_wait(self, kind: str, waited: float, acquired: bool, attempts: int, wakeups: int) -> None:
+        """Record one acquire() call."""
+        stats = self._kind_stats(kind)
+        stats["acquired" if acquired else "failed"] += 1
+        stats["contended"] += attempts > 1
+        stats["release_wakeups"] += wakeups
+        stats["total_wait_seconds"] += waited
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+
+    def record_batch(self, kind: str, waited: float, acquired: int) -> None:
+        """Record one acquire_many() call."""
+        stats = self._kind_stats(kind)
+        stats["batch_calls"] += 1
+        stats["batch_acquired"] += acquired
+        stats["acquired"] += acquired
+        stats["total_wait_seconds"] += waited
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Statistics per lock type, with the average wait per acquisition attempt."""
+        summary = {}
+        for kind, stats in self._by_kind.items():
+            attempts = stats["acquired"] + stats["failed"]
+            summary[kind] = {
+                **stats,
+                "total_wait_seconds": round(stats["total_wait_seconds"], 3),
+                "max_wait_seconds": round(stats["max_wait_seconds"], 3),
+                "avg_wait_seconds": round(stats["total_wait_seconds"] / attempts, 4) if attempts else 0.0,
+            }
+        return summary
+
+    def reset(self) -> None:
+        self._by_kind.clear()
+
+
+class LockReleaseListener:
+    """
+    Wakes local waiters when a lock is released, in this process or any other.
+
+    Releases in this process notify directly; releases elsewhere arrive through a
+    single subscription to ``LOCK_RELEASED_CHANNEL`` shared by all waiters of the
+    process. Waiters still time out and retry, so a lost message or a lock that
+    simply expires only costs one backoff interval.
+    """
+
+    def __init__(self):
+        self._waiters: Dict[str, set[asyncio.Event]] = {}
+        self._pubsub: Any = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._disabled = False
+
+    def watch(self, redis_key: str) -> asyncio.Event:
+        """Register interest in a key; must be called before the attempt whose failure we wait on."""
+        event = asyncio.Event()
+        self._waiters.setdefault(redis_key, set()).add(event)
+        return event
+
+    def unwatch(self, redis_key: str, event: asyncio.Event) -> None:
+        waiters = self._waiters.get(redis_key)
+        if waiters is not None:
+            waiters.discard(event)
+            if not waiters:
+                del self._waiters[redis_key]
+
+    def notify(self, redis_key: str) -> None:
+        """Wake every local waiter of a key."""
+        for event in self._waiters.get(redis_key, ()):
+            event.set()
+
+    async def ensure_subscribed(self, redis_client: Any) -> bool:
+        """
+        Start the shared subscription if it is not running on the current event loop.
+
+        Returns:
+            True if releases from other processes will be received
+        """
+        if self._disabled:
+            return False
+        loop = asyncio.get_running_loop()
+        if self._task and not self._task.done() and self._loop is loop:
+            return True
+        try:
+            self._pubsub = redis_client.pubsub()
+            await self._pubsub.subscribe(LOCK_RELEASED_CHANNEL)
+        except Exception as e:
+            logger.warning(f"Lock release notifications unavailable, waiters will poll: {e}")
+            self._disabled = True
+            return False
+        self._loop = loop
+        self._task = asyncio.create_task(self._listen(self._pubsub))
+        return True
+
+    async def _listen(self, pubsub: Any) -> None:
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    self.notify(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Lock release subscription stopped: {e}")
+
+    async def close(self) -> None:
+        """Stop the subscription (application shutdown)."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing lock release subscription: {e}")
+        self._task = None
+        self._pubsub = None
+
+
+_lock_metrics = LockMetrics()
+_release_listener = LockReleaseListener()
+
+
+def get_lock_metrics() -> LockMetrics:
+    """Get the process-wide lock metrics."""
+    return _lock_metrics
+
+
+def get_lock_release_listener() -> LockReleaseListener:
+    """Get the process-wide lock release listener."""
+    return _release_listener
+
+
 class DistributedLock:
     """
     Redis-based distributed lock with file-based fallback.
@@ -46,7 +249,7 @@ class DistributedLock:
     1. Atomic acquisition using Redis SET NX (or file exclusive create)
     2. Automatic expiration to prevent deadlocks
     3. Token-based release to prevent accidental unlocks
-    4. Exponential backoff for retry attempts
+    4. Exponential backoff for retry attempts, cut short when the holder releases
     5. File-based fallback when Redis is unavailable
 
     Args:
@@ -88,6 +291,7 @@ class DistributedLock:
             use_redis: Whether to use Redis (True) or file-based (False) locking
         """
         self.lock_key = lock_key.replace("/", "_").replace(":", "_")  # Sanitize for filename
+        self.lock_kind = lock_key.split(":", 1)[0]  # Metrics grouping (e.g., "product")
         self.redis_key = f"lock:{lock_key}"
         self.timeout_seconds = timeout_seconds
         self.retry_delay = retry_delay
@@ -125,6 +329,9 @@ class DistributedLock:
         """
         Attempt to acquire lock with exponential backoff retry.
 
+        Between attempts the waiter sleeps until the holder releases the lock
+        (pub/sub notification) or the backoff delay elapses, whichever comes first.
+
         Returns:
             True if lock acquired successfully
 
@@ -133,8 +340,12 @@ class DistributedLock:
         """
         start_time = time.time()
         current_delay = self.retry_delay
+        listener = get_lock_release_listener()
+        wakeups = 0
 
         for attempt in range(self.max_retries):
+            # Watch before trying so a release right after a failed attempt is not missed
+            released = listener.watch(self.redis_key)
             try:
                 if self.use_redis and self.redis_client:
                     acquired = await self._acquire_redis()
@@ -145,6 +356,7 @@ class DistributedLock:
                     self.acquired = True
                     self.start_time = time.time()
                     elapsed = self.start_time - start_time
+                    get_lock_metrics().record_wait(self.lock_kind, elapsed, True, attempt + 1, wakeups)
                     logger.debug(
                         f"🔒 Lock acquired: {self.lock_key} "
                         f"(attempt {attempt + 1}, waited {elapsed:.2f}s, "
@@ -152,17 +364,25 @@ class DistributedLock:
                     )
                     return True
 
-                # Lock already held by another process, retry with backoff
+                # Lock already held by another process, wait for its release (or the backoff delay)
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(current_delay)
-                    current_delay = min(current_delay * 2, 5.0)  # Max 5s delay
+                    if self.use_redis and self.redis_client:
+                        await listener.ensure_subscribed(self.redis_client)
+                    try:
+                        await asyncio.wait_for(released.wait(), timeout=current_delay)
+                        wakeups += 1
+                    except asyncio.TimeoutError:
+                        current_delay = min(current_delay * 2, 5.0)  # Max 5s delay
 
             except Exception as e:
                 logger.error(f"Error acquiring lock {self.lock_key}: {e}")
                 raise
+            finally:
+                listener.unwatch(self.redis_key, released)
 
         # Failed to acquire lock after all retries
         elapsed = time.time() - start_time
+        get_lock_metrics().record_wait(self.lock_kind, elapsed, False, self.max_retries, wakeups)
         raise LockAcquisitionError(self.lock_key, elapsed)
 
     async def _acquire_redis(self) -> bool:
@@ -239,6 +459,7 @@ class DistributedLock:
 
             if result:
                 self.acquired = False
+                get_lock_release_listener().notify(self.redis_key)
                 if self.start_time:
                     held_duration = time.time() - self.start_time
                     logger.debug(
@@ -258,17 +479,9 @@ class DistributedLock:
             return False
 
     async def _release_redis(self) -> bool:
-        """Release lock using Redis Lua script for atomicity."""
+        """Release lock using Redis Lua script for atomicity (and announce it to waiters)."""
         try:
-            # Lua script for atomic release (check token before deleting)
-            lua_script = """
-            if redis.call("get", KEYS[1]) == ARGV[1] then
-                return redis.call("del", KEYS[1])
-            else
-                return 0
-            end
-            """
-            result = await self.redis_client.eval(lua_script, 1, self.redis_key, self.token)
+            result = await self.redis_client.eval(RELEASE_SCRIPT, 1, self.redis_key, self.token, LOCK_RELEASED_CHANNEL)
             return result == 1
         except Exception as e:
             logger.warning(f"Redis lock release failed: {e}")
@@ -367,6 +580,92 @@ class DistributedLock:
         return time.time() - self.start_time >= self.timeout_seconds
 
 
+async def acquire_many(locks: List[DistributedLock]) -> List[DistributedLock]:
+    """
+    Try to acquire many locks at once, without waiting for busy ones.
+
+    Redis locks are taken with one Lua call (SET NX EX per key) instead of one
+    round-trip per lock; file locks are tried one by one. Each lock keeps its own
+    token, so it can later be released individually or with ``release_many``.
+
+    Args:
+        locks: Locks to acquire (e.g., the ProductLock of every product of a page)
+
+    Returns:
+        List[DistributedLock]: The locks that were acquired; the others are held by
+            someone else and can be waited on with their own ``acquire()``
+    """
+    start_time = time.time()
+    redis_locks = [lock for lock in locks if not lock.acquired and lock.use_redis and lock.redis_client]
+    file_locks = [lock for lock in locks if not lock.acquired and lock not in redis_locks]
+    acquired: List[DistributedLock] = []
+
+    if redis_locks:
+        try:
+            results = await redis_locks[0].redis_client.eval(
+                ACQUIRE_MANY_SCRIPT,
+                len(redis_locks),
+                *(lock.redis_key for lock in redis_locks),
+                str(max(lock.timeout_seconds for lock in redis_locks)),
+                *(lock.token for lock in redis_locks),
+            )
+            acquired.extend(lock for lock, result in zip(redis_locks, results, strict=True) if int(result) == 1)
+        except Exception as e:
+            # Leave them unacquired; acquire() retries each one (with its own Redis/file fallback)
+            logger.warning(f"Batch lock acquisition failed, locks will be acquired one by one: {e}")
+
+    for lock in file_locks:
+        if await lock._acquire_file():
+            acquired.append(lock)
+
+    now = time.time()
+    for lock in acquired:
+        lock.acquired = True
+        lock.start_time = now
+    if locks:
+        get_lock_metrics().record_batch(locks[0].lock_kind, now - start_time, len(acquired))
+    logger.debug(f"🔒 Batch lock: {len(acquired)}/{len(locks)} acquired in {now - start_time:.3f}s")
+    return acquired
+
+
+async def release_many(locks: List[DistributedLock]) -> int:
+    """
+    Release many held locks, with one Lua call for the Redis ones.
+
+    Args:
+        locks: Locks to release; locks not held by this instance are ignored
+
+    Returns:
+        int: Number of locks released
+    """
+    held = [lock for lock in locks if lock.acquired]
+    redis_locks = [lock for lock in held if lock.use_redis and lock.redis_client]
+    released: List[DistributedLock] = []
+
+    if redis_locks:
+        try:
+            results = await redis_locks[0].redis_client.eval(
+                RELEASE_MANY_SCRIPT,
+                len(redis_locks),
+                *(lock.redis_key for lock in redis_locks),
+                LOCK_RELEASED_CHANNEL,
+                *(lock.token for lock in redis_locks),
+            )
+            released.extend(lock for lock, result in zip(redis_locks, results, strict=True) if int(result) == 1)
+        except Exception as e:
+            logger.warning(f"Batch lock release failed, locks will expire after their timeout: {e}")
+
+    for lock in held:
+        if lock not in redis_locks and await lock._release_file():
+            released.append(lock)
+
+    listener = get_lock_release_listener()
+    for lock in released:
+        lock.acquired = False
+        listener.notify(lock.redis_key)
+    return len(released)
+
+
 # Legacy alias for backwards compatibility
 @asynccontextmanager
 async def collection_lock(collection_handle: str, timeout_seconds: int = 30):
@@ -487,3 +786,4 @@ async def cleanup_locks():
     if _lock_manager:
         await _lock_manager.stop()
         _lock_manager = None
+    await get_lock_release_listener().close()
@@ -0,0 +1,81 @@
+"""Tests unitarios para el registro de clientes Shopify con sesión compartida."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+
+from app.db.shopify_clients import client_registry
+from app.db.shopify_clients.base_client import BaseShopifyGraphQLClient
+from app.utils.error_handler import ShopifyAPIException
+
+
+@pytest_asyncio.fixture
+async def registry():
+    """Registro limpio para cada test."""
+    await client_registry.close_client_registry()
+    yield client_registry.get_client_registry()
+    await client_registry.close_client_registry()
+
+
+class TestShopifyClientRegistry:
+    """Tests para el pool HTTP compartido por proceso."""
+
+    @pytest.mark.asyncio
+    async def test_clients_share_pooled_session(self, registry):
+        """Todos los clientes deben usar la misma sesión y verificar la conexión una sola vez."""
+        with patch.object(BaseShopifyGraphQLClient, "test_connection", new=AsyncMock(return_value=True)) as test_conn:
+            first = BaseShopifyGraphQLClient()
+            second = BaseShopifyGraphQLClient()
+
+            await first.initialize()
+            await second.initialize()
+
+        assert first.session is second.session
+        assert test_conn.await_count == 1
+        assert registry.stats["sessions_created"] == 1
+
+    @pytest.mark.asyncio
+    async def test_client_close_keeps_pool_open(self, registry):
+        """Cerrar un cliente no debe cerrar la sesión compartida."""
+        with patch.object(BaseShopifyGraphQLClient, "test_connection", new=AsyncMock(return_value=True)):
+            client = BaseShopifyGraphQLClient()
+            await client.initialize()
+            session = client.session
+
+            await client.close()
+
+        assert client.session is None
+        assert not session.closed
+        assert registry.is_started
+
+    @pytest.mark.asyncio
+    async def test_failed_connection_check_is_retried(self, registry):
+        """Si la verificación falla, el siguiente cliente debe volver a intentarla."""
+        failing = AsyncMock(side_effect=[Exception("boom"), True])
+        with patch.object(BaseShopifyGraphQLClient, "test_connection", new=failing):
+            with pytest.raises(ShopifyAPIException):
+                await BaseShopifyGraphQLClient().initialize()
+            await BaseShopifyGraphQLClient().initialize()
+
+        assert failing.await_count == 2
+
+    def test_rest_call_limit_header_paces_requests(self, registry):
+        """Un bucket REST casi lleno debe imponer espera antes del siguiente request."""
+        registry._update_rest_bucket("39/40")
+        assert registry._rest_wait_time() > 0
+
+        registry._update_rest_bucket("10/40")
+        assert registry._rest_wait_time() == 0
+
+    def test_new_event_loop_closes_previous_session(self):
+        """Usar el registro desde otro event loop cierra la sesión anterior y crea una nueva."""
+        registry = client_registry.ShopifyClientRegistry()
+        first = asyncio.run(registry.start())
+        second = asyncio.run(registry.start())
+
+        assert first is not second
+        assert first.closed
+        assert registry.stats["sessions_created"] == 2
+        asyncio.run(registry.close())
@@ -0,0 +1,108 @@
+"""Tests unitarios para el control de concurrencia AIMD."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.db.shopify_clients.concurrency_controller import AIMDConcurrencyController, is_congestion_error
+from app.db.shopify_clients.cost_throttle import ShopifyCostThrottle
+from app.db.shopify_clients.inventory_client import ShopifyInventoryClient
+from app.utils.error_handler import ShopifyAPIException
+
+
+class TestAIMDConcurrencyController:
+    """Tests para la ventana adaptativa."""
+
+    def test_window_grows_with_headroom(self):
+        """Una ventana completa de éxitos con bucket lleno suma un slot."""
+        controller = AIMDConcurrencyController("test", throttle=ShopifyCostThrottle(), initial_window=4)
+
+        for _ in range(4):
+            controller.record()
+
+        assert controller.window == 5
+
+    def test_window_does_not_grow_without_headroom(self):
+        """Con el bucket bajo la ventana se mantiene."""
+        throttle = ShopifyCostThrottle(maximum_available=1000, restore_rate=0.001)
+        throttle._available = 100
+        controller = AIMDConcurrencyController("test", throttle=throttle, initial_window=4)
+
+        for _ in range(8):
+            controller.record()
+
+        assert controller.window == 4
+
+    def test_window_halves_on_throttled_and_rate_limit(self):
+        """THROTTLED registrado por el throttle o errores 429 reducen la ventana a la mitad."""
+        throttle = ShopifyCostThrottle()
+        controller = AIMDConcurrencyController("test", throttle=throttle, initial_window=16)
+
+        throttle.stats["throttled_responses"] += 1
+        controller.record()
+        assert controller.window == 8
+
+        controller.record(
+            ShopifyAPIException("HTTP 429: rate limit exceeded", api_response_code=429, rate_limited=True)
+        )
+        assert controller.window == 4
+
+        controller.record(Exception("userErrors: invalid id"))
+        assert controller.window == 4
+        assert controller.stats["decreases"] == 2
+
+    def test_congestion_uses_exception_fields_not_message(self):
+        """Un GID o SKU con "429" en el mensaje no es congestión; un THROTTLED envuelto sí."""
+        throttled = ShopifyAPIException("GraphQL THROTTLED: inventorySetQuantities", rate_limited=True)
+        wrapped = RuntimeError("write failed")
+        wrapped.__cause__ = throttled
+
+        assert not is_congestion_error(Exception("HTTP 429 Too Many Requests"))
+        assert not is_congestion_error(
+            ShopifyAPIException("GraphQL errors: gid://shopify/InventoryItem/42917 throttled")
+        )
+        assert is_congestion_error(throttled)
+        assert is_congestion_error(wrapped)
+
+    @pytest.mark.asyncio
+    async def test_update_inventory_keeps_rate_limit_fields(self):
+        """update_inventory vuelve a envolver el error sin perder rate_limited ni el código 429."""
+        client = ShopifyInventoryClient()
+        client.activate_inventory_tracking = AsyncMock()
+        client.set_variant_inventory_quantity = AsyncMock(
+            side_effect=ShopifyAPIException("HTTP 429: rate limit exceeded", api_response_code=429, rate_limited=True)
+        )
+
+        with pytest.raises(ShopifyAPIException) as raised:
+            await client.update_inventory("gid://shopify/InventoryItem/1", "gid://shopify/Location/1", 3)
+
+        assert raised.value.rate_limited
+        assert raised.value.api_response_code == 429
+        assert is_congestion_error(raised.value)
+
+    @pytest.mark.asyncio
+    async def test_map_respects_window_and_keeps_order(self):
+        """Nunca hay más tareas en vuelo que la ventana y los resultados mantienen el orden."""
+        controller = AIMDConcurrencyController("test", initial_window=3, max_window=3)
+        in_flight = 0
+        peak = 0
+
+        async def worker(value):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001 * (value % 3))
+            in_flight -= 1
+            if value == 5:
+                raise ValueError("boom")
+            return value * 2
+
+        results = await controller.map(range(10), worker)
+
+        assert peak == 3
+        assert [r for i, r in enumerate(results) if i != 5] == [i * 2 for i in range(10) if i != 5]
+        assert isinstance(results[5], ValueError)
+        status = controller.get_status()
+        assert status["completed"] == 9 and status["failed"] == 1
+        assert status["throughput_per_second"] > 0
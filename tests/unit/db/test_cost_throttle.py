@@ -0,0 +1,160 @@
+"""Tests unitarios para el throttle de costo GraphQL de Shopify."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.db.shopify_clients.cost_throttle import (
+    ShopifyCostThrottle,
+    extract_operation_name,
+    extract_operation_type,
+    is_throttled_error,
+)
+from app.db.shopify_clients.shared_budget import RedisCostBucket
+
+
+def make_cost(requested, actual, currently_available, maximum=1000.0, restore_rate=50.0):
+    """Build an extensions.cost payload like the one Shopify returns."""
+    return {
+        "requestedQueryCost": requested,
+        "actualQueryCost": actual,
+        "throttleStatus": {
+            "maximumAvailable": maximum,
+            "currentlyAvailable": currently_available,
+            "restoreRate": restore_rate,
+        },
+    }
+
+
+class TestOperationParsing:
+    """Tests para extracción del nombre y tipo de operación."""
+
+    def test_named_query(self):
+        """Debe extraer el nombre de una query con nombre."""
+        query = "\n  query GetProducts($first: Int!) { products(first: $first) { edges { node { id } } } }"
+        assert extract_operation_name(query) == "GetProducts"
+        assert extract_operation_type(query) == "query"
+
+    def test_named_mutation(self):
+        """Debe extraer el nombre y tipo de una mutation."""
+        query = "mutation InventorySetQuantities($input: InventorySetQuantitiesInput!) { x }"
+        assert extract_operation_name(query) == "InventorySetQuantities"
+        assert extract_operation_type(query) == "mutation"
+
+    def test_anonymous_query(self):
+        """Las queries sin nombre se agrupan como anonymous_query."""
+        assert extract_operation_name("query { shop { id } }") == "anonymous_query"
+        assert extract_operation_name("{ shop { id } }") == "anonymous_query"
+
+    def test_throttled_error_detection(self):
+        """Debe distinguir THROTTLED del resto de errores GraphQL."""
+        assert is_throttled_error([{"message": "Throttled", "extensions": {"code": "THROTTLED"}}])
+        assert not is_throttled_error([{"message": "Field 'foo' doesn't exist"}])
+        assert not is_throttled_error(None)
+
+
+class TestShopifyCostThrottle:
+    """Tests para el modelo local del bucket de costo."""
+
+    def test_admits_while_bucket_has_points(self):
+        """Debe admitir requests mientras el bucket alcanza y pedir espera después."""
+        throttle = ShopifyCostThrottle(maximum_available=100, restore_rate=50)
+
+        assert throttle.try_acquire(60) == 0
+        wait_time = throttle.try_acquire(60)
+
+        assert wait_time > 0
+        # Faltan ~20 puntos a 50 puntos/s
+        assert wait_time == pytest.approx(0.4, abs=0.05)
+
+    def test_release_refunds_unused_cost(self):
+        """Debe reembolsar la diferencia entre costo reservado y costo real."""
+        throttle = ShopifyCostThrottle(maximum_available=1000, restore_rate=50)
+        reserved = throttle.try_acquire(100) or 100
+
+        throttle.release("GetProducts", reserved, make_cost(100, 20, 980))
+
+        assert throttle.available == pytest.approx(980, abs=1)
+
+    def test_learns_cost_per_operation(self):
+        """Debe aprender el costo solicitado por nombre de operación."""
+        throttle = ShopifyCostThrottle()
+        assert throttle.estimate_cost("BulkProducts") == 10
+
+        throttle.try_acquire(10)
+        throttle.release("BulkProducts", 10, make_cost(352, 120, 900))
+
+        assert throttle.estimate_cost("BulkProducts") == 352
+
+    def test_server_status_overrides_optimistic_model(self):
+        """Si Shopify reporta menos puntos disponibles, el modelo local se ajusta."""
+        throttle = ShopifyCostThrottle(maximum_available=1000, restore_rate=50)
+        throttle.try_acquire(10)
+
+        throttle.release("GetProducts", 10, make_cost(10, 10, 200, maximum=2000, restore_rate=100))
+
+        assert throttle.maximum_available == 2000
+        assert throttle.restore_rate == 100
+        assert throttle.available == pytest.approx(200, abs=2)
+
+    def test_throttled_backs_off_exact_restore_time(self):
+        """THROTTLED debe esperar exactamente el tiempo para restaurar los puntos faltantes."""
+        throttle = ShopifyCostThrottle(maximum_available=1000, restore_rate=50)
+        throttle.try_acquire(10)
+
+        wait_time = throttle.register_throttled("CreateProduct", 10, make_cost(110, None, 10))
+
+        assert wait_time == pytest.approx(2.0, abs=0.05)
+        assert throttle.try_acquire(1) > 0
+        assert throttle.get_status()["stats"]["throttled_responses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_restore(self):
+        """acquire() debe esperar a que el bucket se restaure en lugar de fallar."""
+        throttle = ShopifyCostThrottle(maximum_available=20, restore_rate=200)
+        await throttle.acquire("GetProducts")
+        await throttle.acquire("GetProducts")
+
+        reserved = await throttle.acquire("GetProducts")
+
+        assert reserved == 10
+        assert throttle.stats["throttle_waits"] >= 1
+
+
+class TestSharedBudget:
+    """Tests para el bucket compartido vía Redis y su fallback local."""
+
+    @pytest.mark.asyncio
+    async def test_uses_shared_bucket_when_redis_available(self):
+        """Debe admitir y liquidar a través de Redis cuando está disponible."""
+        redis_client = MagicMock()
+        redis_client.eval = AsyncMock(return_value="0")
+        throttle = ShopifyCostThrottle(shared_bucket=RedisCostBucket("test-shop", redis_client=redis_client))
+
+        reserved = await throttle.acquire("GetProducts")
+        await throttle.settle("GetProducts", reserved, make_cost(10, 4, 990))
+
+        assert throttle.stats["shared_admissions"] == 1
+        assert redis_client.eval.await_count == 2
+        # Refund (10 - 4) and server currentlyAvailable are forwarded to the settle script
+        settle_args = redis_client.eval.await_args_list[1].args
+        assert settle_args[2] == "shopify:cost_bucket:test-shop"
+        assert settle_args[3] == 6
+        assert settle_args[4] == 990
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_local_when_redis_fails(self):
+        """Si Redis falla, debe seguir funcionando con el bucket local."""
+        redis_client = MagicMock()
+        redis_client.eval = AsyncMock(side_effect=ConnectionError("redis down"))
+        shared_bucket = RedisCostBucket("test-shop", redis_client=redis_client)
+        throttle = ShopifyCostThrottle(shared_bucket=shared_bucket)
+
+        reserved = await throttle.acquire("GetProducts")
+        await throttle.settle("GetProducts", reserved, make_cost(10, 10, 990))
+
+        assert throttle.stats["local_admissions"] == 1
+        assert not shared_bucket.is_available
+        # Second call does not hit Redis during the cooldown
+        await throttle.acquire("GetProducts")
+        assert redis_client.eval.await_count == 1
@@ -0,0 +1,86 @@
+"""Tests unitarios para la escritura de inventario en lote."""
+
+import re
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.db.shopify_clients.cost_throttle import ShopifyCostThrottle
+from app.db.shopify_clients.inventory_client import ShopifyInventoryClient
+
+LOCATION = "gid://shopify/Location/1"
+
+
+def make_client(set_quantities):
+    """Cliente de inventario con _execute_query simulado."""
+    client = ShopifyInventoryClient()
+    client._throttle = ShopifyCostThrottle()
+    documents = []
+
+    async def execute(document, variables=None):
+        documents.append(document)
+        if "inventorySetQuantities" in document:
+            return {"inventorySetQuantities": set_quantities(variables["input"]["quantities"])}
+        aliases = re.findall(r"(m\d+): (\w+)", document)
+        return {
+            alias: (
+                {"userErrors": [{"field": ["id"], "message": "bad"}]}
+                if variables.get(f"{alias}_id") == "gid://shopify/InventoryItem/bad"
+                else {"userErrors": []}
+            )
+            for alias, _ in aliases
+        }
+
+    client._execute_query = AsyncMock(side_effect=execute)
+    return client, documents
+
+
+def item(number, quantity=5):
+    """Item de inventario de prueba."""
+    return {"inventory_item_id": f"gid://shopify/InventoryItem/{number}", "sku": f"SKU{number}", "quantity": quantity}
+
+
+class TestWriteInventoryBatch:
+    """Tests para tracking, activación y cantidades en pocas llamadas."""
+
+    @pytest.mark.asyncio
+    async def test_whole_product_in_few_calls(self):
+        """Tracking y activación van en un documento con aliases y las cantidades en un solo set."""
+        client, documents = make_client(lambda quantities: {"userErrors": []})
+
+        results = await client.write_inventory_batch([item(i) for i in range(20)], LOCATION)
+
+        assert all(result["success"] and result["step"] == "done" for result in results)
+        assert len(documents) == 2
+        assert documents[0].count("inventoryItemUpdate") == 20
+        assert documents[0].count("inventoryActivate") == 20
+
+    @pytest.mark.asyncio
+    async def test_quantities_are_chunked_by_250(self):
+        """Más de 250 items deben dividirse en varias llamadas a inventorySetQuantities."""
+        client, documents = make_client(lambda quantities: {"userErrors": []})
+
+        await client.write_inventory_batch([item(i) for i in range(300)], LOCATION, activate=False)
+
+        assert len(documents) == 2
+        assert all("inventorySetQuantities" in document for document in documents)
+
+    @pytest.mark.asyncio
+    async def test_per_item_results_are_reported(self):
+        """Cada item debe recibir su propio resultado y el resto del lote reintentarse."""
+
+        def set_quantities(quantities):
+            for position, quantity in enumerate(quantities):
+                if quantity["inventoryItemId"].endswith("/2"):
+                    return {"userErrors": [{"field": ["input", "quantities", str(position)], "message": "not stocked"}]}
+            return {"userErrors": []}
+
+        client, _ = make_client(set_quantities)
+        items = [item(1), item("bad"), item(2), item(3)]
+
+        results = await client.write_inventory_batch(items, LOCATION)
+
+        assert [result["success"] for result in results] == [True, False, False, True]
+        assert results[1]["step"] == "tracking"
+        assert results[2]["step"] == "quantities"
+        assert results[2]["errors"][0]["message"] == "not stocked"
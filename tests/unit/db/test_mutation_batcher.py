@@ -0,0 +1,190 @@
+"""Tests unitarios para el agrupamiento de mutaciones por alias."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.db.shopify_clients.cost_throttle import ShopifyCostThrottle
+from app.db.shopify_clients.mutation_batcher import MutationBatcher
+from app.services.multiple_variants_creator.metafields_manager import MetafieldsManager
+from app.services.zero_stock_variant_cleanup import ZeroStockVariantCleanupService
+from app.utils.error_handler import ShopifyAPIException
+
+
+def make_client(execute):
+    """Cliente simulado con throttle local y _execute_query controlado."""
+    client = MagicMock()
+    client._throttle = ShopifyCostThrottle()
+    client._execute_query = AsyncMock(side_effect=execute)
+    return client
+
+
+def tags_add(product_id: str, tag: str):
+    """Argumentos de un tagsAdd para el batcher."""
+    return {"id": ("ID!", product_id), "tags": ("[String!]!", [tag])}
+
+
+class TestMutationBatcher:
+    """Tests para el multiplexado de mutaciones en un documento."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_mutations_share_one_document(self):
+        """Mutaciones concurrentes deben enviarse en un solo documento con aliases."""
+
+        async def execute(document, variables):
+            assert "m1: tagsAdd(id: $m1_id, tags: $m1_tags)" in document
+            assert "$m3_id: ID!" in document
+            return {alias: {"userErrors": []} for alias in ("m1", "m2", "m3")}
+
+        client = make_client(execute)
+        batcher = MutationBatcher(client, window=0.01)
+
+        results = await asyncio.gather(*[batcher.submit("tagsAdd", tags_add(f"p{i}", "x")) for i in range(3)])
+
+        assert results == [{"userErrors": []}] * 3
+        assert client._execute_query.await_count == 1
+        variables = client._execute_query.await_args.args[1]
+        assert variables["m2_id"] == "p1"
+
+    @pytest.mark.asyncio
+    async def test_user_errors_are_routed_to_each_caller(self):
+        """Cada llamador debe recibir los userErrors de su propio alias."""
+
+        async def execute(document, variables):
+            return {"m1": {"userErrors": []}, "m2": {"userErrors": [{"field": ["id"], "message": "not found"}]}}
+
+        batcher = MutationBatcher(make_client(execute), window=0.01)
+
+        first, second = await asyncio.gather(
+            batcher.submit("tagsAdd", tags_add("p1", "x")), batcher.submit("tagsAdd", tags_add("p2", "x"))
+        )
+
+        assert first["userErrors"] == []
+        assert second["userErrors"][0]["message"] == "not found"
+
+    @pytest.mark.asyncio
+    async def test_cost_ceiling_splits_documents(self):
+        """El techo de costo debe dividir las mutaciones en varios documentos."""
+
+        async def execute(document, variables):
+            return {f"m{i}": {"userErrors": []} for i in range(1, 4)}
+
+        client = make_client(execute)
+        batcher = MutationBatcher(client, max_cost=30, window=0.01)
+
+        await asyncio.gather(*[batcher.submit("tagsAdd", tags_add(f"p{i}", "x"), cost=10) for i in range(7)])
+
+        assert client._execute_query.await_count == 3
+        assert batcher.get_status()["documents_sent"] == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_document_falls_back_to_individual_mutations(self):
+        """Si el documento falla, cada mutación se reintenta sola y solo la inválida falla."""
+
+        async def execute(document, variables):
+            if "m2" in document or variables.get("m1_id") == "bad":
+                raise ShopifyAPIException(
+                    "GraphQL errors: invalid id", details={"graphql_errors": [{"message": "invalid id"}]}
+                )
+            return {"m1": {"userErrors": []}}
+
+        client = make_client(execute)
+        batcher = MutationBatcher(client, window=0.01)
+
+        results = await asyncio.gather(
+            batcher.submit("tagsAdd", tags_add("good", "x")),
+            batcher.submit("tagsAdd", tags_add("bad", "x")),
+            return_exceptions=True,
+        )
+
+        assert results[0] == {"userErrors": []}
+        assert isinstance(results[1], ShopifyAPIException)
+        assert batcher.stats["fallback_documents"] == 1
+
+    @pytest.mark.asyncio
+    async def test_throttled_document_fails_every_mutation_without_splitting(self):
+        """Un documento limitado por THROTTLED falla completo en vez de reenviarse por mutación."""
+        throttled = ShopifyAPIException("GraphQL THROTTLED: Batched_tagsAdd_3", rate_limited=True)
+        client = make_client(throttled)
+        batcher = MutationBatcher(client, window=0.01)
+
+        results = await asyncio.gather(
+            *[batcher.submit("tagsAdd", tags_add(f"p{i}", "x")) for i in range(3)], return_exceptions=True
+        )
+
+        assert results == [throttled] * 3
+        assert client._execute_query.await_count == 1
+        assert batcher.stats["fallback_documents"] == 0
+
+    @pytest.mark.asyncio
+    async def test_transport_error_fails_every_mutation_without_splitting(self):
+        """Un timeout no se reintenta por mutación: el documento pudo haberse aplicado."""
+        timeout = ShopifyAPIException("Unexpected error: timed out")
+        timeout.__cause__ = asyncio.TimeoutError()
+        client = make_client(timeout)
+        batcher = MutationBatcher(client, window=0.01)
+
+        results = await asyncio.gather(
+            batcher.submit("productVariantsBulkDelete", {"productId": ("ID!", "p1")}),
+            batcher.submit("productVariantsBulkDelete", {"productId": ("ID!", "p2")}),
+            return_exceptions=True,
+        )
+
+        assert results == [timeout, timeout]
+        assert client._execute_query.await_count == 1
+        assert batcher.stats["fallback_documents"] == 0
+
+
+class TestBatchedCallers:
+    """Tests para las escrituras que pasan por el batcher."""
+
+    @pytest.mark.asyncio
+    async def test_metafields_of_concurrent_products_share_one_document(self):
+        """Los metafieldsSet de productos procesados en paralelo van en un solo documento."""
+
+        async def execute(document, variables):
+            assert document.count("metafieldsSet(metafields:") == 2
+            return {alias: {"metafields": [{"id": alias}], "userErrors": []} for alias in ("m1", "m2")}
+
+        client = make_client(execute)
+        client.mutation_batcher = MutationBatcher(client, window=0.01)
+        metafields = [{"namespace": "rms", "key": "ccod", "type": "single_line_text_field", "value": "24X01"}]
+
+        result = await MetafieldsManager(client).bulk_create_metafields(
+            {"gid://shopify/Product/1": metafields, "gid://shopify/Product/2": metafields}
+        )
+
+        assert result["successes"] == 2
+        assert client._execute_query.await_count == 1
+        variables = client._execute_query.await_args.args[1]
+        assert variables["m2_metafields"][0]["ownerId"] == "gid://shopify/Product/2"
+
+    @pytest.mark.asyncio
+    async def test_zero_stock_variant_deletions_share_one_document(self):
+        """La limpieza de variantes con stock 0 envía sus borrados en un solo documento."""
+
+        async def execute(document, variables):
+            if "variants(first:" in document:
+                return {
+                    "product": {
+                        "variants": {
+                            "edges": [
+                                {"node": {"id": f"gid://shopify/ProductVariant/{size}", "sku": f"24X01-{size}"}}
+                                for size in ("38", "39", "40")
+                            ],
+                            "pageInfo": {"hasNextPage": False},
+                        }
+                    }
+                }
+            assert document.count("productVariantsBulkDelete(") == 2
+            return {alias: {"product": {"id": "gid://shopify/Product/1"}, "userErrors": []} for alias in ("m1", "m2")}
+
+        client = make_client(execute)
+        client.mutation_batcher = MutationBatcher(client, window=0.01)
+        service = ZeroStockVariantCleanupService(client)
+
+        stats = await service.cleanup_zero_stock_variants("gid://shopify/Product/1", {"24X01-38", "24X01-40"}, "24X01")
+
+        assert stats["variants_deleted"] == 2
+        assert client._execute_query.await_count == 2
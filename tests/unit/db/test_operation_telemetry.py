@@ -0,0 +1,84 @@
+"""Tests unitarios para la telemetría por operación GraphQL."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.db.shopify_clients.base_client import BaseShopifyGraphQLClient
+from app.db.shopify_clients.cost_throttle import ShopifyCostThrottle
+from app.db.shopify_clients.operation_telemetry import OperationTelemetry, get_operation_telemetry
+
+
+class FakeResponse:
+    """Respuesta aiohttp mínima usada como context manager."""
+
+    def __init__(self, payload, status=200):
+        self.status = status
+        self.headers = {}
+        self._body = json.dumps(payload).encode("utf-8")
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class TestOperationTelemetry:
+    """Tests para el registro de latencia, costo y reintentos por operación."""
+
+    def test_records_cost_latency_and_bytes(self):
+        """Debe acumular costo solicitado vs real, histograma y bytes."""
+        telemetry = OperationTelemetry()
+        cost = {"requestedQueryCost": 52, "actualQueryCost": 12}
+
+        telemetry.observe_request("GetProducts", "query", 0.08, 300, 5000, cost)
+        telemetry.observe_request("GetProducts", "query", 0.6, 300, 4000, cost)
+        telemetry.observe_call("GetProducts", "query", attempts=2, throttle_wait_seconds=1.5, succeeded=True)
+
+        stats = telemetry.get_summary()["operations"]["GetProducts"]
+        assert stats["cost"]["requested_total"] == 104
+        assert stats["cost"]["actual_total"] == 24
+        assert stats["cost"]["over_requested"] == 80
+        assert stats["latency_ms"]["histogram"]["<=100ms"] == 1
+        assert stats["latency_ms"]["histogram"]["<=1000ms"] == 1
+        assert stats["retries"] == 1
+        assert stats["payload_bytes"] == {"request": 600, "response": 9000}
+
+    def test_summary_sorted_by_actual_cost(self):
+        """Las operaciones más costosas deben aparecer primero."""
+        telemetry = OperationTelemetry()
+        telemetry.observe_request("Cheap", "query", 0.01, 10, 10, {"requestedQueryCost": 2, "actualQueryCost": 1})
+        telemetry.observe_request("Costly", "query", 0.01, 10, 10, {"requestedQueryCost": 900, "actualQueryCost": 400})
+
+        summary = telemetry.get_summary(limit=1)
+
+        assert list(summary["operations"]) == ["Costly"]
+        assert summary["totals"]["actual_cost"] == 401
+
+    @pytest.mark.asyncio
+    async def test_execute_query_is_instrumented(self):
+        """_execute_query debe registrar la operación con su costo y bytes."""
+        get_operation_telemetry().reset()
+        client = BaseShopifyGraphQLClient()
+        client._throttle = ShopifyCostThrottle()
+        payload = {
+            "data": {"shop": {"name": "Test"}},
+            "extensions": {"cost": {"requestedQueryCost": 1, "actualQueryCost": 1}},
+        }
+        client.session = MagicMock()
+        client.session.closed = False
+        client.session.post = MagicMock(return_value=FakeResponse(payload))
+
+        result = await client._execute_query("mutation TelemetryProbe { shop { name } }")
+
+        stats = get_operation_telemetry().get_summary()["operations"]["TelemetryProbe"]
+        assert result == {"shop": {"name": "Test"}}
+        assert stats["calls"] == 1
+        assert stats["operation_type"] == "mutation"
+        assert stats["cost"]["actual_total"] == 1
+        assert stats["payload_bytes"]["response"] == len(json.dumps(payload))
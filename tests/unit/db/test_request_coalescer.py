@@ -0,0 +1,82 @@
+"""Tests unitarios para el agrupamiento de queries idénticas en vuelo."""
+
+import asyncio
+
+import pytest
+
+from app.db.shopify_clients.request_coalescer import RequestCoalescer, make_request_key
+
+
+class TestRequestCoalescer:
+    """Tests para single-flight de queries de lectura."""
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_call(self):
+        """Requests idénticos concurrentes deben compartir una sola ejecución."""
+        coalescer = RequestCoalescer()
+        calls = 0
+
+        async def fetch_locations():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"locations": {"edges": [{"node": {"id": "gid://shopify/Location/1"}}]}}
+
+        key = make_request_key("https://shop/graphql.json", "query GetLocations { ... }", None)
+        results = await asyncio.gather(*[coalescer.run(key, "GetLocations", fetch_locations) for _ in range(10)])
+
+        assert calls == 1
+        assert all(result == results[0] for result in results)
+        assert coalescer.get_status()["coalesced"] == 9
+        assert coalescer.get_status()["saved_by_operation"] == {"GetLocations": 9}
+
+    @pytest.mark.asyncio
+    async def test_shared_results_are_independent_copies(self):
+        """Cada llamador debe recibir su propia copia del resultado compartido."""
+        coalescer = RequestCoalescer()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return {"product": {"tags": ["a"]}}
+
+        key = make_request_key("url", "query GetProductByHandle { ... }", {"handle": "x"})
+        first, second = await asyncio.gather(coalescer.run(key, "op", fetch), coalescer.run(key, "op", fetch))
+        first["product"]["tags"].append("b")
+
+        assert second["product"]["tags"] == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_different_variables_are_not_coalesced(self):
+        """Variables distintas deben ejecutar requests distintos."""
+        coalescer = RequestCoalescer()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {}
+
+        await asyncio.gather(
+            coalescer.run(make_request_key("url", "q", {"handle": "a"}), "op", fetch),
+            coalescer.run(make_request_key("url", "q", {"handle": "b"}), "op", fetch),
+        )
+
+        assert calls == 2
+        assert coalescer.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_every_caller(self):
+        """Un error del request compartido debe llegar a todos los llamadores."""
+        coalescer = RequestCoalescer()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        key = make_request_key("url", "q", None)
+        results = await asyncio.gather(
+            coalescer.run(key, "op", failing), coalescer.run(key, "op", failing), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,399 @@
+"""Tests unitarios para la escritura de productos con productSet (una llamada y bulkOperationRunMutation)."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.api.v1.schemas.shopify_schemas import ShopifyProductInput, ShopifyVariantInput
+from app.services.bulk_operations import ShopifyBulkOperations
+from app.services.multiple_variants_creator import MultipleVariantsCreator
+from app.services.multiple_variants_creator.data_preparator import DataPreparator
+from app.services.rms_to_shopify.product_processor import ProductProcessor
+from app.services.rms_to_shopify.sync_orchestrator import RMSToShopifySyncOrchestrator
+from app.utils.error_handler import ShopifyAPIException
+
+LOCATION_ID = "gid://shopify/Location/1"
+
+
+def make_input(ccod="24X01", sizes=("38", "39")):
+    """Producto deseado con una variante por talla."""
+    return ShopifyProductInput(
+        title="Zapato Casual",
+        handle=f"zapato-casual-{ccod.lower()}",
+        tags=[f"ccod_{ccod.lower()}"],
+        variants=[
+            ShopifyVariantInput(
+                sku=f"{ccod}-{size}",
+                price="15990",
+                options=["Negro", size],
+                inventoryQuantities=[{"locationId": LOCATION_ID, "availableQuantity": 4}],
+            )
+            for size in sizes
+        ],
+        metafields=[{"namespace": "rms", "key": "ccod", "type": "single_line_text_field", "value": ccod}],
+    )
+
+
+def make_snapshot(sizes=("38", "40")):
+    """Producto existente en Shopify con variantes completas."""
+    variants = [
+        {
+            "id": f"gid://shopify/ProductVariant/{size}",
+            "sku": f"24X01-{size}",
+            "selectedOptions": [{"name": "Color", "value": "Negro"}, {"name": "Size", "value": size}],
+            "inventoryItem": {
+                "id": f"gid://shopify/InventoryItem/{size}",
+                "tracked": True,
+                "inventoryLevel": {"quantities": [{"name": "available", "quantity": 1}]},
+            },
+        }
+        for size in sizes
+    ]
+    return {
+        "id": "gid://shopify/Product/1",
+        "tags": ["ccod_24x01", "RMS-SYNC-25-01-01"],
+        "metafields": {"edges": []},
+        "variants": {"edges": [{"node": variant} for variant in variants], "pageInfo": {"hasNextPage": False}},
+    }
+
+
+class TestBulkMutationFiles:
+    """Tests para el archivo JSONL de variables y el archivo de resultados."""
+
+    def test_jsonl_chunks_respect_size_and_order(self):
+        """Cada línea es un {"input": ...} y los archivos no superan el tamaño máximo."""
+        inputs = [{"handle": f"producto-{number}"} for number in range(5)]
+        line_size = len(json.dumps({"input": inputs[0]}) + "\n")
+
+        chunks = ShopifyBulkOperations._render_jsonl_chunks(inputs, max_bytes=line_size * 2)
+
+        assert [chunk.count("\n") for chunk in chunks] == [2, 2, 1]
+        lines = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+        assert [line["input"]["handle"] for line in lines] == [item["handle"] for item in inputs]
+
+    def test_results_are_matched_by_line_number(self):
+        """Los resultados se asocian a su línea de entrada; userErrors y líneas faltantes son fallos."""
+        content = "\n".join(
+            json.dumps(line)
+            for line in [
+                {"data": {"productSet": {"product": None, "userErrors": [{"message": "bad"}]}}, "__lineNumber": 1},
+                {"data": {"productSet": {"product": {"id": "P0"}, "userErrors": []}}, "__lineNumber": 0},
+            ]
+        )
+
+        results = ShopifyBulkOperations._parse_mutation_results(content, 3, "productSet")
+
+        assert results[0] == {"product": {"id": "P0"}, "user_errors": []}
+        assert results[1]["product"] is None and results[1]["user_errors"] == [{"message": "bad"}]
+        assert results[2]["product"] is None
+
+    @pytest.mark.asyncio
+    async def test_failed_operation_keeps_completed_files(self):
+        """Si falla un archivo, se conservan los resultados anteriores y se cancela la operación fallida."""
+        client = MagicMock()
+        client.session = object()
+        client._execute_query = AsyncMock(return_value={"node": {"status": "CANCELED"}})
+        bulk = ShopifyBulkOperations(client)
+        bulk._stage_upload = AsyncMock(return_value="tmp/bulk.jsonl")
+        bulk._start_bulk_mutation = AsyncMock(side_effect=["Op/1", "Op/2"])
+        bulk._wait_for_completion = AsyncMock(side_effect=[{"url": "https://results"}, TimeoutError("timed out")])
+        bulk._download_content = AsyncMock(
+            return_value=json.dumps(
+                {"data": {"productSet": {"product": {"id": "P0"}, "userErrors": []}}, "__lineNumber": 0}
+            )
+        )
+        chunks = ['{"input": {}}\n', '{"input": {}}\n{"input": {}}\n']
+
+        with patch.object(ShopifyBulkOperations, "_render_jsonl_chunks", return_value=chunks):
+            results, stats = await bulk.bulk_upsert_products([{}, {}, {}])
+
+        assert results[0] == {"product": {"id": "P0"}, "user_errors": []}
+        assert [result.get("unconfirmed") for result in results[1:]] == [True, True]
+        assert (stats["successful"], stats["failed"], stats["unconfirmed"]) == (1, 0, 2)
+        cancel_call = client._execute_query.await_args_list[0]
+        assert cancel_call.args[1] == {"id": "Op/2"}
+
+
+class TestProductSetInput:
+    """Tests para el ProductSetInput de productos existentes."""
+
+    def test_existing_variants_keep_ids_and_unknown_ones_are_kept(self):
+        """Las variantes existentes conservan su ID y las que RMS no trae no se eliminan."""
+        product_set = DataPreparator().prepare_product_set_input(make_input(), LOCATION_ID, make_snapshot())
+
+        assert product_set["id"] == "gid://shopify/Product/1"
+        variants = {
+            variant.get("inventoryItem", {}).get("sku", variant.get("id")): variant
+            for variant in product_set["variants"]
+        }
+        assert variants["24X01-38"]["id"] == "gid://shopify/ProductVariant/38"
+        assert "inventoryQuantities" not in variants["24X01-38"]
+        assert variants["24X01-39"]["inventoryQuantities"] == [
+            {"locationId": LOCATION_ID, "name": "available", "quantity": 4}
+        ]
+        assert variants["gid://shopify/ProductVariant/40"]["optionValues"][1] == {"optionName": "Size", "name": "40"}
+        sizes = next(option for option in product_set["productOptions"] if option["name"] == "Size")
+        assert [value["name"] for value in sizes["values"]] == ["38", "39", "40"]
+        assert "RMS-SYNC-25-01-01" not in product_set["tags"]
+
+
+class TestProductSetCreate:
+    """Tests para la creación de productos con una sola mutación productSet."""
+
+    @pytest.mark.asyncio
+    async def test_new_product_is_created_in_one_call(self):
+        """Opciones, variantes con SKU, inventario y metafields van en una sola llamada."""
+        client = MagicMock()
+        client._execute_query = AsyncMock(
+            return_value={"productSet": {"product": {"id": "gid://shopify/Product/9"}, "userErrors": []}}
+        )
+        client.create_product = AsyncMock()
+        creator = MultipleVariantsCreator(client, LOCATION_ID, enable_cleanup=False)
+
+        created = await creator.create_product_with_variants(make_input())
+
+        assert created == {"id": "gid://shopify/Product/9"}
+        client.create_product.assert_not_awaited()
+        _, variables = client._execute_query.await_args.args
+        product_set = variables["input"]
+        assert [variant["inventoryItem"] for variant in product_set["variants"]] == [
+            {"sku": "24X01-38", "tracked": True},
+            {"sku": "24X01-39", "tracked": True},
+        ]
+        assert product_set["metafields"][0]["value"] == "24X01"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "response",
+        [
+            {"productSet": {"product": None, "userErrors": [{"message": "Invalid option"}]}},
+            ShopifyAPIException(
+                "GraphQL errors: Field 'productSet' doesn't exist",
+                details={"graphql_errors": [{"message": "Field 'productSet' doesn't exist"}]},
+            ),
+            ShopifyAPIException("HTTP 400: Bad Request", api_response_code=400),
+        ],
+    )
+    async def test_rejected_product_set_falls_back_to_steps(self, response):
+        """Si Shopify rechaza productSet se usa el flujo por pasos."""
+        client = MagicMock()
+        client._execute_query = AsyncMock(side_effect=[response])
+        client.create_product = AsyncMock(return_value={"id": "gid://shopify/Product/9", "title": "Zapato Casual"})
+        creator = MultipleVariantsCreator(client, LOCATION_ID, enable_cleanup=False)
+        creator.variant_manager.get_existing_variants = AsyncMock(return_value=[])
+        creator.variant_manager.sync_product_variants = AsyncMock()
+        creator.inventory_manager.force_inventory_update_for_new_product = AsyncMock()
+        creator.metafields_manager.create_metafields = AsyncMock()
+
+        created = await creator.create_product_with_variants(make_input())
+
+        assert created["id"] == "gid://shopify/Product/9"
+        client.create_product.assert_awaited_once()
+        creator.variant_manager.sync_product_variants.assert_awaited_once()
+
+    @staticmethod
+    def transport_error(message="HTTP 502: Bad Gateway", status=502):
+        """Error final del cliente base tras agotar los reintentos de un 5xx o timeout."""
+        error = ShopifyAPIException(f"Unexpected error: {message}")
+        error.__cause__ = ShopifyAPIException(message, api_response_code=status) if status else TimeoutError()
+        return error
+
+    @pytest.mark.asyncio
+    async def test_committed_product_set_is_not_created_twice(self):
+        """Tras un 5xx se busca el handle; si Shopify escribió el producto no se crea otro."""
+        client = MagicMock()
+        client._execute_query = AsyncMock(side_effect=[self.transport_error()])
+        client.get_product_by_handle = AsyncMock(return_value={"id": "gid://shopify/Product/9"})
+        client.create_product = AsyncMock()
+        creator = MultipleVariantsCreator(client, LOCATION_ID, enable_cleanup=False)
+
+        created = await creator.create_product_with_variants(make_input())
+
+        assert created == {"id": "gid://shopify/Product/9"}
+        client.get_product_by_handle.assert_awaited_once_with("zapato-casual-24x01")
+        client.create_product.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("lookup", [AsyncMock(return_value=None), AsyncMock(side_effect=TimeoutError())])
+    async def test_unconfirmed_product_set_is_left_for_next_sync(self, lookup):
+        """Tras un timeout sin producto visible (o sin poder buscarlo) no se usa el flujo por pasos."""
+        client = MagicMock()
+        client._execute_query = AsyncMock(side_effect=[self.transport_error("timeout", status=None)])
+        client.get_product_by_handle = lookup
+        client.create_product = AsyncMock()
+        creator = MultipleVariantsCreator(client, LOCATION_ID, enable_cleanup=False)
+
+        with pytest.raises(ShopifyAPIException, match="unconfirmed"):
+            await creator.create_product_with_variants(make_input())
+
+        client.create_product.assert_not_awaited()
+
+
+class TestBulkWritePath:
+    """Tests para la selección y el respaldo del modo bulk."""
+
+    @pytest.mark.asyncio
+    async def test_rejected_products_fall_back_to_per_product_path(self):
+        """Los productos que productSet rechaza se escriben uno por uno."""
+        updater = MagicMock()
+        updater.check_products_exist_batch = AsyncMock(
+            return_value={"zapato-casual-24x01": None, "zapato-casual-24x02": None}
+        )
+        updater.upsert_products_bulk = AsyncMock(
+            return_value=[
+                {"product": {"id": "gid://shopify/Product/1"}, "user_errors": [], "inventory_failed": 0},
+                {"product": None, "user_errors": [{"message": "Handle already taken"}], "inventory_failed": 0},
+            ]
+        )
+        updater.create_shopify_product = AsyncMock(return_value={"id": "gid://shopify/Product/2"})
+        processor = ProductProcessor("test_sync", updater, MagicMock(), MagicMock())
+
+        stats = await processor.process_products_bulk([make_input("24X01"), make_input("24X02")], force_update=True)
+
+        assert stats["created"] == 2
+        assert stats["total_processed"] == 2
+        updater.create_shopify_product.assert_awaited_once()
+        assert updater.create_shopify_product.await_args.args[0].handle == "zapato-casual-24x02"
+        assert processor.get_skip_report()["bulk_writes"] == {
+            "operations": 1,
+            "products": 1,
+            "per_product_fallbacks": 1,
+        }
+
+    @pytest.mark.asyncio
+    async def test_products_with_failed_inventory_are_not_recorded(self):
+        """Si fallan cantidades de un producto escrito en bulk, cuenta como error y no guarda su fingerprint."""
+        updater = MagicMock()
+        updater.check_products_exist_batch = AsyncMock(
+            return_value={"zapato-casual-24x01": None, "zapato-casual-24x02": None}
+        )
+        updater.upsert_products_bulk = AsyncMock(
+            return_value=[
+                {"product": {"id": "gid://shopify/Product/1"}, "user_errors": [], "inventory_failed": 0},
+                {"product": {"id": "gid://shopify/Product/2"}, "user_errors": [], "inventory_failed": 2},
+            ]
+        )
+        ledger = MagicMock()
+        ledger.get_many = AsyncMock(return_value={})
+        ledger.set_many = AsyncMock()
+        ledger.mark_verified = AsyncMock()
+        processor = ProductProcessor("test_sync", updater, MagicMock(), MagicMock(), fingerprint_ledger=ledger)
+
+        stats = await processor.process_products_bulk([make_input("24X01"), make_input("24X02")], force_update=True)
+
+        assert (stats["created"], stats["errors"], stats["inventory_failed"]) == (1, 1, 2)
+        assert stats["total_processed"] == 2
+        assert list(ledger.set_many.await_args.args[0]) == ["24X01"]
+
+    @pytest.mark.asyncio
+    async def test_unconfirmed_products_are_looked_up_again_before_fallback(self):
+        """Tras una operación bulk interrumpida, el respaldo usa una consulta nueva y no crea duplicados."""
+        updater = MagicMock()
+        updater.check_products_exist_batch = AsyncMock(
+            return_value={"zapato-casual-24x01": None, "zapato-casual-24x02": None}
+        )
+        updater.upsert_products_bulk = AsyncMock(
+            return_value=[
+                {"product": {"id": "gid://shopify/Product/1"}, "user_errors": [], "inventory_failed": 0},
+                {"product": None, "user_errors": [], "unconfirmed": True, "inventory_failed": 0},
+            ]
+        )
+        updater.refresh_products = AsyncMock(return_value={"zapato-casual-24x02": {"id": "gid://shopify/Product/2"}})
+        updater.create_shopify_product = AsyncMock()
+        updater.update_shopify_product = AsyncMock(return_value={"id": "gid://shopify/Product/2"})
+        processor = ProductProcessor("test_sync", updater, MagicMock(), MagicMock())
+
+        stats = await processor.process_products_bulk([make_input("24X01"), make_input("24X02")], force_update=True)
+
+        updater.refresh_products.assert_awaited_once_with(["zapato-casual-24x02"])
+        updater.create_shopify_product.assert_not_awaited()
+        assert updater.update_shopify_product.await_args.args[0].handle == "zapato-casual-24x02"
+        assert (stats["created"], stats["updated"]) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_unconfirmed_products_are_skipped_if_lookup_fails(self):
+        """Si la nueva consulta falla, los productos quedan como error en vez de crearse a ciegas."""
+        updater = MagicMock()
+        updater.check_products_exist_batch = AsyncMock(
+            return_value={"zapato-casual-24x01": None, "zapato-casual-24x02": None}
+        )
+        updater.upsert_products_bulk = AsyncMock(side_effect=ShopifyAPIException("bulk operation failed"))
+        updater.refresh_products = AsyncMock(side_effect=ShopifyAPIException("lookup failed"))
+        updater.create_shopify_product = AsyncMock()
+        processor = ProductProcessor("test_sync", updater, MagicMock(), MagicMock())
+
+        stats = await processor.process_products_bulk([make_input("24X01"), make_input("24X02")], force_update=True)
+
+        updater.create_shopify_product.assert_not_awaited()
+        assert stats["errors"] == 2
+        assert stats["created"] == 0
+
+    @pytest.mark.asyncio
+    async def test_unanswered_handles_are_looked_up_before_writing(self):
+        """Un handle que la consulta en lote no pudo resolver no se crea como producto nuevo."""
+        updater = MagicMock()
+        updater.check_products_exist_batch = AsyncMock(return_value={"zapato-casual-24x01": None})
+        updater.refresh_products = AsyncMock(return_value={"zapato-casual-24x02": {"id": "gid://shopify/Product/2"}})
+        updater.upsert_products_bulk = AsyncMock(
+            return_value=[{"product": {"id": "gid://shopify/Product/1"}, "user_errors": [], "inventory_failed": 0}]
+        )
+        updater.update_shopify_product = AsyncMock(return_value={"id": "gid://shopify/Product/2"})
+        processor = ProductProcessor("test_sync", updater, MagicMock(), MagicMock())
+
+        stats = await processor.process_products_bulk([make_input("24X01"), make_input("24X02")], force_update=True)
+
+        updater.refresh_products.assert_awaited_once_with(["zapato-casual-24x02"])
+        entries = updater.upsert_products_bulk.await_args.args[0]
+        assert [shopify_input.handle for shopify_input, _ in entries] == ["zapato-casual-24x01"]
+        assert updater.update_shopify_product.await_args.args[0].handle == "zapato-casual-24x02"
+        assert (stats["created"], stats["updated"]) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_large_sync_accumulates_pages_for_bulk_writes(self):
+        """Sobre el umbral, las páginas se acumulan y se escriben con una operación bulk por grupo."""
+        catalog = [f"C{number:04d}" for number in range(25)]
+
+        async def extract(limit, filter_categories, include_zero_stock=False, after_ccod=None):
+            page = [ccod for ccod in catalog if ccod > (after_ccod or "")][:limit]
+            if not page:
+                return [], None
+            return [SimpleNamespace(tags=[f"ccod_{ccod.lower()}"]) for ccod in page], page[-1]
+
+        orchestrator = RMSToShopifySyncOrchestrator(sync_id="test_bulk", resume_from_checkpoint=False)
+        orchestrator.rms_extractor = MagicMock()
+        orchestrator.rms_extractor.count_rms_products = AsyncMock(return_value=len(catalog))
+        orchestrator.rms_extractor.extract_rms_products_paginated = AsyncMock(side_effect=extract)
+        orchestrator.product_processor = MagicMock()
+        orchestrator.product_processor.process_products_bulk = AsyncMock(
+            side_effect=lambda products, force_update: {"total_processed": len(products), "created": len(products)}
+        )
+        orchestrator.product_processor.process_products_in_batches_optimized = AsyncMock()
+        orchestrator.product_processor.get_skip_report = MagicMock(return_value={})
+        orchestrator.checkpoint_manager = MagicMock()
+        orchestrator.checkpoint_manager.load_checkpoint = AsyncMock(return_value=None)
+        orchestrator.checkpoint_manager.save_checkpoint = AsyncMock()
+        orchestrator.checkpoint_manager.delete_checkpoint = AsyncMock()
+        orchestrator.report_generator = MagicMock()
+        orchestrator.report_generator.generate_sync_report = MagicMock(side_effect=lambda stats: {"statistics": stats})
+
+        settings_path = "app.services.rms_to_shopify.sync_orchestrator.settings"
+        with (
+            patch(f"{settings_path}.SYNC_BULK_MUTATION_ENABLED", True),
+            patch(f"{settings_path}.SYNC_BULK_MUTATION_THRESHOLD", 20),
+            patch(f"{settings_path}.SYNC_BULK_MUTATION_BATCH_SIZE", 20),
+        ):
+            report = await orchestrator._sync_products_streaming(False, 10, None, False, page_size=10)
+
+        written = [len(call.args[0]) for call in orchestrator.product_processor.process_products_bulk.await_args_list]
+        assert written == [20, 5]
+        orchestrator.product_processor.process_products_in_batches_optimized.assert_not_awaited()
+        saved_ccods = [
+            call.kwargs["last_processed_ccod"]
+            for call in orchestrator.checkpoint_manager.save_checkpoint.await_args_list
+        ]
+        assert saved_ccods == ["C0019"]
+        assert report["write_mode"] == "bulk_mutation"
+        assert report["total_products_synced"] == 25
+        assert report["pages_processed"] == 3
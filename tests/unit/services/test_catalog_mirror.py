@@ -0,0 +1,295 @@
+"""Tests unitarios para el espejo local del catálogo de Shopify."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.api.v1.schemas.shopify_schemas import ShopifyProductInput, ShopifyVariantInput
+from app.services.catalog_mirror import CatalogMirror, normalize_webhook_product
+from app.services.reverse_stock_sync import ReverseStockSynchronizer
+from app.services.rms_to_shopify.shopify_updater import ShopifyUpdater
+
+LOCATION_ID = "gid://shopify/Location/1"
+
+
+def make_bulk_product():
+    """Producto como lo entrega la operación bulk (variantes ya ensambladas)."""
+    return {
+        "id": "gid://shopify/Product/1",
+        "handle": "zapato-casual-24x01",
+        "title": "Zapato Casual",
+        "status": "ACTIVE",
+        "tags": ["ccod_24x01"],
+        "metafield": {"value": "24X01"},
+        "variants": {
+            "edges": [
+                {
+                    "node": {
+                        "id": f"gid://shopify/ProductVariant/{size}",
+                        "sku": f"24X01-{size}",
+                        "price": "15990.00",
+                        "inventoryQuantity": quantity,
+                        "inventoryItem": {"id": f"gid://shopify/InventoryItem/{size}"},
+                    }
+                }
+                for size, quantity in (("38", 5), ("39", 0))
+            ]
+        },
+    }
+
+
+async def open_mirror(tmp_path):
+    """Espejo inicializado en un archivo temporal."""
+    mirror = CatalogMirror(file_path=tmp_path / "catalog.sqlite3", max_age_minutes=60)
+    await mirror.initialize()
+    return mirror
+
+
+class TestCatalogMirror:
+    """Tests para la carga y actualización del espejo."""
+
+    @pytest.mark.asyncio
+    async def test_bulk_seed_serves_lookups_and_expires(self, tmp_path):
+        """La carga completa responde handles, SKUs y productos hasta vencer."""
+        mirror = await open_mirror(tmp_path)
+        assert not await mirror.is_usable()
+        await mirror.replace_all([make_bulk_product()])
+
+        assert await mirror.is_usable()
+        assert (await mirror.get_sku_index())["24x01-38"] == "gid://shopify/InventoryItem/38"
+
+        unsynced = await mirror.get_products()
+        assert [(product["id"], product["handle"]) for product in unsynced] == [
+            ("gid://shopify/Product/1", "zapato-casual-24x01")
+        ]
+        assert unsynced[0]["metafields"]["edges"][0]["node"]["value"] == "24X01"
+        assert [edge["node"]["inventoryQuantity"] for edge in unsynced[0]["variants"]["edges"]] == [5, 0]
+
+        mirror.max_age_minutes = 1
+        await mirror._run(lambda conn: conn.execute("UPDATE meta SET value = ?", (str(time.time() - 120),)))
+        assert not await mirror.is_usable()
+
+    @pytest.mark.asyncio
+    async def test_webhooks_and_own_writes_keep_mirror_current(self, tmp_path):
+        """Webhooks y escrituras propias actualizan el espejo sin perder IDs ni CCOD."""
+        mirror = await open_mirror(tmp_path)
+        await mirror.replace_all([make_bulk_product()])
+
+        payload = {
+            "id": 1,
+            "admin_graphql_api_id": "gid://shopify/Product/1",
+            "handle": "zapato-casual-24x01",
+            "title": "Zapato Casual",
+            "status": "active",
+            "tags": "ccod_24x01, RMS-SYNC-25-01-01",
+            "variants": [{"id": 38, "sku": "24X01-38", "inventory_item_id": 38, "inventory_quantity": 5}],
+        }
+        await mirror.upsert_products([normalize_webhook_product(payload)])
+        await mirror.set_available({"gid://shopify/InventoryItem/38": 2})
+        assert await mirror.get_sku_index() == {"24x01-38": "gid://shopify/InventoryItem/38"}
+
+        written = ShopifyProductInput(
+            title="Zapato Casual",
+            handle="zapato-casual-24x01",
+            tags=["ccod_24x01"],
+            variants=[
+                ShopifyVariantInput(
+                    sku="24X01-38",
+                    price="12990",
+                    inventoryQuantities=[{"locationId": LOCATION_ID, "availableQuantity": 7}],
+                )
+            ],
+        )
+        await mirror.record_written_product("gid://shopify/Product/1", written)
+
+        unsynced = await mirror.get_products()
+        variant = unsynced[0]["variants"]["edges"][0]["node"]
+        assert variant["id"] == "gid://shopify/ProductVariant/38"
+        assert variant["inventoryQuantity"] == 7
+        assert unsynced[0]["metafields"]["edges"][0]["node"]["value"] == "24X01"
+
+    @pytest.mark.asyncio
+    async def test_written_products_take_variant_ids_from_the_write_response(self, tmp_path):
+        """Las variantes nuevas toman sus IDs de la respuesta; las que no los tienen no se entregan."""
+        mirror = await open_mirror(tmp_path)
+        written = ShopifyProductInput(
+            title="Nuevo",
+            handle="producto-nuevo",
+            tags=["ccod_24x09"],
+            variants=[
+                ShopifyVariantInput(
+                    sku=f"24X09-{size}",
+                    price="12990",
+                    inventoryQuantities=[{"locationId": LOCATION_ID, "availableQuantity": 3}],
+                )
+                for size in ("38", "39")
+            ],
+        )
+        response = {
+            "id": "gid://shopify/Product/9",
+            "variants": {
+                "nodes": [
+                    {
+                        "id": "gid://shopify/ProductVariant/938",
+                        "sku": "24X09-38",
+                        "inventoryItem": {"id": "gid://shopify/InventoryItem/938"},
+                    }
+                ]
+            },
+        }
+
+        await mirror.record_written_product("gid://shopify/Product/9", written, [response])
+
+        [product] = await mirror.get_products()
+        assert [edge["node"] for edge in product["variants"]["edges"]] == [
+            {
+                "id": "gid://shopify/ProductVariant/938",
+                "sku": "24X09-38",
+                "inventoryQuantity": 3,
+                "inventoryItem": {"id": "gid://shopify/InventoryItem/938"},
+            }
+        ]
+        assert await mirror.get_sku_index() == {"24x09-38": "gid://shopify/InventoryItem/938"}
+
+    @pytest.mark.asyncio
+    async def test_reload_keeps_changes_made_during_export(self, tmp_path):
+        """Lo registrado después de iniciar la exportación no se pierde al recargar."""
+        mirror = await open_mirror(tmp_path)
+        removed = {**make_bulk_product(), "id": "gid://shopify/Product/3", "handle": "eliminado", "variants": {}}
+        await mirror.replace_all([make_bulk_product(), removed])
+        started_at = time.time()
+
+        created = ShopifyProductInput(title="Nuevo", handle="producto-nuevo", tags=["ccod_24x09"], variants=[])
+        await mirror.record_written_product("gid://shopify/Product/9", created)
+        await mirror.set_available({"gid://shopify/InventoryItem/38": 2})
+        await mirror.replace_all([make_bulk_product()], started_at=started_at)
+
+        products = {product["id"]: product for product in await mirror.get_products()}
+        assert {product_id: product["handle"] for product_id, product in products.items()} == {
+            "gid://shopify/Product/1": "zapato-casual-24x01",
+            "gid://shopify/Product/9": "producto-nuevo",
+        }
+        variants = products["gid://shopify/Product/1"]["variants"]["edges"]
+        assert [edge["node"]["inventoryQuantity"] for edge in variants] == [2, 0]
+
+
+class TestMirrorConsumers:
+    """Tests para los servicios que leen del espejo en vez de la API."""
+
+    @pytest.mark.asyncio
+    async def test_existence_check_queries_shopify_even_with_mirror(self, tmp_path):
+        """La verificación de existencia consulta Shopify aunque el espejo esté vigente."""
+        mirror = await open_mirror(tmp_path)
+        await mirror.replace_all([make_bulk_product()])
+        shopify_client = MagicMock()
+        shopify_client.get_product_snapshots_by_handles = AsyncMock(
+            return_value={
+                "zapato-casual-24x01": {"id": "gid://shopify/Product/1"},
+                "creado-en-otra-replica": {"id": "gid://shopify/Product/7"},
+                "producto-nuevo": None,
+            }
+        )
+        updater = ShopifyUpdater(shopify_client, LOCATION_ID, catalog_mirror=mirror)
+        handles = ["zapato-casual-24x01", "creado-en-otra-replica", "producto-nuevo"]
+
+        existing = await updater.check_products_exist_batch(handles)
+
+        assert existing == {
+            "zapato-casual-24x01": {"id": "gid://shopify/Product/1"},
+            "creado-en-otra-replica": {"id": "gid://shopify/Product/7"},
+            "producto-nuevo": None,
+        }
+        shopify_client.get_product_snapshots_by_handles.assert_awaited_once_with(handles, LOCATION_ID)
+
+    @pytest.mark.asyncio
+    async def test_reverse_sync_reads_unsynced_products_from_mirror(self, tmp_path):
+        """El reverse sync no pagina Shopify si el espejo está vigente y solo toma productos activos."""
+        mirror = await open_mirror(tmp_path)
+        draft = {**make_bulk_product(), "id": "gid://shopify/Product/2", "handle": "borrador", "status": "DRAFT"}
+        await mirror.replace_all([make_bulk_product(), draft])
+        live_product = {**make_bulk_product(), "metafields": {"edges": []}}
+        live_product["variants"]["edges"][0]["node"]["inventoryQuantity"] = 2
+        shopify_client = MagicMock()
+        shopify_client.products.get_active_products_with_inventory = AsyncMock()
+        shopify_client.get_product_snapshots_by_handles = AsyncMock(return_value={"zapato-casual-24x01": live_product})
+        synchronizer = ReverseStockSynchronizer(shopify_client, MagicMock(), LOCATION_ID, catalog_mirror=mirror)
+
+        products = await synchronizer._get_unsynced_products(time.time(), batch_size=50, limit=None)
+
+        assert products == [live_product]
+        shopify_client.get_product_snapshots_by_handles.assert_awaited_once_with(["zapato-casual-24x01"], LOCATION_ID)
+        shopify_client.products.get_active_products_with_inventory.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_reverse_sync_pages_through_mirror(self, tmp_path):
+        """El espejo se lee por páginas de batch_size, cada página se relee en Shopify y se entrega al leerla."""
+        mirror = await open_mirror(tmp_path)
+        catalog = [
+            {
+                **make_bulk_product(),
+                "id": f"gid://shopify/Product/{number}",
+                "handle": f"producto-{number}",
+                "status": "DRAFT" if number == 3 else "ACTIVE",
+                "variants": {},
+            }
+            for number in range(1, 7)
+        ]
+        await mirror.replace_all(catalog)
+        shopify_client = MagicMock()
+        shopify_client.get_product_snapshots_by_handles = AsyncMock(
+            side_effect=lambda handles, location_id: {
+                handle: None if handle == "producto-5" else {"handle": handle, "status": "ACTIVE"} for handle in handles
+            }
+        )
+        synchronizer = ReverseStockSynchronizer(shopify_client, MagicMock(), LOCATION_ID, catalog_mirror=mirror)
+
+        with patch.object(mirror, "get_products", wraps=mirror.get_products) as get_products:
+            pages = [
+                [product["handle"] for product in page]
+                async for page in synchronizer._iter_unsynced_pages(time.time(), batch_size=2, limit=4)
+            ]
+
+        assert pages == [["producto-1", "producto-2"], ["producto-4"], ["producto-6"]]
+        assert [call.kwargs["after_product_id"] for call in get_products.call_args_list] == [
+            None,
+            "gid://shopify/Product/2",
+            "gid://shopify/Product/5",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_reverse_sync_mirrors_only_applied_inventory_writes(self, tmp_path):
+        """Una escritura fallida en medio del lote no se registra en el espejo ni en el rollback."""
+        mirror = await open_mirror(tmp_path)
+        product = make_bulk_product()
+        product["variants"]["edges"].extend(
+            {
+                "node": {
+                    "id": f"gid://shopify/ProductVariant/{size}",
+                    "sku": f"24X01-{size}",
+                    "price": "15990.00",
+                    "inventoryQuantity": quantity,
+                    "inventoryItem": {"id": f"gid://shopify/InventoryItem/{size}"},
+                }
+            }
+            for size, quantity in (("40", 1), ("41", 3))
+        )
+        await mirror.replace_all([product])
+
+        async def batch_update_inventory(updates):
+            return len(updates) - 1, [{"update": updates[1], "error": "Update failed"}]
+
+        shopify_client = MagicMock()
+        shopify_client.inventory.batch_update_inventory = AsyncMock(side_effect=batch_update_inventory)
+        synchronizer = ReverseStockSynchronizer(shopify_client, MagicMock(), LOCATION_ID, catalog_mirror=mirror)
+        synchronizer._delete_variants_safely = AsyncMock(side_effect=RuntimeError("delete failed"))
+        synchronizer._rollback_operations = AsyncMock()
+        page_stock = {"24x01": {"24x01-38": 2, "24x01-39": 4, "24x01-40": 6}}
+
+        [mirrored] = await mirror.get_products()
+        assert not await synchronizer._process_product_locked(mirrored, False, True, page_stock)
+
+        [mirrored] = await mirror.get_products()
+        assert [edge["node"]["inventoryQuantity"] for edge in mirrored["variants"]["edges"]] == [2, 0, 6, 3]
+        [rollback_actions] = synchronizer._rollback_operations.await_args.args
+        assert [action["sku"] for action in rollback_actions] == ["24X01-38", "24X01-40"]
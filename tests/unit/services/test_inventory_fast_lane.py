@@ -0,0 +1,137 @@
+"""Tests unitarios para el inventory fast lane."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.inventory_fast_lane import InventoryFastLane, compute_quantity_deltas
+
+LOCATION = "gid://shopify/Location/1"
+
+
+def make_lane(rows, sku_index=None):
+    """Fast lane con repositorio RMS y cliente Shopify simulados."""
+    repository = MagicMock()
+    repository.get_item_quantities = AsyncMock(return_value=rows)
+    client = MagicMock()
+    client.get_inventory_item_sku_index = AsyncMock(
+        return_value=sku_index or {sku.lower(): f"gid://shopify/InventoryItem/{item_id}" for item_id, sku, _ in rows}
+    )
+
+    async def write(items, location_id, activate=True):
+        return [{**item, "success": not item["sku"].startswith("FAIL"), "step": "done", "errors": []} for item in items]
+
+    client.write_inventory_batch = AsyncMock(side_effect=write)
+    return InventoryFastLane(client, repository, LOCATION, index_ttl_seconds=3600), repository, client
+
+
+class TestComputeQuantityDeltas:
+    """Tests para la comparación de snapshots."""
+
+    def test_only_changed_items_are_reported(self):
+        """Solo los items con cantidad o SKU distintos deben aparecer."""
+        previous = {1: ("A", 5), 2: ("B", 3), 3: ("C", 0)}
+        current = {1: ("A", 5), 2: ("B", 1), 3: ("C2", 0), 4: ("D", 7)}
+
+        changes = {change["item_id"]: change for change in compute_quantity_deltas(previous, current)}
+
+        assert set(changes) == {2, 3, 4}
+        assert changes[2]["delta"] == -2
+        assert changes[4]["quantity"] == 7
+
+
+class TestInventoryFastLane:
+    """Tests para los ciclos del fast lane."""
+
+    @pytest.mark.asyncio
+    async def test_first_cycle_only_seeds_snapshot(self):
+        """El primer ciclo no debe escribir en Shopify."""
+        lane, _, client = make_lane([(1, "A", 5)])
+
+        summary = await lane.run_cycle()
+
+        assert summary["seeded"] is True
+        client.write_inventory_batch.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_pushes_only_changed_quantities(self):
+        """Solo los cambios se envían, resueltos por SKU en minúsculas."""
+        lane, repository, client = make_lane([(1, "a-1", 5), (2, "B-2", 3)])
+        await lane.run_cycle()
+        repository.get_item_quantities.return_value = [(1, "a-1", 5), (2, "B-2", 9)]
+
+        summary = await lane.run_cycle()
+
+        items, location = client.write_inventory_batch.await_args.args
+        assert location == LOCATION
+        assert items == [
+            {"inventory_item_id": "gid://shopify/InventoryItem/2", "sku": "B-2", "quantity": 9, "item_id": 2}
+        ]
+        assert summary["pushed"] == 1
+        assert lane._snapshot[2] == ("B-2", 9)
+
+    @pytest.mark.asyncio
+    async def test_negative_stock_is_pushed_as_zero(self):
+        """El stock negativo de RMS se publica como 0 y sus cambios bajo cero no se envían."""
+        lane, repository, client = make_lane([(1, "A-1", 2), (2, "B-2", -3)])
+        await lane.run_cycle()
+        repository.get_item_quantities.return_value = [(1, "A-1", -4), (2, "B-2", -1)]
+
+        summary = await lane.run_cycle()
+
+        items, _ = client.write_inventory_batch.await_args.args
+        assert [(item["sku"], item["quantity"]) for item in items] == [("A-1", 0)]
+        assert summary["changes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_items_are_retried_next_cycle(self):
+        """Un item fallido conserva el valor anterior para reintentarse."""
+        lane, repository, client = make_lane([(1, "FAIL-1", 5), (2, "OK-2", 1)])
+        await lane.run_cycle()
+        repository.get_item_quantities.return_value = [(1, "FAIL-1", 8), (2, "OK-2", 2)]
+
+        summary = await lane.run_cycle()
+        assert len(summary["failed"]) == 1
+        assert lane._snapshot[1] == ("FAIL-1", 5)
+
+        await lane.run_cycle()
+        items, _ = client.write_inventory_batch.await_args.args
+        assert [item["sku"] for item in items] == ["FAIL-1"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_skus_are_reported(self):
+        """SKUs sin inventory item en Shopify se reportan y no se envían."""
+        lane, repository, client = make_lane([(1, "A", 5)], sku_index={"a": "gid://shopify/InventoryItem/1"})
+        await lane.run_cycle()
+        repository.get_item_quantities.return_value = [(1, "A", 5), (2, "NEW", 4)]
+
+        summary = await lane.run_cycle()
+
+        assert summary["unknown_skus"] == ["NEW"]
+        client.write_inventory_batch.assert_not_awaited()
+        assert lane.get_status()["unknown_skus"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_skus_are_pushed_once_indexed(self, monkeypatch):
+        """El cambio de un SKU desconocido no se da por enviado: se envía cuando el índice lo conoce."""
+        monkeypatch.setattr("app.services.inventory_fast_lane.INDEX_MISS_REFRESH_SECONDS", 0)
+        lane, repository, client = make_lane(
+            [(1, "A", 5), (2, "B", 1)], sku_index={"a": "gid://shopify/InventoryItem/1"}
+        )
+        await lane.run_cycle()
+        repository.get_item_quantities.return_value = [(1, "A", 5), (2, "B", 4)]
+
+        summary = await lane.run_cycle()
+        assert summary["unknown_skus"] == ["B"]
+        assert lane._snapshot[2] == ("B", 1)
+
+        client.get_inventory_item_sku_index.return_value = {
+            "a": "gid://shopify/InventoryItem/1",
+            "b": "gid://shopify/InventoryItem/2",
+        }
+        summary = await lane.run_cycle()
+
+        assert summary["pushed"] == 1
+        items, _ = client.write_inventory_batch.await_args.args
+        assert [(item["sku"], item["quantity"]) for item in items] == [("B", 4)]
+        assert lane._snapshot[2] == ("B", 4)
@@ -0,0 +1,159 @@
+"""Tests unitarios para la reconciliación de inventario de todo el catálogo (exportación bulk y cruce vectorizado)."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.inventory_reconciliation import (
+    compute_inventory_drift,
+    rms_quantities_to_frame,
+    summarize_drift,
+    variants_to_frame,
+)
+from app.services.reverse_stock_sync import ReverseStockSynchronizer
+
+LOCATION_ID = "gid://shopify/Location/1"
+
+
+def make_variant(product, sku, quantity, status="ACTIVE"):
+    """Línea del JSONL de la exportación bulk de variantes."""
+    level = {"quantities": [{"quantity": quantity}]} if quantity is not None else None
+    return {
+        "id": f"gid://shopify/ProductVariant/{sku}",
+        "sku": sku,
+        "product": {"id": f"gid://shopify/Product/{product}", "status": status},
+        "inventoryItem": {"id": f"gid://shopify/InventoryItem/{sku}", "inventoryLevel": level},
+    }
+
+
+def make_catalog():
+    """Catálogo con un caso de cada tipo de diferencia."""
+    variants = [
+        make_variant(1, "24X01-38", 5),  # igual a RMS
+        make_variant(1, "24X01-39", 2),  # cantidad distinta
+        make_variant(1, "24X01-40", 3),  # sin stock en RMS
+        make_variant(1, "24X01-41", None),  # no activada en la ubicación
+        make_variant(2, "24X02-38", 4),  # única variante sin stock
+        make_variant(3, "24X03-38", 1),  # SKU desconocido en RMS
+        make_variant(4, "24X04-38", 9, status="DRAFT"),  # producto no activo
+    ]
+    rms = [
+        (1, "24x01-38", 5),
+        (2, "24X01-39", 7),
+        (3, "24X01-40", 0),
+        (4, "24X01-41", 6),
+        (5, "24X02-38", 1),
+        (6, "24X02-38", -2),  # duplicado: gana la última fila
+        (7, "24X04-38", 0),
+    ]
+    return variants, rms
+
+
+class TestComputeDrift:
+    """Tests para el cruce vectorizado por SKU."""
+
+    def test_only_drifted_variants_are_returned(self):
+        """Se devuelven solo las diferencias, con la misma regla que el reverse sync."""
+        variants, rms = make_catalog()
+
+        drift = compute_inventory_drift(variants_to_frame(variants), rms_quantities_to_frame(rms))
+
+        assert dict(zip(drift["sku"], drift["action"], strict=True)) == {
+            "24X01-39": "update",
+            "24X01-40": "delete",
+            "24X01-41": "update",
+            "24X02-38": "preserve",
+            "24X03-38": "missing_in_rms",
+        }
+        summary = summarize_drift(drift)
+        assert summary["counts"] == {"update": 2, "delete": 1, "preserve": 1, "missing_in_rms": 1}
+        assert summary["samples"]["update"] == [
+            {"sku": "24X01-39", "shopify_qty": 2, "rms_qty": 7},
+            {"sku": "24X01-41", "shopify_qty": None, "rms_qty": 6},
+        ]
+
+    def test_zero_stock_is_written_when_deletion_is_disabled(self):
+        """Sin eliminación, el stock 0 de RMS se escribe como cantidad."""
+        variants, rms = make_catalog()
+
+        drift = compute_inventory_drift(
+            variants_to_frame(variants), rms_quantities_to_frame(rms), delete_zero_stock=False
+        )
+
+        actions = dict(zip(drift["sku"], drift["action"], strict=True))
+        assert actions["24X01-40"] == "update"
+        assert actions["24X02-38"] == "update"
+
+    def test_full_catalog_diff_is_vectorized(self):
+        """200k variantes se cruzan en pocos segundos."""
+        variants = [make_variant(number // 5, f"SKU-{number}", number % 7 + 1) for number in range(200_000)]
+        rms = [(number, f"sku-{number}", number % 7 + 1 + (number % 100 == 0)) for number in range(200_000)]
+
+        started = time.perf_counter()
+        drift = compute_inventory_drift(variants_to_frame(variants), rms_quantities_to_frame(rms))
+        elapsed = time.perf_counter() - started
+
+        assert set(drift["action"]) == {"update"}
+        assert len(drift) == 2_000
+        assert elapsed < 10
+
+
+class TestExecuteReconciliation:
+    """Tests para la escritura de las diferencias en ReverseStockSynchronizer."""
+
+    @staticmethod
+    def make_synchronizer():
+        """Sincronizador con cliente y repositorio simulados sobre el catálogo de prueba."""
+        variants, rms = make_catalog()
+        shopify_client = MagicMock()
+        shopify_client.write_inventory_batch = AsyncMock(
+            side_effect=lambda items, location_id, activate=True: [{**item, "success": True} for item in items]
+        )
+        shopify_client.products.delete_variant = AsyncMock(return_value={"success": True})
+        repository = MagicMock()
+        repository.get_item_quantities = AsyncMock(return_value=rms)
+        synchronizer = ReverseStockSynchronizer(shopify_client, repository, LOCATION_ID)
+        synchronizer._validate_variant_deletion = AsyncMock(return_value=(True, "ok"))
+        return synchronizer, variants
+
+    @pytest.mark.asyncio
+    async def test_only_mismatches_and_zero_stock_are_written(self):
+        """Una escritura por lote de cantidades y una eliminación por variante sin stock."""
+        synchronizer, variants = self.make_synchronizer()
+        client = synchronizer.shopify_client
+
+        with patch(
+            "app.services.reverse_stock_sync.ShopifyBulkOperations.extract_variant_inventory_bulk",
+            AsyncMock(return_value=(variants, {"duration_seconds": 1.0})),
+        ):
+            report = await synchronizer.execute_reconciliation()
+
+        written = {
+            call.kwargs["activate"]: [(item["sku"], item["quantity"]) for item in call.args[0]]
+            for call in client.write_inventory_batch.await_args_list
+        }
+        assert written == {False: [("24X01-39", 7)], True: [("24X01-41", 6)]}
+        client.products.delete_variant.assert_awaited_once_with(
+            "gid://shopify/Product/1", "gid://shopify/ProductVariant/24X01-40"
+        )
+        assert report["statistics"]["variants_updated"] == 2
+        assert report["statistics"]["variants_deleted"] == 1
+        assert report["drift"]["counts"]["missing_in_rms"] == 1
+
+    @pytest.mark.asyncio
+    async def test_dry_run_only_reports(self):
+        """En dry-run no se escribe nada en Shopify."""
+        synchronizer, variants = self.make_synchronizer()
+        client = synchronizer.shopify_client
+
+        with patch(
+            "app.services.reverse_stock_sync.ShopifyBulkOperations.extract_variant_inventory_bulk",
+            AsyncMock(return_value=(variants, {"duration_seconds": 1.0})),
+        ):
+            report = await synchronizer.execute_reconciliation(dry_run=True)
+
+        client.write_inventory_batch.assert_not_awaited()
+        client.products.delete_variant.assert_not_awaited()
+        assert report["statistics"]["variants_updated"] == 2
+        assert report["statistics"]["variants_deleted"] == 1
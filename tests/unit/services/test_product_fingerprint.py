@@ -0,0 +1,179 @@
+"""Tests unitarios para el ledger de fingerprints por CCOD."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.api.v1.schemas.shopify_schemas import ShopifyProductInput, ShopifyVariantInput
+from app.services.product_fingerprint import FingerprintLedger, changed_sections, compute_product_fingerprint
+from app.services.rms_to_shopify.product_processor import ProductProcessor
+
+
+def make_product(price="15990", quantity=5, sync_tag="RMS-SYNC-25-01-01"):
+    """Producto mapeado de prueba."""
+    return ShopifyProductInput(
+        title="Zapato Casual",
+        handle="zapato-casual-24x01",
+        tags=["ccod_24x01", sync_tag],
+        options=["Talla"],
+        variants=[
+            ShopifyVariantInput(
+                sku="24X01-38",
+                price=price,
+                options=["38"],
+                inventoryQuantities=[{"locationId": "gid://shopify/Location/1", "availableQuantity": quantity}],
+            )
+        ],
+        metafields=[{"namespace": "custom", "key": "color", "value": "Negro"}],
+    )
+
+
+class TestComputeProductFingerprint:
+    """Tests para el cálculo de fingerprints."""
+
+    def test_sync_date_tag_does_not_change_fingerprint(self):
+        """El tag RMS-SYNC con fecha no debe alterar el fingerprint."""
+        first = compute_product_fingerprint(make_product(sync_tag="RMS-SYNC-25-01-01"))
+        second = compute_product_fingerprint(make_product(sync_tag="RMS-SYNC-25-01-02"))
+
+        assert first == second
+
+    def test_sub_hashes_isolate_changes(self):
+        """Un cambio de precio solo afecta la sección de precios y el hash total."""
+        base = compute_product_fingerprint(make_product())
+        repriced = compute_product_fingerprint(make_product(price="12990"))
+        restocked = compute_product_fingerprint(make_product(quantity=2))
+
+        assert changed_sections(base, repriced) == ["price"]
+        assert changed_sections(base, restocked) == ["inventory"]
+        assert base["product"] != repriced["product"]
+        assert changed_sections(None, base) == ["core", "price", "inventory", "metafields", "options"]
+
+
+class TestFingerprintLedger:
+    """Tests para el almacén local del ledger."""
+
+    @pytest.mark.asyncio
+    async def test_local_round_trip_and_expiry(self, tmp_path):
+        """Los registros persisten en archivo y vencen tras max_age_hours."""
+        path = tmp_path / "fingerprints.json"
+        ledger = FingerprintLedger(max_age_hours=1, file_path=path)
+        await ledger.initialize()
+        await ledger.set_many({"24X01": {"product": "abc"}})
+
+        reloaded = FingerprintLedger(max_age_hours=1, file_path=path)
+        await reloaded.initialize()
+        assert (await reloaded.get_many(["24X01", "OTHER"]))["24X01"]["product"] == "abc"
+
+        reloaded._local["24X01"]["recorded_at"] = time.time() - 7200
+        assert await reloaded.get_many(["24X01"]) == {}
+
+    @pytest.mark.asyncio
+    async def test_writes_and_confirmations_are_recorded_as_verified(self, tmp_path):
+        """Escribir o confirmar sin cambios registra la hora de verificación, que persiste en archivo."""
+        path = tmp_path / "fingerprints.json"
+        ledger = FingerprintLedger(max_age_hours=1, file_path=path)
+        await ledger.initialize()
+        before = time.time()
+        await ledger.set_many({"24X01": {"product": "abc"}})
+        await ledger.mark_verified(["24X02"])
+
+        reloaded = FingerprintLedger(max_age_hours=1, file_path=path)
+        await reloaded.initialize()
+        verified_at = await reloaded.get_verified_at(["24X01", "24X02", "OTHER"])
+        assert set(verified_at) == {"24X01", "24X02"}
+        assert all(timestamp >= before for timestamp in verified_at.values())
+
+
+def make_snapshot(quantity):
+    """Producto de Shopify con el contenido de make_product(sync_tag="Mujer") y la cantidad indicada."""
+    return {
+        "id": "gid://shopify/Product/1",
+        "title": "Zapato Casual",
+        "status": "DRAFT",
+        "vendor": "",
+        "tags": ["ccod_24x01", "Mujer"],
+        "metafields": {"edges": [{"node": {"namespace": "custom", "key": "color", "value": "Negro"}}]},
+        "variants": {
+            "pageInfo": {"hasNextPage": False},
+            "edges": [
+                {
+                    "node": {
+                        "id": "gid://shopify/ProductVariant/1",
+                        "sku": "24X01-38",
+                        "price": "15990",
+                        "selectedOptions": [{"name": "Color", "value": "38"}],
+                        "inventoryItem": {
+                            "id": "gid://shopify/InventoryItem/1",
+                            "tracked": True,
+                            "inventoryLevel": {"quantities": [{"name": "available", "quantity": quantity}]},
+                        },
+                    }
+                }
+            ],
+        },
+    }
+
+
+class TestProcessorSkipsUnchanged:
+    """Tests para la omisión de productos sin cambios."""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_products_are_skipped_with_reason(self, tmp_path):
+        """Un producto idéntico al registrado no se reescribe; uno modificado sí."""
+        ledger = FingerprintLedger(max_age_hours=0, file_path=tmp_path / "fingerprints.json")
+        await ledger.initialize()
+        updater = MagicMock()
+        updater.update_shopify_product = AsyncMock(return_value={"id": "gid://shopify/Product/1"})
+        processor = ProductProcessor("test_sync", updater, MagicMock(), MagicMock(), fingerprint_ledger=ledger)
+        existing = {"zapato-casual-24x01": {"id": "gid://shopify/Product/1"}}
+
+        await processor._process_product_batch_optimized([make_product()], existing, force_update=True)
+        stats = await processor._process_product_batch_optimized([make_product()], existing, force_update=True)
+        assert stats["skipped"] == 1
+        assert updater.update_shopify_product.await_count == 1
+        assert "24X01" in await ledger.get_verified_at(["24X01"])
+
+        stats = await processor._process_product_batch_optimized(
+            [make_product(price="12990")], existing, force_update=True
+        )
+        assert stats["updated"] == 1
+        report = processor.get_skip_report()
+        assert report["skip_reasons"] == {"unchanged_fingerprint": 1}
+        assert report["changed_sections"]["price"] == 2
+
+    @pytest.mark.asyncio
+    async def test_unchanged_product_is_updated_if_shopify_drifted(self, tmp_path):
+        """Con fingerprint sin cambios, un snapshot completo distinto se actualiza y uno igual se verifica."""
+        ledger = FingerprintLedger(max_age_hours=0, file_path=tmp_path / "fingerprints.json")
+        await ledger.initialize()
+        product = make_product(sync_tag="Mujer")
+        await ledger.set_many({"24X01": compute_product_fingerprint(product)})
+        ledger._verified.clear()
+        updater = MagicMock(primary_location_id="gid://shopify/Location/1")
+        updater.update_shopify_product = AsyncMock(return_value={"id": "gid://shopify/Product/1"})
+        processor = ProductProcessor("test_sync", updater, MagicMock(), MagicMock(), fingerprint_ledger=ledger)
+
+        snapshot = make_snapshot(quantity=2)
+        stats = await processor._process_product_batch_optimized(
+            [product], {product.handle: snapshot}, force_update=True
+        )
+        assert stats["updated"] == 1
+        assert stats["skipped"] == 0
+        updater.update_shopify_product.assert_awaited_once_with(product, snapshot)
+
+        # Sin snapshot completo solo queda el fingerprint: se omite pero no se marca verificado
+        ledger._verified.clear()
+        stats = await processor._process_product_batch_optimized(
+            [product], {product.handle: {"id": "gid://shopify/Product/1"}}, force_update=True
+        )
+        assert stats["skipped"] == 1
+        assert await ledger.get_verified_at(["24X01"]) == {}
+
+        stats = await processor._process_product_batch_optimized(
+            [product], {product.handle: make_snapshot(quantity=5)}, force_update=True
+        )
+        assert stats["skipped"] == 1
+        assert updater.update_shopify_product.await_count == 1
+        assert "24X01" in await ledger.get_verified_at(["24X01"])
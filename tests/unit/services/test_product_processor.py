@@ -0,0 +1,69 @@
+"""Tests unitarios para el procesamiento concurrente de productos por batch."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.rms_to_shopify.product_processor import ProductProcessor
+
+
+def product(number):
+    """Producto RMS mapeado de prueba."""
+    return SimpleNamespace(handle=f"handle-{number}", title=f"Producto {number}", tags=[f"ccod_C{number}"], variants=[])
+
+
+def make_processor(update):
+    """ProductProcessor con ShopifyUpdater simulado."""
+    updater = MagicMock()
+    updater.update_shopify_product = AsyncMock(side_effect=update)
+    return ProductProcessor("test_sync", updater, MagicMock(), MagicMock())
+
+
+class TestProcessProductBatch:
+    """Tests para la concurrencia acotada dentro de un batch."""
+
+    @pytest.mark.asyncio
+    async def test_products_run_concurrently_up_to_workers(self):
+        """No se superan SYNC_PARALLEL_WORKERS productos en vuelo."""
+        in_flight = 0
+        peak = 0
+
+        async def update(shopify_input, existing):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"id": existing["id"]}
+
+        processor = make_processor(update)
+        batch = [product(i) for i in range(10)]
+        existing = {p.handle: {"id": p.handle} for p in batch}
+
+        with patch("app.services.rms_to_shopify.product_processor.settings.SYNC_PARALLEL_WORKERS", 4):
+            stats = await processor._process_product_batch_optimized(batch, existing, force_update=True)
+
+        assert peak == 4
+        assert stats["updated"] == 10
+        assert stats["total_processed"] == 10
+
+    @pytest.mark.asyncio
+    async def test_errors_are_isolated_per_product(self):
+        """Un producto que falla no afecta al resto del batch."""
+
+        async def update(shopify_input, existing):
+            if shopify_input.handle == "handle-2":
+                raise RuntimeError("boom")
+            return {"id": existing["id"]}
+
+        processor = make_processor(update)
+        batch = [product(i) for i in range(5)]
+        existing = {p.handle: {"id": p.handle} for p in batch}
+
+        stats = await processor._process_product_batch_optimized(batch, existing, force_update=True)
+
+        assert stats["updated"] == 4
+        assert stats["errors"] == 1
+        processor.error_aggregator.add_error.assert_called_once()
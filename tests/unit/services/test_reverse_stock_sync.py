@@ -1,10 +1,12 @@
 """Tests unitarios para Reverse Stock Synchronization (Shopify → RMS)."""
 
+import time
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from app.services.product_fingerprint import FingerprintLedger
 from app.services.reverse_stock_sync import ReverseStockSynchronizer
 
 
@@ -83,6 +85,7 @@ class TestExtractCcodFromMetafields:
         result = synchronizer._extract_ccod_from_metafields(product)
         assert result is None
 
+
 def create_mock_item(c_articulo: str, quantity: Decimal):
     """Create a mock item with c_articulo and quantity attributes."""
     mock_item = MagicMock()
@@ -212,9 +215,7 @@ class TestEdgeCases:
         This is the expected behavior per the implementation.
         """
         mock_repo = MagicMock()
-        mock_repo.get_products_by_ccod = AsyncMock(
-            side_effect=Exception("Database connection error")
-        )
+        mock_repo.get_products_by_ccod = AsyncMock(side_effect=Exception("Database connection error"))
 
         synchronizer = ReverseStockSynchronizer(
             shopify_client=MagicMock(),
@@ -286,3 +287,226 @@ class TestSyncStatistics:
         assert stats["variants_checked"] == 40
         assert stats["variants_updated"] == 25
         assert stats["variants_deleted"] == 5
+
+
+def make_shopify_product(ccod, quantities):
+    """Producto de Shopify sin el tag de sincronización, con su CCOD en metafields."""
+    return {
+        "id": f"gid://shopify/Product/{ccod}",
+        "title": f"Producto {ccod}",
+        "metafields": {"edges": [{"node": {"namespace": "rms", "key": "ccod", "value": ccod}}]},
+        "variants": {
+            "edges": [
+                {
+                    "node": {
+                        "id": f"gid://shopify/ProductVariant/{sku}",
+                        "sku": sku,
+                        "inventoryQuantity": quantity,
+                        "inventoryItem": {"id": f"gid://shopify/InventoryItem/{sku}"},
+                    }
+                }
+                for sku, quantity in quantities.items()
+            ]
+        },
+    }
+
+
+class TestPageStockLoader:
+    """Tests para la carga de stock de RMS por página de productos."""
+
+    @pytest.mark.asyncio
+    async def test_page_stock_is_loaded_in_one_query(self):
+        """El stock de todos los CCODs de la página se obtiene con una sola consulta."""
+        mock_repo = MagicMock()
+        mock_repo.get_stock_by_ccods = AsyncMock(return_value={"26ts00": {"26ts00-41-beige": 7}})
+        mock_repo.get_products_by_ccod = AsyncMock()
+        synchronizer = ReverseStockSynchronizer(
+            shopify_client=MagicMock(),
+            product_repository=mock_repo,
+            primary_location_id="gid://shopify/Location/123",
+        )
+        products = [make_shopify_product("26TS00", {"26TS00-41-BEIGE": 2}), make_shopify_product("27AB01", {})]
+
+        page_stock = await synchronizer._load_page_stock(products)
+        await synchronizer._process_product_locked(products[0], True, False, page_stock)
+
+        mock_repo.get_stock_by_ccods.assert_awaited_once_with(["26ts00", "27ab01"])
+        assert page_stock == {"26ts00": {"26ts00-41-beige": 7}, "27ab01": {}}
+        mock_repo.get_products_by_ccod.assert_not_awaited()
+        assert synchronizer.stats["details"]["updated"] == [
+            {"sku": "26TS00-41-BEIGE", "old_qty": 2, "new_qty": 7, "dry_run": True}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failed_page_query_falls_back_to_ccod_lookup(self):
+        """Si la consulta de la página falla, cada producto consulta su CCOD."""
+        mock_repo = MagicMock()
+        mock_repo.get_stock_by_ccods = AsyncMock(side_effect=Exception("Database connection error"))
+        mock_repo.get_products_by_ccod = AsyncMock(return_value=[create_mock_item("26TS00-41-BEIGE", Decimal("4"))])
+        synchronizer = ReverseStockSynchronizer(
+            shopify_client=MagicMock(),
+            product_repository=mock_repo,
+            primary_location_id="gid://shopify/Location/123",
+        )
+        product = make_shopify_product("26TS00", {"26TS00-41-BEIGE": 2})
+
+        page_stock = await synchronizer._load_page_stock([product])
+        await synchronizer._process_product_locked(product, True, False, page_stock)
+
+        assert page_stock == {}
+        mock_repo.get_products_by_ccod.assert_awaited_once_with("26TS00")
+        assert synchronizer.stats["details"]["updated"][0]["new_qty"] == 4
+
+
+class TestStreamingPages:
+    """Tests para el procesamiento de páginas a medida que llegan de Shopify."""
+
+    @staticmethod
+    def make_synchronizer(pages, events):
+        """Sincronizador con un cliente que pagina las páginas dadas y registra cada consulta."""
+
+        async def get_active_products_with_inventory(limit, cursor=None):
+            page = int(cursor or 0)
+            events.append(f"fetch {page}")
+            return {
+                "edges": [{"node": product} for product in pages[page]],
+                "pageInfo": {"hasNextPage": page + 1 < len(pages), "endCursor": str(page + 1)},
+            }
+
+        shopify_client = MagicMock()
+        shopify_client.products.get_active_products_with_inventory = AsyncMock(
+            side_effect=get_active_products_with_inventory
+        )
+        mock_repo = MagicMock()
+        mock_repo.get_stock_by_ccods = AsyncMock(return_value={})
+        synchronizer = ReverseStockSynchronizer(
+            shopify_client=shopify_client,
+            product_repository=mock_repo,
+            primary_location_id="gid://shopify/Location/123",
+        )
+
+        async def process_product(product, dry_run, delete_zero_stock, page_stock, product_lock=None):
+            events.append(f"process {product['id']}")
+
+        synchronizer._process_product = process_product
+        return synchronizer
+
+    @pytest.mark.asyncio
+    async def test_first_page_is_processed_before_catalog_is_fetched(self):
+        """La primera página se procesa sin esperar a que se pagine todo el catálogo."""
+        events = []
+        pages = [[make_shopify_product(f"{page}{index:02d}", {}) for index in range(50)] for page in range(6)]
+        synchronizer = self.make_synchronizer(pages, events)
+
+        await synchronizer.execute_reverse_sync(dry_run=True, batch_size=50)
+
+        assert events.index(f"process {pages[0][0]['id']}") < events.index("fetch 5")
+        assert sum(event.startswith("process") for event in events) == 300
+
+    @pytest.mark.asyncio
+    async def test_limit_stops_pagination(self):
+        """Con límite se procesan solo esos productos y no se piden más páginas."""
+        events = []
+        pages = [[make_shopify_product(f"{page}{index:02d}", {}) for index in range(50)] for page in range(4)]
+        synchronizer = self.make_synchronizer(pages, events)
+
+        await synchronizer.execute_reverse_sync(dry_run=True, batch_size=50, limit=120)
+
+        assert sum(event.startswith("process") for event in events) == 120
+        assert "fetch 3" not in events
+
+
+class TestSyncLedger:
+    """Tests para el uso del ledger de sincronización en lugar del tag diario."""
+
+    @staticmethod
+    async def make_synchronizer(tmp_path, products=None):
+        """Sincronizador con un ledger local y un catálogo de dos productos."""
+        ledger = FingerprintLedger(file_path=tmp_path / "fingerprints.json")
+        await ledger.initialize()
+        products = products or [
+            make_shopify_product("24X01", {"24X01-38": 1}),
+            make_shopify_product("24X02", {"24X02-38": 1}),
+        ]
+        shopify_client = MagicMock()
+        shopify_client.products.get_active_products_with_inventory = AsyncMock(
+            return_value={
+                "edges": [{"node": product} for product in products],
+                "pageInfo": {"hasNextPage": False},
+            }
+        )
+        shopify_client.inventory.batch_update_inventory = AsyncMock(return_value=(1, []))
+        mock_repo = MagicMock()
+        mock_repo.get_stock_by_ccods = AsyncMock(return_value={"24x01": {"24x01-38": 3}, "24x02": {"24x02-38": 4}})
+        synchronizer = ReverseStockSynchronizer(
+            shopify_client=shopify_client,
+            product_repository=mock_repo,
+            primary_location_id="gid://shopify/Location/123",
+            fingerprint_ledger=ledger,
+        )
+
+        async def process_product(product, dry_run, delete_zero_stock, page_stock, product_lock=None):
+            return await synchronizer._process_product_locked(product, dry_run, delete_zero_stock, page_stock)
+
+        synchronizer._process_product = process_product
+        return synchronizer, ledger
+
+    @pytest.mark.asyncio
+    async def test_verified_products_are_skipped_and_reconciled_ones_recorded(self, tmp_path):
+        """Los productos verificados hoy se omiten y los reconciliados se registran sin mutar tags."""
+        synchronizer, ledger = await self.make_synchronizer(tmp_path)
+        await ledger.mark_verified(["24X01"])
+
+        report = await synchronizer.execute_reverse_sync(delete_zero_stock=False)
+
+        assert report["statistics"]["already_verified"] == 1
+        assert report["statistics"]["products_checked"] == 1
+        assert [update["sku"] for update in report["details"]["updated"]] == ["24X02-38"]
+        assert set(await ledger.get_verified_at(["24X01", "24X02"])) == {"24X01", "24X02"}
+        synchronizer.shopify_client._execute_query.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_dry_run_does_not_record_verification(self, tmp_path):
+        """En dry-run no se registra nada en el ledger y los verificados antes de hoy se revisan."""
+        synchronizer, ledger = await self.make_synchronizer(tmp_path)
+        ledger._verified["24X01"] = time.time() - 2 * 86400
+
+        report = await synchronizer.execute_reverse_sync(dry_run=True, delete_zero_stock=False)
+
+        assert report["statistics"]["products_checked"] == 2
+        assert (await ledger.get_verified_at(["24X01", "24X02"])).keys() == {"24X01"}
+
+    @pytest.mark.asyncio
+    async def test_partially_failed_batch_is_not_recorded_as_verified(self, tmp_path):
+        """Si falla una escritura de inventario del lote, el CCOD no se registra como verificado."""
+        products = [
+            make_shopify_product("24X01", {"24X01-38": 1}),
+            make_shopify_product("24X02", {"24X02-38": 1, "24X02-39": 1, "24X02-40": 1}),
+        ]
+        synchronizer, ledger = await self.make_synchronizer(tmp_path, products)
+        synchronizer.product_repository.get_stock_by_ccods = AsyncMock(
+            return_value={"24x01": {"24x01-38": 3}, "24x02": {"24x02-38": 4, "24x02-39": 5, "24x02-40": 6}}
+        )
+
+        async def batch_update_inventory(updates):
+            failed = [{"update": update, "error": "Update failed"} for update in updates if update["sku"] == "24X02-39"]
+            return len(updates) - len(failed), failed
+
+        synchronizer.shopify_client.inventory.batch_update_inventory = AsyncMock(side_effect=batch_update_inventory)
+
+        await synchronizer.execute_reverse_sync(delete_zero_stock=False)
+
+        assert (await ledger.get_verified_at(["24X01", "24X02"])).keys() == {"24X01"}
+
+    @pytest.mark.asyncio
+    async def test_failed_deletion_is_not_recorded_as_verified(self, tmp_path):
+        """Si falla el borrado de una variante sin stock, el CCOD no se registra como verificado."""
+        products = [make_shopify_product("24X01", {"24X01-38": 1, "24X01-39": 2})]
+        synchronizer, ledger = await self.make_synchronizer(tmp_path, products)
+        synchronizer.product_repository.get_stock_by_ccods = AsyncMock(return_value={"24x01": {"24x01-38": 3}})
+        synchronizer._validate_variant_deletion = AsyncMock(return_value=(True, "ok"))
+        synchronizer.shopify_client.products.delete_variant = AsyncMock(return_value={"success": False})
+
+        await synchronizer.execute_reverse_sync(delete_zero_stock=True)
+
+        assert await ledger.get_verified_at(["24X01"]) == {}
@@ -0,0 +1,235 @@
+"""Tests unitarios para la extracción de RMS por bloques de CCOD (generador asíncrono)."""
+
+import re
+import tracemalloc
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.rms_to_shopify.data_extractor import RMSExtractor
+from app.services.rms_to_shopify.sync_orchestrator import RMSToShopifySyncOrchestrator
+
+SIZES = ("36", "37", "38", "39", "40")
+
+
+class SyntheticViewItems:
+    """QueryExecutor simulado que genera filas de View_Items bajo demanda (5 tallas por CCOD)."""
+
+    def __init__(self, total_ccods):
+        self.ccods = [f"{number:06d}" for number in range(total_ccods)]
+        self.rows_returned = 0
+
+    async def execute_custom_query(self, query, params=None):
+        if "SELECT DISTINCT TOP" in query:
+            limit = int(re.search(r"TOP \((\d+)\)", query).group(1))
+            after = (params or {}).get("after_ccod", "")
+            start = int(after) + 1 if after else 0
+            return [{"CCOD": ccod} for ccod in self.ccods[start : start + limit]]
+
+        page_ccods = [value for key, value in params.items() if key.startswith("page_ccod_")]
+        rows = [
+            {
+                "Familia": "Zapatos",
+                "Genero": "Mujer",
+                "Categoria": "Casual",
+                "CCOD": ccod,
+                "C_ARTICULO": f"{ccod}{size}",
+                "ItemID": int(ccod) * 10 + index,
+                "Description": f"Zapato Casual {ccod}",
+                "color": "Negro",
+                "talla": size,
+                "Quantity": 3,
+                "Price": 15990.0,
+                "SalePrice": None,
+                "ExtendedCategory": "",
+                "Tax": 13,
+                "SaleStartDate": None,
+                "SaleEndDate": None,
+            }
+            for ccod in page_ccods
+            for index, size in enumerate(SIZES)
+        ]
+        self.rows_returned += len(rows)
+        return rows
+
+
+class TestStreamingExtraction:
+    """Tests para la memoria acotada del generador de productos."""
+
+    @pytest.mark.asyncio
+    async def test_chunks_resume_after_ccod(self):
+        """Los bloques salen en orden de CCOD y se puede reanudar después de un CCOD."""
+        executor = SyntheticViewItems(total_ccods=25)
+        extractor = RMSExtractor(executor, MagicMock(), MagicMock(), "gid://shopify/Location/1")
+
+        chunks = [
+            (len(products), last_ccod)
+            async for products, last_ccod in extractor.iter_rms_products_with_variants(
+                chunk_size=10, after_ccod="000004"
+            )
+        ]
+
+        assert chunks == [(10, "000014"), (10, "000024")]
+
+    @pytest.mark.asyncio
+    async def test_memory_stays_bounded_on_200k_items(self, monkeypatch):
+        """200k filas de View_Items se recorren con un pico de memoria de un solo bloque."""
+        executor = SyntheticViewItems(total_ccods=40_000)
+        extractor = RMSExtractor(executor, MagicMock(), MagicMock(), "gid://shopify/Location/1")
+
+        # El mapeo real se prueba aparte; aquí solo importa que nada se acumule entre bloques
+        async def map_products(rms_items, *args, **kwargs):
+            return [SimpleNamespace(handle=item.ccod) for item in rms_items[:: len(SIZES)]]
+
+        monkeypatch.setattr("app.services.rms_to_shopify.data_extractor.create_products_with_variants", map_products)
+
+        products_seen = 0
+        tracemalloc.start()
+        try:
+            async for products, _ in extractor.iter_rms_products_with_variants(chunk_size=500):
+                products_seen += len(products)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert executor.rows_returned == 200_000
+        assert products_seen == 40_000
+        # Un bloque son 2.500 filas; la lista completa de filas y modelos ocuparía cientos de MB
+        assert peak < 16 * 1024 * 1024
+
+
+class FilteringViewItems:
+    """QueryExecutor simulado que aplica los filtros de fila de la consulta de artículos."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.ccod_queries = []
+        self.items_queries = []
+
+    async def execute_custom_query(self, query, params=None):
+        if "SELECT DISTINCT TOP" in query:
+            self.ccod_queries.append(query)
+            return [{"CCOD": "000001"}] if not params.get("after_ccod") else []
+
+        self.items_queries.append((query, params))
+        page_ccods = {value for key, value in params.items() if key.startswith("page_ccod_")}
+        return [
+            row
+            for row in self.rows
+            if row["CCOD"] in page_ccods
+            and row["Price"] > 0
+            and ("Quantity > 0" not in query or row["Quantity"] > 0)
+        ]
+
+
+class TestItemRowFilters:
+    """Tests para los filtros de fila de la consulta de artículos por CCOD."""
+
+    @staticmethod
+    def make_rows():
+        """Un CCOD con una fila válida, una con precio cero y otra sin stock."""
+        base = {
+            "Familia": "Zapatos",
+            "Genero": "Mujer",
+            "Categoria": "Casual",
+            "CCOD": "000001",
+            "Description": "Zapato Casual 000001",
+            "color": "Negro",
+            "SalePrice": None,
+            "ExtendedCategory": "",
+            "Tax": 13,
+            "SaleStartDate": None,
+            "SaleEndDate": None,
+        }
+        return [
+            {**base, "C_ARTICULO": "00000136", "ItemID": 1, "talla": "36", "Quantity": 3, "Price": 15990.0},
+            {**base, "C_ARTICULO": "00000137", "ItemID": 2, "talla": "37", "Quantity": 3, "Price": 0},
+            {**base, "C_ARTICULO": "00000138", "ItemID": 3, "talla": "38", "Quantity": 0, "Price": 15990.0},
+        ]
+
+    @staticmethod
+    async def extract_sizes(monkeypatch, include_zero_stock):
+        executor = FilteringViewItems(TestItemRowFilters.make_rows())
+        extractor = RMSExtractor(executor, MagicMock(), MagicMock(), "gid://shopify/Location/1")
+        mapped_items = []
+
+        async def map_products(rms_items, *args, **kwargs):
+            mapped_items.extend(rms_items)
+            return [SimpleNamespace(handle="000001")]
+
+        monkeypatch.setattr("app.services.rms_to_shopify.data_extractor.create_products_with_variants", map_products)
+
+        await extractor.extract_rms_products_with_variants(ccod="000001", include_zero_stock=include_zero_stock)
+        return executor, {item.talla: item.quantity for item in mapped_items}
+
+    @pytest.mark.asyncio
+    async def test_zero_price_rows_are_filtered_and_zero_stock_sizes_kept(self, monkeypatch):
+        """Se descarta la fila de precio cero; la talla sin stock de un CCOD con stock se mapea en 0."""
+        executor, sizes = await self.extract_sizes(monkeypatch, include_zero_stock=False)
+
+        query, params = executor.items_queries[0]
+        assert "Price > 0" in query
+        assert "Description IS NOT NULL" in query
+        assert "C_ARTICULO IS NOT NULL" in query
+        assert "Quantity > 0" not in query
+        assert "000001" not in query
+        assert params == {"page_ccod_0": "000001"}
+        assert sizes == {"36": 3, "38": 0}
+
+    @pytest.mark.asyncio
+    async def test_stock_filter_applies_only_to_ccod_selection(self, monkeypatch):
+        """El filtro de stock solo decide qué CCODs entran; include_zero_stock lo quita."""
+        executor, _ = await self.extract_sizes(monkeypatch, include_zero_stock=False)
+        assert "Quantity > 0" in executor.ccod_queries[0]
+
+        executor, sizes = await self.extract_sizes(monkeypatch, include_zero_stock=True)
+        assert "Quantity > 0" not in executor.ccod_queries[0]
+        assert sizes == {"36": 3, "38": 0}
+
+
+class TestTraditionalResume:
+    """Tests para la reanudación del sync tradicional desde el último CCOD."""
+
+    @staticmethod
+    def make_orchestrator(after_ccods, interrupt=False):
+        """Orquestador con dos bloques de 10 productos; con interrupt falla tras el primero."""
+        orchestrator = RMSToShopifySyncOrchestrator(sync_id="test_traditional_resume")
+
+        async def iter_products(filter_categories, cod_product, include_zero_stock, chunk_size, after_ccod):
+            after_ccods.append(after_ccod)
+            if after_ccod is None:
+                yield [SimpleNamespace()] * 10, "000009"
+            if interrupt:
+                raise ConnectionError("RMS connection lost")
+            yield [SimpleNamespace()] * 10, "000019"
+
+        orchestrator.rms_extractor = MagicMock()
+        orchestrator.rms_extractor.count_rms_products = AsyncMock(return_value=20)
+        orchestrator.rms_extractor.iter_rms_products_with_variants = iter_products
+        orchestrator.product_processor = MagicMock()
+        orchestrator.product_processor.process_products_in_batches_optimized = AsyncMock(
+            side_effect=lambda products, *args, **kwargs: {"total_processed": len(products), "updated": len(products)}
+        )
+        orchestrator.product_processor.get_skip_report = MagicMock(return_value={})
+        orchestrator.report_generator = MagicMock()
+        orchestrator.report_generator.generate_sync_report = MagicMock(
+            side_effect=lambda stats: {"statistics": stats, "success_rate": 100.0}
+        )
+        return orchestrator
+
+    @pytest.mark.asyncio
+    async def test_interrupted_sync_resumes_after_last_ccod(self, tmp_path, monkeypatch):
+        """Tras una interrupción, el siguiente sync pide los CCOD posteriores al del checkpoint."""
+        monkeypatch.chdir(tmp_path)
+        after_ccods = []
+
+        with pytest.raises(ConnectionError):
+            await self.make_orchestrator(after_ccods, interrupt=True)._sync_products_traditional(
+                False, 10, None, False, None
+            )
+        report = await self.make_orchestrator(after_ccods)._sync_products_traditional(False, 10, None, False, None)
+
+        assert after_ccods == [None, "000009"]
+        assert report["statistics"]["total_processed"] == 20
+        assert report["statistics"]["resumed_from_checkpoint"] is True
@@ -0,0 +1,108 @@
+"""Tests unitarios para el pipeline extracción/procesamiento del sync en streaming."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.rms_to_shopify.sync_orchestrator import RMSToShopifySyncOrchestrator
+
+
+def make_orchestrator(total_products, page_size, events):
+    """Orquestador con extractor, procesador y checkpoints simulados."""
+    orchestrator = RMSToShopifySyncOrchestrator(sync_id="test_pipeline", resume_from_checkpoint=False)
+
+    catalog = [f"C{number:04d}" for number in range(total_products)]
+
+    async def extract(limit, filter_categories, include_zero_stock=False, after_ccod=None):
+        remaining = [ccod for ccod in catalog if ccod > (after_ccod or "")]
+        page_ccods = remaining[:limit]
+        if not page_ccods:
+            return [], None
+        events.append(("extract_start", catalog.index(page_ccods[0]) // page_size + 1))
+        await asyncio.sleep(0.01)
+        return [SimpleNamespace(tags=[f"ccod_{ccod.lower()}"]) for ccod in page_ccods], page_ccods[-1]
+
+    async def process(page_products, *args, **kwargs):
+        page = int(page_products[0].tags[0].replace("ccod_c", "")) // page_size + 1
+        events.append(("process_start", page))
+        await asyncio.sleep(0.03)
+        events.append(("process_end", page))
+        return {"total_processed": len(page_products), "created": len(page_products)}
+
+    orchestrator.rms_extractor = MagicMock()
+    orchestrator.rms_extractor.count_rms_products = AsyncMock(return_value=total_products)
+    orchestrator.rms_extractor.extract_rms_products_paginated = AsyncMock(side_effect=extract)
+    orchestrator.product_processor = MagicMock()
+    orchestrator.product_processor.process_products_in_batches_optimized = AsyncMock(side_effect=process)
+    orchestrator.product_processor.get_skip_report = MagicMock(return_value={})
+    orchestrator.checkpoint_manager = MagicMock()
+    orchestrator.checkpoint_manager.load_checkpoint = AsyncMock(return_value=None)
+    orchestrator.checkpoint_manager.save_checkpoint = AsyncMock()
+    orchestrator.checkpoint_manager.delete_checkpoint = AsyncMock()
+    orchestrator.report_generator = MagicMock()
+    orchestrator.report_generator.generate_sync_report = MagicMock(side_effect=lambda stats: {"statistics": stats})
+    return orchestrator
+
+
+class TestStreamingPipeline:
+    """Tests para la superposición de etapas y los checkpoints."""
+
+    @pytest.mark.asyncio
+    async def test_extraction_overlaps_processing(self):
+        """La página siguiente se extrae mientras se procesa la actual."""
+        events = []
+        orchestrator = make_orchestrator(total_products=40, page_size=10, events=events)
+
+        report = await orchestrator._sync_products_streaming(False, 10, None, False, page_size=10)
+
+        assert events.index(("extract_start", 2)) < events.index(("process_end", 1))
+        assert report["total_products_synced"] == 40
+        assert report["pages_processed"] == 4
+        assert set(report["pipeline"]["stages"]) == {"extract", "process"}
+        assert report["pipeline"]["stages"]["process"]["busy_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_checkpoints_store_last_ccod(self):
+        """Los checkpoints se guardan en orden con el último CCOD de cada página."""
+        events = []
+        orchestrator = make_orchestrator(total_products=25, page_size=10, events=events)
+
+        await orchestrator._sync_products_streaming(False, 10, None, False, page_size=10)
+
+        saved_ccods = [
+            call.kwargs["last_processed_ccod"]
+            for call in orchestrator.checkpoint_manager.save_checkpoint.await_args_list
+        ]
+        assert saved_ccods == ["C0009", "C0019", "C0024"]
+        orchestrator.checkpoint_manager.delete_checkpoint.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_resume_seeks_past_checkpoint_ccod(self):
+        """Al reanudar, la extracción continúa después del último CCOD guardado."""
+        events = []
+        orchestrator = make_orchestrator(total_products=30, page_size=10, events=events)
+        orchestrator.resume_from_checkpoint = True
+        orchestrator.checkpoint_manager.load_checkpoint.return_value = {
+            "last_processed_ccod": "C0019",
+            "stats": {"total_processed": 20, "created": 20, "updated": 0, "errors": 0, "skipped": 0},
+            "additional_data": {"current_page": 3},
+        }
+        orchestrator.checkpoint_manager.should_resume = AsyncMock(return_value=True)
+
+        report = await orchestrator._sync_products_streaming(False, 10, None, False, page_size=10)
+
+        first_call = orchestrator.rms_extractor.extract_rms_products_paginated.await_args_list[0]
+        assert first_call.kwargs["after_ccod"] == "C0019"
+        assert report["total_products_synced"] == 30
+
+    @pytest.mark.asyncio
+    async def test_extraction_error_stops_pipeline(self):
+        """Un error de extracción se propaga y no deja la tarea productora colgada."""
+        events = []
+        orchestrator = make_orchestrator(total_products=30, page_size=10, events=events)
+        orchestrator.rms_extractor.extract_rms_products_paginated.side_effect = RuntimeError("RMS down")
+
+        with pytest.raises(RuntimeError, match="RMS down"):
+            await orchestrator._sync_products_streaming(False, 10, None, False, page_size=10)
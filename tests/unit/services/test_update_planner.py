@@ -0,0 +1,219 @@
+"""Tests unitarios para el planificador de mutaciones mínimas de actualización."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.api.v1.schemas.shopify_schemas import ProductStatus, ShopifyProductInput, ShopifyVariantInput
+from app.services.multiple_variants_creator import MultipleVariantsCreator
+from app.services.multiple_variants_creator.update_planner import UpdatePlanner
+from app.utils.error_handler import ShopifyAPIException
+
+LOCATION_ID = "gid://shopify/Location/1"
+PRODUCT_ID = "gid://shopify/Product/1"
+
+
+def make_input(prices=("15990", "15990"), quantities=(5, 3)):
+    """Producto deseado con dos tallas."""
+    return ShopifyProductInput(
+        title="Zapato Casual",
+        handle="zapato-casual-24x01",
+        status=ProductStatus.ACTIVE,
+        vendor="Best Brands",
+        tags=["ccod_24x01"],
+        options=["Color", "Talla"],
+        variants=[
+            ShopifyVariantInput(
+                sku=f"24X01-{size}",
+                price=price,
+                options=["Negro", size],
+                inventoryQuantities=[{"locationId": LOCATION_ID, "availableQuantity": quantity}],
+            )
+            for size, price, quantity in zip(("38", "39"), prices, quantities, strict=True)
+        ],
+        metafields=[{"namespace": "rms", "key": "ccod", "type": "single_line_text_field", "value": "24X01"}],
+    )
+
+
+def make_snapshot(quantities=(5, 3)):
+    """Estado actual del producto en Shopify, igual al producto deseado por defecto."""
+    variants = [
+        {
+            "id": f"gid://shopify/ProductVariant/{size}",
+            "sku": f"24X01-{size}",
+            "price": "15990.00",
+            "compareAtPrice": None,
+            "selectedOptions": [{"name": "Color", "value": "Negro"}, {"name": "Size", "value": size}],
+            "inventoryItem": {
+                "id": f"gid://shopify/InventoryItem/{size}",
+                "tracked": True,
+                "inventoryLevel": {"quantities": [{"name": "available", "quantity": quantity}]},
+            },
+        }
+        for size, quantity in zip(("38", "39"), quantities, strict=True)
+    ]
+    return {
+        "id": PRODUCT_ID,
+        "title": "Zapato Casual",
+        "status": "ACTIVE",
+        "vendor": "Best Brands",
+        "tags": ["ccod_24x01", "RMS-SYNC-25-01-02"],
+        "category": None,
+        "metafields": {
+            "edges": [{"node": {"namespace": "rms", "key": "ccod", "type": "single_line_text_field", "value": "24X01"}}]
+        },
+        "variants": {"edges": [{"node": variant} for variant in variants], "pageInfo": {"hasNextPage": False}},
+    }
+
+
+def make_client(snapshot):
+    """Cliente de Shopify simulado que devuelve el snapshot."""
+    client = MagicMock()
+    client._execute_query = AsyncMock(return_value={"product": snapshot})
+    client.update_product = AsyncMock(return_value={"id": PRODUCT_ID})
+    client.update_variants_bulk = AsyncMock(return_value={"productVariants": []})
+    client.write_inventory_batch = AsyncMock(
+        side_effect=lambda items, location_id, activate=True: [{**item, "success": True} for item in items]
+    )
+    return client
+
+
+class TestBuildPlan:
+    """Tests para la comparación con el estado actual."""
+
+    def test_unchanged_product_needs_no_operations(self):
+        """Un producto igual al de Shopify no genera operaciones."""
+        planner = UpdatePlanner(MagicMock(), LOCATION_ID)
+
+        plan = planner.build_plan(PRODUCT_ID, make_input(), make_snapshot())
+
+        assert plan.is_empty
+
+    def test_inventory_drift_only_sets_changed_quantities(self):
+        """Solo las cantidades distintas se incluyen en el plan."""
+        planner = UpdatePlanner(MagicMock(), LOCATION_ID)
+
+        plan = planner.build_plan(PRODUCT_ID, make_input(quantities=(7, 3)), make_snapshot())
+
+        assert plan.operations == ["inventory_set"]
+        assert [(item["sku"], item["quantity"]) for item in plan.inventory_items] == [("24X01-38", 7)]
+        assert not plan.inventory_needs_activation
+
+    def test_legacy_sync_tag_does_not_trigger_update(self):
+        """Un tag RMS-SYNC con fecha antiguo no genera por sí solo una actualización."""
+        planner = UpdatePlanner(MagicMock(), LOCATION_ID)
+        snapshot = make_snapshot()
+        snapshot["tags"] = ["ccod_24x01", "RMS-SYNC-25-01-01", "Destacado"]
+
+        plan = planner.build_plan(PRODUCT_ID, make_input(), snapshot)
+
+        assert plan.is_empty
+
+    def test_tag_change_drops_legacy_sync_tags(self):
+        """Si los tags cambian, se conservan los propios de Shopify y se quitan los RMS-SYNC antiguos."""
+        planner = UpdatePlanner(MagicMock(), LOCATION_ID)
+        snapshot = make_snapshot()
+        snapshot["tags"] = ["RMS-SYNC-25-01-01", "Destacado"]
+
+        plan = planner.build_plan(PRODUCT_ID, make_input(), snapshot)
+
+        assert plan.operations == ["product_update"]
+        assert set(plan.product_fields) == {"tags"}
+        assert set(plan.product_fields["tags"]) == {"ccod_24x01", "Destacado"}
+
+    def test_cleanup_candidates_need_cleanup_service(self):
+        """Sin servicio de limpieza, una variante sin stock en RMS no genera operaciones."""
+        planner = UpdatePlanner(MagicMock(), LOCATION_ID)
+
+        plan = planner.build_plan(PRODUCT_ID, make_input(quantities=(5, 0)), make_snapshot(quantities=(5, 2)))
+
+        assert plan.cleanup_candidates == []
+        assert plan.is_empty
+
+    def test_cleanup_skips_variants_already_at_zero(self):
+        """Con limpieza activa solo se proponen las variantes que aún tienen stock en Shopify."""
+        planner = UpdatePlanner(MagicMock(), LOCATION_ID, plan_cleanup=True)
+
+        plan = planner.build_plan(PRODUCT_ID, make_input(quantities=(0, 0)), make_snapshot(quantities=(0, 2)))
+
+        assert plan.operations == ["zero_stock_cleanup"]
+        assert plan.cleanup_candidates == ["24X01-39"]
+
+
+class TestExecutePlan:
+    """Tests para la ejecución del plan en MultipleVariantsCreator."""
+
+    @pytest.mark.asyncio
+    async def test_price_change_costs_one_mutation(self):
+        """Un cambio de precio envía un solo productVariantsBulkUpdate."""
+        client = make_client(make_snapshot())
+        creator = MultipleVariantsCreator(client, LOCATION_ID, enable_cleanup=False)
+
+        result = await creator.update_product_with_variants(
+            PRODUCT_ID, make_input(prices=("12990", "15990")), {"id": PRODUCT_ID}
+        )
+
+        assert result["update_plan"]["operations"] == ["variants_update"]
+        client.update_variants_bulk.assert_awaited_once()
+        _, bulk_inputs = client.update_variants_bulk.await_args.args
+        assert bulk_inputs == [{"id": "gid://shopify/ProductVariant/38", "price": "12990"}]
+        client.update_product.assert_not_awaited()
+        client.write_inventory_batch.assert_not_awaited()
+        assert client._execute_query.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_snapshot_falls_back_to_full_update(self):
+        """Sin snapshot (demasiadas variantes) se usa el flujo completo."""
+        snapshot = make_snapshot()
+        snapshot["variants"]["pageInfo"]["hasNextPage"] = True
+        client = make_client(snapshot)
+        creator = MultipleVariantsCreator(client, LOCATION_ID, enable_cleanup=False)
+        creator.variant_manager.get_existing_variants = AsyncMock(return_value=[])
+        creator.variant_manager.sync_product_variants = AsyncMock()
+        creator.metafields_manager.update_metafields = AsyncMock()
+        creator.inventory_manager.activate_inventory_for_all_variants = AsyncMock()
+
+        result = await creator.update_product_with_variants(PRODUCT_ID, make_input(), {"id": PRODUCT_ID, "tags": []})
+
+        assert result["update_plan"] == {"operations": ["full_update"]}
+        client.update_product.assert_awaited_once()
+        creator.variant_manager.sync_product_variants.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_prefetched_snapshot_is_not_fetched_again(self):
+        """El producto de la consulta en lote de la página se usa como snapshot."""
+        snapshot = make_snapshot()
+        client = make_client(snapshot)
+        creator = MultipleVariantsCreator(client, LOCATION_ID, enable_cleanup=False)
+
+        result = await creator.update_product_with_variants(PRODUCT_ID, make_input(quantities=(5, 1)), snapshot)
+
+        assert result["update_plan"]["operations"] == ["inventory_set"]
+        client._execute_query.assert_not_awaited()
+        items, _ = client.write_inventory_batch.await_args.args
+        assert [(item["sku"], item["quantity"]) for item in items] == [("24X01-39", 1)]
+
+    @pytest.mark.asyncio
+    async def test_failed_inventory_write_fails_the_update(self):
+        """Si una cantidad planificada no se escribe, la actualización falla en vez de contarse como hecha."""
+        snapshot = make_snapshot()
+        client = make_client(snapshot)
+        client.write_inventory_batch = AsyncMock(
+            side_effect=lambda items, location_id, activate=True: [{**item, "success": False} for item in items]
+        )
+        creator = MultipleVariantsCreator(client, LOCATION_ID, enable_cleanup=False)
+
+        with pytest.raises(ShopifyAPIException, match="inventory"):
+            await creator.update_product_with_variants(PRODUCT_ID, make_input(quantities=(5, 1)), snapshot)
+
+    @pytest.mark.asyncio
+    async def test_failed_variant_update_fails_the_update(self):
+        """Si el productVariantsBulkUpdate y su respaldo REST fallan, la actualización falla."""
+        snapshot = make_snapshot()
+        client = make_client(snapshot)
+        client.update_variants_bulk = AsyncMock(side_effect=ShopifyAPIException("HTTP 502: Bad Gateway"))
+        creator = MultipleVariantsCreator(client, LOCATION_ID, enable_cleanup=False)
+        creator.variant_manager.update_single_variant = AsyncMock(return_value=False)
+
+        with pytest.raises(ShopifyAPIException, match="variant updates"):
+            await creator.update_product_with_variants(PRODUCT_ID, make_input(prices=("12990", "15990")), snapshot)
@@ -0,0 +1,82 @@
+"""Tests unitarios para la actualización en lote de variantes."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.multiple_variants_creator.variant_manager import VariantManager
+
+
+def make_manager():
+    """VariantManager con cliente Shopify simulado."""
+    shopify_client = MagicMock()
+    shopify_client.update_variants_bulk = AsyncMock(return_value={"productVariants": []})
+    return VariantManager(shopify_client, "gid://shopify/Location/1")
+
+
+def existing(variant_id: str, price: str, sku: str):
+    """Variante existente en Shopify."""
+    return {"id": variant_id, "price": price, "sku": sku}
+
+
+def new(sku: str, price: str, compare_at=None):
+    """Variante nueva desde RMS."""
+    return SimpleNamespace(sku=sku, price=price, compareAtPrice=compare_at)
+
+
+class TestUpdateExistingVariants:
+    """Tests para productVariantsBulkUpdate por producto."""
+
+    @pytest.mark.asyncio
+    async def test_all_variants_in_one_bulk_update(self):
+        """Todas las variantes del producto deben enviarse en una sola mutación."""
+        manager = make_manager()
+        variants = [
+            (existing(f"gid://shopify/ProductVariant/{i}", "1000", f"OLD{i}"), new(f"SKU{i}", "15990.00"))
+            for i in range(20)
+        ]
+
+        await manager.update_existing_variants("gid://shopify/Product/1", variants)
+
+        manager.shopify_client.update_variants_bulk.assert_awaited_once()
+        product_id, inputs = manager.shopify_client.update_variants_bulk.await_args.args
+        assert product_id == "gid://shopify/Product/1"
+        assert len(inputs) == 20
+        assert inputs[0] == {
+            "id": "gid://shopify/ProductVariant/0",
+            "price": "15990",
+            "inventoryItem": {"sku": "SKU0"},
+        }
+
+    @pytest.mark.asyncio
+    async def test_extreme_prices_are_not_sent(self):
+        """Precios mayores a 1,000,000 no deben enviarse y compare-at inválido se descarta."""
+        manager = make_manager()
+        variants = [
+            (existing("gid://shopify/ProductVariant/1", "1000", "A"), new("A", "2000000")),
+            (existing("gid://shopify/ProductVariant/2", "1000", "B"), new("B", "5000", compare_at="3000000")),
+        ]
+
+        await manager.update_existing_variants("gid://shopify/Product/1", variants)
+
+        _, inputs = manager.shopify_client.update_variants_bulk.await_args.args
+        assert inputs == [{"id": "gid://shopify/ProductVariant/2", "price": "5000"}]
+
+    @pytest.mark.asyncio
+    async def test_bulk_failure_falls_back_to_rest(self):
+        """Si la mutación falla, cada variante se actualiza vía REST."""
+        manager = make_manager()
+        manager.shopify_client.update_variants_bulk.side_effect = Exception("userErrors")
+        manager.update_variant_via_rest = AsyncMock(return_value={"id": 1})
+
+        updated = await manager.update_variants_bulk(
+            "gid://shopify/Product/1",
+            [
+                {"id": "gid://shopify/ProductVariant/1", "price": "100"},
+                {"id": "gid://shopify/ProductVariant/2", "sku": "X"},
+            ],
+        )
+
+        assert updated == 2
+        assert manager.update_variant_via_rest.await_count == 2
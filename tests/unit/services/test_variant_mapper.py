@@ -0,0 +1,124 @@
+"""Tests unitarios para la consulta en lote de productos existentes durante el mapeo."""
+
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.api.v1.schemas.rms_schemas import RMSViewItem
+from app.api.v1.schemas.shopify_schemas import ProductStatus
+from app.services.rms_to_shopify.product_processor import ProductProcessor
+from app.services.rms_to_shopify.shopify_updater import ShopifyUpdater
+from app.services.variant_mapper import VariantMapper, create_products_with_variants
+
+
+def make_items(ccods):
+    """Dos tallas por CCOD."""
+    return [
+        RMSViewItem(
+            familia="Zapatos",
+            categoria="Tenis",
+            ccod=ccod,
+            c_articulo=f"{ccod}-{size}",
+            item_id=index,
+            description=f"Tenis {ccod}-{size}",
+            color="Negro",
+            talla=size,
+            quantity=3,
+            price=Decimal("15990"),
+        )
+        for index, (ccod, size) in enumerate((ccod, size) for ccod in ccods for size in ("38", "39"))
+    ]
+
+
+class TestPagePrefetch:
+    """Tests para la consulta única por página."""
+
+    @pytest.mark.asyncio
+    async def test_one_lookup_serves_mapping_and_existence_check(self):
+        """El mapeo consulta todos los handles en lote y el chequeo de existencia usa la caché."""
+        items = make_items(["24X01", "24X02"])
+        existing_handle = VariantMapper.get_group_handle(items[:2])
+        new_handle = VariantMapper.get_group_handle(items[2:])
+
+        shopify_client = MagicMock()
+        shopify_client.get_product_by_handle = AsyncMock()
+        shopify_client.get_product_snapshots_by_handles = AsyncMock(
+            return_value={existing_handle: {"id": "gid://shopify/Product/1", "status": "ACTIVE"}, new_handle: None}
+        )
+        updater = ShopifyUpdater(shopify_client, "gid://shopify/Location/1")
+
+        with patch("app.services.data_mapper.RMSToShopifyMapper.resolve_category_id", AsyncMock(return_value=None)):
+            products = await create_products_with_variants(
+                items, shopify_client, "gid://shopify/Location/1", product_lookup=updater.check_products_exist_batch
+            )
+        existing = await updater.check_products_exist_batch([product.handle for product in products])
+
+        assert {product.handle: product.status for product in products} == {
+            existing_handle: ProductStatus.ACTIVE,
+            new_handle: ProductStatus.DRAFT,
+        }
+        assert existing[existing_handle]["id"] == "gid://shopify/Product/1"
+        assert existing[new_handle] is None
+        shopify_client.get_product_snapshots_by_handles.assert_awaited_once()
+        shopify_client.get_product_by_handle.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_lookup_is_not_treated_as_missing(self):
+        """Si la consulta en lote falla, el status se consulta por handle en vez de publicar como DRAFT."""
+        items = make_items(["24X01"])
+        shopify_client = MagicMock()
+        shopify_client.get_product_by_handle = AsyncMock(return_value={"status": "ACTIVE"})
+        shopify_client.get_product_snapshots_by_handles = AsyncMock(side_effect=Exception("timeout"))
+        updater = ShopifyUpdater(shopify_client, "gid://shopify/Location/1")
+
+        with patch("app.services.data_mapper.RMSToShopifyMapper.resolve_category_id", AsyncMock(return_value=None)):
+            products = await create_products_with_variants(
+                items, shopify_client, "gid://shopify/Location/1", product_lookup=updater.check_products_exist_batch
+            )
+
+        assert products[0].status == ProductStatus.ACTIVE
+        assert await updater.check_products_exist_batch([products[0].handle]) == {}
+        shopify_client.get_product_by_handle.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_without_lookup_falls_back_to_per_handle_query(self):
+        """Sin consulta en lote se mantiene la consulta por handle."""
+        items = make_items(["24X01"])
+        shopify_client = MagicMock()
+        shopify_client.get_product_by_handle = AsyncMock(return_value={"status": "ARCHIVED"})
+
+        with patch("app.services.data_mapper.RMSToShopifyMapper.resolve_category_id", AsyncMock(return_value=None)):
+            products = await create_products_with_variants(items, shopify_client, "gid://shopify/Location/1")
+
+        assert products[0].status == ProductStatus.ARCHIVED
+        shopify_client.get_product_by_handle.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_processed_page_is_evicted_from_cache(self):
+        """Tras escribir la página, sus snapshots salen de la caché y la memoria no crece con el catálogo."""
+        items = make_items(["24X01", "24X02"])
+        existing_handle = VariantMapper.get_group_handle(items[:2])
+        new_handle = VariantMapper.get_group_handle(items[2:])
+
+        shopify_client = MagicMock()
+        shopify_client.get_product_snapshots_by_handles = AsyncMock(
+            return_value={existing_handle: {"id": "gid://shopify/Product/1", "status": "ACTIVE"}, new_handle: None}
+        )
+        updater = ShopifyUpdater(shopify_client, "gid://shopify/Location/1")
+        updater.update_shopify_product = AsyncMock(return_value={"id": "gid://shopify/Product/1"})
+        updater.create_shopify_product = AsyncMock(return_value={"id": "gid://shopify/Product/2"})
+        processor = ProductProcessor("test_sync", updater, MagicMock(), MagicMock())
+
+        with patch("app.services.data_mapper.RMSToShopifyMapper.resolve_category_id", AsyncMock(return_value=None)):
+            products = await create_products_with_variants(
+                items, shopify_client, "gid://shopify/Location/1", product_lookup=updater.check_products_exist_batch
+            )
+        stats = await processor.process_products_in_batches_optimized(
+            products, force_update=True, batch_size=10, is_page_processing=True
+        )
+
+        assert stats["updated"] == 1
+        assert stats["created"] == 1
+        assert updater.batch_handle_cache == {}
+        shopify_client.get_product_snapshots_by_handles.assert_awaited_once()
@@ -0,0 +1,157 @@
+"""Tests unitarios para la adquisición de locks en lote y el aviso de liberación por pub/sub."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.utils.distributed_lock import (
+    ACQUIRE_MANY_SCRIPT,
+    RELEASE_MANY_SCRIPT,
+    RELEASE_SCRIPT,
+    DistributedLock,
+    ProductLock,
+    acquire_many,
+    get_lock_metrics,
+    get_lock_release_listener,
+    release_many,
+)
+
+
+class FakePubSub:
+    """Suscripción simulada que recibe lo publicado en el FakeRedis."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis.subscribers.setdefault(channel, []).append(self.queue)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self):
+        pass
+
+
+class FakeRedis:
+    """Redis en memoria que interpreta los scripts Lua de los locks."""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = {}
+        self.eval_calls = 0
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def publish(self, channel, message):
+        for queue in self.subscribers.get(channel, []):
+            queue.put_nowait({"type": "message", "channel": channel, "data": message})
+
+    def release(self, key, token, channel):
+        if self.data.get(key) != token:
+            return 0
+        del self.data[key]
+        self.publish(channel, key)
+        return 1
+
+    async def eval(self, script, numkeys, *args):
+        self.eval_calls += 1
+        keys, argv = args[:numkeys], args[numkeys:]
+        if script == ACQUIRE_MANY_SCRIPT:
+            return [int(bool(await self.set(key, argv[i + 1], nx=True))) for i, key in enumerate(keys)]
+        if script == RELEASE_MANY_SCRIPT:
+            return [self.release(key, argv[i + 1], argv[0]) for i, key in enumerate(keys)]
+        if script == RELEASE_SCRIPT:
+            return self.release(keys[0], argv[0], argv[1])
+        raise AssertionError("unexpected script")
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+def make_lock(redis, product_id, **kwargs):
+    """ProductLock que usa el FakeRedis."""
+    lock = ProductLock(product_id=product_id)
+    lock.use_redis = True
+    lock.redis_client = redis
+    for name, value in kwargs.items():
+        setattr(lock, name, value)
+    return lock
+
+
+class TestBatchLocks:
+    """Tests para acquire_many y release_many."""
+
+    @pytest.mark.asyncio
+    async def test_page_is_locked_and_released_with_one_call_each(self):
+        """Los locks libres de la página se toman con una llamada y los ocupados quedan pendientes."""
+        redis = FakeRedis()
+        redis.data["lock:product:2"] = "otro-proceso"
+        locks = [make_lock(redis, f"gid://shopify/Product/{number}") for number in range(1, 4)]
+
+        acquired = await acquire_many(locks)
+
+        assert [lock.redis_key for lock in acquired] == ["lock:product:1", "lock:product:3"]
+        assert [lock.acquired for lock in locks] == [True, False, True]
+        assert redis.eval_calls == 1
+
+        assert await release_many(locks) == 2
+        assert redis.data == {"lock:product:2": "otro-proceso"}
+        assert redis.eval_calls == 2
+
+
+class TestReleaseWakeup:
+    """Tests para el aviso de liberación en lugar del sondeo con espera."""
+
+    @pytest.mark.asyncio
+    async def test_waiter_is_woken_by_release_in_another_process(self):
+        """Quien espera un lock lo toma en cuanto se publica la liberación, sin agotar el backoff."""
+        get_lock_metrics().reset()
+        redis = FakeRedis()
+        redis.data["lock:product:1"] = "otro-proceso"
+        waiter = make_lock(redis, "gid://shopify/Product/1", retry_delay=5.0)
+
+        async def release_elsewhere():
+            await asyncio.sleep(0.05)
+            await redis.eval(RELEASE_SCRIPT, 1, "lock:product:1", "otro-proceso", "lock:released")
+
+        started = time.monotonic()
+        try:
+            await asyncio.gather(waiter.acquire(), release_elsewhere())
+        finally:
+            await get_lock_release_listener().close()
+
+        assert waiter.acquired
+        assert time.monotonic() - started < 1
+        stats = get_lock_metrics().get_summary()["product"]
+        assert stats["acquired"] == 1
+        assert stats["contended"] == 1
+        assert stats["release_wakeups"] == 1
+        assert 0 < stats["max_wait_seconds"] < 1
+
+    @pytest.mark.asyncio
+    async def test_file_locks_wake_local_waiters(self, tmp_path):
+        """Sin Redis, la liberación en el mismo proceso también despierta a quien espera."""
+        holder = DistributedLock("product:file-test", use_redis=False)
+        holder.lock_file = str(tmp_path / "product.lock")
+        waiter = DistributedLock("product:file-test", retry_delay=5.0, use_redis=False)
+        waiter.lock_file = holder.lock_file
+        await holder.acquire()
+
+        async def release_soon():
+            await asyncio.sleep(0.05)
+            await holder.release()
+
+        started = time.monotonic()
+        await asyncio.gather(waiter.acquire(), release_soon())
+
+        assert waiter.acquired
+        assert time.monotonic() - started < 1
+        await waiter.release()